@@ -119,6 +119,7 @@ export class VoiceSessionBridge {
       this.server.listen(port, "0.0.0.0", () => {
         this.log.info(`[voice-bridge] Listening on port ${port}`);
         this.log.info(`[voice-bridge] POST /call-event - Receive call events`);
+        this.log.info(`[voice-bridge] POST /call-events - Receive batched call events`);
         this.log.info(`[voice-bridge] POST /sync-transcript - Manual transcript sync`);
         this.log.info(`[voice-bridge] GET /health - Health check`);
         this.log.info(`[voice-bridge] GET /zombie-calls - List zombie/stale calls`);
@@ -188,6 +189,32 @@ export class VoiceSessionBridge {
       return;
     }
 
+    // Batched call events from session_context.py's sender: { events: CallEvent[] }.
+    // Handled one at a time, in order, so each call's events keep their order.
+    if (url.pathname === "/call-events" && req.method === "POST") {
+      const body = await this.readBody(req);
+      let events: CallEvent[];
+      try {
+        events = (JSON.parse(body) as { events: CallEvent[] }).events;
+        if (!Array.isArray(events)) throw new Error("events must be an array");
+      } catch (err) {
+        res.statusCode = 400;
+        res.end(JSON.stringify({ error: "Invalid call event batch" }));
+        return;
+      }
+      const results = [];
+      for (const event of events) {
+        try {
+          results.push(await this.handleCallEvent(event));
+        } catch (err) {
+          results.push({ status: "error", error: err instanceof Error ? err.message : String(err) });
+        }
+      }
+      res.statusCode = 200;
+      res.end(JSON.stringify({ results }));
+      return;
+    }
+
     // Manual transcript sync (fetch from webhook-server.py and inject)
     if (url.pathname === "/sync-transcript" && req.method === "POST") {
       const body = await this.readBody(req);
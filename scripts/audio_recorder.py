@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Audio Recorder - Streaming stereo WAV recording of both call legs.
+
+The media bridge hands every frame to the recorder without doing any audio
+work itself: feed_caller()/feed_agent() copy the base64 payload into a
+single-producer/single-consumer ring buffer and return. A background writer
+thread drains the ring, decodes µ-law, places each leg on a shared timeline
+and writes interleaved stereo (left = caller, right = agent):
+
+- Caller frames arrive in real time (Twilio streams silence too), so the
+  caller leg is laid down sequentially and doubles as the recording clock
+- Agent audio arrives in bursts faster than real time; each chunk starts at
+  max(end of previous agent audio, arrival time), which is what the caller
+  actually hears from Twilio's playback buffer
+- The WAV header is rewritten every HEADER_UPDATE_INTERVAL seconds, so a
+  crash still leaves a playable file
+- Optional µ-law compression (WAVE_FORMAT_MULAW) halves the file size
+- Output stops at max_bytes (MAX_RECORDING_SIZE_MB); the file stays valid
+
+Memory per call is bounded by the ring (RECORDING_RING_BYTES) plus at most
+AGENT_LOOKAHEAD_SECONDS of agent audio queued ahead of the caller clock.
+When the ring is full, frames are dropped and counted — the bridge never
+blocks on the recorder.
+
+Usage:
+    recorder = StreamingWavRecorder(path, compress=False, max_bytes=100 * 1024 * 1024)
+    recorder.start()
+    recorder.feed_caller(twilio_payload_b64)
+    recorder.feed_agent(mulaw_payload_b64)
+    stats = recorder.close()   # blocking; use asyncio.to_thread()
+"""
+
+import base64
+import binascii
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# audioop: stdlib in Python < 3.13, audioop-lts on 3.13+
+try:
+    import audioop
+except ImportError:
+    try:
+        import audioop_lts as audioop
+    except ImportError:
+        audioop = None
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 8000
+SAMPLE_WIDTH = 2  # PCM16 in memory
+CHANNELS = 2
+
+RECORDING_RING_BYTES = int(os.getenv("RECORDING_RING_BYTES", str(256 * 1024)))
+AGENT_LOOKAHEAD_SECONDS = 60
+WRITER_POLL_INTERVAL = 0.05
+HEADER_UPDATE_INTERVAL = 1.0
+
+LEG_CALLER = 0
+LEG_AGENT = 1
+
+# Ring record header: leg (B), arrival time (d, monotonic), payload length (I)
+_RECORD_HEADER = struct.Struct("<BdI")
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_MULAW = 7
+
+
+class SPSCRingBuffer:
+    """
+    Fixed-size byte ring for exactly one producer and one consumer thread.
+
+    The producer only ever advances _tail and the consumer only _head, and
+    each index is published with a single attribute store after the bytes
+    are in place, so no lock is needed. Records are written whole or not at
+    all, so the consumer never sees a partial record.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = max(capacity, 64)
+        self._buf = bytearray(self.capacity)
+        self._head = 0  # Total bytes consumed
+        self._tail = 0  # Total bytes produced
+
+    @property
+    def used(self) -> int:
+        return self._tail - self._head
+
+    def write(self, data: bytes) -> bool:
+        """Append data; False (nothing written) if it doesn't fit."""
+        n = len(data)
+        tail = self._tail
+        if n > self.capacity - (tail - self._head):
+            return False
+        pos = tail % self.capacity
+        first = min(n, self.capacity - pos)
+        self._buf[pos:pos + first] = data[:first]
+        if first < n:
+            self._buf[0:n - first] = data[first:]
+        self._tail = tail + n  # Publish
+        return True
+
+    def read_all(self) -> bytes:
+        """Consume everything currently available."""
+        head, tail = self._head, self._tail
+        n = tail - head
+        if not n:
+            return b""
+        pos = head % self.capacity
+        first = min(n, self.capacity - pos)
+        data = bytes(self._buf[pos:pos + first])
+        if first < n:
+            data += bytes(self._buf[0:n - first])
+        self._head = head + n  # Release
+        return data
+
+
+def _wav_header(compress: bool, data_bytes: int, frames: int) -> bytes:
+    """RIFF/WAVE header for stereo 8 kHz, PCM16 or µ-law."""
+    if compress:
+        bits, block_align = 8, CHANNELS
+        fmt = struct.pack("<HHIIHHH", WAVE_FORMAT_MULAW, CHANNELS, SAMPLE_RATE,
+                          SAMPLE_RATE * block_align, block_align, bits, 0)
+        extra = b"fact" + struct.pack("<II", 4, frames)
+    else:
+        bits, block_align = 16, CHANNELS * SAMPLE_WIDTH
+        fmt = struct.pack("<HHIIHH", WAVE_FORMAT_PCM, CHANNELS, SAMPLE_RATE,
+                          SAMPLE_RATE * block_align, block_align, bits)
+        extra = b""
+    body = b"fmt " + struct.pack("<I", len(fmt)) + fmt + extra + b"data" + struct.pack("<I", data_bytes)
+    return b"RIFF" + struct.pack("<I", 4 + len(body) + data_bytes) + b"WAVE" + body
+
+
+class StreamingWavRecorder:
+    """Two-leg stereo WAV writer fed from the event loop, drained by a thread."""
+
+    def __init__(self, path: Path, compress: bool = False,
+                 max_bytes: int = 100 * 1024 * 1024,
+                 ring_bytes: int = RECORDING_RING_BYTES):
+        if audioop is None:
+            raise RuntimeError("audioop not available — run: pip install audioop-lts")
+        self.path = Path(path)
+        self.compress = compress
+        self.max_bytes = max_bytes
+        self._ring = SPSCRingBuffer(ring_bytes)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._t0 = 0.0
+
+        # Writer-thread state: PCM16 per leg, covering samples [_flushed, ...)
+        self._legs = [bytearray(), bytearray()]
+        self._caller_started = False
+        self._flushed = 0
+        self._data_bytes = 0
+        self._frame_bytes = CHANNELS * (1 if compress else SAMPLE_WIDTH)
+        self._file = None
+        self._last_header_update = 0.0
+
+        self.stats = {"frames_in": 0, "frames_dropped": 0, "agent_samples_dropped": 0,
+                      "bad_frames": 0, "truncated": False}
+
+    # ── Producer side (event loop) ──────────────────────────────────────────
+
+    def start(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "wb")
+        self._file.write(_wav_header(self.compress, 0, 0))
+        self._t0 = time.monotonic()
+        self._thread = threading.Thread(
+            target=self._run, name=f"wav-writer-{self.path.stem}", daemon=True
+        )
+        self._thread.start()
+
+    def _feed(self, leg: int, payload_b64: str) -> None:
+        if not payload_b64 or self._thread is None:
+            return
+        data = payload_b64.encode("ascii")
+        record = _RECORD_HEADER.pack(leg, time.monotonic(), len(data)) + data
+        self.stats["frames_in"] += 1
+        if not self._ring.write(record):
+            self.stats["frames_dropped"] += 1
+
+    def feed_caller(self, payload_b64: str) -> None:
+        """Caller audio: Twilio media payload (base64 µ-law 8 kHz)."""
+        self._feed(LEG_CALLER, payload_b64)
+
+    def feed_agent(self, payload_b64: str) -> None:
+        """Agent audio: payload sent to Twilio (base64 µ-law 8 kHz)."""
+        self._feed(LEG_AGENT, payload_b64)
+
+    def close(self) -> Dict[str, Any]:
+        """Stop the writer, finalize the header and return recording stats (blocking)."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        frames = self._data_bytes // self._frame_bytes
+        return {
+            "path": str(self.path),
+            "bytes": self._data_bytes,
+            "duration_s": round(frames / SAMPLE_RATE, 2),
+            "compressed": self.compress,
+            **self.stats,
+        }
+
+    # ── Writer thread ───────────────────────────────────────────────────────
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                self._drain()
+                self._flush(self._now_samples())
+                time.sleep(WRITER_POLL_INTERVAL)
+            self._drain()
+            self._flush(self._now_samples(), final=True)
+        except Exception as e:
+            logger.error(f"Recorder for {self.path.name} failed: {e}")
+        finally:
+            try:
+                self._update_header()
+                self._file.close()
+            except Exception:
+                pass
+
+    def _now_samples(self) -> int:
+        return int((time.monotonic() - self._t0) * SAMPLE_RATE)
+
+    def _drain(self) -> None:
+        data = self._ring.read_all()
+        offset = 0
+        while offset < len(data):
+            leg, arrived, length = _RECORD_HEADER.unpack_from(data, offset)
+            offset += _RECORD_HEADER.size
+            payload = data[offset:offset + length]
+            offset += length
+            try:
+                pcm = audioop.ulaw2lin(base64.b64decode(payload), SAMPLE_WIDTH)
+            except (binascii.Error, ValueError):
+                self.stats["bad_frames"] += 1
+                continue
+            self._place(leg, int((arrived - self._t0) * SAMPLE_RATE), pcm)
+
+    def _place(self, leg: int, arrival: int, pcm: bytes) -> None:
+        buf = self._legs[leg]
+        end = self._flushed + len(buf) // SAMPLE_WIDTH
+        if leg == LEG_CALLER and self._caller_started:
+            start = end  # Continuous stream: the caller leg is the clock
+        else:
+            start = max(end, arrival)
+            self._caller_started = self._caller_started or leg == LEG_CALLER
+        if leg == LEG_AGENT:
+            room = arrival + AGENT_LOOKAHEAD_SECONDS * SAMPLE_RATE - start
+            if room <= 0:
+                self.stats["agent_samples_dropped"] += len(pcm) // SAMPLE_WIDTH
+                return
+            if len(pcm) // SAMPLE_WIDTH > room:
+                self.stats["agent_samples_dropped"] += len(pcm) // SAMPLE_WIDTH - room
+                pcm = pcm[:room * SAMPLE_WIDTH]
+        if start > end:
+            buf.extend(bytes((start - end) * SAMPLE_WIDTH))
+        buf.extend(pcm)
+
+    def _flush(self, now: int, final: bool = False) -> None:
+        """Write both legs up to the recording clock, padding the quieter one."""
+        caller, agent = self._legs
+        caller_end = self._flushed + len(caller) // SAMPLE_WIDTH
+        # Caller frames set the clock; fall back to wall time if they stall
+        horizon = max(caller_end, now - SAMPLE_RATE // 2)
+        if final:
+            horizon = max(caller_end, min(self._flushed + len(agent) // SAMPLE_WIDTH, now))
+        n = horizon - self._flushed
+        if n <= 0:
+            return
+
+        nbytes = n * SAMPLE_WIDTH
+        for buf in self._legs:
+            if len(buf) < nbytes:
+                buf.extend(bytes(nbytes - len(buf)))
+        left, right = bytes(caller[:nbytes]), bytes(agent[:nbytes])
+        del caller[:nbytes]
+        del agent[:nbytes]
+        self._flushed = horizon
+
+        if self.stats["truncated"]:
+            return
+        stereo = audioop.add(
+            audioop.tostereo(left, SAMPLE_WIDTH, 1, 0),
+            audioop.tostereo(right, SAMPLE_WIDTH, 0, 1),
+            SAMPLE_WIDTH,
+        )
+        if self.compress:
+            stereo = audioop.lin2ulaw(stereo, SAMPLE_WIDTH)
+
+        room = self.max_bytes - self._data_bytes
+        if len(stereo) > room:
+            stereo = stereo[:room - room % self._frame_bytes]
+            self.stats["truncated"] = True
+            logger.warning(f"Recording {self.path.name} reached {self.max_bytes} bytes — truncated")
+        self._file.write(stereo)
+        self._data_bytes += len(stereo)
+
+        if final or time.monotonic() - self._last_header_update >= HEADER_UPDATE_INTERVAL:
+            self._update_header()
+
+    def _update_header(self) -> None:
+        """Rewrite the header sizes in place so the file is valid at all times."""
+        header = _wav_header(self.compress, self._data_bytes, self._data_bytes // self._frame_bytes)
+        self._file.seek(0)
+        self._file.write(header)
+        self._file.seek(0, os.SEEK_END)
+        self._file.flush()
+        self._last_header_update = time.monotonic()
+
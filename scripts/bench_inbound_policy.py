@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for inbound authorization.
+
+Compares the compiled InboundPolicy (allowlist trie + per-number decision
+cache) against a linear scan of allowFrom, for growing allowlist sizes.
+Compiled lookups should stay flat as the allowlist grows.
+
+Usage:
+    python scripts/bench_inbound_policy.py [--sizes 10,1000,10000] [--lookups 20000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from inbound_handler import InboundPolicy, normalize_phone  # noqa: E402
+
+
+def linear_match(phone, allow_from):
+    """The pre-compilation allowlist check, kept here as the baseline."""
+    for entry in allow_from:
+        if entry == "*":
+            return entry
+        if entry.endswith("*") and phone.startswith(normalize_phone(entry[:-1])):
+            return entry
+        if normalize_phone(entry) == phone:
+            return entry
+    return None
+
+
+def make_allowlist(size, rng):
+    entries = [f"+1{rng.randrange(10**9, 10**10)}" for _ in range(size - size // 10)]
+    entries += [f"+44{rng.randrange(1000, 9999)}*" for _ in range(size // 10)]
+    return entries
+
+
+def make_callers(allow_from, count, rng):
+    exact = [e for e in allow_from if not e.endswith("*")]
+    callers = []
+    for i in range(count):
+        if exact and i % 2 == 0:
+            callers.append(rng.choice(exact))
+        else:
+            callers.append(f"+1{rng.randrange(10**9, 10**10)}")
+    # Repeat callers, as real inbound traffic does
+    return callers[: max(count // 4, 1)] * 4
+
+
+def per_lookup_us(fn, callers):
+    start = time.perf_counter()
+    for phone in callers:
+        fn(phone)
+    return (time.perf_counter() - start) / len(callers) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="10,100,1000,5000,20000")
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'entries':>8} {'compile ms':>11} {'linear us':>10} {'cold us':>8} {'cached us':>10}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        allow_from = make_allowlist(size, rng)
+        callers = make_callers(allow_from, args.lookups, rng)
+
+        start = time.perf_counter()
+        policy = InboundPolicy({"policy": "allowlist", "allowFrom": allow_from})
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        linear_callers = callers[: min(len(callers), 2000)]
+        linear = per_lookup_us(lambda p: linear_match(normalize_phone(p), allow_from), linear_callers)
+        cold = per_lookup_us(lambda p: policy.allowlist.match(normalize_phone(p)), callers)
+        cached = per_lookup_us(policy.authorize, callers)
+
+        print(f"{size:>8} {compile_ms:>11.2f} {linear:>10.2f} {cold:>8.2f} {cached:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark for transcript search and call listing on a large call history.
+
+Builds a throwaway call_history.db with --calls calls and --lines transcript
+lines per call (100k+ rows by default), then compares:
+
+- search_transcripts (FTS5 + BM25) against a LIKE scan of transcripts
+- list_calls_page (keyset) against list_calls with a deep OFFSET
+
+FTS search should stay in milliseconds while the LIKE scan grows with the
+table; a keyset page costs the same at any depth, an OFFSET page does not.
+
+Usage:
+    python scripts/bench_transcript_search.py [--calls 20000] [--lines 6] [--runs 20]
+"""
+
+import argparse
+import asyncio
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from call_recording import CallRecordingManager  # noqa: E402
+from db_migrations import migrate  # noqa: E402
+
+TOPICS = (
+    "account appointment balance billing booking cancel confirm delivery discount "
+    "invoice order payment plan premium price refund renewal reschedule shipping "
+    "subscription support tomorrow upgrade warranty weekend"
+).split()
+SYLLABLES = "ka lo mi ne ru sa ti vo be da fe gi ho ju".split()
+
+
+def vocabulary(rng, size=5000):
+    """Filler words: conversation vocabulary is large and mostly rare."""
+    return ["".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(size)]
+
+
+def make_line(rng, filler):
+    words = rng.choices(filler, k=11)
+    words.insert(rng.randrange(12), rng.choice(TOPICS))
+    return " ".join(words)
+
+
+def build(db_path, calls, lines, rng):
+    migrate(db_path)
+    filler = vocabulary(rng)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO calls (call_id, call_type, started_at, status) VALUES (?, ?, ?, ?)",
+            [(f"CA{i:08d}", rng.choice(("inbound", "outbound")),
+              (base + timedelta(minutes=i)).isoformat(), rng.choice(("completed", "completed", "failed")))
+             for i in range(calls)]
+        )
+        for i in range(calls):
+            started = base + timedelta(minutes=i)
+            conn.executemany(
+                "INSERT INTO transcripts (call_id, timestamp, speaker, content, event_type) "
+                "VALUES (?, ?, ?, ?, 'speech')",
+                [(f"CA{i:08d}", (started + timedelta(seconds=j)).isoformat(),
+                  "user" if j % 2 else "assistant", make_line(rng, filler))
+                 for j in range(lines)]
+            )
+
+
+def like_search(db_path, query, limit=20):
+    """Substring scan, the only option without the FTS index."""
+    terms = query.split()
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            f"SELECT call_id, COUNT(*) FROM transcripts WHERE {' AND '.join('content LIKE ?' for _ in terms)} "
+            f"GROUP BY call_id ORDER BY COUNT(*) DESC LIMIT ?",
+            (*[f"%{t}%" for t in terms], limit)
+        ).fetchall()
+
+
+def per_run_ms(fn, runs):
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=6)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "call_history.db"
+        start = time.perf_counter()
+        build(db_path, args.calls, args.lines, rng)
+        print(f"built {args.calls} calls / {args.calls * args.lines} transcript rows "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        manager = CallRecordingManager.__new__(CallRecordingManager)
+        manager.db_path = db_path
+        run = asyncio.run
+
+        print(f"\n{'query':<24} {'fts ms':>8} {'like ms':>8}")
+        for query in ("refund", "invoice warranty", "premium upgrade weekend"):
+            fts = per_run_ms(lambda: run(manager.search_transcripts(query)), args.runs)
+            like = per_run_ms(lambda: like_search(db_path, query), max(args.runs // 4, 1))
+            print(f"{query:<24} {fts:>8.2f} {like:>8.2f}")
+
+        print(f"\n{'page depth':<24} {'keyset ms':>9} {'offset ms':>9}")
+        for depth in (0, args.calls // 10, args.calls // 2, args.calls - 50):
+            cursor = None
+            if depth:
+                page, cursor = run(manager.list_calls_page(limit=depth, status="completed"))
+            keyset = per_run_ms(
+                lambda: run(manager.list_calls_page(limit=50, cursor=cursor, status="completed")), args.runs
+            )
+            offset = per_run_ms(
+                lambda: run(manager.list_calls(limit=50, offset=depth, status="completed")), args.runs
+            )
+            print(f"{depth:<24} {keyset:>9.2f} {offset:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
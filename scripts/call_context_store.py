@@ -2,10 +2,18 @@
 """
 Call Context Store - Shared storage for call context between modules.
 
-This module provides a simple in-memory store for call context (caller phone,
-timezone, location) that can be accessed by both webhook-server.py and
+This module provides a store for call context (caller phone, timezone,
+location) that can be accessed by both webhook-server.py and
 realtime_tool_handler.py without circular imports.
 
+The store is bounded: entries expire after CALL_CONTEXT_TTL seconds and the
+least recently used entries are evicted beyond CALL_CONTEXT_MAX_ENTRIES, so
+calls that never reach clear_call_context() do not pile up. Backends:
+
+- "memory" (default): in-process, fastest, visible to this process only
+- "sqlite": a shared SQLite file (CALL_CONTEXT_DB), so a tool handler in
+  another worker process sees the context the webhook server stored
+
 Usage in webhook-server.py:
     from call_context_store import store_call_context
     store_call_context(call_id, caller_phone=from_header)
@@ -15,14 +23,286 @@ Usage in realtime_tool_handler.py:
     context = get_call_context(call_id)
 """
 
+import json
 import logging
-from typing import Dict, Optional, Any
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
-# In-memory store for call contexts
-# Key: call_id, Value: context dict
-_call_contexts: Dict[str, Dict[str, Any]] = {}
+# Configuration
+CALL_CONTEXT_BACKEND = os.getenv("CALL_CONTEXT_BACKEND", "memory")  # memory | sqlite
+CALL_CONTEXT_DB = Path(os.getenv("CALL_CONTEXT_DB", "call_context.db"))
+CALL_CONTEXT_TTL = float(os.getenv("CALL_CONTEXT_TTL", str(4 * 3600)))  # Longer than any call
+CALL_CONTEXT_MAX_ENTRIES = int(os.getenv("CALL_CONTEXT_MAX_ENTRIES", "10000"))
+
+
+class MemoryContextBackend:
+    """In-process backend: an OrderedDict kept in LRU order."""
+
+    def __init__(self, max_entries: int = CALL_CONTEXT_MAX_ENTRIES):
+        self.max_entries = max(max_entries, 1)
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, call_ids: Iterable[str], now: float) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        """Return (found contexts, number of expired entries dropped)."""
+        found: Dict[str, Dict[str, Any]] = {}
+        expired = 0
+        with self._lock:
+            for call_id in call_ids:
+                entry = self._entries.get(call_id)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._entries[call_id]
+                    expired += 1
+                    continue
+                self._entries.move_to_end(call_id)
+                found[call_id] = entry[1]
+        return found, expired
+
+    def put_many(self, contexts: Dict[str, Dict[str, Any]], expires_at: float) -> int:
+        """Store contexts; return how many LRU entries were evicted."""
+        evicted = 0
+        with self._lock:
+            for call_id, context in contexts.items():
+                self._entries[call_id] = (expires_at, context)
+                self._entries.move_to_end(call_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def delete(self, call_id: str) -> bool:
+        with self._lock:
+            return self._entries.pop(call_id, None) is not None
+
+    def items(self, now: float) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {cid: ctx for cid, (exp, ctx) in self._entries.items() if exp > now}
+
+    def purge_expired(self, now: float) -> int:
+        with self._lock:
+            expired = [cid for cid, (exp, _) in self._entries.items() if exp <= now]
+            for call_id in expired:
+                del self._entries[call_id]
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteContextBackend:
+    """
+    Shared backend: one SQLite file used by every worker process.
+
+    LRU order is kept in accessed_at; reads touch it in one UPDATE per batch.
+    WAL mode lets readers in other processes proceed during writes.
+    """
+
+    def __init__(self, db_path: Path = CALL_CONTEXT_DB, max_entries: int = CALL_CONTEXT_MAX_ENTRIES):
+        self.db_path = Path(db_path)
+        self.max_entries = max(max_entries, 1)
+        self._db_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=10.0)
+
+    def _ensure_db(self) -> None:
+        """Create the table on first use (not at import)."""
+        if self._db_ready:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS call_contexts (
+                    call_id TEXT PRIMARY KEY,
+                    context TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_call_contexts_lru ON call_contexts(accessed_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_call_contexts_expiry ON call_contexts(expires_at)')
+            conn.commit()
+        self._db_ready = True
+
+    def get_many(self, call_ids: Iterable[str], now: float) -> Tuple[Dict[str, Dict[str, Any]], int]:
+        ids = list(dict.fromkeys(call_ids))
+        if not ids:
+            return {}, 0
+        self._ensure_db()
+        placeholders = ",".join("?" * len(ids))
+        found: Dict[str, Dict[str, Any]] = {}
+        expired: List[str] = []
+        with self._connect() as conn:
+            rows = conn.execute(
+                f'SELECT call_id, context, expires_at FROM call_contexts WHERE call_id IN ({placeholders})',
+                ids
+            ).fetchall()
+            for call_id, context, expires_at in rows:
+                if expires_at <= now:
+                    expired.append(call_id)
+                else:
+                    found[call_id] = json.loads(context)
+            if found:
+                conn.execute(
+                    f'UPDATE call_contexts SET accessed_at = ? WHERE call_id IN ({",".join("?" * len(found))})',
+                    [now, *found]
+                )
+            if expired:
+                conn.execute(
+                    f'DELETE FROM call_contexts WHERE call_id IN ({",".join("?" * len(expired))}) '
+                    f'AND expires_at <= ?',
+                    [*expired, now]
+                )
+            conn.commit()
+        return found, len(expired)
+
+    def put_many(self, contexts: Dict[str, Dict[str, Any]], expires_at: float) -> int:
+        if not contexts:
+            return 0
+        self._ensure_db()
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO call_contexts (call_id, context, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?)',
+                [(cid, json.dumps(ctx, default=str), expires_at, now) for cid, ctx in contexts.items()]
+            )
+            excess = conn.execute('SELECT COUNT(*) FROM call_contexts').fetchone()[0] - self.max_entries
+            evicted = 0
+            if excess > 0:
+                evicted = conn.execute(
+                    'DELETE FROM call_contexts WHERE call_id IN '
+                    '(SELECT call_id FROM call_contexts ORDER BY accessed_at LIMIT ?)',
+                    (excess,)
+                ).rowcount
+            conn.commit()
+        return evicted
+
+    def delete(self, call_id: str) -> bool:
+        self._ensure_db()
+        with self._connect() as conn:
+            deleted = conn.execute('DELETE FROM call_contexts WHERE call_id = ?', (call_id,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def items(self, now: float) -> Dict[str, Dict[str, Any]]:
+        self._ensure_db()
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT call_id, context FROM call_contexts WHERE expires_at > ?', (now,)
+            ).fetchall()
+        return {call_id: json.loads(context) for call_id, context in rows}
+
+    def purge_expired(self, now: float) -> int:
+        self._ensure_db()
+        with self._connect() as conn:
+            purged = conn.execute('DELETE FROM call_contexts WHERE expires_at <= ?', (now,)).rowcount
+            conn.commit()
+        return purged
+
+    def __len__(self) -> int:
+        self._ensure_db()
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM call_contexts').fetchone()[0]
+
+
+class CallContextStore:
+    """TTL + LRU bounded call context store over a pluggable backend, with hit/miss stats."""
+
+    def __init__(self, backend=None, ttl: float = CALL_CONTEXT_TTL):
+        self.backend = backend if backend is not None else MemoryContextBackend()
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0, "puts": 0, "evictions": 0, "expired": 0}
+
+    def put(self, call_id: str, context: Dict[str, Any]) -> None:
+        self.put_many({call_id: context})
+
+    def put_many(self, contexts: Dict[str, Dict[str, Any]]) -> None:
+        """Store several contexts in one backend write."""
+        if not contexts:
+            return
+        evicted = self.backend.put_many(contexts, time.time() + self.ttl)
+        self.stats["puts"] += len(contexts)
+        if evicted:
+            self.stats["evictions"] += evicted
+            logger.info(f"Call context store full: evicted {evicted} least recently used context(s)")
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([call_id]).get(call_id)
+
+    def get_many(self, call_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Look up several calls in one backend read; missing calls are left out."""
+        call_ids = list(call_ids)
+        found, expired = self.backend.get_many(call_ids, time.time())
+        self.stats["hits"] += len(found)
+        self.stats["misses"] += len(call_ids) - len(found)
+        self.stats["expired"] += expired
+        return found
+
+    def delete(self, call_id: str) -> bool:
+        return self.backend.delete(call_id)
+
+    def items(self) -> Dict[str, Dict[str, Any]]:
+        return self.backend.items(time.time())
+
+    def purge_expired(self) -> int:
+        purged = self.backend.purge_expired(time.time())
+        self.stats["expired"] += purged
+        return purged
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            "entries": len(self.backend),
+            "max_entries": self.backend.max_entries,
+            "ttl_seconds": self.ttl,
+            "backend": type(self.backend).__name__,
+        }
+
+
+def _create_store() -> CallContextStore:
+    if CALL_CONTEXT_BACKEND == "sqlite":
+        backend = SQLiteContextBackend(CALL_CONTEXT_DB, CALL_CONTEXT_MAX_ENTRIES)
+    else:
+        if CALL_CONTEXT_BACKEND != "memory":
+            logger.warning(f"Unknown CALL_CONTEXT_BACKEND={CALL_CONTEXT_BACKEND!r}, using memory")
+        backend = MemoryContextBackend(CALL_CONTEXT_MAX_ENTRIES)
+    return CallContextStore(backend, CALL_CONTEXT_TTL)
+
+
+# Singleton store
+call_context_store = _create_store()
+
+
+def _build_context(
+    caller_phone: Optional[str],
+    callee_phone: Optional[str],
+    call_type: str,
+    extra: Dict[str, Any]
+) -> Dict[str, Any]:
+    # Determine the user's phone based on call type
+    # For inbound: user is the caller
+    # For outbound: user is the callee
+    user_phone = caller_phone if call_type == "inbound" else callee_phone
+    return {
+        "caller_phone": caller_phone,
+        "callee_phone": callee_phone,
+        "call_type": call_type,
+        "user_phone": user_phone,
+        **extra
+    }
 
 
 def store_call_context(
@@ -34,7 +314,7 @@ def store_call_context(
 ) -> None:
     """
     Store context for a call.
-    
+
     Args:
         call_id: The call ID
         caller_phone: Caller's phone number (for inbound) or our number (for outbound)
@@ -42,49 +322,68 @@ def store_call_context(
         call_type: "inbound" or "outbound"
         **extra: Any additional context to store
     """
-    # Determine the user's phone based on call type
-    # For inbound: user is the caller
-    # For outbound: user is the callee
-    user_phone = caller_phone if call_type == "inbound" else callee_phone
-    
-    context = {
-        "caller_phone": caller_phone,
-        "callee_phone": callee_phone,
-        "call_type": call_type,
-        "user_phone": user_phone,
-        **extra
-    }
-    
-    _call_contexts[call_id] = context
-    logger.info(f"[call_id={call_id}] Stored call context: user_phone={user_phone}, type={call_type}")
+    context = _build_context(caller_phone, callee_phone, call_type, extra)
+    call_context_store.put(call_id, context)
+    logger.info(f"[call_id={call_id}] Stored call context: user_phone={context['user_phone']}, type={call_type}")
+
+
+def store_call_contexts(contexts: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Store context for several calls in one write.
+
+    Args:
+        contexts: call_id -> keyword arguments of store_call_context()
+                  (caller_phone, callee_phone, call_type, extra fields)
+    """
+    built = {}
+    for call_id, fields in contexts.items():
+        fields = dict(fields)
+        built[call_id] = _build_context(
+            fields.pop("caller_phone", None),
+            fields.pop("callee_phone", None),
+            fields.pop("call_type", "unknown"),
+            fields
+        )
+    call_context_store.put_many(built)
+    logger.info(f"Stored call context for {len(built)} call(s)")
 
 
 def get_call_context(call_id: str) -> Dict[str, Any]:
     """
     Get stored context for a call.
-    
+
     Args:
         call_id: The call ID
-        
+
     Returns:
-        Context dict, or empty dict if not found
+        Context dict, or empty dict if not found (or expired)
     """
-    context = _call_contexts.get(call_id, {})
+    context = call_context_store.get(call_id) or {}
     if not context:
         logger.debug(f"[call_id={call_id}] No stored call context found")
     return context
 
 
+def get_call_contexts(call_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Get stored context for several calls in one read.
+
+    Returns:
+        call_id -> context for the calls that have one
+    """
+    return call_context_store.get_many(call_ids)
+
+
 def get_user_phone(call_id: str) -> Optional[str]:
     """
     Get the user's phone number for a call.
-    
+
     This is the caller's phone for inbound calls, or the callee's phone
     for outbound calls.
-    
+
     Args:
         call_id: The call ID
-        
+
     Returns:
         User's phone number, or None if not available
     """
@@ -95,15 +394,19 @@ def get_user_phone(call_id: str) -> Optional[str]:
 def clear_call_context(call_id: str) -> None:
     """
     Clear stored context for a call (e.g., when call ends).
-    
+
     Args:
         call_id: The call ID to clear
     """
-    if call_id in _call_contexts:
-        del _call_contexts[call_id]
+    if call_context_store.delete(call_id):
         logger.debug(f"[call_id={call_id}] Cleared call context")
 
 
 def get_all_contexts() -> Dict[str, Dict[str, Any]]:
-    """Get all stored call contexts (for debugging)."""
-    return _call_contexts.copy()
+    """Get all stored (unexpired) call contexts (for debugging)."""
+    return call_context_store.items()
+
+
+def get_store_stats() -> Dict[str, Any]:
+    """Hit/miss, eviction and size stats of the call context store."""
+    return call_context_store.get_stats()
@@ -6,7 +6,8 @@ Provides production-ready call metrics, analytics, and monitoring hooks.
 Designed for dashboard integration and debugging.
 
 Features:
-- Aggregate metrics (success rate, duration percentiles, failure reasons)
+- Aggregate metrics (success rate, duration percentiles, failure reasons),
+  computed by grouped SQL queries; the dashboard reads one snapshot
 - Time-series data for dashboards (hourly/daily buckets)
 - Structured logging for debugging
 - CSV/JSON exports for analytics
@@ -37,18 +38,55 @@ import json
 import logging
 import os
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass, asdict, field
-from typing import Optional, Dict, List, Any, Tuple
+from typing import Optional, Dict, Iterator, List, Any, Tuple
 from enum import Enum
 from pathlib import Path
-import statistics
+
+from call_retention import archived_days, iter_archived, read_archived, read_archived_range, without_hot_rows
+from db_migrations import epoch_ms_ready, to_epoch_ms
 
 # Import from call_recording for database access
 DATABASE_PATH = Path(os.getenv("DATABASE_PATH", "call_history.db"))
 
 logger = logging.getLogger(__name__)
 
+# Percentiles come from a histogram sketch built in SQL: values are grouped
+# by their 3-significant-digit rounding (<= 0.5% relative error), so Python
+# only sees a bounded number of (value, count) buckets however many rows
+# the window holds.
+_QUANTILES = (0.50, 0.95, 0.99)
+
+
+def _sketch_key(column: str) -> str:
+    return f"CAST(printf('%.2e', {column}) AS REAL)"
+
+
+def _sketch_percentiles(buckets: List[Tuple[float, int]], count: int,
+                        low: float, high: float) -> List[float]:
+    """
+    Quantiles from ascending (value, count) buckets.
+
+    Uses the same rank as the sorted-list version (index int(n * q)) and
+    clamps to the exact min/max.
+    """
+    if not count:
+        return [0.0 for _ in _QUANTILES]
+    results = []
+    ranks = [min(int(count * q), count - 1) for q in _QUANTILES]
+    seen = 0
+    i = 0
+    for value, n in buckets:
+        seen += n
+        while i < len(ranks) and ranks[i] < seen:
+            results.append(min(max(value, low), high))
+            i += 1
+    while len(results) < len(_QUANTILES):
+        results.append(high)
+    return results
+
 # Configure structured logging
 class StructuredFormatter(logging.Formatter):
     """JSON-structured log formatter for production debugging."""
@@ -103,6 +141,8 @@ class LatencyEventType(Enum):
     SPEECH_END_TO_FIRST_AUDIO = "speech_end_to_first_audio"  # Core UX metric
     TOOL_CALL_DURATION = "tool_call_duration"  # Time spent in tool execution
     SESSION_DURATION = "session_duration"  # Total call length
+    SESSION_RECOVERY = "session_recovery"  # Realtime WS drop → session restored
+    TOOL_FIRST_AUDIO = "tool_first_audio"  # ask_openclaw call → first chunk sent to voice
 
 
 @dataclass
@@ -213,6 +253,37 @@ class CallMetricsManager:
         self._setup_structured_logging()
         self._init_latency_table()
     
+    @contextmanager
+    def _snapshot(self, conn: Optional[sqlite3.Connection] = None) -> Iterator[sqlite3.Connection]:
+        """
+        One read transaction: every query inside sees the same database state.
+        
+        Reuses conn when a caller already holds a snapshot.
+        """
+        if conn is not None:
+            yield conn
+            return
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("BEGIN")
+            yield conn
+        finally:
+            conn.rollback()  # Read-only: nothing to commit
+            conn.close()
+    
+    @staticmethod
+    def _window(conn: sqlite3.Connection, column: str,
+                start: datetime, end: datetime) -> Tuple[str, Tuple[Any, ...]]:
+        """
+        WHERE fragment and parameters for start <= column < end.
+        
+        Compares the epoch-ms twin (column_ms) once db_migrations has
+        backfilled it, and the ISO 8601 text before that.
+        """
+        if epoch_ms_ready(conn):
+            return f"{column}_ms >= ? AND {column}_ms < ?", (to_epoch_ms(start), to_epoch_ms(end))
+        return f"{column} >= ? AND {column} < ?", (start.isoformat(), end.isoformat())
+    
     def _init_latency_table(self):
         """Initialize latency_events table if it doesn't exist."""
         with sqlite3.connect(self.db_path) as conn:
@@ -259,13 +330,20 @@ class CallMetricsManager:
     
     def get_metrics(self, 
                     start_time: Optional[datetime] = None,
-                    end_time: Optional[datetime] = None) -> CallMetrics:
+                    end_time: Optional[datetime] = None,
+                    conn: Optional[sqlite3.Connection] = None,
+                    percentiles: bool = True) -> CallMetrics:
         """
         Get aggregate call metrics for a time period.
         
+        Counts and duration totals come from one grouped query; duration
+        percentiles from a SQL-side sketch (see _sketch_percentiles).
+        
         Args:
             start_time: Start of period (default: 24 hours ago)
             end_time: End of period (default: now)
+            conn: Connection of an open snapshot to read from (optional)
+            percentiles: Compute p50/p95/p99 (skipped for comparison windows)
         
         Returns:
             CallMetrics with all aggregate data
@@ -276,61 +354,54 @@ class CallMetricsManager:
             start_time = end_time - timedelta(hours=24)
         
         metrics = CallMetrics(period_start=start_time, period_end=end_time)
-        durations: List[float] = []
-        
-        with sqlite3.connect(self.db_path) as conn:
-            # Get all calls in the time period
-            cursor = conn.execute('''
-                SELECT call_id, call_type, started_at, ended_at, 
-                       duration_seconds, status, has_transcript
+        # Durations counted only for completed calls with a (non-zero) duration
+        completed_duration = "CASE WHEN status = 'completed' AND duration_seconds THEN duration_seconds END"
+        
+        with self._snapshot(conn) as conn:
+            in_window, window = self._window(conn, "started_at", start_time, end_time)
+            row = conn.execute(f'''
+                SELECT COUNT(*),
+                       COALESCE(SUM(call_type = 'inbound'), 0),
+                       COALESCE(SUM(status = 'completed'), 0),
+                       COALESCE(SUM(status = 'failed'), 0),
+                       COALESCE(SUM(status = 'timeout'), 0),
+                       COALESCE(SUM(status = 'cancelled'), 0),
+                       COALESCE(SUM(status = 'active'), 0),
+                       COALESCE(SUM(CASE WHEN has_transcript THEN 1 ELSE 0 END), 0),
+                       COUNT({completed_duration}),
+                       COALESCE(SUM({completed_duration}), 0.0),
+                       MIN({completed_duration}),
+                       MAX({completed_duration})
                 FROM calls
-                WHERE started_at >= ? AND started_at < ?
-                ORDER BY started_at ASC
-            ''', (start_time.isoformat(), end_time.isoformat()))
+                WHERE {in_window}
+            ''', window).fetchone()
             
-            for row in cursor.fetchall():
-                call_id, call_type, started_at, ended_at, duration, status, has_transcript = row
-                
-                metrics.total_calls += 1
-                
-                # Count by type
-                if call_type == "inbound":
-                    metrics.inbound_calls += 1
-                else:
-                    metrics.outbound_calls += 1
-                
-                # Count by status
-                if status == "completed":
-                    metrics.completed_calls += 1
-                    if duration:
-                        durations.append(duration)
-                        metrics.total_duration += duration
-                elif status == "failed":
-                    metrics.failed_calls += 1
-                    reason = self._categorize_failure(call_id)
-                    metrics.failure_reasons[reason] = metrics.failure_reasons.get(reason, 0) + 1
-                elif status == "timeout":
-                    metrics.timeout_calls += 1
-                elif status == "cancelled":
-                    metrics.cancelled_calls += 1
-                elif status == "active":
-                    metrics.active_calls += 1
-                
-                # Transcript metrics
-                if has_transcript:
-                    metrics.calls_with_transcript += 1
-        
-        # Calculate duration statistics
-        if durations:
-            metrics.avg_duration = statistics.mean(durations)
-            metrics.min_duration = min(durations)
-            metrics.max_duration = max(durations)
+            (metrics.total_calls, metrics.inbound_calls, metrics.completed_calls,
+             metrics.failed_calls, metrics.timeout_calls, metrics.cancelled_calls,
+             metrics.active_calls, metrics.calls_with_transcript,
+             duration_count, metrics.total_duration, min_duration, max_duration) = row
+            metrics.outbound_calls = metrics.total_calls - metrics.inbound_calls
             
-            sorted_durations = sorted(durations)
-            n = len(sorted_durations)
-            metrics.p50_duration = sorted_durations[n // 2]
-            metrics.p95_duration = sorted_durations[int(n * 0.95)] if n > 1 else sorted_durations[-1]
-            metrics.p99_duration = sorted_durations[int(n * 0.99)] if n > 1 else sorted_durations[-1]
+            if duration_count:
+                metrics.avg_duration = metrics.total_duration / duration_count
+                metrics.min_duration = min_duration
+                metrics.max_duration = max_duration
+                if percentiles:
+                    buckets = conn.execute(f'''
+                        SELECT {_sketch_key('duration_seconds')} AS bucket, COUNT(*)
+                        FROM calls
+                        WHERE {in_window}
+                          AND status = 'completed' AND duration_seconds
+                        GROUP BY bucket ORDER BY bucket
+                    ''', window).fetchall()
+                    (metrics.p50_duration, metrics.p95_duration,
+                     metrics.p99_duration) = _sketch_percentiles(
+                        buckets, duration_count, min_duration, max_duration
+                    )
+        
+        if metrics.failed_calls:
+            # Failure reasons aren't recorded yet; webhook-server.py would log them
+            metrics.failure_reasons[FailureReason.UNKNOWN.value] = metrics.failed_calls
         
         # Calculate rates
         if metrics.total_calls > 0:
@@ -345,12 +416,14 @@ class CallMetricsManager:
         # In production, webhook-server.py would log failure reasons
         return FailureReason.UNKNOWN.value
     
-    def get_hourly_timeseries(self, hours: int = 24) -> List[HourlyBucket]:
+    def get_hourly_timeseries(self, hours: int = 24,
+                              conn: Optional[sqlite3.Connection] = None) -> List[HourlyBucket]:
         """
         Get hourly metrics for time-series visualization.
         
         Args:
             hours: Number of hours to include (default: 24)
+            conn: Connection of an open snapshot to read from (optional)
         
         Returns:
             List of HourlyBucket objects
@@ -369,45 +442,28 @@ class CallMetricsManager:
             buckets[hour_key] = HourlyBucket(hour=hour_key)
             current += timedelta(hours=1)
         
-        # Fill buckets with data
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT started_at, duration_seconds, status
-                FROM calls
-                WHERE started_at >= ? AND started_at < ?
-            ''', (start_time.isoformat(), end_time.isoformat()))
-            
-            duration_by_hour: Dict[str, List[float]] = {}
-            
-            for row in cursor.fetchall():
-                started_at, duration, status = row
-                dt = datetime.fromisoformat(started_at)
-                hour_key = dt.strftime("%Y-%m-%dT%H:00:00Z")
-                
-                if hour_key in buckets:
-                    buckets[hour_key].total += 1
-                    if status == "completed":
-                        buckets[hour_key].completed += 1
-                        if duration:
-                            if hour_key not in duration_by_hour:
-                                duration_by_hour[hour_key] = []
-                            duration_by_hour[hour_key].append(duration)
-                    elif status in ("failed", "timeout"):
-                        buckets[hour_key].failed += 1
-            
-            # Calculate averages
-            for hour_key, durations in duration_by_hour.items():
-                if durations:
-                    buckets[hour_key].avg_duration = statistics.mean(durations)
+        # Fill buckets from one grouped query (started_at is ISO 8601, so the
+        # first 13 characters are the hour)
+        for hour, total, completed, failed, avg_duration in self._grouped_counts(
+            "substr(started_at, 1, 13)", start_time, end_time, conn
+        ):
+            bucket = buckets.get(f"{hour}:00:00Z")
+            if bucket:
+                bucket.total = total
+                bucket.completed = completed
+                bucket.failed = failed
+                bucket.avg_duration = avg_duration or 0.0
         
         return [buckets[k] for k in sorted(buckets.keys())]
     
-    def get_daily_timeseries(self, days: int = 30) -> List[DailyBucket]:
+    def get_daily_timeseries(self, days: int = 30,
+                             conn: Optional[sqlite3.Connection] = None) -> List[DailyBucket]:
         """
         Get daily metrics for trend analysis.
         
         Args:
             days: Number of days to include (default: 30)
+            conn: Connection of an open snapshot to read from (optional)
         
         Returns:
             List of DailyBucket objects
@@ -424,42 +480,39 @@ class CallMetricsManager:
             buckets[date_key] = DailyBucket(date=date_key)
             current += timedelta(days=1)
         
-        # Fill buckets with data
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT started_at, duration_seconds, status
-                FROM calls
-                WHERE date(started_at) >= ? AND date(started_at) <= ?
-            ''', (start_date.isoformat(), end_date.isoformat()))
-            
-            duration_by_day: Dict[str, List[float]] = {}
-            
-            for row in cursor.fetchall():
-                started_at, duration, status = row
-                dt = datetime.fromisoformat(started_at)
-                date_key = dt.date().isoformat()
-                
-                if date_key in buckets:
-                    buckets[date_key].total += 1
-                    if status == "completed":
-                        buckets[date_key].completed += 1
-                        if duration:
-                            if date_key not in duration_by_day:
-                                duration_by_day[date_key] = []
-                            duration_by_day[date_key].append(duration)
-                    elif status in ("failed", "timeout"):
-                        buckets[date_key].failed += 1
-            
-            # Calculate averages and success rates
-            for date_key in buckets:
-                bucket = buckets[date_key]
-                if bucket.total > 0:
-                    bucket.success_rate = bucket.completed / bucket.total * 100
-                if date_key in duration_by_day and duration_by_day[date_key]:
-                    bucket.avg_duration = statistics.mean(duration_by_day[date_key])
+        day_start = datetime.combine(start_date, datetime.min.time(), timezone.utc)
+        day_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), timezone.utc)
+        for date_key, total, completed, failed, avg_duration in self._grouped_counts(
+            "substr(started_at, 1, 10)", day_start, day_end, conn
+        ):
+            bucket = buckets.get(date_key)
+            if bucket:
+                bucket.total = total
+                bucket.completed = completed
+                bucket.failed = failed
+                bucket.avg_duration = avg_duration or 0.0
+                if total > 0:
+                    bucket.success_rate = completed / total * 100
         
         return [buckets[k] for k in sorted(buckets.keys())]
     
+    def _grouped_counts(self, key: str, start: datetime, end: datetime,
+                        conn: Optional[sqlite3.Connection] = None) -> List[Tuple]:
+        """(key, total, completed, failed+timeout, avg completed duration) per key value."""
+        with self._snapshot(conn) as conn:
+            in_window, window = self._window(conn, "started_at", start, end)
+            return conn.execute(f'''
+                SELECT {key} AS bucket,
+                       COUNT(*),
+                       SUM(status = 'completed'),
+                       SUM(status IN ('failed', 'timeout')),
+                       AVG(CASE WHEN status = 'completed' AND duration_seconds
+                           THEN duration_seconds END)
+                FROM calls
+                WHERE {in_window}
+                GROUP BY bucket
+            ''', window).fetchall()
+    
     def get_dashboard_data(self) -> Dict[str, Any]:
         """
         Get comprehensive dashboard data in a single call.
@@ -469,30 +522,36 @@ class CallMetricsManager:
         """
         now = datetime.now(timezone.utc)
         
-        # Current metrics (last 24 hours)
-        current_metrics = self.get_metrics(
-            start_time=now - timedelta(hours=24),
-            end_time=now
-        )
-        
-        # Previous period for comparison (24-48 hours ago)
-        prev_metrics = self.get_metrics(
-            start_time=now - timedelta(hours=48),
-            end_time=now - timedelta(hours=24)
-        )
-        
         # Calculate deltas
         def calc_delta(current: float, previous: float) -> float:
             if previous == 0:
                 return 100.0 if current > 0 else 0.0
             return ((current - previous) / previous) * 100
         
-        # Get active calls right now
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT COUNT(*) FROM calls WHERE status = 'active'"
+        # Everything below reads one consistent snapshot over one connection
+        with self._snapshot() as conn:
+            # Current metrics (last 24 hours)
+            current_metrics = self.get_metrics(
+                start_time=now - timedelta(hours=24),
+                end_time=now,
+                conn=conn
             )
-            active_now = cursor.fetchone()[0]
+            
+            # Previous period for comparison (24-48 hours ago)
+            prev_metrics = self.get_metrics(
+                start_time=now - timedelta(hours=48),
+                end_time=now - timedelta(hours=24),
+                conn=conn,
+                percentiles=False
+            )
+            
+            # Get active calls right now
+            active_now = conn.execute(
+                "SELECT COUNT(*) FROM calls WHERE status = 'active'"
+            ).fetchone()[0]
+            
+            hourly = self.get_hourly_timeseries(24, conn=conn)
+            latency = self._get_latency_summary(now, conn=conn)
         
         return {
             "generated_at": now.isoformat() + "Z",
@@ -543,16 +602,18 @@ class CallMetricsManager:
                 "transcript_rate": round(current_metrics.transcript_rate, 1),
             },
             "timeseries": {
-                "hourly": [asdict(b) for b in self.get_hourly_timeseries(24)],
+                "hourly": [asdict(b) for b in hourly],
             },
-            "latency": self._get_latency_summary(now),
+            "latency": latency,
         }
     
-    def _get_latency_summary(self, now: datetime) -> Dict[str, Any]:
+    def _get_latency_summary(self, now: datetime,
+                             conn: Optional[sqlite3.Connection] = None) -> Dict[str, Any]:
         """Get latency summary for dashboard."""
         stats = self.get_latency_stats(
             start_time=now - timedelta(hours=24),
-            end_time=now
+            end_time=now,
+            conn=conn
         )
         
         return {
@@ -592,7 +653,9 @@ class CallMetricsManager:
         Returns:
             String in Prometheus exposition format
         """
-        metrics = self.get_metrics()
+        with self._snapshot() as conn:
+            metrics = self.get_metrics(conn=conn)
+            latency_lines = self.get_latency_prometheus_metrics(conn=conn)
         
         lines = [
             "# HELP voice_calls_total Total number of calls",
@@ -632,9 +695,6 @@ class CallMetricsManager:
             f"voice_transcript_rate {metrics.transcript_rate:.2f}",
         ]
         
-        # Add latency metrics
-        latency_lines = self.get_latency_prometheus_metrics()
-        
         return "\n".join(lines) + "\n\n" + latency_lines
     
     def export_csv(self, 
@@ -824,13 +884,18 @@ class CallMetricsManager:
     
     def get_latency_stats(self, 
                          start_time: Optional[datetime] = None,
-                         end_time: Optional[datetime] = None) -> LatencyStats:
+                         end_time: Optional[datetime] = None,
+                         conn: Optional[sqlite3.Connection] = None) -> LatencyStats:
         """
         Get aggregate latency statistics for a time period.
         
+        Events the retention job has archived are read back for the part of
+        the window they cover, so long windows don't lose them.
+        
         Args:
             start_time: Start of period (default: 24 hours ago)
             end_time: End of period (default: now)
+            conn: Connection of an open snapshot to read from (optional)
         
         Returns:
             LatencyStats with all latency metrics
@@ -842,67 +907,64 @@ class CallMetricsManager:
         
         stats = LatencyStats(period_start=start_time, period_end=end_time)
         
-        # Collect durations by event type
-        speech_to_audio: List[float] = []
-        tool_call: List[float] = []
-        session: List[float] = []
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT event_type, duration_ms
-                FROM latency_events
-                WHERE timestamp >= ? AND timestamp < ?
-            ''', (start_time.isoformat(), end_time.isoformat()))
+        # Event type -> LatencyStats field prefix
+        prefixes = {
+            LatencyEventType.SPEECH_END_TO_FIRST_AUDIO.value: "speech_to_audio",
+            LatencyEventType.TOOL_CALL_DURATION.value: "tool_call",
+            LatencyEventType.SESSION_DURATION.value: "session",
+        }
+        types = list(prefixes)
+        placeholders = ",".join("?" * len(types))
+        
+        with self._snapshot(conn) as conn:
+            in_window, window = self._window(conn, "timestamp", start_time, end_time)
+            params = (*window, *types)
+            # event_type -> [count, sum, min, max]
+            summary = {
+                event_type: [count, total, low, high]
+                for event_type, count, total, low, high in conn.execute(f'''
+                    SELECT event_type, COUNT(*), SUM(duration_ms), MIN(duration_ms), MAX(duration_ms)
+                    FROM latency_events
+                    WHERE {in_window} AND event_type IN ({placeholders})
+                    GROUP BY event_type
+                ''', params)
+            }
             
-            for row in cursor.fetchall():
-                event_type, duration_ms = row
-                if event_type == LatencyEventType.SPEECH_END_TO_FIRST_AUDIO.value:
-                    speech_to_audio.append(duration_ms)
-                elif event_type == LatencyEventType.TOOL_CALL_DURATION.value:
-                    tool_call.append(duration_ms)
-                elif event_type == LatencyEventType.SESSION_DURATION.value:
-                    session.append(duration_ms)
-        
-        # Calculate statistics for each metric type
-        def calc_percentile(sorted_list: List[float], p: float) -> float:
-            if not sorted_list:
-                return 0.0
-            n = len(sorted_list)
-            idx = int(n * p)
-            return sorted_list[min(idx, n - 1)]
-        
-        # Speech to audio stats
-        if speech_to_audio:
-            sorted_sta = sorted(speech_to_audio)
-            stats.speech_to_audio_count = len(sorted_sta)
-            stats.speech_to_audio_avg_ms = statistics.mean(sorted_sta)
-            stats.speech_to_audio_min_ms = min(sorted_sta)
-            stats.speech_to_audio_max_ms = max(sorted_sta)
-            stats.speech_to_audio_p50_ms = calc_percentile(sorted_sta, 0.50)
-            stats.speech_to_audio_p95_ms = calc_percentile(sorted_sta, 0.95)
-            stats.speech_to_audio_p99_ms = calc_percentile(sorted_sta, 0.99)
-        
-        # Tool call stats
-        if tool_call:
-            sorted_tc = sorted(tool_call)
-            stats.tool_call_count = len(sorted_tc)
-            stats.tool_call_avg_ms = statistics.mean(sorted_tc)
-            stats.tool_call_min_ms = min(sorted_tc)
-            stats.tool_call_max_ms = max(sorted_tc)
-            stats.tool_call_p50_ms = calc_percentile(sorted_tc, 0.50)
-            stats.tool_call_p95_ms = calc_percentile(sorted_tc, 0.95)
-            stats.tool_call_p99_ms = calc_percentile(sorted_tc, 0.99)
-        
-        # Session duration stats
-        if session:
-            sorted_sess = sorted(session)
-            stats.session_count = len(sorted_sess)
-            stats.session_avg_ms = statistics.mean(sorted_sess)
-            stats.session_min_ms = min(sorted_sess)
-            stats.session_max_ms = max(sorted_sess)
-            stats.session_p50_ms = calc_percentile(sorted_sess, 0.50)
-            stats.session_p95_ms = calc_percentile(sorted_sess, 0.95)
-            stats.session_p99_ms = calc_percentile(sorted_sess, 0.99)
+            buckets: Dict[str, Dict[float, int]] = {}
+            if summary:
+                for event_type, bucket, count in conn.execute(f'''
+                    SELECT event_type, {_sketch_key('duration_ms')} AS bucket, COUNT(*)
+                    FROM latency_events
+                    WHERE {in_window} AND event_type IN ({placeholders})
+                    GROUP BY event_type, bucket
+                ''', params):
+                    buckets.setdefault(event_type, {})[bucket] = count
+            
+            for row in read_archived_range(conn, "latency_events", start_time, end_time):
+                event_type, duration = row.get("event_type"), row.get("duration_ms")
+                if event_type not in prefixes or duration is None:
+                    continue
+                agg = summary.setdefault(event_type, [0, 0.0, duration, duration])
+                agg[0] += 1
+                agg[1] += duration
+                agg[2] = min(agg[2], duration)
+                agg[3] = max(agg[3], duration)
+                bucket = float(f"{duration:.2e}")  # Same sketch key as the SQL side
+                type_buckets = buckets.setdefault(event_type, {})
+                type_buckets[bucket] = type_buckets.get(bucket, 0) + 1
+        
+        for event_type, (count, total, min_ms, max_ms) in summary.items():
+            prefix = prefixes[event_type]
+            p50, p95, p99 = _sketch_percentiles(
+                sorted(buckets.get(event_type, {}).items()), count, min_ms, max_ms
+            )
+            setattr(stats, f"{prefix}_count", count)
+            setattr(stats, f"{prefix}_avg_ms", total / count)
+            setattr(stats, f"{prefix}_min_ms", min_ms)
+            setattr(stats, f"{prefix}_max_ms", max_ms)
+            setattr(stats, f"{prefix}_p50_ms", p50)
+            setattr(stats, f"{prefix}_p95_ms", p95)
+            setattr(stats, f"{prefix}_p99_ms", p99)
         
         return stats
     
@@ -918,7 +980,8 @@ class CallMetricsManager:
             limit: Maximum number of events to return
         
         Returns:
-            List of LatencyEvent objects
+            List of LatencyEvent objects, newest first; archived events fill
+            in when the hot table has fewer than limit
         """
         events = []
         
@@ -937,9 +1000,33 @@ class CallMetricsManager:
         params.append(limit)
         
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(query, params)
+            rows = conn.execute(query, params).fetchall()
+            if call_id and len(rows) < limit:
+                # Older events of this call may have moved to the retention archive
+                archived = [
+                    (r.get("id"), r.get("call_id"), r.get("event_type"), r.get("duration_ms"),
+                     r.get("timestamp"), r.get("metadata"))
+                    for r in reversed(read_archived(conn, "latency_events", call_id))
+                    if not event_type or r.get("event_type") == event_type
+                ]
+                rows.extend(archived[:limit - len(rows)])
+            elif not call_id and len(rows) < limit:
+                # Continue into the archive, newest day first, until limit is reached
+                for day in reversed(archived_days(conn, "latency_events")):
+                    day_rows = without_hot_rows(conn, "latency_events", [
+                        r for r in iter_archived("latency_events", day, day)
+                        if not event_type or r.get("event_type") == event_type
+                    ])
+                    day_rows.sort(key=lambda r: r.get("timestamp") or "", reverse=True)
+                    rows.extend(
+                        (r.get("id"), r.get("call_id"), r.get("event_type"), r.get("duration_ms"),
+                         r.get("timestamp"), r.get("metadata"))
+                        for r in day_rows[:limit - len(rows)]
+                    )
+                    if len(rows) >= limit:
+                        break
             
-            for row in cursor.fetchall():
+            for row in rows:
                 events.append(LatencyEvent(
                     id=row[0],
                     call_id=row[1],
@@ -951,14 +1038,14 @@ class CallMetricsManager:
         
         return events
     
-    def get_latency_prometheus_metrics(self) -> str:
+    def get_latency_prometheus_metrics(self, conn: Optional[sqlite3.Connection] = None) -> str:
         """
         Export latency metrics in Prometheus format.
         
         Returns:
             String in Prometheus exposition format
         """
-        stats = self.get_latency_stats()
+        stats = self.get_latency_stats(conn=conn)
         
         lines = [
             "# HELP voice_speech_to_audio_ms Time from user speech end to first AI audio",
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Call Reaper - In-process cleanup of zombie calls.
+
+cleanup_zombie_calls.py finds calls stuck in status='active' by scanning
+the calls table, usually hours after the fact. The reaper runs inside the
+server instead. Every tracked call has a deadline:
+
+    min(last activity + CALL_IDLE_TIMEOUT, start + CALL_MAX_DURATION)
+
+Deadlines live in a min-heap and the reaper sleeps until the earliest one,
+so a call whose media stream went quiet is closed within seconds of its
+deadline and nothing scans the table on a timer.
+
+- track(call_id) when a call starts, untrack(call_id) when it ends normally
+- touch(call_id) on activity. It is a dict write: heap entries are not
+  updated, an entry that comes due for a call touched since is pushed
+  back with the new deadline
+- Calls that expire together are closed in one batch (close_calls) and
+  dropped from the bridge's active_calls
+- start(recovered) tracks calls the database still marks active from a
+  previous process; unless a stream shows activity for them, they are
+  reaped after CALL_IDLE_TIMEOUT
+
+Usage:
+    reaper = CallReaper(close_calls, active_calls)
+    await reaper.start(recovered_call_ids)
+    reaper.track(call_sid)
+    reaper.touch(call_sid)      # per media event
+    reaper.untrack(call_sid)    # normal hang-up
+"""
+
+import asyncio
+import heapq
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CALL_IDLE_TIMEOUT = float(os.getenv("CALL_IDLE_TIMEOUT", "60"))        # seconds without media
+CALL_MAX_DURATION = float(os.getenv("CALL_MAX_DURATION", "14400"))     # hard cap per call
+CALL_REAPER_BATCH_WINDOW = 0.5  # seconds; deadlines this close together are reaped as one batch
+
+
+class CallReaper:
+    """Deadline min-heap of live calls, reaped in batches when they go idle."""
+
+    def __init__(
+        self,
+        close_calls: Callable[[List[str]], Awaitable[Any]],
+        active_calls: Optional[Dict[str, dict]] = None,
+        idle_timeout: float = CALL_IDLE_TIMEOUT,
+        max_duration: float = CALL_MAX_DURATION,
+        batch_window: float = CALL_REAPER_BATCH_WINDOW,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.close_calls = close_calls
+        self.active_calls = active_calls if active_calls is not None else {}
+        self.idle_timeout = idle_timeout
+        self.max_duration = max_duration
+        self.batch_window = batch_window
+        self._clock = clock
+
+        self._heap: List[Tuple[float, str]] = []
+        self._started: Dict[str, float] = {}
+        self._activity: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "tracked": 0,
+            "reaped": 0,
+            "batches": 0,
+            "recovered": 0,
+            "close_errors": 0,
+        }
+
+    # ── Tracking ────────────────────────────────────────────────────────────
+
+    def track(self, call_id: str) -> None:
+        """Start the idle clock for a call."""
+        if not call_id:
+            return
+        now = self._clock()
+        self._started.setdefault(call_id, now)
+        self._activity[call_id] = now
+        self.stats["tracked"] += 1
+        self._push(self._deadline(call_id), call_id)
+
+    def touch(self, call_id: Optional[str]) -> None:
+        """Record activity for a tracked call (O(1); the heap is updated lazily)."""
+        if call_id in self._activity:
+            self._activity[call_id] = self._clock()
+
+    def untrack(self, call_id: Optional[str]) -> None:
+        """Forget a call that ended normally; its heap entry is skipped when it comes due."""
+        self._started.pop(call_id, None)
+        self._activity.pop(call_id, None)
+
+    def is_tracked(self, call_id: str) -> bool:
+        return call_id in self._activity
+
+    def _deadline(self, call_id: str) -> float:
+        return min(
+            self._activity[call_id] + self.idle_timeout,
+            self._started[call_id] + self.max_duration,
+        )
+
+    def _push(self, deadline: float, call_id: str) -> None:
+        earliest = self._heap[0][0] if self._heap else None
+        heapq.heappush(self._heap, (deadline, call_id))
+        if self._wakeup and (earliest is None or deadline < earliest):
+            self._wakeup.set()  # The loop is sleeping towards a later deadline
+
+    def expired(self) -> List[str]:
+        """Pop and untrack every call past its deadline."""
+        now = self._clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, call_id = heapq.heappop(self._heap)
+            if call_id not in self._activity:
+                continue  # Ended normally (or already reaped)
+            deadline = self._deadline(call_id)
+            if deadline > now:
+                heapq.heappush(self._heap, (deadline, call_id))  # Touched since it was pushed
+                continue
+            self.untrack(call_id)
+            due.append(call_id)
+        return due
+
+    # ── Reaping ─────────────────────────────────────────────────────────────
+
+    async def reap(self) -> List[str]:
+        """Close every expired call in one batch; return their ids."""
+        call_ids = self.expired()
+        if not call_ids:
+            return []
+
+        for call_id in call_ids:
+            self.active_calls.pop(call_id, None)
+        try:
+            await self.close_calls(call_ids)
+        except Exception as e:
+            self.stats["close_errors"] += 1
+            logger.error(f"Failed to close {len(call_ids)} zombie call(s): {e}")
+
+        self.stats["reaped"] += len(call_ids)
+        self.stats["batches"] += 1
+        logger.warning(
+            f"Reaped {len(call_ids)} idle call(s) "
+            f"(no activity for {self.idle_timeout:.0f}s): {', '.join(call_ids)}"
+        )
+        return call_ids
+
+    async def start(self, recovered: Iterable[str] = ()) -> None:
+        """Start the reaper loop, tracking calls left active by a previous process."""
+        for call_id in recovered:
+            if call_id and not self.is_tracked(call_id):
+                self.track(call_id)
+                self.stats["recovered"] += 1
+        if self.stats["recovered"]:
+            logger.info(f"Call reaper tracking {self.stats['recovered']} call(s) left active by the last run")
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self._wakeup.clear()
+            timeout = None
+            if self._heap:
+                timeout = max(self._heap[0][0] - self._clock(), 0.0) + self.batch_window
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Call reaper error: {e}", exc_info=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        next_deadline = None
+        if self._heap:
+            next_deadline = round(max(self._heap[0][0] - self._clock(), 0.0), 1)
+        return {
+            "tracked_calls": len(self._activity),
+            "heap_entries": len(self._heap),
+            "next_deadline_s": next_deadline,
+            "idle_timeout_s": self.idle_timeout,
+            **self.stats,
+        }
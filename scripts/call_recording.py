@@ -10,15 +10,28 @@ import asyncio
 import json
 import logging
 import os
+import re
 import sqlite3
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from dataclasses import dataclass, asdict
 import aiofiles
 import asyncio
 from contextlib import asynccontextmanager
 
+from call_retention import read_archived
+from db_migrations import (
+    ARCHIVE_INDEX_VERSION,
+    TRANSCRIPT_SEARCH_VERSION,
+    epoch_ms_ready,
+    migrate,
+    schema_version,
+    storage_counts,
+    to_epoch_ms,
+)
+from storage_stats import add_recording_bytes, directory_size, file_size, read_storage_stats, summarize
+
 logger = logging.getLogger(__name__)
 
 # Configuration
@@ -27,11 +40,17 @@ DATABASE_PATH = Path(os.getenv("DATABASE_PATH", "call_history.db"))
 ENABLE_RECORDING = os.getenv("ENABLE_RECORDING", "true").lower() == "true"
 ENABLE_TRANSCRIPTION = os.getenv("ENABLE_TRANSCRIPTION", "true").lower() == "true"
 MAX_RECORDING_SIZE_MB = int(os.getenv("MAX_RECORDING_SIZE_MB", "100"))
+# Store call audio as stereo µ-law instead of PCM16 (half the size)
+RECORDING_COMPRESS = os.getenv("RECORDING_COMPRESS", "false").lower() == "true"
 
 # Stale call cleanup configuration
 # Calls older than this (in seconds) with status='active' are considered zombie calls
 STALE_CALL_THRESHOLD_SECONDS = int(os.getenv("STALE_CALL_THRESHOLD_SECONDS", "3600"))  # 1 hour default
 
+# Transcript search
+SEARCH_SNIPPET_TOKENS = 12     # Tokens of context in a search snippet
+SEARCH_HITS_PER_CALL = 50      # Matching lines ranked per requested call
+
 @dataclass
 class CallRecord:
     """Data class for call records."""
@@ -59,8 +78,41 @@ class TranscriptEntry:
     event_type: str  # 'speech', 'audio_buffer', 'conversation_update'
     metadata: Optional[Dict[str, Any]] = None
 
+@dataclass
+class TranscriptSearchHit:
+    """A call matching a transcript search, with its best-matching line."""
+    call_id: str
+    score: float          # Higher is better (negated BM25)
+    matches: int          # Matching transcript lines considered
+    snippet: str          # Matched terms in [brackets]
+    call_type: Optional[str] = None
+    caller_number: Optional[str] = None
+    callee_number: Optional[str] = None
+    started_at: Optional[datetime] = None
+    status: Optional[str] = None
+
+def _record_from_row(row: tuple) -> CallRecord:
+    """CallRecord from a SELECT * FROM calls row (extra trailing columns ignored)."""
+    return CallRecord(
+        call_id=row[0],
+        call_type=row[1],
+        caller_number=row[2],
+        callee_number=row[3],
+        started_at=datetime.fromisoformat(row[4]),
+        ended_at=datetime.fromisoformat(row[5]) if row[5] else None,
+        duration_seconds=row[6],
+        status=row[7],
+        recording_path=row[8],
+        transcript_path=row[9],
+        has_audio=bool(row[10]),
+        has_transcript=bool(row[11]),
+        metadata=json.loads(row[12]) if row[12] else None
+    )
+
 class CallRecordingManager:
     """Manages call recording, transcription, and storage."""
+
+    _recorders: Optional[Dict[str, Any]] = None  # call_id → StreamingWavRecorder
     
     def __init__(self):
         self.db_path = DATABASE_PATH
@@ -69,47 +121,9 @@ class CallRecordingManager:
         self._init_database()
         
     def _init_database(self):
-        """Initialize SQLite database with required tables."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS calls (
-                    call_id TEXT PRIMARY KEY,
-                    call_type TEXT NOT NULL,
-                    caller_number TEXT,
-                    callee_number TEXT,
-                    started_at TEXT NOT NULL,
-                    ended_at TEXT,
-                    duration_seconds REAL,
-                    status TEXT NOT NULL,
-                    recording_path TEXT,
-                    transcript_path TEXT,
-                    has_audio BOOLEAN DEFAULT FALSE,
-                    has_transcript BOOLEAN DEFAULT FALSE,
-                    metadata TEXT
-                )
-            ''')
-            
-            conn.execute('''
-                CREATE TABLE IF NOT EXISTS transcripts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    call_id TEXT NOT NULL,
-                    timestamp TEXT NOT NULL,
-                    speaker TEXT NOT NULL,
-                    content TEXT NOT NULL,
-                    event_type TEXT NOT NULL,
-                    metadata TEXT,
-                    FOREIGN KEY (call_id) REFERENCES calls (call_id)
-                )
-            ''')
-            
-            # Indexes for better query performance
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_calls_started_at ON calls(started_at)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_call_id ON transcripts(call_id)')
-            conn.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_timestamp ON transcripts(timestamp)')
-            
-            conn.commit()
-        
-        logger.info("Call recording database initialized")
+        """Create or upgrade the database schema (see db_migrations)."""
+        version = migrate(self.db_path)
+        logger.info(f"Call recording database initialized (schema version {version})")
     
     async def start_call_recording(self, call_id: str, call_type: str, 
                                  caller_number: Optional[str] = None, 
@@ -182,8 +196,59 @@ class CallRecordingManager:
         logger.info(f"Started recording for call {call_id}")
         return call_record
     
+    @property
+    def audio_recorders(self) -> Dict[str, Any]:
+        """Streaming audio recorders still open, by call_id."""
+        if self._recorders is None:
+            self._recorders = {}
+        return self._recorders
+
+    def open_audio_recorder(self, call_id: str, recording_path: str):
+        """
+        Start streaming both call legs to recording_path.
+
+        Returns the StreamingWavRecorder the media bridge feeds frames to, or
+        None if recording is disabled or unavailable.
+        """
+        if not ENABLE_RECORDING or not recording_path:
+            return None
+        try:
+            from audio_recorder import StreamingWavRecorder
+            recorder = StreamingWavRecorder(
+                Path(recording_path),
+                compress=RECORDING_COMPRESS,
+                max_bytes=MAX_RECORDING_SIZE_MB * 1024 * 1024,
+            )
+            recorder.start()
+        except Exception as e:
+            logger.error(f"Could not start audio recorder for {call_id}: {e}")
+            return None
+        self.audio_recorders[call_id] = recorder
+        logger.info(f"Audio recording started for call {call_id} → {recording_path}")
+        return recorder
+
+    async def close_audio_recorder(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Finalize a call's audio file and mark has_audio."""
+        recorder = self.audio_recorders.pop(call_id, None)
+        if recorder is None:
+            return None
+        stats = await asyncio.to_thread(recorder.close)
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute(
+                'UPDATE calls SET has_audio = ? WHERE call_id = ?',
+                (stats["bytes"] > 0, call_id)
+            )
+            conn.commit()
+        logger.info(
+            f"Audio recording for {call_id} closed: {stats['duration_s']}s, "
+            f"{stats['bytes']} bytes, dropped={stats['frames_dropped']}"
+        )
+        return stats
+
     async def end_call_recording(self, call_id: str, status: str = 'completed') -> Optional[CallRecord]:
         """End recording for a call."""
+        await self.close_audio_recorder(call_id)
+
         with sqlite3.connect(self.db_path) as conn:
             # Get current call record
             cursor = conn.execute(
@@ -206,6 +271,9 @@ class CallRecordingManager:
                 SET ended_at = ?, duration_seconds = ?, status = ?
                 WHERE call_id = ?
             ''', (ended_at.isoformat(), duration_seconds, status, call_id))
+            if row[5] is None:
+                # The call's files are complete now: count them once
+                add_recording_bytes(conn, file_size(row[8]) + file_size(row[9]))
             conn.commit()
         
         logger.info(f"Ended recording for call {call_id} (duration: {duration_seconds:.1f}s)")
@@ -319,69 +387,158 @@ class CallRecordingManager:
             if not row:
                 return None
             
-            return CallRecord(
-                call_id=row[0],
-                call_type=row[1],
-                caller_number=row[2],
-                callee_number=row[3],
-                started_at=datetime.fromisoformat(row[4]),
-                ended_at=datetime.fromisoformat(row[5]) if row[5] else None,
-                duration_seconds=row[6],
-                status=row[7],
-                recording_path=row[8],
-                transcript_path=row[9],
-                has_audio=bool(row[10]),
-                has_transcript=bool(row[11]),
-                metadata=json.loads(row[12]) if row[12] else None
-            )
+            return _record_from_row(row)
     
-    async def list_calls(self, limit: int = 50, offset: int = 0, 
-                        call_type: Optional[str] = None) -> List[CallRecord]:
-        """List call records with pagination."""
-        query = 'SELECT * FROM calls'
-        params = []
-        
+    def _call_filters(self, conn: sqlite3.Connection, call_type: Optional[str] = None,
+                      status: Optional[str] = None, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None, alias: str = '') -> Tuple[str, List[Any], str]:
+        """(WHERE clause, params, start-time column) for list/search filters."""
+        ms = epoch_ms_ready(conn)
+        col = f'{alias}.' if alias else ''
+        started = f"{col}{'started_at_ms' if ms else 'started_at'}"
+        as_value = to_epoch_ms if ms else (lambda dt: dt.isoformat())
+        conditions, params = [], []
         if call_type:
-            query += ' WHERE call_type = ?'
+            conditions.append(f'{col}call_type = ?')
             params.append(call_type)
+        if status:
+            conditions.append(f'{col}status = ?')
+            params.append(status)
+        if since:
+            conditions.append(f'{started} >= ?')
+            params.append(as_value(since))
+        if until:
+            conditions.append(f'{started} < ?')
+            params.append(as_value(until))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return where, params, started
+    
+    async def list_calls(self, limit: int = 50, offset: int = 0, 
+                        call_type: Optional[str] = None,
+                        status: Optional[str] = None,
+                        since: Optional[datetime] = None,
+                        until: Optional[datetime] = None) -> List[CallRecord]:
+        """List call records with pagination (see list_calls_page for deep pages)."""
+        with sqlite3.connect(self.db_path) as conn:
+            where, params, started = self._call_filters(conn, call_type, status, since, until)
+            cursor = conn.execute(
+                f'SELECT * FROM calls {where} ORDER BY {started} DESC LIMIT ? OFFSET ?',
+                (*params, limit, offset)
+            )
+            return [_record_from_row(row) for row in cursor.fetchall()]
+    
+    async def list_calls_page(self, limit: int = 50, cursor: Optional[str] = None,
+                              call_type: Optional[str] = None,
+                              status: Optional[str] = None,
+                              since: Optional[datetime] = None,
+                              until: Optional[datetime] = None) -> Tuple[List[CallRecord], Optional[str]]:
+        """
+        Calls, newest first, one keyset page at a time.
         
-        query += ' ORDER BY started_at DESC LIMIT ? OFFSET ?'
-        params.extend([limit, offset])
+        Returns (page, next_cursor); pass next_cursor back to get the next
+        page. next_cursor is None on the last page. Unlike OFFSET, a page
+        costs the same however deep it is: each filter combination walks an
+        index on (filter, started_at_ms, call_id).
+        """
+        limit = max(limit, 1)
+        with sqlite3.connect(self.db_path) as conn:
+            where, params, started = self._call_filters(conn, call_type, status, since, until)
+            if cursor:
+                last_started, _, last_call_id = cursor.partition('|')
+                try:
+                    last_started = int(last_started) if started.endswith('_ms') else last_started
+                except ValueError:
+                    raise ValueError(f"Invalid cursor: {cursor!r}")
+                where += ' AND ' if where else 'WHERE '
+                where += f'({started}, call_id) < (?, ?)'
+                params.extend([last_started, last_call_id])
+            rows = conn.execute(
+                f'SELECT *, {started} FROM calls {where} '
+                f'ORDER BY {started} DESC, call_id DESC LIMIT ?',
+                (*params, limit + 1)
+            ).fetchall()
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = f"{last[-1]}|{last[0]}"
+        return [_record_from_row(row) for row in page], next_cursor
+    
+    async def search_transcripts(self, query: str, limit: int = 20,
+                                 call_type: Optional[str] = None,
+                                 since: Optional[datetime] = None,
+                                 until: Optional[datetime] = None) -> List[TranscriptSearchHit]:
+        """
+        Calls whose transcripts match every word of query, best match first.
         
+        Uses the transcripts_fts index (BM25 ranking, porter stemming), so
+        "discussed pricing" also finds "we discuss the price". Each hit
+        carries a snippet of the call's best-matching line. Until the index
+        backfill has finished, falls back to a (slow) LIKE scan.
+        """
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        limit = max(limit, 1)
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
-            
-            calls = []
-            for row in rows:
-                calls.append(CallRecord(
-                    call_id=row[0],
-                    call_type=row[1],
-                    caller_number=row[2],
-                    callee_number=row[3],
-                    started_at=datetime.fromisoformat(row[4]),
-                    ended_at=datetime.fromisoformat(row[5]) if row[5] else None,
-                    duration_seconds=row[6],
-                    status=row[7],
-                    recording_path=row[8],
-                    transcript_path=row[9],
-                    has_audio=bool(row[10]),
-                    has_transcript=bool(row[11]),
-                    metadata=json.loads(row[12]) if row[12] else None
-                ))
-            
-            return calls
+            where, params, _ = self._call_filters(conn, call_type, None, since, until, alias='c')
+            call_filter = where.replace('WHERE ', 'AND ', 1)
+            if schema_version(conn) >= TRANSCRIPT_SEARCH_VERSION:
+                match = ' '.join('"' + t.replace('"', '""') + '"' for t in terms)
+                rows = conn.execute(f'''
+                    WITH hits AS (
+                        SELECT f.call_id, f.rank,
+                               snippet(transcripts_fts, 0, '[', ']', '…', {SEARCH_SNIPPET_TOKENS}) AS snippet
+                        FROM transcripts_fts f JOIN calls c ON c.call_id = f.call_id
+                        WHERE transcripts_fts MATCH ? {call_filter}
+                        ORDER BY f.rank
+                        LIMIT ?
+                    )
+                    SELECT h.call_id, -MIN(h.rank), COUNT(*), h.snippet,
+                           c.call_type, c.caller_number, c.callee_number, c.started_at, c.status
+                    FROM hits h JOIN calls c ON c.call_id = h.call_id
+                    GROUP BY h.call_id
+                    ORDER BY MIN(h.rank)
+                    LIMIT ?
+                ''', (match, *params, limit * SEARCH_HITS_PER_CALL, limit)).fetchall()
+            else:
+                like = ' AND '.join('t.content LIKE ?' for _ in terms)
+                rows = conn.execute(f'''
+                    SELECT t.call_id, COUNT(*), COUNT(*), MIN(t.content),
+                           c.call_type, c.caller_number, c.callee_number, c.started_at, c.status
+                    FROM transcripts t JOIN calls c ON c.call_id = t.call_id
+                    WHERE {like} {call_filter}
+                    GROUP BY t.call_id
+                    ORDER BY COUNT(*) DESC, c.started_at DESC
+                    LIMIT ?
+                ''', (*[f'%{t}%' for t in terms], *params, limit)).fetchall()
+        return [
+            TranscriptSearchHit(
+                call_id=row[0], score=float(row[1]), matches=row[2], snippet=row[3],
+                call_type=row[4], caller_number=row[5], callee_number=row[6],
+                started_at=datetime.fromisoformat(row[7]) if row[7] else None, status=row[8],
+            )
+            for row in rows
+        ]
     
     async def get_call_transcript(self, call_id: str) -> List[TranscriptEntry]:
-        """Get transcript entries for a call."""
+        """Get transcript entries for a call (including entries moved to the retention archive)."""
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
+            # Archived entries are older than anything still in the table
+            archived = read_archived(conn, 'transcripts', call_id)
+            rows = [
+                (r.get('call_id'), r.get('timestamp'), r.get('speaker'), r.get('content'),
+                 r.get('event_type'), r.get('metadata'))
+                for r in archived
+            ]
+            order = 'timestamp_ms ASC, id ASC' if epoch_ms_ready(conn) else 'timestamp ASC'
+            cursor = conn.execute(f'''
                 SELECT call_id, timestamp, speaker, content, event_type, metadata
                 FROM transcripts 
                 WHERE call_id = ? 
-                ORDER BY timestamp ASC
+                ORDER BY {order}
             ''', (call_id,))
-            rows = cursor.fetchall()
+            rows.extend(cursor.fetchall())
             
             entries = []
             for row in rows:
@@ -405,8 +562,14 @@ class CallRecordingManager:
         
         # Delete from database
         with sqlite3.connect(self.db_path) as conn:
+            if delete_files and call_record.ended_at:
+                add_recording_bytes(conn, -(file_size(call_record.recording_path) +
+                                           file_size(call_record.transcript_path)))
             conn.execute('DELETE FROM transcripts WHERE call_id = ?', (call_id,))
             conn.execute('DELETE FROM calls WHERE call_id = ?', (call_id,))
+            if schema_version(conn) >= ARCHIVE_INDEX_VERSION:
+                # Archived rows stay in their day files but are no longer reachable
+                conn.execute('DELETE FROM archive_index WHERE call_id = ?', (call_id,))
             conn.commit()
         
         # Delete associated files if requested
@@ -425,34 +588,22 @@ class CallRecordingManager:
         return True
     
     def get_storage_stats(self) -> Dict[str, Any]:
-        """Get storage statistics."""
+        """Get storage statistics (from the storage_stats counters, see storage_stats.py)."""
         with sqlite3.connect(self.db_path) as conn:
-            # Call counts
-            cursor = conn.execute('SELECT COUNT(*) FROM calls')
-            total_calls = cursor.fetchone()[0]
-            
-            cursor = conn.execute('SELECT COUNT(*) FROM calls WHERE status = "active"')
-            active_calls = cursor.fetchone()[0]
-            
-            cursor = conn.execute('SELECT COUNT(*) FROM calls WHERE has_audio = TRUE')
-            calls_with_audio = cursor.fetchone()[0]
-            
-            cursor = conn.execute('SELECT COUNT(*) FROM calls WHERE has_transcript = TRUE')
-            calls_with_transcripts = cursor.fetchone()[0]
-            
-            # Storage usage
-            recordings_size = sum(f.stat().st_size for f in self.recordings_dir.rglob('*') if f.is_file())
-            
-            return {
-                'total_calls': total_calls,
-                'active_calls': active_calls,
-                'calls_with_audio': calls_with_audio,
-                'calls_with_transcripts': calls_with_transcripts,
-                'recordings_directory': str(self.recordings_dir),
-                'recordings_size_mb': recordings_size / 1024 / 1024,
-                'recording_enabled': ENABLE_RECORDING,
-                'transcription_enabled': ENABLE_TRANSCRIPTION
-            }
+            counters = read_storage_stats(conn)
+            if counters is None:
+                # Not migrated yet: count the slow way
+                counters = {
+                    **storage_counts(conn),
+                    'recording_bytes': directory_size(self.recordings_dir),
+                }
+        
+        return {
+            **summarize(counters),
+            'recordings_directory': str(self.recordings_dir),
+            'recording_enabled': ENABLE_RECORDING,
+            'transcription_enabled': ENABLE_TRANSCRIPTION
+        }
     
     async def cleanup_stale_calls(self, threshold_seconds: int = None) -> Dict[str, Any]:
         """
@@ -478,61 +629,34 @@ class CallRecordingManager:
         
         logger.info(f"Cleaning up stale calls older than {threshold_seconds}s (cutoff: {cutoff_iso})")
         
-        cleaned_calls = []
         errors = []
+        cleaned_calls = []
         
         with sqlite3.connect(self.db_path) as conn:
             # Find zombie calls: status='active' AND started_at < cutoff
-            cursor = conn.execute('''
-                SELECT call_id, started_at, caller_number, callee_number, call_type
-                FROM calls 
-                WHERE status = 'active' AND started_at < ?
+            started_before, cutoff_value = self._started_before(conn, cutoff_time)
+            cursor = conn.execute(f'''
+                SELECT call_id FROM calls 
+                WHERE status = 'active' AND {started_before}
                 ORDER BY started_at ASC
-            ''', (cutoff_iso,))
-            
-            stale_calls = cursor.fetchall()
-            
-            for row in stale_calls:
-                call_id, started_at, caller_number, callee_number, call_type = row
-                
-                try:
-                    # Calculate actual duration
-                    started_dt = datetime.fromisoformat(started_at)
-                    ended_at = datetime.now(timezone.utc)
-                    duration_seconds = (ended_at - started_dt).total_seconds()
-                    
-                    # Mark as 'timeout' (distinct from 'completed' so we know it was cleaned up)
-                    conn.execute('''
-                        UPDATE calls 
-                        SET ended_at = ?, duration_seconds = ?, status = 'timeout'
-                        WHERE call_id = ?
-                    ''', (ended_at.isoformat(), duration_seconds, call_id))
-                    
-                    cleaned_calls.append({
-                        'call_id': call_id,
-                        'call_type': call_type,
-                        'started_at': started_at,
-                        'duration_seconds': duration_seconds,
-                        'status': 'timeout'
-                    })
-                    
-                    logger.info(f"Cleaned up stale call {call_id} (was active for {duration_seconds:.0f}s)")
-                    
-                    # Notify bridge of call end (for transcript sync)
-                    try:
-                        from session_context import notify_call_ended
-                        phone = caller_number or callee_number or ""
-                        direction = call_type or "inbound"
-                        notify_call_ended(call_id, phone, direction)
-                    except Exception as e:
-                        logger.debug(f"Bridge notification skipped during cleanup: {e}")
-                    
-                except Exception as e:
-                    error_msg = f"Error cleaning call {call_id}: {e}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
-            
-            conn.commit()
+            ''', (cutoff_value,))
+            stale_ids = [row[0] for row in cursor.fetchall()]
+        
+        if stale_ids:
+            try:
+                # Mark as 'timeout' (distinct from 'completed' so we know it was cleaned up)
+                cleaned_calls = self.close_stale_calls(stale_ids, status='timeout')
+            except Exception as e:
+                error_msg = f"Error cleaning {len(stale_ids)} stale calls: {e}"
+                logger.error(error_msg)
+                errors.append(error_msg)
+        
+        for call in cleaned_calls:
+            logger.info(
+                f"Cleaned up stale call {call['call_id']} "
+                f"(was active for {call['duration_seconds'] or 0:.0f}s)"
+            )
+        self.notify_calls_ended(cleaned_calls)
         
         result = {
             'cleaned_count': len(cleaned_calls),
@@ -545,6 +669,97 @@ class CallRecordingManager:
         logger.info(f"Stale call cleanup complete: {len(cleaned_calls)} calls cleaned, {len(errors)} errors")
         return result
     
+    def close_stale_calls(self, call_ids: List[str], status: str = 'timeout') -> List[Dict[str, Any]]:
+        """
+        End a batch of calls that are still 'active', in one transaction.
+        
+        Calls that already ended (or don't exist) are skipped. Returns the
+        closed calls; bridge notification is left to the caller (see
+        notify_calls_ended) so it happens after the commit.
+        """
+        if not call_ids:
+            return []
+        
+        ended_at = datetime.now(timezone.utc)
+        closed = []
+        call_ids = list(call_ids)
+        with sqlite3.connect(self.db_path) as conn:
+            rows = []
+            for i in range(0, len(call_ids), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = call_ids[i:i + 500]
+                rows.extend(conn.execute(f'''
+                    SELECT call_id, started_at, caller_number, callee_number, call_type,
+                           recording_path, transcript_path
+                    FROM calls
+                    WHERE status = 'active' AND call_id IN ({','.join('?' * len(chunk))})
+                ''', chunk).fetchall())
+            
+            recording_bytes = 0
+            for (call_id, started_at, caller_number, callee_number, call_type,
+                 recording_path, transcript_path) in rows:
+                try:
+                    started_dt = datetime.fromisoformat(started_at)
+                    if started_dt.tzinfo is None:
+                        started_dt = started_dt.replace(tzinfo=timezone.utc)
+                    duration_seconds = (ended_at - started_dt).total_seconds()
+                except (TypeError, ValueError):
+                    duration_seconds = None
+                recording_bytes += file_size(recording_path) + file_size(transcript_path)
+                closed.append({
+                    'call_id': call_id,
+                    'call_type': call_type,
+                    'caller_number': caller_number,
+                    'callee_number': callee_number,
+                    'started_at': started_at,
+                    'duration_seconds': duration_seconds,
+                    'status': status,
+                })
+            
+            conn.executemany('''
+                UPDATE calls 
+                SET ended_at = ?, duration_seconds = ?, status = ?
+                WHERE call_id = ? AND status = 'active'
+            ''', [
+                (ended_at.isoformat(), call['duration_seconds'], status, call['call_id'])
+                for call in closed
+            ])
+            add_recording_bytes(conn, recording_bytes)  # As end_call_recording does for a normal end
+            conn.commit()
+        
+        return closed
+    
+    def notify_calls_ended(self, calls: List[Dict[str, Any]]) -> None:
+        """Tell the OpenClaw bridge about calls closed by close_stale_calls (for transcript sync)."""
+        if not calls:
+            return
+        try:
+            from session_context import notify_call_ended
+        except Exception as e:
+            logger.debug(f"Bridge notification skipped during cleanup: {e}")
+            return
+        for call in calls:
+            try:
+                phone = call.get('caller_number') or call.get('callee_number') or ""
+                notify_call_ended(call['call_id'], phone, call.get('call_type') or "inbound")
+            except Exception as e:
+                logger.debug(f"Bridge notification skipped during cleanup: {e}")
+    
+    def _started_before(self, conn: sqlite3.Connection, cutoff: datetime) -> Tuple[str, Any]:
+        """WHERE fragment and parameter for started_at < cutoff (numeric once backfilled)."""
+        if epoch_ms_ready(conn):
+            return 'started_at_ms < ?', to_epoch_ms(cutoff)
+        return 'started_at < ?', cutoff.isoformat()
+    
+    def get_active_calls(self) -> List[Dict[str, Any]]:
+        """Calls still marked 'active' (call_id, started_at), oldest first."""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.execute('''
+                SELECT call_id, started_at FROM calls
+                WHERE status = 'active'
+                ORDER BY started_at ASC
+            ''')
+            return [{'call_id': row[0], 'started_at': row[1]} for row in cursor.fetchall()]
+    
     def get_zombie_calls(self, threshold_seconds: int = None) -> List[Dict[str, Any]]:
         """
         Get list of zombie calls without cleaning them up.
@@ -560,18 +775,18 @@ class CallRecordingManager:
             threshold_seconds = STALE_CALL_THRESHOLD_SECONDS
         
         cutoff_time = datetime.now(timezone.utc) - timedelta(seconds=threshold_seconds)
-        cutoff_iso = cutoff_time.isoformat()
         
         zombies = []
         
         with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
+            started_before, cutoff_value = self._started_before(conn, cutoff_time)
+            cursor = conn.execute(f'''
                 SELECT call_id, call_type, caller_number, callee_number, started_at, 
                        has_transcript, has_audio
                 FROM calls 
-                WHERE status = 'active' AND started_at < ?
+                WHERE status = 'active' AND {started_before}
                 ORDER BY started_at ASC
-            ''', (cutoff_iso,))
+            ''', (cutoff_value,))
             
             for row in cursor.fetchall():
                 call_id, call_type, caller_number, callee_number, started_at, has_transcript, has_audio = row
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Call Retention - Tiered retention and compressed archival for call data.
+
+transcripts and latency_events in call_history.db, the recordings
+directory and the call-transcripts segments all grew forever, slowing every
+query and backup. Each run moves what is older than its policy out of the
+hot tier:
+
+- Table rows (transcripts, latency_events) are appended to date-partitioned
+  gzip JSONL files, <archive>/<table>/YYYY-MM-DD.jsonl.gz, then deleted in
+  the same batch transaction. archive_index (see db_migrations) records
+  which days hold rows of which call
+- Recording files are gzipped into <archive>/recordings/YYYY-MM-DD/ and the
+  calls row is pointed at the archived path
+- Monthly call-transcripts segments are gzipped in place (transcript_archive
+  reads .jsonl.gz segments)
+- Freed pages are returned with PRAGMA incremental_vacuum, a few hundred at
+  a time, instead of a full VACUUM
+
+Archiving is at-least-once: a crash between the archive write and the
+commit can archive a batch twice, so readers deduplicate on the row id.
+read_archived() reads a call's rows back through the index, and
+read_archived_range() the rows of a time window; the recording and metrics
+managers merge them into their per-call lookups and date-range latency
+queries.
+
+Usage:
+    retention = CallRetentionManager(db_path, recordings_dir=RECORDINGS_DIR)
+    retention.run()                  # or: await retention.start()
+    rows = read_archived(conn, "transcripts", call_id)
+    rows = read_archived_range(conn, "latency_events", start, end)
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from db_migrations import ARCHIVE_INDEX_VERSION, schema_version, to_epoch_ms
+from storage_stats import add_recording_bytes
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+RETENTION_ARCHIVE_DIR = Path(os.getenv("RETENTION_ARCHIVE_DIR", "archive"))
+TRANSCRIPT_RETENTION_DAYS = int(os.getenv("TRANSCRIPT_RETENTION_DAYS", "90"))
+LATENCY_RETENTION_DAYS = int(os.getenv("LATENCY_RETENTION_DAYS", "30"))
+RECORDING_RETENTION_DAYS = int(os.getenv("RECORDING_RETENTION_DAYS", "90"))
+RETENTION_INTERVAL = float(os.getenv("RETENTION_INTERVAL", "21600"))  # seconds between runs
+RETENTION_BATCH_SIZE = 1000       # rows archived per transaction
+RETENTION_VACUUM_PAGES = 500      # pages freed per incremental_vacuum step
+
+RECORDINGS_ARCHIVE = "recordings"
+
+
+@dataclass
+class RetentionPolicy:
+    """Rows of table whose time_column is older than days go to the archive."""
+    table: str
+    days: int
+    time_column: str = "timestamp"
+
+
+DEFAULT_POLICIES = [
+    RetentionPolicy("transcripts", TRANSCRIPT_RETENTION_DAYS),
+    RetentionPolicy("latency_events", LATENCY_RETENTION_DAYS),
+]
+
+
+def _day(epoch_ms: Optional[int]) -> str:
+    if epoch_ms is None:
+        return "undated"
+    return datetime.fromtimestamp(epoch_ms / 1000, timezone.utc).date().isoformat()
+
+
+def _read_partition(path: Path) -> Iterator[Dict[str, Any]]:
+    """Rows of one archive file; a torn final gzip member ends the file."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return
+    except (EOFError, OSError) as e:
+        logger.warning(f"Archive file {path} ends early: {e}")
+
+
+def read_archived(conn: sqlite3.Connection, table: str, call_id: str,
+                  archive_root: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Archived rows of table for call_id, by id (empty before the archive exists)."""
+    if schema_version(conn) < ARCHIVE_INDEX_VERSION:
+        return []
+    archive_root = Path(archive_root or RETENTION_ARCHIVE_DIR)
+    days = [row[0] for row in conn.execute(
+        'SELECT day FROM archive_index WHERE table_name = ? AND call_id = ? ORDER BY day',
+        (table, call_id)
+    )]
+    rows: Dict[Any, Dict[str, Any]] = {}
+    for day in days:
+        for row in _read_partition(archive_root / table / f"{day}.jsonl.gz"):
+            if row.get("call_id") == call_id:
+                rows[row.get("id")] = row  # Deduplicate batches archived twice
+    return sorted(rows.values(), key=lambda r: r.get("id") or 0)
+
+
+def iter_archived(table: str, start: date, end: date,
+                  archive_root: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+    """Archived rows of table for days start..end inclusive, oldest day first."""
+    archive_root = Path(archive_root or RETENTION_ARCHIVE_DIR)
+    day = start
+    while day <= end:
+        seen = set()
+        for row in _read_partition(archive_root / table / f"{day.isoformat()}.jsonl.gz"):
+            if row.get("id") not in seen:
+                seen.add(row.get("id"))
+                yield row
+        day += timedelta(days=1)
+
+
+def archived_days(conn: sqlite3.Connection, table: str,
+                  start: Optional[date] = None, end: Optional[date] = None) -> List[date]:
+    """Days (oldest first) with archived rows of table, optionally within start..end."""
+    if schema_version(conn) < ARCHIVE_INDEX_VERSION:
+        return []
+    first = start.isoformat() if start else "0000-00-00"
+    last = end.isoformat() if end else "9999-99-99"  # Sorts before "undated"
+    return [date.fromisoformat(row[0]) for row in conn.execute(
+        'SELECT DISTINCT day FROM archive_index WHERE table_name = ? AND day BETWEEN ? AND ? ORDER BY day',
+        (table, first, last)
+    )]
+
+
+def without_hot_rows(conn: sqlite3.Connection, table: str,
+                     rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop archived rows still present in the hot table.
+
+    A crash between the archive write and the delete leaves a batch in
+    both tiers; readers that merge the two take it from the hot table.
+    """
+    if not rows:
+        return rows
+    highest = max(row.get("id") or 0 for row in rows)
+    hot = {row[0] for row in conn.execute(f'SELECT id FROM {table} WHERE id <= ?', (highest,))}
+    return [row for row in rows if row.get("id") not in hot]
+
+
+def read_archived_range(conn: sqlite3.Connection, table: str, start: datetime, end: datetime,
+                        time_column: str = "timestamp",
+                        archive_root: Optional[Path] = None) -> List[Dict[str, Any]]:
+    """Archived rows of table with start <= time_column < end that are not in the hot table."""
+    start_ms, end_ms = to_epoch_ms(start), to_epoch_ms(end)
+    days = archived_days(
+        conn, table,
+        datetime.fromtimestamp(start_ms / 1000, timezone.utc).date(),
+        datetime.fromtimestamp((end_ms - 1) / 1000, timezone.utc).date(),
+    )
+    time_ms = f"{time_column}_ms"
+    rows = [
+        row
+        for day in days
+        for row in iter_archived(table, day, day, archive_root)
+        if row.get(time_ms) is not None and start_ms <= row[time_ms] < end_ms
+    ]
+    return without_hot_rows(conn, table, rows)
+
+
+class CallRetentionManager:
+    """Moves aged rows and files of call_history.db into the compressed archive."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        archive_root: Optional[Path] = None,
+        policies: Optional[List[RetentionPolicy]] = None,
+        recordings_dir: Optional[Path] = None,
+        recording_days: int = RECORDING_RETENTION_DAYS,
+        transcripts_dir: Optional[Path] = None,
+        batch_size: int = RETENTION_BATCH_SIZE,
+        vacuum_pages: int = RETENTION_VACUUM_PAGES,
+        interval: float = RETENTION_INTERVAL,
+    ):
+        self.db_path = Path(db_path)
+        self.archive_root = Path(archive_root or RETENTION_ARCHIVE_DIR)
+        self.policies = policies if policies is not None else list(DEFAULT_POLICIES)
+        self.recordings_dir = Path(recordings_dir) if recordings_dir else None
+        self.recording_days = recording_days
+        self.transcripts_dir = Path(transcripts_dir) if transcripts_dir else None
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._vacuum_hint_logged = False
+        self.stats = {
+            "runs": 0,
+            "rows_archived": 0,
+            "files_archived": 0,
+            "segments_compressed": 0,
+            "pages_vacuumed": 0,
+            "errors": 0,
+            "last_run_at": None,
+            "last_run_seconds": None,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30.0, isolation_level=None)
+
+    # ── Table rows ──────────────────────────────────────────────────────────
+
+    def archive_table(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> int:
+        """Archive and delete rows older than the policy, one batch per transaction."""
+        now = now or datetime.now(timezone.utc)
+        cutoff_ms = to_epoch_ms(now - timedelta(days=policy.days))
+        time_ms = f"{policy.time_column}_ms"
+        archived = 0
+        last_id = 0
+        conn = self._connect()
+        try:
+            if schema_version(conn) < ARCHIVE_INDEX_VERSION:
+                logger.info(f"Retention for {policy.table} waits for database migrations")
+                return 0
+            while True:
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    # ids grow with time, so old rows sit at the front of the table
+                    cursor = conn.execute(f'''
+                        SELECT * FROM {policy.table}
+                        WHERE id > ? AND {time_ms} < ?
+                        ORDER BY id LIMIT ?
+                    ''', (last_id, cutoff_ms, self.batch_size))
+                    columns = [d[0] for d in cursor.description]
+                    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                    if not rows:
+                        conn.execute('ROLLBACK')
+                        break
+                    self._archive_rows(conn, policy.table, rows, time_ms)
+                    conn.executemany(
+                        f'DELETE FROM {policy.table} WHERE id = ?',
+                        [(row["id"],) for row in rows]
+                    )
+                    conn.execute('COMMIT')
+                except Exception:
+                    conn.execute('ROLLBACK')
+                    raise
+                last_id = rows[-1]["id"]
+                archived += len(rows)
+                time.sleep(0)  # Let live writers in between batches
+        finally:
+            conn.close()
+
+        self.stats["rows_archived"] += archived
+        if archived:
+            logger.info(f"Archived {archived} {policy.table} row(s) older than {policy.days} days")
+        return archived
+
+    def _archive_rows(self, conn: sqlite3.Connection, table: str,
+                      rows: List[Dict[str, Any]], time_ms: str) -> None:
+        by_day: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            by_day.setdefault(_day(row.get(time_ms)), []).append(row)
+
+        directory = self.archive_root / table
+        directory.mkdir(parents=True, exist_ok=True)
+        counts: Dict[tuple, int] = {}
+        for day, day_rows in by_day.items():
+            payload = "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in day_rows)
+            # Each batch is its own gzip member; gzip readers concatenate them
+            with open(directory / f"{day}.jsonl.gz", "ab") as f:
+                f.write(gzip.compress(payload.encode("utf-8")))
+                f.flush()
+                os.fsync(f.fileno())  # On disk before the rows are deleted
+            for row in day_rows:
+                key = (row.get("call_id") or "", day)
+                counts[key] = counts.get(key, 0) + 1
+
+        conn.executemany('''
+            INSERT INTO archive_index (table_name, call_id, day, rows) VALUES (?, ?, ?, ?)
+            ON CONFLICT (table_name, call_id, day) DO UPDATE SET rows = rows + excluded.rows
+        ''', [(table, call_id, day, n) for (call_id, day), n in counts.items()])
+
+    # ── Files ───────────────────────────────────────────────────────────────
+
+    def archive_recordings(self, now: Optional[datetime] = None) -> int:
+        """Gzip recording and transcript files older than recording_days into the archive."""
+        if self.recordings_dir is None or not self.recordings_dir.exists():
+            return 0
+        now = now or datetime.now(timezone.utc)
+        cutoff = (now - timedelta(days=self.recording_days)).timestamp()
+        moved = 0
+        for path in sorted(self.recordings_dir.iterdir()):
+            try:
+                stat = path.stat()
+                mtime = stat.st_mtime
+                if not path.is_file() or mtime >= cutoff:
+                    continue
+                day = datetime.fromtimestamp(mtime, timezone.utc).date().isoformat()
+                target_dir = self.archive_root / RECORDINGS_ARCHIVE / day
+                target_dir.mkdir(parents=True, exist_ok=True)
+                target = target_dir / f"{path.name}.gz"
+                tmp = target.with_suffix(".gz.tmp")
+                with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                os.replace(tmp, target)
+                self._repoint_files(str(path), str(target), stat.st_size)
+                path.unlink()
+                moved += 1
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Could not archive recording file {path}: {e}")
+        self.stats["files_archived"] += moved
+        if moved:
+            logger.info(f"Archived {moved} recording file(s) older than {self.recording_days} days")
+        return moved
+
+    def _repoint_files(self, old: str, new: str, size: int = 0) -> None:
+        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            conn.execute('UPDATE calls SET recording_path = ? WHERE recording_path = ?', (new, old))
+            conn.execute('UPDATE calls SET transcript_path = ? WHERE transcript_path = ?', (new, old))
+            add_recording_bytes(conn, -size)  # Left the recordings directory
+
+    def compress_transcript_segments(self, now: Optional[datetime] = None) -> int:
+        """Gzip call-transcripts segments whose month ended before the transcript policy."""
+        if self.transcripts_dir is None:
+            return 0
+        from transcript_archive import get_archive
+
+        now = now or datetime.now(timezone.utc)
+        days = next((p.days for p in self.policies if p.table == "transcripts"), TRANSCRIPT_RETENTION_DAYS)
+        compressed = get_archive(self.transcripts_dir).compress_segments(now - timedelta(days=days))
+        self.stats["segments_compressed"] += compressed
+        return compressed
+
+    # ── Vacuum ──────────────────────────────────────────────────────────────
+
+    def incremental_vacuum(self) -> int:
+        """Return free pages to the filesystem in small steps; pages freed."""
+        conn = self._connect()
+        try:
+            if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+                free = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                if free and not self._vacuum_hint_logged:
+                    self._vacuum_hint_logged = True
+                    logger.info(
+                        f"{self.db_path} has {free} free pages but no incremental auto_vacuum; "
+                        f"run call_retention.py --enable-incremental-vacuum once"
+                    )
+                return 0
+            freed = 0
+            while True:
+                before = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                if not before:
+                    break
+                conn.execute(f'PRAGMA incremental_vacuum({self.vacuum_pages})').fetchall()
+                after = conn.execute('PRAGMA freelist_count').fetchone()[0]
+                freed += before - after
+                if after >= before:
+                    break
+                time.sleep(0)
+        finally:
+            conn.close()
+        self.stats["pages_vacuumed"] += freed
+        return freed
+
+    def enable_incremental_vacuum(self) -> None:
+        """One-time full VACUUM switching an existing database to auto_vacuum=INCREMENTAL."""
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            conn.execute('VACUUM')
+        finally:
+            conn.close()
+
+    # ── Runs ────────────────────────────────────────────────────────────────
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """One retention pass over every tier; returns what it moved."""
+        started = time.monotonic()
+        result: Dict[str, Any] = {"tables": {}}
+        for policy in self.policies:
+            try:
+                result["tables"][policy.table] = self.archive_table(policy, now)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Retention for {policy.table} failed: {e}")
+        result["recordings"] = self.archive_recordings(now)
+        try:
+            result["segments"] = self.compress_transcript_segments(now)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Compressing transcript segments failed: {e}")
+        result["pages_vacuumed"] = self.incremental_vacuum()
+
+        self.stats["runs"] += 1
+        self.stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        self.stats["last_run_seconds"] = round(time.monotonic() - started, 3)
+        return result
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.run)
+            except Exception as e:
+                logger.error(f"Retention run failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "policies": {p.table: p.days for p in self.policies},
+            "recording_days": self.recording_days,
+            "archive_root": str(self.archive_root),
+            **self.stats,
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from call_recording import DATABASE_PATH, RECORDINGS_DIR
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Archive aged call data")
+    parser.add_argument("--transcripts-dir", type=Path, help="call-transcripts directory to compress")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="One-time full VACUUM enabling incremental vacuum")
+    args = parser.parse_args()
+
+    manager = CallRetentionManager(DATABASE_PATH, recordings_dir=RECORDINGS_DIR,
+                                   transcripts_dir=args.transcripts_dir)
+    if args.enable_incremental_vacuum:
+        manager.enable_incremental_vacuum()
+    print(json.dumps(manager.run(), indent=2))
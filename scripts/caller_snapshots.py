@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Caller Snapshots - Precomputed per-caller context, rebuilt at write time.
+
+SessionContextExtractor.get_enhanced_instructions and
+OpenClawBridge.get_caller_context used to assemble a caller's context while
+the call was being answered: read phone_mapping.json, parse MEMORY.md and
+the daily memory files, then format. The work now happens when its inputs
+change instead:
+
+- A CallerSnapshotRefresher thread rebuilds the snapshot of every caller in
+  the phone mapping after each call ends (request()) and whenever one of
+  its source files changes (mtime/size polled every
+  CALLER_SNAPSHOT_POLL_INTERVAL; the daily files roll over with the date).
+  Memory files are parsed once per rebuild, not once per caller
+- A CallerSnapshotStore keeps the snapshots in memory, so a lookup at call
+  setup is a dict read, and in SQLite (CALLER_SNAPSHOT_DB, keyed by
+  workspace), so a restarted process answers its first call warm
+- Callers without a snapshot (wildcard mapping entries, a call before the
+  first rebuild) fall back to live extraction
+
+Usage:
+    refresher = snapshot_refresher(workspace, build_all, sources)   # shared, started
+    refresher.store.get(phone)      # context dict or None
+    request_refresh("call_ended")   # every workspace in this process
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CALLER_SNAPSHOT_DB = Path(os.getenv("CALLER_SNAPSHOT_DB", "caller_snapshots.db"))
+CALLER_SNAPSHOT_POLL_INTERVAL = float(os.getenv("CALLER_SNAPSHOT_POLL_INTERVAL", "5"))  # seconds between source checks
+
+
+class CallerSnapshotStore:
+    """One workspace's per-caller context snapshots: read from memory, persisted to SQLite."""
+
+    def __init__(self, db_path: Path, workspace: str):
+        self.db_path = Path(db_path)
+        self.workspace = workspace
+        self._snapshots: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.built_at: Optional[float] = None
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS caller_snapshots (
+                workspace TEXT NOT NULL,
+                phone TEXT NOT NULL,
+                built_at REAL NOT NULL,
+                context TEXT NOT NULL,
+                PRIMARY KEY (workspace, phone)
+            )
+        ''')
+        return conn
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            if self.db_path.exists():  # Nothing to load (and no file to create) before the first build
+                try:
+                    with self._connect() as conn:
+                        rows = conn.execute(
+                            'SELECT phone, built_at, context FROM caller_snapshots WHERE workspace = ?',
+                            (self.workspace,)
+                        ).fetchall()
+                    self._snapshots = {phone: json.loads(context) for phone, _, context in rows}
+                    self.built_at = max((built_at for _, built_at, _ in rows), default=None)
+                except Exception as e:
+                    logger.warning(f"Could not load caller snapshots from {self.db_path}: {e}")
+            self._loaded = True
+
+    def get(self, phone: str) -> Optional[Dict[str, Any]]:
+        """The snapshot for a normalized phone number, or None."""
+        if not self._loaded:
+            self._load()
+        snapshot = self._snapshots.get(phone)
+        self.stats["hits" if snapshot is not None else "misses"] += 1
+        return snapshot
+
+    def replace_all(self, snapshots: Dict[str, Dict[str, Any]]) -> None:
+        """Persist a full rebuild, then swap it in (readers see the old or the new set)."""
+        built_at = time.time()
+        with self._connect() as conn:
+            conn.execute('DELETE FROM caller_snapshots WHERE workspace = ?', (self.workspace,))
+            conn.executemany(
+                'INSERT INTO caller_snapshots (workspace, phone, built_at, context) VALUES (?, ?, ?, ?)',
+                [(self.workspace, phone, built_at, json.dumps(context)) for phone, context in snapshots.items()]
+            )
+        with self._lock:
+            self._snapshots = dict(snapshots)
+            self.built_at = built_at
+            self._loaded = True
+
+    def __len__(self) -> int:
+        if not self._loaded:
+            self._load()
+        return len(self._snapshots)
+
+
+class CallerSnapshotRefresher:
+    """Background job that rebuilds every snapshot when asked or when a source file changes."""
+
+    def __init__(
+        self,
+        store: CallerSnapshotStore,
+        build_all: Callable[[], Dict[str, Dict[str, Any]]],
+        sources: Callable[[], List[Path]],
+        poll_interval: float = CALLER_SNAPSHOT_POLL_INTERVAL,
+    ):
+        self.store = store
+        self.build_all = build_all
+        self.sources = sources
+        self.poll_interval = poll_interval
+        self._signature: Optional[Tuple] = None
+        self._requested: Optional[str] = None
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {
+            "rebuilds": 0,
+            "errors": 0,
+            "last_reason": None,
+            "last_build_ms": None,
+        }
+
+    def _source_signature(self) -> Tuple:
+        signature = []
+        for path in self.sources():
+            try:
+                stat = path.stat()
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    def request(self, reason: str) -> None:
+        """Ask for a rebuild soon (non-blocking; safe from any thread)."""
+        self._requested = reason
+        self._wake.set()
+
+    def rebuild(self, reason: str = "manual") -> int:
+        """Rebuild every snapshot now; returns how many were stored."""
+        signature = self._source_signature()  # Before reading: a change mid-build triggers another
+        started = time.monotonic()
+        snapshots = self.build_all()
+        self.store.replace_all(snapshots)
+        self._signature = signature
+        self.stats["rebuilds"] += 1
+        self.stats["last_reason"] = reason
+        self.stats["last_build_ms"] = round((time.monotonic() - started) * 1000, 1)
+        logger.info(f"Rebuilt {len(snapshots)} caller snapshot(s) ({reason}, {self.stats['last_build_ms']}ms)")
+        return len(snapshots)
+
+    def check(self) -> bool:
+        """One background step: rebuild if requested or a source changed. True if it rebuilt."""
+        self._wake.clear()
+        reason, self._requested = self._requested, None
+        if reason is None:
+            if self._signature is None:
+                reason = "startup"
+            elif self._source_signature() != self._signature:
+                reason = "sources_changed"
+            else:
+                return False
+        self.rebuild(reason)
+        return True
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="caller-snapshots", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Caller snapshot rebuild failed: {e}", exc_info=True)
+            self._wake.wait(self.poll_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "snapshots": len(self.store),
+            "built_at": self.store.built_at,
+            **self.store.stats,
+            **self.stats,
+        }
+
+
+_refreshers: Dict[str, CallerSnapshotRefresher] = {}
+_refreshers_lock = threading.Lock()
+
+
+def snapshot_refresher(
+    workspace: Path,
+    build_all: Callable[[], Dict[str, Dict[str, Any]]],
+    sources: Callable[[], List[Path]],
+) -> CallerSnapshotRefresher:
+    """Shared, started refresher for a workspace (one per workspace per process)."""
+    key = str(Path(workspace).resolve())
+    refresher = _refreshers.get(key)
+    if refresher is None:
+        with _refreshers_lock:
+            refresher = _refreshers.get(key)
+            if refresher is None:
+                refresher = CallerSnapshotRefresher(CallerSnapshotStore(CALLER_SNAPSHOT_DB, key), build_all, sources)
+                refresher.start()
+                _refreshers[key] = refresher
+    return refresher
+
+
+def request_refresh(reason: str) -> None:
+    """Ask every workspace's refresher to rebuild (e.g. after a call ended)."""
+    for refresher in list(_refreshers.values()):
+        refresher.request(reason)
+
+
+def stop_refreshers() -> None:
+    with _refreshers_lock:
+        refreshers = list(_refreshers.values())
+        _refreshers.clear()
+    for refresher in refreshers:
+        refresher.stop()
+
+
+def get_snapshot_stats() -> Dict[str, Dict[str, Any]]:
+    return {workspace: refresher.get_stats() for workspace, refresher in list(_refreshers.items())}
@@ -3,6 +3,8 @@
 Zombie Call Cleanup Script
 
 One-time migration script to clean up zombie calls from the database.
+The webhook server now reaps idle calls itself (see call_reaper.py); this
+script remains for databases written by older versions or other processes.
 These are calls with status='active' and ended_at=null that have been
 running for impossibly long durations (e.g., 60,000+ seconds).
 
@@ -131,7 +133,7 @@ async def main():
         print()
         print("Cleaned calls:")
         for call in result['cleaned_calls']:
-            print(f"  {call['call_id']}: {call['duration_seconds']:.0f}s → status={call['status']}")
+            print(f"  {call['call_id']}: {call['duration_seconds'] or 0:.0f}s → status={call['status']}")
     
     print()
     print("✅ Cleanup complete!")
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Conversation Compactor - Rolling compaction for long Realtime calls.
+
+The OpenAI Realtime conversation keeps every item for the life of the
+session, so input tokens (and turn latency) grow with each exchange. This
+module mirrors the live conversation from server events and, once the item
+count or estimated token load crosses a threshold, plans a compaction:
+the oldest turns (plus any previous summary) are folded into a single
+summary item and the originals are deleted.
+
+It is pure bookkeeping — the caller does the summarizing and sends the
+events. Usage in webhook-server.py:
+
+    compactor = ConversationCompactor()
+
+    # on conversation.item.created / transcription / deleted events
+    compactor.on_item_created(msg["item"])
+    compactor.on_item_text(msg["item_id"], text)
+    compactor.on_item_deleted(msg["item_id"])
+
+    # after response.done
+    if compactor.needs_compaction():
+        plan = compactor.plan()
+        summary = await summarize(plan.previous_summary, plan.text)
+        for event in compactor.build_events(plan, summary):
+            await oai_ws.send(json.dumps(event))
+        compactor.apply(plan, summary)
+"""
+
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Thresholds (either one triggers compaction)
+COMPACT_MAX_ITEMS = int(os.getenv("COMPACT_MAX_ITEMS", "40"))
+COMPACT_MAX_TOKENS = int(os.getenv("COMPACT_MAX_TOKENS", "6000"))
+# Most recent items always left verbatim
+COMPACT_KEEP_RECENT = int(os.getenv("COMPACT_KEEP_RECENT", "10"))
+
+# Rough estimates — ~4 chars per text token, audio items cost ~3x their transcript
+CHARS_PER_TOKEN = 4
+AUDIO_TOKEN_RATIO = 3
+ITEM_TOKEN_OVERHEAD = 4
+
+SUMMARY_ITEM_PREFIX = "nia_summary_"
+SUMMARY_HEADER = "Summary of the call so far (earlier turns were condensed):"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency)."""
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class TrackedItem:
+    """One item in the live Realtime conversation."""
+    item_id: str
+    item_type: str              # message / function_call / function_call_output
+    role: str = ""              # user / assistant / system ("" for function items)
+    text: str = ""
+    audio: bool = False         # Item carries audio (costs more than its transcript)
+    call_id: str = ""           # Function call pairing
+    is_summary: bool = False
+
+    @property
+    def tokens(self) -> int:
+        estimate = estimate_tokens(self.text)
+        if self.audio:
+            estimate *= AUDIO_TOKEN_RATIO
+        return estimate + ITEM_TOKEN_OVERHEAD
+
+
+@dataclass
+class CompactionPlan:
+    """Items selected for folding into a summary."""
+    items: List[TrackedItem]
+    previous_summary: str
+    text: str
+    tokens: int
+    summary_item_id: str = ""
+
+
+class ConversationCompactor:
+    """
+    Tracks live conversation items and plans rolling compactions.
+
+    Not thread-safe; owned by a single media bridge coroutine.
+    """
+
+    def __init__(
+        self,
+        max_items: int = COMPACT_MAX_ITEMS,
+        max_tokens: int = COMPACT_MAX_TOKENS,
+        keep_recent: int = COMPACT_KEEP_RECENT
+    ):
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.keep_recent = max(keep_recent, 1)
+
+        self.items: List[TrackedItem] = []
+        self._index: Dict[str, TrackedItem] = {}
+        self.summary: str = ""
+        self.in_flight: bool = False
+        self.stats = {
+            "compactions": 0,
+            "items_removed": 0,
+            "tokens_removed": 0,
+        }
+
+    # ── Event tracking ──────────────────────────────────────────────────────
+
+    def on_item_created(self, item: Dict[str, Any]) -> None:
+        """Track an item from a conversation.item.created event."""
+        item_id = item.get("id")
+        if not item_id or item_id in self._index:
+            return
+
+        text_parts = []
+        audio = False
+        for part in item.get("content") or []:
+            part_type = part.get("type", "")
+            if "audio" in part_type:
+                audio = True
+            text_parts.append(part.get("text") or part.get("transcript") or "")
+
+        item_type = item.get("type", "message")
+        if item_type == "function_call":
+            text = f"{item.get('name', '')}({item.get('arguments', '')})"
+        elif item_type == "function_call_output":
+            text = item.get("output", "")
+        else:
+            text = " ".join(p for p in text_parts if p)
+
+        tracked = TrackedItem(
+            item_id=item_id,
+            item_type=item_type,
+            role=item.get("role", ""),
+            text=text,
+            audio=audio,
+            call_id=item.get("call_id", ""),
+            is_summary=item_id.startswith(SUMMARY_ITEM_PREFIX),
+        )
+        if tracked.is_summary:
+            # Our own summary echoed back — it lives at the start of the conversation
+            self.items.insert(0, tracked)
+        else:
+            self.items.append(tracked)
+        self._index[item_id] = tracked
+
+    def on_item_text(self, item_id: str, text: str) -> None:
+        """Attach a transcript that arrived after the item was created."""
+        tracked = self._index.get(item_id or "")
+        if tracked and text:
+            tracked.text = f"{tracked.text} {text}".strip() if tracked.text else text
+
+    def on_item_deleted(self, item_id: str) -> None:
+        """Forget an item the server confirmed deleted."""
+        tracked = self._index.pop(item_id or "", None)
+        if tracked:
+            self.items.remove(tracked)
+
+    def reset(self) -> None:
+        """Drop item tracking (new session after reconnect); the summary is kept."""
+        self.items.clear()
+        self._index.clear()
+        self.in_flight = False
+
+    # ── Compaction ──────────────────────────────────────────────────────────
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(item.tokens for item in self.items)
+
+    def needs_compaction(self) -> bool:
+        if self.in_flight or len(self.items) <= self.keep_recent:
+            return False
+        return len(self.items) > self.max_items or self.total_tokens > self.max_tokens
+
+    def plan(self) -> Optional[CompactionPlan]:
+        """
+        Choose the items to fold: everything older than the last keep_recent,
+        never splitting a function_call from its output and never touching a
+        function_call whose output has not arrived yet.
+        """
+        cut = len(self.items) - self.keep_recent
+        if cut <= 0:
+            return None
+
+        # Stop before any unresolved function call
+        answered = {i.call_id for i in self.items if i.item_type == "function_call_output"}
+        for idx, item in enumerate(self.items[:cut]):
+            if item.item_type == "function_call" and item.call_id not in answered:
+                cut = idx
+                break
+
+        # Keep call/output pairs together: outputs of folded calls are folded too
+        folded_calls = {i.call_id for i in self.items[:cut] if i.item_type == "function_call"}
+        selected = self.items[:cut] + [
+            i for i in self.items[cut:]
+            if i.item_type == "function_call_output" and i.call_id in folded_calls
+        ]
+        if not any(not i.is_summary for i in selected):
+            return None
+
+        lines = []
+        for item in selected:
+            if item.is_summary or not item.text:
+                continue
+            if item.item_type == "function_call":
+                lines.append(f"Tool call: {item.text}")
+            elif item.item_type == "function_call_output":
+                lines.append(f"Tool result: {item.text}")
+            else:
+                lines.append(f"{(item.role or 'user').capitalize()}: {item.text}")
+
+        self.stats["compactions"] += 1
+        return CompactionPlan(
+            items=selected,
+            previous_summary=self.summary,
+            text="\n".join(lines),
+            tokens=sum(i.tokens for i in selected),
+            summary_item_id=f"{SUMMARY_ITEM_PREFIX}{self.stats['compactions']}",
+        )
+
+    def build_events(self, plan: CompactionPlan, summary: str) -> List[Dict[str, Any]]:
+        """
+        Realtime events for a compaction: the summary item is inserted at the
+        start of the conversation, then every folded item is deleted.
+        """
+        events: List[Dict[str, Any]] = [{
+            "type": "conversation.item.create",
+            "previous_item_id": "root",
+            "item": {
+                "id": plan.summary_item_id,
+                "type": "message",
+                "role": "system",
+                "content": [{"type": "input_text", "text": f"{SUMMARY_HEADER}\n{summary}"}]
+            }
+        }]
+        for item in plan.items:
+            events.append({"type": "conversation.item.delete", "item_id": item.item_id})
+        return events
+
+    def apply(self, plan: CompactionPlan, summary: str) -> None:
+        """Update local state once the compaction events were sent."""
+        folded = {item.item_id for item in plan.items}
+        self.items = [i for i in self.items if i.item_id not in folded]
+        for item_id in folded:
+            self._index.pop(item_id, None)
+
+        summary_item = TrackedItem(
+            item_id=plan.summary_item_id,
+            item_type="message",
+            role="system",
+            text=summary,
+            is_summary=True,
+        )
+        if plan.summary_item_id not in self._index:
+            self.items.insert(0, summary_item)
+            self._index[plan.summary_item_id] = summary_item
+
+        self.summary = summary
+        self.stats["items_removed"] += len(plan.items)
+        self.stats["tokens_removed"] += max(plan.tokens - summary_item.tokens, 0)
+        logger.info(
+            f"Compacted {len(plan.items)} items (~{plan.tokens} tokens) into summary "
+            f"(~{summary_item.tokens} tokens); live items={len(self.items)}"
+        )
+
+
+def fallback_summary(previous_summary: str, text: str, max_chars: int = 1200) -> str:
+    """Extractive summary used when the LLM summarizer is unavailable."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    excerpt = " / ".join(line[:160] for line in lines)
+    combined = f"{previous_summary} {excerpt}".strip() if previous_summary else excerpt
+    if len(combined) > max_chars:
+        # Keep the most recent material — older context already lives in earlier summaries
+        combined = "…" + combined[-(max_chars - 1):]
+    return combined
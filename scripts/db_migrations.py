@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+DB Migrations - Versioned schema upgrades for call_history.db.
+
+calls, transcripts and latency_events store their timestamps as ISO 8601
+TEXT, so range queries compare strings and a "Z" suffix from one writer
+sorts differently from "+00:00" from another. Migrations add an integer
+epoch-millisecond column next to each timestamp, keep it in sync with
+triggers (so every writer, including ad-hoc scripts, is covered) and build
+covering indexes on the numeric columns. Later ones add the retention
+archive index, an FTS5 index over transcripts.content and the
+trigger-maintained storage_stats counters.
+
+- The schema version is PRAGMA user_version; each migration runs in its
+  own BEGIN IMMEDIATE transaction together with the version bump, so a
+  crash leaves the database at the previous version
+- Migrations are idempotent (IF NOT EXISTS, column checks): two processes
+  starting at once apply each migration only once
+- The database is switched to WAL, so readers never block the writer;
+  a new database is also created with auto_vacuum=INCREMENTAL
+- Online migrations rewrite existing rows in small batches, each its own
+  short transaction, pausing in between so live writes interleave.
+  migrate() backfills up to one batch of rows inline (enough for a new or
+  small database) and leaves the rest to run_backfill(), which the server
+  runs in a thread
+- Readers check epoch_ms_ready() before filtering on the *_ms columns;
+  until the backfill finishes they keep using the TEXT columns
+
+Usage:
+    migrate(db_path)                       # at startup, cheap when current
+    await asyncio.to_thread(run_backfill, db_path)
+    if epoch_ms_ready(conn): ...           # query started_at_ms
+"""
+
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", "500"))        # rows per backfill transaction
+MIGRATION_BATCH_PAUSE = float(os.getenv("MIGRATION_BATCH_PAUSE", "0.01"))   # seconds between batches
+MIGRATION_BUSY_TIMEOUT = 30.0  # seconds to wait for a live writer's transaction
+
+
+def epoch_ms_sql(column: str) -> str:
+    """SQL for an ISO 8601 TEXT column as UTC epoch milliseconds (NULL if unparseable)."""
+    # strftime normalizes "Z", "+00:00" and other offsets to UTC; naive
+    # timestamps are taken as UTC, as close_stale_calls does
+    return (f"(CAST(strftime('%s', {column}) AS INTEGER) * 1000"
+            f" + CAST(substr(strftime('%f', {column}), 4) AS INTEGER))")
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """A datetime as UTC epoch milliseconds, rounded as epoch_ms_sql does (naive values are UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return round(value.timestamp() * 1000)
+
+
+# (table, TEXT column) pairs that get an epoch-ms twin
+EPOCH_MS_COLUMNS = [
+    ("calls", "started_at"),
+    ("calls", "ended_at"),
+    ("transcripts", "timestamp"),
+    ("latency_events", "timestamp"),
+]
+
+
+@dataclass
+class Migration:
+    """
+    One schema step.
+
+    apply(conn) runs inside the migration's transaction. For an online
+    migration, apply(conn, state, batch_size) processes one batch and
+    returns True while rows remain; state carries its cursor between
+    batches.
+    """
+    version: int
+    name: str
+    apply: Callable[..., Any]
+    online: bool = False
+
+
+def _create_tables(conn: sqlite3.Connection) -> None:
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS calls (
+            call_id TEXT PRIMARY KEY,
+            call_type TEXT NOT NULL,
+            caller_number TEXT,
+            callee_number TEXT,
+            started_at TEXT NOT NULL,
+            ended_at TEXT,
+            duration_seconds REAL,
+            status TEXT NOT NULL,
+            recording_path TEXT,
+            transcript_path TEXT,
+            has_audio BOOLEAN DEFAULT FALSE,
+            has_transcript BOOLEAN DEFAULT FALSE,
+            metadata TEXT
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transcripts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            call_id TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            speaker TEXT NOT NULL,
+            content TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            metadata TEXT,
+            FOREIGN KEY (call_id) REFERENCES calls (call_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS latency_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            call_id TEXT NOT NULL,
+            event_type TEXT NOT NULL,
+            duration_ms REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            metadata TEXT,
+            FOREIGN KEY (call_id) REFERENCES calls (call_id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_calls_started_at ON calls(started_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_calls_status_started ON calls(status, started_at)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_call_id ON transcripts(call_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_timestamp ON transcripts(timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_latency_call_id ON latency_events(call_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_latency_event_type ON latency_events(event_type)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_latency_timestamp ON latency_events(timestamp)')
+
+
+def _add_epoch_ms_columns(conn: sqlite3.Connection) -> None:
+    for table, column in EPOCH_MS_COLUMNS:
+        existing = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        if f"{column}_ms" not in existing:
+            conn.execute(f'ALTER TABLE {table} ADD COLUMN {column}_ms INTEGER')
+
+    # Keep the *_ms twins in sync for every writer. The trigger's own UPDATE
+    # only touches *_ms columns, so it doesn't fire the UPDATE OF trigger again.
+    for table in ("calls", "transcripts", "latency_events"):
+        columns = [column for t, column in EPOCH_MS_COLUMNS if t == table]
+        assignments = ", ".join(
+            f"{column}_ms = {epoch_ms_sql('NEW.' + column)}" for column in columns
+        )
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_epoch_ms_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                UPDATE {table} SET {assignments} WHERE rowid = NEW.rowid;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_epoch_ms_update
+            AFTER UPDATE OF {", ".join(columns)} ON {table}
+            BEGIN
+                UPDATE {table} SET {assignments} WHERE rowid = NEW.rowid;
+            END
+        ''')
+
+
+def _create_covering_indexes(conn: sqlite3.Connection) -> None:
+    # Active/zombie lookups: status + start time, call_id read from the index
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_calls_status_started_ms
+        ON calls(status, started_at_ms, call_id)
+    ''')
+    # Metrics windows: every column get_metrics aggregates
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_calls_started_ms
+        ON calls(started_at_ms, status, call_type, duration_seconds, has_transcript)
+    ''')
+    # Latency stats per event type over a window
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_latency_type_ts_ms
+        ON latency_events(event_type, timestamp_ms, duration_ms)
+    ''')
+    # Per-call timelines
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_latency_call_ts_ms ON latency_events(call_id, timestamp_ms)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_transcripts_call_ts_ms ON transcripts(call_id, timestamp_ms)')
+
+
+def _create_archive_index(conn: sqlite3.Connection) -> None:
+    # Which archive days (see call_retention) hold rows of which call
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS archive_index (
+            table_name TEXT NOT NULL,
+            call_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (table_name, call_id, day)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _backfill_epoch_ms(conn: sqlite3.Connection, state: Dict[str, Any],
+                       batch_size: int = MIGRATION_BATCH_SIZE) -> bool:
+    """Fill *_ms for one rowid range of one table; True while rows remain."""
+    tables = list(dict.fromkeys(table for table, _ in EPOCH_MS_COLUMNS))
+    while state.setdefault("table", 0) < len(tables):
+        table = tables[state["table"]]
+        after = state.setdefault("rowid", 0)
+        upto, scanned = conn.execute(f'''
+            SELECT MAX(rowid), COUNT(*) FROM (
+                SELECT rowid FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?
+            )
+        ''', (after, batch_size)).fetchone()
+        if upto is None:
+            state["table"] += 1
+            state["rowid"] = 0
+            continue
+
+        columns = [column for t, column in EPOCH_MS_COLUMNS if t == table]
+        assignments = ", ".join(f"{column}_ms = {epoch_ms_sql(column)}" for column in columns)
+        missing = " OR ".join(f"({column}_ms IS NULL AND {column} IS NOT NULL)" for column in columns)
+        cursor = conn.execute(f'''
+            UPDATE {table} SET {assignments}
+            WHERE rowid > ? AND rowid <= ? AND ({missing})
+        ''', (after, upto))
+        state["rowid"] = upto
+        state["scanned"] = state.get("scanned", 0) + scanned
+        state["rows"] = state.get("rows", 0) + max(cursor.rowcount, 0)
+        return True
+    return False
+
+
+def _create_transcript_search(conn: sqlite3.Connection) -> None:
+    # A regular (not external-content) FTS5 table: deleting a rowid that was
+    # never indexed is harmless, so the triggers need not know how far the
+    # backfill has got
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS transcripts_fts USING fts5(
+            content, call_id UNINDEXED, tokenize = 'porter unicode61 remove_diacritics 2'
+        )
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_transcripts_fts_insert
+        AFTER INSERT ON transcripts
+        BEGIN
+            INSERT INTO transcripts_fts (rowid, content, call_id) VALUES (NEW.id, NEW.content, NEW.call_id);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_transcripts_fts_delete
+        AFTER DELETE ON transcripts
+        BEGIN
+            DELETE FROM transcripts_fts WHERE rowid = OLD.id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_transcripts_fts_update
+        AFTER UPDATE OF content ON transcripts
+        BEGIN
+            UPDATE transcripts_fts SET content = NEW.content WHERE rowid = NEW.id;
+        END
+    ''')
+    # Rows up to the watermark predate the triggers and are indexed by the
+    # next (online) migration; its cursor survives restarts
+    conn.execute('CREATE TABLE IF NOT EXISTS schema_meta (key TEXT PRIMARY KEY, value)')
+    conn.execute('''
+        INSERT OR IGNORE INTO schema_meta (key, value)
+        SELECT 'transcripts_fts_watermark', COALESCE(MAX(id), 0) FROM transcripts
+    ''')
+    conn.execute("INSERT OR IGNORE INTO schema_meta (key, value) VALUES ('transcripts_fts_cursor', 0)")
+    # list_calls keyset pages filtered by call type
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_calls_type_started_ms
+        ON calls(call_type, started_at_ms, call_id)
+    ''')
+
+
+def _backfill_transcript_search(conn: sqlite3.Connection, state: Dict[str, Any],
+                                batch_size: int = MIGRATION_BATCH_SIZE) -> bool:
+    """Index one batch of pre-trigger transcripts; True while rows remain."""
+    meta = dict(conn.execute(
+        "SELECT key, value FROM schema_meta WHERE key LIKE 'transcripts_fts_%'"
+    ))
+    after, watermark = meta['transcripts_fts_cursor'], meta['transcripts_fts_watermark']
+    if after >= watermark:
+        return False
+    upto, scanned = conn.execute('''
+        SELECT MAX(id), COUNT(*) FROM (
+            SELECT id FROM transcripts WHERE id > ? AND id <= ? ORDER BY id LIMIT ?
+        )
+    ''', (after, watermark, batch_size)).fetchone()
+    upto = upto if upto is not None else watermark  # Rest of the range was deleted
+    conn.execute('''
+        INSERT INTO transcripts_fts (rowid, content, call_id)
+        SELECT id, content, call_id FROM transcripts WHERE id > ? AND id <= ?
+    ''', (after, upto))
+    conn.execute("UPDATE schema_meta SET value = ? WHERE key = 'transcripts_fts_cursor'", (upto,))
+    state["scanned"] = state.get("scanned", 0) + scanned
+    return True
+
+
+STORAGE_STATS_UPSERT = 'ON CONFLICT(key) DO UPDATE SET value = value + excluded.value'
+
+
+def storage_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Row counts storage_stats keeps incrementally, computed from scratch."""
+    counts = {
+        'calls_total': conn.execute('SELECT COUNT(*) FROM calls').fetchone()[0],
+        'calls_with_audio': conn.execute('SELECT COUNT(*) FROM calls WHERE has_audio = TRUE').fetchone()[0],
+        'calls_with_transcripts': conn.execute(
+            'SELECT COUNT(*) FROM calls WHERE has_transcript = TRUE'
+        ).fetchone()[0],
+        'transcript_entries': conn.execute('SELECT COUNT(*) FROM transcripts').fetchone()[0],
+    }
+    for status, count in conn.execute('SELECT status, COUNT(*) FROM calls GROUP BY status'):
+        counts[f'calls_status:{status}'] = count
+    return counts
+
+
+def _create_storage_stats(conn: sqlite3.Connection) -> None:
+    # Counters behind get_storage_stats and the storage gauges. The triggers
+    # keep the row counts; recording_bytes is kept by the recording write
+    # path and, like everything else, corrected by storage_stats.reconcile()
+    conn.execute('CREATE TABLE IF NOT EXISTS storage_stats (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+    conn.execute('DELETE FROM storage_stats')
+    conn.executemany(
+        'INSERT INTO storage_stats (key, value) VALUES (?, ?)',
+        [*storage_counts(conn).items(), ('recording_bytes', 0), ('reconciled_at', 0)]
+    )
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_calls_stats_insert
+        AFTER INSERT ON calls
+        BEGIN
+            INSERT INTO storage_stats (key, value) VALUES
+                ('calls_total', 1),
+                ('calls_status:' || NEW.status, 1),
+                ('calls_with_audio', COALESCE(NEW.has_audio = TRUE, 0)),
+                ('calls_with_transcripts', COALESCE(NEW.has_transcript = TRUE, 0))
+            {STORAGE_STATS_UPSERT};
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_calls_stats_update
+        AFTER UPDATE OF status, has_audio, has_transcript ON calls
+        WHEN OLD.status IS NOT NEW.status
+          OR OLD.has_audio IS NOT NEW.has_audio
+          OR OLD.has_transcript IS NOT NEW.has_transcript
+        BEGIN
+            INSERT INTO storage_stats (key, value) VALUES
+                ('calls_status:' || OLD.status, -1),
+                ('calls_status:' || NEW.status, 1),
+                ('calls_with_audio', COALESCE(NEW.has_audio = TRUE, 0) - COALESCE(OLD.has_audio = TRUE, 0)),
+                ('calls_with_transcripts',
+                 COALESCE(NEW.has_transcript = TRUE, 0) - COALESCE(OLD.has_transcript = TRUE, 0))
+            {STORAGE_STATS_UPSERT};
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_calls_stats_delete
+        AFTER DELETE ON calls
+        BEGIN
+            INSERT INTO storage_stats (key, value) VALUES
+                ('calls_total', -1),
+                ('calls_status:' || OLD.status, -1),
+                ('calls_with_audio', -COALESCE(OLD.has_audio = TRUE, 0)),
+                ('calls_with_transcripts', -COALESCE(OLD.has_transcript = TRUE, 0))
+            {STORAGE_STATS_UPSERT};
+        END
+    ''')
+    for event, delta in (('INSERT', 1), ('DELETE', -1)):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_transcripts_stats_{event.lower()}
+            AFTER {event} ON transcripts
+            BEGIN
+                INSERT INTO storage_stats (key, value) VALUES ('transcript_entries', {delta})
+                {STORAGE_STATS_UPSERT};
+            END
+        ''')
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "baseline tables", _create_tables),
+    Migration(2, "epoch-ms timestamp columns and triggers", _add_epoch_ms_columns),
+    Migration(3, "covering indexes on epoch-ms columns", _create_covering_indexes),
+    Migration(4, "backfill epoch-ms timestamps", _backfill_epoch_ms, online=True),
+    Migration(5, "archive index", _create_archive_index),
+    Migration(6, "transcript full-text index", _create_transcript_search),
+    Migration(7, "backfill transcript full-text index", _backfill_transcript_search, online=True),
+    Migration(8, "storage statistics counters", _create_storage_stats),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+# Readers may filter on *_ms columns from this version on
+EPOCH_MS_READY_VERSION = 4
+# archive_index exists (call_retention) from this version on
+ARCHIVE_INDEX_VERSION = 5
+# transcripts_fts covers every transcript row from this version on
+TRANSCRIPT_SEARCH_VERSION = 7
+# storage_stats is maintained from this version on
+STORAGE_STATS_VERSION = 8
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+    return sqlite3.connect(db_path, timeout=MIGRATION_BUSY_TIMEOUT, isolation_level=None)
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def epoch_ms_ready(conn: sqlite3.Connection) -> bool:
+    """True once every row has its *_ms columns filled (readers may rely on them)."""
+    return schema_version(conn) >= EPOCH_MS_READY_VERSION
+
+
+def _apply(conn: sqlite3.Connection, migration: Migration, *args) -> Any:
+    """Run one migration (or one online batch) in its own write transaction."""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        if schema_version(conn) >= migration.version:
+            conn.execute('ROLLBACK')  # Another process got here first
+            return False
+        result = migration.apply(conn, *args)
+        if not (migration.online and result):
+            conn.execute(f'PRAGMA user_version = {migration.version}')
+            logger.info(f"Applied migration {migration.version}: {migration.name}")
+        conn.execute('COMMIT')
+        return result
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def migrate(db_path: Path, online: bool = False,
+            batch_size: int = MIGRATION_BATCH_SIZE,
+            batch_pause: float = MIGRATION_BATCH_PAUSE) -> int:
+    """
+    Bring db_path up to date and return its schema version.
+
+    Online migrations get up to batch_size rows here; if more remain they
+    are left to run_backfill() unless online=True, in which case they run
+    to the end.
+    """
+    conn = _connect(db_path)
+    try:
+        if schema_version(conn) == 0 and not conn.execute('SELECT 1 FROM sqlite_master').fetchone():
+            # Only possible before the first table: lets retention free pages
+            # with PRAGMA incremental_vacuum instead of a full VACUUM
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+        if conn.execute('PRAGMA journal_mode').fetchone()[0].lower() != 'wal':
+            conn.execute('PRAGMA journal_mode=WAL')  # Persistent: stored in the file
+        for migration in MIGRATIONS:
+            if schema_version(conn) >= migration.version:
+                continue
+            if not migration.online:
+                _apply(conn, migration)
+                continue
+            state: Dict[str, Any] = {}
+            while _apply(conn, migration, state, batch_size):
+                if not online and state.get("scanned", 0) >= batch_size:
+                    logger.info(
+                        f"Migration {migration.version} ({migration.name}) "
+                        f"continues in the background"
+                    )
+                    return schema_version(conn)
+                time.sleep(batch_pause)  # Let live writers in
+        return schema_version(conn)
+    finally:
+        conn.close()
+
+
+def run_backfill(db_path: Path, batch_size: int = MIGRATION_BATCH_SIZE,
+                 batch_pause: float = MIGRATION_BATCH_PAUSE) -> int:
+    """Finish pending online migrations in small batches (blocking; run in a thread)."""
+    started = time.monotonic()
+    version = migrate(db_path, online=True, batch_size=batch_size, batch_pause=batch_pause)
+    logger.info(f"{db_path} at schema version {version} ({time.monotonic() - started:.1f}s)")
+    return version
+
+
+def pending_migrations(db_path: Path) -> List[Migration]:
+    """Migrations not yet applied to db_path."""
+    conn = _connect(db_path)
+    try:
+        version = schema_version(conn)
+    finally:
+        conn.close()
+    return [m for m in MIGRATIONS if m.version > version]
@@ -21,6 +21,8 @@ Environment:
     PORT - Server port (default: 8084)
     VOICE_ALLOWLIST - Comma-separated list of allowed phone numbers
     VOICE_POLICY - Policy: open, allowlist (default), pairing
+    INBOUND_DECISION_CACHE_SIZE - Cached per-number decisions (default: 10000)
+    INBOUND_DB - SQLite file for caller history and missed calls
 """
 
 import asyncio
@@ -28,15 +30,18 @@ import json
 import logging
 import os
 import re
+import threading
 import time
-from dataclasses import dataclass, field, asdict
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+
+from inbound_store import CallerHistory, InboundStore, MissedCall
+from phone_routing import Allowlist, compile_allowlist
 import uvicorn
 
 # Setup logging
@@ -50,12 +55,37 @@ logger = logging.getLogger(__name__)
 PORT = int(os.getenv("PORT", "8084"))
 VOICE_ALLOWLIST = os.getenv("VOICE_ALLOWLIST", "").split(",")
 VOICE_POLICY = os.getenv("VOICE_POLICY", "allowlist")
+# Per-number authorization decisions kept per policy version
+POLICY_DECISION_CACHE_SIZE = int(os.getenv("INBOUND_DECISION_CACHE_SIZE", "10000"))
 
 # Try to load allowlist from config file
 CONFIG_PATH = Path(__file__).parent.parent / "config" / "inbound.json"
 
+# Last loaded config and what it was built from (file signature + env overrides)
+_config_cache: Dict[str, Any] = {"key": None, "config": None}
+
+
+def _config_key() -> tuple:
+    try:
+        stat = CONFIG_PATH.stat()
+        file_signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        file_signature = None
+    return (str(CONFIG_PATH), file_signature, tuple(VOICE_ALLOWLIST), VOICE_POLICY)
+
+
 def load_config() -> Dict[str, Any]:
-    """Load inbound configuration from file or environment."""
+    """
+    Load inbound configuration from file or environment.
+    
+    The result is cached until inbound.json or the environment overrides
+    change, so the same allowFrom list (and its compiled allowlist) is
+    reused across calls. Treat the returned dict as read-only.
+    """
+    key = _config_key()
+    if _config_cache["key"] == key:
+        return _config_cache["config"]
+    
     config = {
         "allowFrom": [],
         "policy": VOICE_POLICY,
@@ -80,36 +110,14 @@ def load_config() -> Dict[str, Any]:
     if VOICE_POLICY:
         config["policy"] = VOICE_POLICY
     
+    _config_cache["key"] = key
+    _config_cache["config"] = config
     return config
 
 
-# Data models
-@dataclass
-class CallerHistory:
-    """Tracks history for a known caller."""
-    phone: str
-    name: Optional[str] = None
-    call_count: int = 0
-    last_call_at: Optional[str] = None
-    notes: Optional[str] = None
-    first_seen_at: Optional[str] = None
-
-
-@dataclass
-class MissedCall:
-    """Record of a missed call."""
-    timestamp: str
-    from_number: str
-    reason: str  # unauthorized, busy, no_answer, after_hours
-    has_voicemail: bool = False
-    voicemail_transcript: Optional[str] = None
-    callback_scheduled: bool = False
-    callback_scheduled_at: Optional[str] = None
-
-
-# In-memory storage (replace with persistent storage in production)
-caller_history: Dict[str, CallerHistory] = {}
-missed_calls: List[MissedCall] = []
+# Persistent caller history and missed calls (see inbound_store.py)
+inbound_store = InboundStore()
+caller_history = inbound_store.callers
 
 # Pydantic models for API
 class AuthorizeRequest(BaseModel):
@@ -181,37 +189,28 @@ def check_allowlist(phone: str, allow_from: List[str]) -> Optional[str]:
     - Exact match: "+14402915517"
     - Wildcard: "*"
     - Prefix match: "+1440*"
-    """
-    normalized = normalize_phone(phone)
-    
-    for entry in allow_from:
-        if not entry:
-            continue
-            
-        # Wildcard - allow all
-        if entry.strip() == "*":
-            return "*"
-        
-        entry_normalized = normalize_phone(entry.rstrip("*"))
-        
-        # Prefix match
-        if entry.endswith("*"):
-            if normalized.startswith(entry_normalized):
-                return entry
-        
-        # Exact match
-        if normalized == entry_normalized:
-            return entry
     
-    return None
+    Returns the first matching entry in list order. The list is compiled
+    into a trie once (see phone_routing.Allowlist), so a check costs
+    O(digits) however long the allowlist is.
+    """
+    return compile_allowlist(allow_from).match(phone)
 
 
 def authorize_caller(phone: str, config: Dict[str, Any]) -> AuthorizeResponse:
     """Authorize an incoming call based on config."""
-    normalized = normalize_phone(phone)
-    policy = config.get("policy", "allowlist")
     allow_from = config.get("allowFrom", [])
-    
+    return _decide(
+        normalize_phone(phone),
+        config.get("policy", "allowlist"),
+        allow_from,
+        lambda number: check_allowlist(number, allow_from),
+    )
+
+
+def _decide(normalized: str, policy: str, allow_from: List[str],
+            match: Callable[[str], Optional[str]]) -> AuthorizeResponse:
+    """Apply policy to a normalized number; match() looks it up in the allowlist."""
     # Open policy - accept all
     if policy == "open":
         return AuthorizeResponse(
@@ -223,7 +222,7 @@ def authorize_caller(phone: str, config: Dict[str, Any]) -> AuthorizeResponse:
     
     # Pairing policy - check paired devices (falls back to allowlist)
     if policy == "pairing":
-        matched = check_allowlist(normalized, allow_from)
+        matched = match(normalized)
         if matched:
             return AuthorizeResponse(
                 authorized=True,
@@ -248,7 +247,7 @@ def authorize_caller(phone: str, config: Dict[str, Any]) -> AuthorizeResponse:
             policy="allowlist"
         )
     
-    matched = check_allowlist(normalized, allow_from)
+    matched = match(normalized)
     if matched:
         return AuthorizeResponse(
             authorized=True,
@@ -266,6 +265,81 @@ def authorize_caller(phone: str, config: Dict[str, Any]) -> AuthorizeResponse:
     )
 
 
+class InboundPolicy:
+    """
+    Inbound policy compiled from one version of the config.
+    
+    Holds the config, its allowlist trie and a per-number decision cache.
+    A config change builds a new InboundPolicy (see get_policy), so the
+    decision cache is never consulted across versions. Returned decisions
+    are shared between requests; treat them as read-only.
+    """
+    
+    def __init__(self, config: Dict[str, Any], version: int = 1):
+        self.config = config
+        self.version = version
+        self.policy = config.get("policy", "allowlist")
+        self.allow_from: List[str] = config.get("allowFrom", [])
+        self.allowlist = Allowlist(self.allow_from)
+        self.loaded_at = datetime.now(timezone.utc).isoformat()
+        self._decisions: Dict[str, AuthorizeResponse] = {}
+        self.stats = {"decisions": 0, "cache_hits": 0}
+    
+    def authorize(self, phone: str) -> AuthorizeResponse:
+        """Decision for phone, computed once per number for this policy version."""
+        normalized = normalize_phone(phone)
+        self.stats["decisions"] += 1
+        decision = self._decisions.get(normalized)
+        if decision is not None:
+            self.stats["cache_hits"] += 1
+            return decision
+        
+        decision = _decide(normalized, self.policy, self.allow_from, self.allowlist.match)
+        if len(self._decisions) >= POLICY_DECISION_CACHE_SIZE:
+            self._decisions.clear()  # Bounded: numbers seen once (spam) can't grow it forever
+        self._decisions[normalized] = decision
+        return decision
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "loaded_at": self.loaded_at,
+            "policy": self.policy,
+            "allowlist_entries": len(self.allow_from),
+            "cached_decisions": len(self._decisions),
+            **self.stats,
+        }
+
+
+_policy: Optional[InboundPolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_policy() -> InboundPolicy:
+    """
+    Current compiled policy, rebuilt when inbound.json or the env overrides change.
+    
+    The new policy is swapped in with one assignment: a request sees either
+    the old version or the new one, never a half-built allowlist.
+    """
+    global _policy
+    config = load_config()
+    policy = _policy
+    if policy is not None and policy.config is config:
+        return policy
+    with _policy_lock:
+        policy = _policy
+        if policy is None or policy.config is not config:
+            version = policy.version + 1 if policy else 1
+            policy = InboundPolicy(config, version)
+            _policy = policy
+            logger.info(
+                f"Compiled inbound policy v{version}: {policy.policy}, "
+                f"{len(policy.allow_from)} allowlist entries"
+            )
+    return policy
+
+
 def build_context(request: ContextRequest) -> ContextResponse:
     """Build session context for an inbound call."""
     normalized = normalize_phone(request.caller_phone)
@@ -338,8 +412,7 @@ async def authorize_inbound_call(request: AuthorizeRequest):
     Returns whether the call should be accepted based on
     the configured policy and allowlist.
     """
-    config = load_config()
-    result = authorize_caller(request.caller_phone, config)
+    result = get_policy().authorize(request.caller_phone)
     
     logger.info(
         f"Authorization: {mask_phone(request.caller_phone)} -> "
@@ -357,7 +430,7 @@ async def get_session_context(request: ContextRequest):
     Returns session key and context instructions to inject
     into the agent's system prompt.
     """
-    context = build_context(request)
+    context = await asyncio.to_thread(build_context, request)  # SQLite read off the event loop
     
     logger.info(
         f"Context built: {mask_phone(request.caller_phone)} -> "
@@ -375,20 +448,8 @@ async def record_call_started(request: ContextRequest):
     normalized = normalize_phone(request.caller_phone)
     now = datetime.now(timezone.utc).isoformat() + "Z"
     
-    if normalized in caller_history:
-        history = caller_history[normalized]
-        history.call_count += 1
-        history.last_call_at = now
-        if request.caller_name and not history.name:
-            history.name = request.caller_name
-    else:
-        caller_history[normalized] = CallerHistory(
-            phone=normalized,
-            name=request.caller_name,
-            call_count=1,
-            last_call_at=now,
-            first_seen_at=now
-        )
+    # Batched: bursts of calls become one write per flush window
+    inbound_store.record_call(normalized, request.caller_name, now)
     
     logger.info(f"Call started: {mask_phone(request.caller_phone)}")
     return {"status": "recorded"}
@@ -407,11 +468,7 @@ async def record_missed_call(request: MissedCallRecord):
         voicemail_transcript=request.voicemail_transcript
     )
     
-    missed_calls.append(missed_call)
-    
-    # Keep only last 100 missed calls
-    if len(missed_calls) > 100:
-        missed_calls.pop(0)
+    await asyncio.to_thread(inbound_store.add_missed_call, missed_call)
     
     logger.info(
         f"Missed call recorded: {mask_phone(request.from_number)} "
@@ -422,8 +479,13 @@ async def record_missed_call(request: MissedCallRecord):
 
 
 @app.get("/callers")
-async def list_known_callers(limit: int = Query(50, le=100)):
-    """List known callers (for admin/debugging)."""
+async def list_known_callers(
+    limit: int = Query(50, le=100),
+    cursor: Optional[str] = Query(None)
+):
+    """List known callers, most recent first (for admin/debugging)."""
+    page, next_cursor = await asyncio.to_thread(inbound_store.list_callers, limit, cursor)
+    counts = await asyncio.to_thread(inbound_store.counts)
     callers = [
         {
             "phone": mask_phone(h.phone),
@@ -432,25 +494,25 @@ async def list_known_callers(limit: int = Query(50, le=100)):
             "last_call_at": h.last_call_at,
             "first_seen_at": h.first_seen_at,
         }
-        for h in list(caller_history.values())[:limit]
+        for h in page
     ]
     
     return {
         "callers": callers,
-        "total": len(caller_history)
+        "total": counts["callers"],
+        "next_cursor": next_cursor,
     }
 
 
 @app.get("/missed-calls")
 async def list_missed_calls(
     limit: int = Query(20, le=100),
-    pending_only: bool = Query(False)
+    pending_only: bool = Query(False),
+    cursor: Optional[int] = Query(None)
 ):
-    """List recent missed calls."""
-    calls = missed_calls[-limit:]
-    
-    if pending_only:
-        calls = [c for c in calls if not c.callback_scheduled and c.has_voicemail]
+    """List recent missed calls, newest first."""
+    calls, next_cursor = await asyncio.to_thread(inbound_store.list_missed_calls, limit, pending_only, cursor)
+    counts = await asyncio.to_thread(inbound_store.counts)
     
     return {
         "missed_calls": [
@@ -461,21 +523,20 @@ async def list_missed_calls(
                 "has_voicemail": c.has_voicemail,
                 "callback_scheduled": c.callback_scheduled,
             }
-            for c in reversed(calls)
+            for c in calls
         ],
         "total": len(calls),
-        "pending_callbacks": len([c for c in missed_calls if not c.callback_scheduled and c.has_voicemail])
+        "pending_callbacks": counts["pending_callbacks"],
+        "next_cursor": next_cursor,
     }
 
 
 @app.post("/missed-calls/callback")
 async def schedule_callback(timestamp: str):
     """Mark a missed call as scheduled for callback."""
-    for call in missed_calls:
-        if call.timestamp == timestamp:
-            call.callback_scheduled = True
-            call.callback_scheduled_at = datetime.now(timezone.utc).isoformat() + "Z"
-            return {"status": "scheduled", "timestamp": timestamp}
+    scheduled_at = datetime.now(timezone.utc).isoformat() + "Z"
+    if await asyncio.to_thread(inbound_store.schedule_callback, timestamp, scheduled_at):
+        return {"status": "scheduled", "timestamp": timestamp}
     
     raise HTTPException(status_code=404, detail="Missed call not found")
 
@@ -485,17 +546,17 @@ async def update_caller_notes(phone: str, notes: str):
     """Update notes for a caller."""
     normalized = normalize_phone(phone)
     
-    if normalized not in caller_history:
+    if not await asyncio.to_thread(inbound_store.update_notes, normalized, notes):
         raise HTTPException(status_code=404, detail="Caller not found")
     
-    caller_history[normalized].notes = notes
     return {"status": "updated"}
 
 
 @app.get("/config")
 async def get_config():
     """Get current inbound configuration (without secrets)."""
-    config = load_config()
+    policy = get_policy()
+    config = policy.config
     
     # Mask allowlist entries for privacy
     masked_allowlist = [
@@ -508,21 +569,31 @@ async def get_config():
         "allowlist_count": len(config.get("allowFrom", [])),
         "allowlist_preview": masked_allowlist[:5],
         "voicemail_enabled": config.get("voicemailEnabled", True),
+        "version": policy.version,
+        "loaded_at": policy.loaded_at,
     }
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    counts = await asyncio.to_thread(inbound_store.counts)
     return {
         "status": "healthy",
         "timestamp": datetime.now(timezone.utc).isoformat() + "Z",
-        "known_callers": len(caller_history),
-        "missed_calls": len(missed_calls),
-        "pending_callbacks": len([c for c in missed_calls if not c.callback_scheduled and c.has_voicemail])
+        "known_callers": counts["callers"],
+        "missed_calls": counts["missed_calls"],
+        "pending_callbacks": counts["pending_callbacks"],
+        "policy": get_policy().get_stats(),
     }
 
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Write any batched call records before exiting."""
+    await asyncio.to_thread(inbound_store.close)
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API info."""
@@ -549,7 +620,7 @@ if __name__ == "__main__":
     logger.info(f"   Policy: {VOICE_POLICY}")
     logger.info(f"   Config file: {CONFIG_PATH}")
     
-    config = load_config()
+    config = get_policy().config
     allowlist_count = len(config.get("allowFrom", []))
     logger.info(f"   Allowlist entries: {allowlist_count}")
     
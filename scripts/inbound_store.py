@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Inbound Store - Persistent caller history and missed calls for inbound_handler.
+
+Caller history used to be an in-memory dict and missed calls a list capped
+at 100 (pop(0) on overflow, linear scans for callbacks and filters). Both
+now live in SQLite (INBOUND_DB) and survive restarts:
+
+- Indexed: callers by phone and recency, missed calls by number,
+  timestamp and pending-callback state (a partial index)
+- Keyset pagination: list_callers() / list_missed_calls() take the cursor
+  returned with the previous page, so deep pages cost the same as the first
+- O(1) counters: caller, missed-call and pending-callback counts are kept
+  in a counters table by triggers instead of COUNT(*) per request
+- Write batching: record_call() only updates an in-process batch; calls from
+  the same number are coalesced and the batch is upserted with one
+  executemany per INBOUND_FLUSH_INTERVAL. Point reads (get_caller,
+  counts) merge the batch into the committed rows instead of flushing, so
+  a read never forces a write; listings and writes flush first.
+
+Every method blocks on SQLite: async callers run them with asyncio.to_thread.
+
+Usage:
+    store = InboundStore()
+    store.record_call("+14402915517", name="Jane", at=now)
+    history = store.get_caller("+14402915517")
+    page, cursor = store.list_callers(limit=50)
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+INBOUND_DB = os.getenv("INBOUND_DB", "inbound_calls.db")
+INBOUND_FLUSH_INTERVAL = float(os.getenv("INBOUND_FLUSH_INTERVAL", "0.05"))  # seconds
+INBOUND_FLUSH_BATCH = int(os.getenv("INBOUND_FLUSH_BATCH", "200"))  # flush early at this many numbers
+INBOUND_MAX_MISSED_CALLS = int(os.getenv("INBOUND_MAX_MISSED_CALLS", "1000"))
+
+_PENDING = "has_voicemail = 1 AND callback_scheduled = 0"
+
+_SCHEMA = f'''
+    CREATE TABLE IF NOT EXISTS callers (
+        phone TEXT PRIMARY KEY,
+        name TEXT,
+        call_count INTEGER NOT NULL DEFAULT 0,
+        last_call_at TEXT NOT NULL DEFAULT '',
+        first_seen_at TEXT,
+        notes TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_callers_recent ON callers(last_call_at, phone);
+
+    CREATE TABLE IF NOT EXISTS missed_calls (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        from_number TEXT NOT NULL,
+        reason TEXT NOT NULL,
+        has_voicemail INTEGER NOT NULL DEFAULT 0,
+        voicemail_transcript TEXT,
+        callback_scheduled INTEGER NOT NULL DEFAULT 0,
+        callback_scheduled_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_missed_calls_from ON missed_calls(from_number, id);
+    CREATE INDEX IF NOT EXISTS idx_missed_calls_timestamp ON missed_calls(timestamp);
+    CREATE INDEX IF NOT EXISTS idx_missed_calls_pending ON missed_calls(id) WHERE {_PENDING};
+
+    CREATE TABLE IF NOT EXISTS inbound_counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO inbound_counters SELECT 'callers', COUNT(*) FROM callers;
+    INSERT OR IGNORE INTO inbound_counters SELECT 'missed_calls', COUNT(*) FROM missed_calls;
+    INSERT OR IGNORE INTO inbound_counters
+        SELECT 'pending_callbacks', COUNT(*) FROM missed_calls WHERE {_PENDING};
+
+    CREATE TRIGGER IF NOT EXISTS callers_count_insert AFTER INSERT ON callers BEGIN
+        UPDATE inbound_counters SET value = value + 1 WHERE name = 'callers';
+    END;
+    CREATE TRIGGER IF NOT EXISTS callers_count_delete AFTER DELETE ON callers BEGIN
+        UPDATE inbound_counters SET value = value - 1 WHERE name = 'callers';
+    END;
+    CREATE TRIGGER IF NOT EXISTS missed_calls_count_insert AFTER INSERT ON missed_calls BEGIN
+        UPDATE inbound_counters SET value = value + 1 WHERE name = 'missed_calls';
+        UPDATE inbound_counters
+            SET value = value + (NEW.has_voicemail = 1 AND NEW.callback_scheduled = 0)
+            WHERE name = 'pending_callbacks';
+    END;
+    CREATE TRIGGER IF NOT EXISTS missed_calls_count_delete AFTER DELETE ON missed_calls BEGIN
+        UPDATE inbound_counters SET value = value - 1 WHERE name = 'missed_calls';
+        UPDATE inbound_counters
+            SET value = value - (OLD.has_voicemail = 1 AND OLD.callback_scheduled = 0)
+            WHERE name = 'pending_callbacks';
+    END;
+    CREATE TRIGGER IF NOT EXISTS missed_calls_count_update
+    AFTER UPDATE OF has_voicemail, callback_scheduled ON missed_calls BEGIN
+        UPDATE inbound_counters
+            SET value = value
+                + (NEW.has_voicemail = 1 AND NEW.callback_scheduled = 0)
+                - (OLD.has_voicemail = 1 AND OLD.callback_scheduled = 0)
+            WHERE name = 'pending_callbacks';
+    END;
+'''
+
+
+# Data models
+@dataclass
+class CallerHistory:
+    """Tracks history for a known caller."""
+    phone: str
+    name: Optional[str] = None
+    call_count: int = 0
+    last_call_at: Optional[str] = None
+    notes: Optional[str] = None
+    first_seen_at: Optional[str] = None
+
+
+@dataclass
+class MissedCall:
+    """Record of a missed call."""
+    timestamp: str
+    from_number: str
+    reason: str  # unauthorized, busy, no_answer, after_hours
+    has_voicemail: bool = False
+    voicemail_transcript: Optional[str] = None
+    callback_scheduled: bool = False
+    callback_scheduled_at: Optional[str] = None
+    id: Optional[int] = None
+
+
+def _caller_from_row(row: sqlite3.Row) -> CallerHistory:
+    return CallerHistory(
+        phone=row["phone"],
+        name=row["name"],
+        call_count=row["call_count"],
+        last_call_at=row["last_call_at"] or None,
+        notes=row["notes"],
+        first_seen_at=row["first_seen_at"],
+    )
+
+
+def _missed_call_from_row(row: sqlite3.Row) -> MissedCall:
+    return MissedCall(
+        timestamp=row["timestamp"],
+        from_number=row["from_number"],
+        reason=row["reason"],
+        has_voicemail=bool(row["has_voicemail"]),
+        voicemail_transcript=row["voicemail_transcript"],
+        callback_scheduled=bool(row["callback_scheduled"]),
+        callback_scheduled_at=row["callback_scheduled_at"],
+        id=row["id"],
+    )
+
+
+class InboundStore:
+    """SQLite-backed caller history and missed calls with batched call recording."""
+
+    def __init__(
+        self,
+        db_path: Any = INBOUND_DB,
+        flush_interval: float = INBOUND_FLUSH_INTERVAL,
+        flush_batch: int = INBOUND_FLUSH_BATCH,
+        max_missed_calls: int = INBOUND_MAX_MISSED_CALLS,
+    ):
+        self.db_path = str(db_path)
+        self.flush_interval = flush_interval
+        self.flush_batch = max(flush_batch, 1)
+        self.max_missed_calls = max(max_missed_calls, 1)
+        self.callers = CallerHistoryMap(self)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.RLock()        # Connection and flushes
+        self._pending_lock = threading.Lock()   # The in-process batch only
+        # phone -> [calls, last_call_at, name, first_call_at]
+        self._pending: Dict[str, List[Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "calls_recorded": 0,
+            "flushes": 0,
+            "rows_flushed": 0,
+        }
+
+    # ── Storage ─────────────────────────────────────────────────────────────
+
+    def _connection(self) -> sqlite3.Connection:
+        """The shared connection, opened (and the schema created) on first use."""
+        if self._conn is None:
+            if self.db_path != ":memory:":
+                Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if self.db_path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def open(self, db_path: Any) -> None:
+        """Point the store at another database (flushing and closing the current one)."""
+        self.close()
+        with self._db_lock:
+            self.db_path = str(db_path)
+
+    def close(self) -> None:
+        """Flush batched calls and close the connection."""
+        with self._db_lock:
+            if self._conn is not None:
+                self._flush_locked()
+                self._conn.close()
+                self._conn = None
+
+    # ── Batched call recording ──────────────────────────────────────────────
+
+    def record_call(self, phone: str, name: Optional[str], at: str) -> None:
+        """
+        Count a call from phone (already normalized) at timestamp at.
+
+        Cheap and non-blocking: the call is added to the in-process batch,
+        which is written within flush_interval (or at once outside an event
+        loop, or when the batch reaches flush_batch numbers).
+        """
+        with self._pending_lock:
+            entry = self._pending.get(phone)
+            if entry is None:
+                self._pending[phone] = [1, at, name, at]
+            else:
+                entry[0] += 1
+                entry[1] = at
+                entry[2] = entry[2] or name
+            batch_size = len(self._pending)
+        self.stats["calls_recorded"] += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+            return
+        if batch_size >= self.flush_batch:
+            loop.create_task(asyncio.to_thread(self.flush))
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        # Loop: calls recorded while a flush is in flight see this task still
+        # running and rely on it to pick them up
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def flush(self) -> int:
+        """Write the batched calls; return how many numbers were upserted."""
+        with self._db_lock:
+            return self._flush_locked()
+
+    def _flush_locked(self) -> int:
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        rows = [
+            (phone, name, calls, last_at, first_at)
+            for phone, (calls, last_at, name, first_at) in pending.items()
+        ]
+        conn = self._connection()
+        try:
+            conn.executemany('''
+                INSERT INTO callers (phone, name, call_count, last_call_at, first_seen_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(phone) DO UPDATE SET
+                    call_count = call_count + excluded.call_count,
+                    last_call_at = excluded.last_call_at,
+                    name = COALESCE(callers.name, excluded.name)
+            ''', rows)
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"Failed to record {len(rows)} inbound calls: {e}")
+            return 0
+        self.stats["flushes"] += 1
+        self.stats["rows_flushed"] += len(rows)
+        return len(rows)
+
+    def _read(self) -> sqlite3.Connection:
+        """Connection for a listing or write, with batched calls written first. Call under _db_lock."""
+        if self._pending:
+            self._flush_locked()
+        return self._connection()
+
+    # ── Callers ─────────────────────────────────────────────────────────────
+
+    def get_caller(self, phone: str) -> Optional[CallerHistory]:
+        """The committed caller row with any batched calls from phone merged in."""
+        # Under _db_lock a flush is never half done: the batch is either still pending or committed
+        with self._db_lock:
+            row = self._connection().execute(
+                'SELECT * FROM callers WHERE phone = ?', (phone,)
+            ).fetchone()
+            with self._pending_lock:
+                entry = list(self._pending.get(phone) or ())
+        history = _caller_from_row(row) if row else None
+        if not entry:
+            return history
+        calls, last_at, name, first_at = entry
+        if history is None:
+            return CallerHistory(phone=phone, name=name, call_count=calls,
+                                 last_call_at=last_at, first_seen_at=first_at)
+        history.call_count += calls
+        history.last_call_at = last_at
+        history.name = history.name or name
+        return history
+
+    def put_caller(self, history: CallerHistory) -> None:
+        """Insert or replace a caller record."""
+        with self._db_lock:
+            conn = self._read()
+            conn.execute('''
+                INSERT INTO callers (phone, name, call_count, last_call_at, first_seen_at, notes)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(phone) DO UPDATE SET
+                    name = excluded.name,
+                    call_count = excluded.call_count,
+                    last_call_at = excluded.last_call_at,
+                    first_seen_at = excluded.first_seen_at,
+                    notes = excluded.notes
+            ''', (history.phone, history.name, history.call_count,
+                  history.last_call_at or '', history.first_seen_at, history.notes))
+            conn.commit()
+
+    def update_notes(self, phone: str, notes: str) -> bool:
+        """Set notes for a known caller; False if the caller is unknown."""
+        with self._db_lock:
+            conn = self._read()
+            updated = conn.execute(
+                'UPDATE callers SET notes = ? WHERE phone = ?', (notes, phone)
+            ).rowcount
+            conn.commit()
+        return updated > 0
+
+    def delete_caller(self, phone: str) -> bool:
+        with self._db_lock:
+            conn = self._read()
+            deleted = conn.execute('DELETE FROM callers WHERE phone = ?', (phone,)).rowcount
+            conn.commit()
+        return deleted > 0
+
+    def clear_callers(self) -> None:
+        with self._pending_lock:
+            self._pending.clear()
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute('DELETE FROM callers')
+            conn.commit()
+
+    def caller_phones(self) -> List[str]:
+        with self._db_lock:
+            rows = self._read().execute('SELECT phone FROM callers ORDER BY phone').fetchall()
+        return [row["phone"] for row in rows]
+
+    def list_callers(
+        self, limit: int = 50, cursor: Optional[str] = None
+    ) -> Tuple[List[CallerHistory], Optional[str]]:
+        """
+        Callers, most recent call first.
+
+        Returns (page, next_cursor); pass next_cursor back to get the next
+        page. next_cursor is None on the last page.
+        """
+        limit = max(limit, 1)
+        params: List[Any] = []
+        where = ''
+        if cursor:
+            last_call_at, _, phone = cursor.rpartition('|')
+            where = 'WHERE (last_call_at, phone) < (?, ?)'
+            params = [last_call_at, phone]
+        with self._db_lock:
+            rows = self._read().execute(
+                f'SELECT * FROM callers {where} '
+                f'ORDER BY last_call_at DESC, phone DESC LIMIT ?',
+                (*params, limit + 1),
+            ).fetchall()
+        page = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = page[-1]
+            next_cursor = f"{last['last_call_at']}|{last['phone']}"
+        return [_caller_from_row(row) for row in page], next_cursor
+
+    # ── Missed calls ────────────────────────────────────────────────────────
+
+    def add_missed_call(self, missed_call: MissedCall) -> MissedCall:
+        """Store a missed call, dropping the oldest beyond max_missed_calls."""
+        with self._db_lock:
+            conn = self._connection()
+            cursor = conn.execute('''
+                INSERT INTO missed_calls (timestamp, from_number, reason, has_voicemail,
+                    voicemail_transcript, callback_scheduled, callback_scheduled_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (missed_call.timestamp, missed_call.from_number, missed_call.reason,
+                  int(missed_call.has_voicemail), missed_call.voicemail_transcript,
+                  int(missed_call.callback_scheduled), missed_call.callback_scheduled_at))
+            missed_call.id = cursor.lastrowid
+            conn.execute(
+                'DELETE FROM missed_calls WHERE id <= ?',
+                (missed_call.id - self.max_missed_calls,),
+            )
+            conn.commit()
+        return missed_call
+
+    def list_missed_calls(
+        self, limit: int = 20, pending_only: bool = False, cursor: Optional[int] = None
+    ) -> Tuple[List[MissedCall], Optional[int]]:
+        """
+        Missed calls, newest first; pending_only keeps voicemails awaiting a callback.
+
+        Returns (page, next_cursor) as list_callers() does.
+        """
+        limit = max(limit, 1)
+        clauses = []
+        params: List[Any] = []
+        if pending_only:
+            clauses.append(_PENDING)
+        if cursor is not None:
+            clauses.append('id < ?')
+            params.append(cursor)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._db_lock:
+            rows = self._connection().execute(
+                f'SELECT * FROM missed_calls {where} ORDER BY id DESC LIMIT ?',
+                (*params, limit + 1),
+            ).fetchall()
+        page = rows[:limit]
+        next_cursor = page[-1]["id"] if len(rows) > limit else None
+        return [_missed_call_from_row(row) for row in page], next_cursor
+
+    def schedule_callback(self, timestamp: str, scheduled_at: str) -> bool:
+        """Mark the missed call recorded at timestamp for callback; False if not found."""
+        with self._db_lock:
+            conn = self._connection()
+            updated = conn.execute('''
+                UPDATE missed_calls SET callback_scheduled = 1, callback_scheduled_at = ?
+                WHERE id = (SELECT id FROM missed_calls WHERE timestamp = ? ORDER BY id LIMIT 1)
+            ''', (scheduled_at, timestamp)).rowcount
+            conn.commit()
+        return updated > 0
+
+    # ── Stats ───────────────────────────────────────────────────────────────
+
+    def counts(self) -> Dict[str, int]:
+        """Known callers, stored missed calls and pending callbacks (O(1) plus the batch)."""
+        with self._db_lock:
+            conn = self._connection()
+            counts = {row["name"]: row["value"] for row in conn.execute(
+                'SELECT name, value FROM inbound_counters'
+            )}
+            with self._pending_lock:
+                batched = list(self._pending)
+            if batched:
+                # Numbers first seen in the batch are callers the counter hasn't seen yet
+                known = conn.execute(
+                    f'SELECT COUNT(*) FROM callers WHERE phone IN ({",".join("?" * len(batched))})',
+                    batched,
+                ).fetchone()[0]
+                counts["callers"] += len(batched) - known
+        return counts
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.counts(),
+            **self.stats,
+            "pending_writes": len(self._pending),
+        }
+
+
+class CallerHistoryMap(MutableMapping):
+    """
+    Dict-style view of the stored callers, keyed by normalized phone.
+
+    Values are copies: assign a changed CallerHistory back (or use the
+    store's update methods) to persist it.
+    """
+
+    def __init__(self, store: InboundStore):
+        self._store = store
+
+    def __getitem__(self, phone: str) -> CallerHistory:
+        history = self._store.get_caller(phone)
+        if history is None:
+            raise KeyError(phone)
+        return history
+
+    def __setitem__(self, phone: str, history: CallerHistory) -> None:
+        if history.phone != phone:
+            history = CallerHistory(**{**history.__dict__, "phone": phone})
+        self._store.put_caller(history)
+
+    def __delitem__(self, phone: str) -> None:
+        if not self._store.delete_caller(phone):
+            raise KeyError(phone)
+
+    def __contains__(self, phone: object) -> bool:
+        return isinstance(phone, str) and self._store.get_caller(phone) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.caller_phones())
+
+    def __len__(self) -> int:
+        return self._store.counts()["callers"]
+
+    def clear(self) -> None:
+        self._store.clear_callers()
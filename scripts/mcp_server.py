@@ -20,11 +20,14 @@ Then add to ~/.claude/mcp.json:
 
 import json
 import os
+from dataclasses import asdict
 from pathlib import Path
 
 import httpx
 from mcp.server.fastmcp import FastMCP
 
+from transcript_archive import get_archive
+
 mcp = FastMCP("openai-voice-skill")
 
 WEBHOOK_BASE = os.environ.get("VOICE_WEBHOOK_BASE", "http://localhost:8080")
@@ -102,7 +105,8 @@ async def join_google_meet(meet_url: str) -> dict:
 async def get_call_history(limit: int = 5) -> list:
     """List recent calls with summaries and transcript excerpts.
 
-    Reads from call_log.json (if present) or recent memory files.
+    Reads from call_log.json (if present), then the voice server's transcript
+    archive manifest, then recent memory files.
 
     Args:
         limit: Maximum number of calls to return (default 5)
@@ -123,6 +127,11 @@ async def get_call_history(limit: int = 5) -> list:
         except (json.JSONDecodeError, OSError):
             pass
 
+    # Then the transcript archive's recent-calls manifest (no directory scan)
+    transcripts_dir = MEMORY_DIR / "call-transcripts"
+    if not calls and transcripts_dir.exists():
+        calls = [asdict(entry) for entry in get_archive(transcripts_dir).recent(limit)]
+
     # Fall back to memory files if no log found
     if not calls and MEMORY_DIR.exists():
         memory_files = sorted(
@@ -211,11 +211,7 @@ class MetricsRequestHandler(BaseHTTPRequestHandler):
                         "GET /metrics/latency/events?call_id=&event_type=&limit=100": "List latency events",
                         "POST /metrics/latency": "Record latency event (body: {call_id, event_type, duration_ms, metadata?})",
                     },
-                    "latency_event_types": [
-                        "speech_end_to_first_audio",
-                        "tool_call_duration",
-                        "session_duration"
-                    ]
+                    "latency_event_types": [e.value for e in LatencyEventType]
                 }
                 self.send_json_response(endpoints)
                 return
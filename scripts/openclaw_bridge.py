@@ -23,6 +23,7 @@ from typing import Dict, List, Optional, Any, Tuple
 
 import httpx
 
+from phone_routing import PhoneMapping, lookup_phone, normalize_phone, watch_phone_mapping
 from session_context import SessionContextExtractor
 
 logger = logging.getLogger(__name__)
@@ -46,18 +47,18 @@ class OpenClawBridge:
         """
         Load phone number to user mapping from configuration.
         
-        Returns mapping: {phone_number: {name, session_id, relationship}}
+        Returns mapping: {phone_number: {name, session_id, relationship}},
+        compiled for O(digits) lookups including wildcard ("+2507*") entries
         """
         mapping = {}
         
         try:
-            # Try to load from workspace config
+            # Try to load from workspace config (shared compiled copy)
             if self.context_extractor.workspace_path:
                 config_file = self.context_extractor.workspace_path / "phone_mapping.json"
                 if config_file.exists():
-                    with open(config_file, 'r') as f:
-                        mapping = json.load(f)
-                        logger.info(f"Loaded phone mapping for {len(mapping)} numbers")
+                    mapping = dict(watch_phone_mapping(config_file).current())
+                    logger.info(f"Loaded phone mapping for {len(mapping)} numbers")
             
             # Also check environment variable for additional mappings
             env_mapping = os.getenv("PHONE_USER_MAPPING")
@@ -84,7 +85,7 @@ class OpenClawBridge:
             }
             logger.info("Using default phone mapping")
         
-        return mapping
+        return PhoneMapping(mapping)
     
     async def identify_caller(self, phone_number: str) -> Optional[Dict[str, str]]:
         """
@@ -100,9 +101,10 @@ class OpenClawBridge:
             # Normalize phone number (remove spaces, dashes, etc.)
             normalized_phone = self._normalize_phone_number(phone_number)
             
-            # Check direct mapping first
-            if normalized_phone in self.user_phone_mapping:
-                caller_info = self.user_phone_mapping[normalized_phone].copy()
+            # Check direct mapping first (exact number, then wildcard entries)
+            mapped = lookup_phone(self.user_phone_mapping, normalized_phone)
+            if mapped is not None:
+                caller_info = mapped.copy()
                 caller_info["phone"] = normalized_phone
                 caller_info["known_caller"] = True
                 logger.info(f"Identified caller: {caller_info.get('name', 'Unknown')} ({normalized_phone})")
@@ -142,7 +144,12 @@ class OpenClawBridge:
             session_id = caller_info.get("session_id", "guest")
             cache_key = f"{session_id}_{caller_info.get('phone', '')}"
             
-            # Check cache first
+            # Precomputed snapshot first: rebuilt after calls and memory changes, never stale by a TTL
+            snapshot = self.context_extractor.get_cached_context(caller_info.get("phone", ""))
+            if snapshot is not None:
+                return self._enhance_context_for_caller(self._context_from_snapshot(snapshot), caller_info)
+            
+            # Check cache
             if cache_key in self.session_cache:
                 cached_data = self.session_cache[cache_key]
                 if time.time() - cached_data["cached_at"] < self.cache_ttl:
@@ -359,14 +366,7 @@ class OpenClawBridge:
     
     def _normalize_phone_number(self, phone: str) -> str:
         """Normalize phone number to standard E.164 format."""
-        # Remove all non-digit characters except leading +
-        clean_phone = "".join(c for c in phone if c.isdigit() or c == "+")
-        
-        # Ensure it starts with +
-        if not clean_phone.startswith("+"):
-            clean_phone = "+" + clean_phone
-        
-        return clean_phone
+        return normalize_phone(phone)
     
     async def _lookup_caller_via_api(self, phone_number: str) -> Optional[Dict[str, str]]:
         """Lookup caller information via OpenClaw API (if available)."""
@@ -396,6 +396,20 @@ class OpenClawBridge:
         
         return None
     
+    def _context_from_snapshot(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Bridge context format from a SessionContextExtractor caller snapshot."""
+        return {
+            "conversation_history": [
+                {"timestamp": conv.get("time", ""), "speaker": conv.get("speaker", ""),
+                 "content": conv.get("message", "")}
+                for conv in snapshot.get("recent_conversations", [])
+            ],
+            "user_info": {},
+            "ongoing_projects": [],
+            "recent_decisions": [],
+            "context_summary": snapshot.get("context_summary", ""),
+        }
+    
     def _enhance_context_for_caller(self, base_context: Dict[str, Any], 
                                    caller_info: Dict[str, str]) -> Dict[str, Any]:
         """Enhance base context with caller-specific information."""
@@ -17,7 +17,8 @@ import re
 import subprocess
 from typing import AsyncGenerator, Optional, Dict, Any
 
-from smart_chunker import SmartChunker
+from smart_chunker import AdaptiveChunker
+from voice_normalizer import VoiceNormalizer
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,8 @@ logger = logging.getLogger(__name__)
 # Reduced from 30s to 5s for voice responsiveness (users expect fast replies)
 OPENCLAW_TIMEOUT = int(os.getenv("OPENCLAW_VOICE_TIMEOUT", os.getenv("OPENCLAW_TIMEOUT", "5")))
 OPENCLAW_MODEL = os.getenv("OPENCLAW_MODEL", "")  # Empty = use default
+# Streaming: release whatever is buffered if no chunk is out after this many seconds
+OPENCLAW_FIRST_CHUNK_DEADLINE = float(os.getenv("OPENCLAW_FIRST_CHUNK_DEADLINE", "1.5"))
 
 # Global call_id for error tracking (set per-request)
 _current_call_id: Optional[str] = None
@@ -235,13 +238,17 @@ class OpenClawExecutor:
         self,
         request: str,
         chunk_size: int = 500,
-        user_context: Optional[Dict[str, Any]] = None
+        user_context: Optional[Dict[str, Any]] = None,
+        first_chunk_deadline: float = OPENCLAW_FIRST_CHUNK_DEADLINE
     ) -> AsyncGenerator[str, None]:
         """
         Execute a request through OpenClaw, yielding chunks as they're generated.
         
         Runs `openclaw agent` as a subprocess and streams stdout line-by-line,
-        using SmartChunker to buffer and yield chunks at natural boundaries.
+        using AdaptiveChunker to buffer and yield chunks at natural boundaries:
+        the first chunk is about a clause long and later chunks grow toward
+        chunk_size. If no chunk is out by first_chunk_deadline, whatever is
+        buffered is yielded as the first chunk.
         
         User context (timezone, location) is injected into the request
         so that tools return results appropriate for the caller.
@@ -251,6 +258,8 @@ class OpenClawExecutor:
             chunk_size: Target chunk size in characters (~500 for TTS)
             user_context: Optional dict with timezone, location, name for the caller.
                          If None, uses the global context set via set_user_context().
+            first_chunk_deadline: Seconds after which buffered text is sent as the
+                         first chunk even without a natural boundary
             
         Yields:
             Text chunks as they become available
@@ -280,9 +289,11 @@ class OpenClawExecutor:
                    f"context={bool(context)}): {request[:100]}...")
         
         process = None
-        chunker = SmartChunker(target_size=chunk_size, min_size=100, max_size=1000)
+        chunker = AdaptiveChunker(target_size=chunk_size, min_size=100, max_size=1000)
+        normalizer = VoiceNormalizer()
         chunks_yielded = 0
         start_time = asyncio.get_event_loop().time()
+        first_chunk_at = start_time + first_chunk_deadline
         
         try:
             # Build command with enhanced request (includes user context)
@@ -303,25 +314,29 @@ class OpenClawExecutor:
             
             # Read stdout line-by-line as it's generated
             async def read_with_timeout():
-                """Read lines with overall timeout."""
+                """Read lines with overall timeout; yields "" when the first-chunk deadline passes."""
                 stream_start = asyncio.get_event_loop().time()
                 
                 while True:
                     # Check timeout
-                    elapsed = asyncio.get_event_loop().time() - stream_start
+                    now = asyncio.get_event_loop().time()
+                    elapsed = now - stream_start
                     if elapsed > self.timeout:
                         raise asyncio.TimeoutError()
                     
-                    # Read next line with short timeout
+                    # Read next line with short timeout (shorter while the first chunk is due)
+                    wait = min(5.0, self.timeout - elapsed)
+                    first_due = chunks_yielded == 0 and chunker.has_content
+                    if first_due:
+                        wait = min(wait, max(first_chunk_at - now, 0.0))
                     try:
-                        line = await asyncio.wait_for(
-                            process.stdout.readline(),
-                            timeout=min(5.0, self.timeout - elapsed)
-                        )
+                        line = await asyncio.wait_for(process.stdout.readline(), timeout=wait)
                     except asyncio.TimeoutError:
                         # No data available - check if process ended
                         if process.returncode is not None:
                             break
+                        if first_due:
+                            yield ""
                         continue
                     
                     if not line:
@@ -332,22 +347,42 @@ class OpenClawExecutor:
             # Process lines and yield chunks
             async for line in read_with_timeout():
                 # Format and add to chunker
-                formatted = self._format_for_voice(line)
+                formatted = normalizer.feed(line) if line else ""
                 if formatted and formatted.strip():
                     chunker.add_text(formatted + " ")
-                    
-                    # Yield any ready chunks
-                    for chunk in chunker.get_chunks():
-                        chunk = chunk.strip()
-                        if chunk:
-                            chunks_yielded += 1
-                            logger.debug(f"[call_id={call_id}] Yielding chunk {chunks_yielded}: {len(chunk)} chars")
-                            yield chunk
+                
+                ready = chunker.get_chunks()
+                if (not ready and chunks_yielded == 0 and chunker.has_content
+                        and asyncio.get_event_loop().time() >= first_chunk_at):
+                    # Nothing has reached the caller yet: send what we have
+                    ready = [chunker.force_chunk()]
+                    logger.info(f"[call_id={call_id}] First chunk deadline ({first_chunk_deadline}s) hit, "
+                               f"flushing {len(ready[0])} chars")
+                
+                # Yield any ready chunks
+                for chunk in ready:
+                    chunk = chunk.strip()
+                    if chunk:
+                        chunks_yielded += 1
+                        if chunks_yielded == 1:
+                            first_ms = (asyncio.get_event_loop().time() - start_time) * 1000
+                            logger.info(f"[call_id={call_id}] First chunk after {first_ms:.0f}ms ({len(chunk)} chars)")
+                        logger.debug(f"[call_id={call_id}] Yielding chunk {chunks_yielded}: {len(chunk)} chars")
+                        yield chunk
+                
+                if normalizer.truncated:
+                    # Voice budget spent: the rest of the output would be dropped anyway
+                    logger.info(f"[call_id={call_id}] Output reached {normalizer.max_chars} chars, stopping agent")
+                    process.terminate()
+                    break
             
             # Wait for process to finish
             await process.wait()
             
             # Flush remaining buffer
+            tail = normalizer.finish()
+            if tail:
+                chunker.add_text(tail)
             final = chunker.flush()
             if final and final.strip():
                 final = final.strip()
@@ -360,8 +395,8 @@ class OpenClawExecutor:
                 logger.warning(f"[call_id={call_id}] No output returned from request")
                 yield "Done."
             
-            # Check for errors
-            if process.returncode != 0:
+            # Check for errors (a process we stopped at the voice budget is fine)
+            if process.returncode != 0 and not normalizer.truncated:
                 stderr_data = await process.stderr.read()
                 error_msg = stderr_data.decode().strip() if stderr_data else "Unknown error"
                 logger.error(f"[call_id={call_id}] Process failed (exit={process.returncode}): {error_msg[:200]}")
@@ -408,39 +443,13 @@ class OpenClawExecutor:
         - Remove markdown formatting
         - Truncate overly long responses
         - Clean up code blocks
+        
+        Streaming output uses a VoiceNormalizer directly so that fences and
+        emphasis spanning lines are handled.
         """
         if not text:
             return "Done."
-        
-        # Remove markdown code blocks
-        import re
-        text = re.sub(r'```[\s\S]*?```', '[code snippet omitted]', text)
-        text = re.sub(r'`([^`]+)`', r'\1', text)  # Inline code
-        
-        # Remove markdown headers
-        text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
-        
-        # Remove markdown bold/italic
-        text = re.sub(r'\*\*([^*]+)\*\*', r'\1', text)
-        text = re.sub(r'\*([^*]+)\*', r'\1', text)
-        text = re.sub(r'__([^_]+)__', r'\1', text)
-        text = re.sub(r'_([^_]+)_', r'\1', text)
-        
-        # Remove markdown links, keep text
-        text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
-        
-        # Remove bullet points
-        text = re.sub(r'^[-*+]\s+', '', text, flags=re.MULTILINE)
-        
-        # Collapse multiple newlines
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        
-        # Truncate if too long (voice should be concise)
-        max_chars = 2000  # ~30 seconds of speech
-        if len(text) > max_chars:
-            text = text[:max_chars].rsplit(' ', 1)[0] + "... I can provide more details if you'd like."
-        
-        return text.strip()
+        return VoiceNormalizer().normalize(text)
 
 
 # Singleton instance for the webhook server
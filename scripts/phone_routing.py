@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Phone Routing - Compiled longest-prefix lookups for phone numbers.
+
+Country codes, allowlist wildcards and per-number mappings are all prefix
+questions over the same digits. They used to be answered with per-call
+loops (prefix lengths 3/2/1, linear allowlist scans, re-reading
+phone_mapping.json). This module compiles them once into tries so a lookup
+costs O(digits) regardless of how many entries there are.
+
+- PhoneTrie: character trie with exact and prefix ("+1440*") terminals
+- PhoneMapping: phone_mapping.json as a dict of exact numbers plus a
+  trie for wildcard entries
+- Allowlist: inbound allowFrom entries; the first entry (in list order)
+  that matches wins, as with the old linear scan
+- WatchedPhoneFile: a JSON file compiled once and recompiled when it
+  changes on disk; the compiled table is swapped in with one assignment,
+  so readers never see a half-built table
+
+Usage:
+    mapping = watch_phone_mapping(path).current()
+    info = mapping.lookup("+250 794 002 033")
+
+    allowlist = compile_allowlist(config["allowFrom"])
+    matched_entry = allowlist.match(phone)
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Seconds between on-disk change checks of watched files
+PHONE_ROUTING_RELOAD_INTERVAL = float(os.getenv("PHONE_ROUTING_RELOAD_INTERVAL", "5"))
+
+T = TypeVar("T")
+
+# Terminal markers inside trie nodes (never phone characters)
+_EXACT = "="
+_PREFIX = "*"
+
+
+def normalize_phone(phone: str) -> str:
+    """Normalize a phone number to E.164-style "+digits"."""
+    clean = "".join(c for c in phone if c.isdigit() or c == "+")
+    if not clean.startswith("+"):
+        clean = "+" + clean
+    return clean
+
+
+class PhoneTrie(Generic[T]):
+    """Trie over number strings with exact-match and prefix-match terminals."""
+
+    def __init__(self):
+        self._root: Dict[str, Any] = {}
+        self._size = 0
+
+    def add(self, key: str, value: T, prefix: bool = False) -> None:
+        """Add key; prefix=True matches every number starting with key."""
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        marker = _PREFIX if prefix else _EXACT
+        if marker not in node:
+            self._size += 1
+        node[marker] = value
+
+    def matches(self, number: str) -> List[T]:
+        """All values matching number: prefix entries shortest first, then an exact entry."""
+        found = []
+        node = self._root
+        if _PREFIX in node:
+            found.append(node[_PREFIX])
+        for ch in number:
+            node = node.get(ch)
+            if node is None:
+                return found
+            if _PREFIX in node:
+                found.append(node[_PREFIX])
+        if _EXACT in node:
+            found.append(node[_EXACT])
+        return found
+
+    def longest(self, number: str) -> Optional[T]:
+        """Exact entry for number if any, else the longest matching prefix entry."""
+        found = self.matches(number)
+        return found[-1] if found else None
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class PhoneMapping(dict):
+    """
+    Per-number mappings (phone_mapping.json).
+
+    Behaves as a dict keyed by normalized number. Keys ending in "*" are
+    wildcard entries ("+2507*") that lookup() falls back to, longest first.
+    Keys starting with "_" are comments and are skipped.
+    """
+
+    def __init__(self, entries: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self._wildcards: PhoneTrie[Dict[str, Any]] = PhoneTrie()
+        for key, value in (entries or {}).items():
+            if key.startswith("_"):
+                continue
+            if key.endswith("*"):
+                self._wildcards.add(normalize_phone(key.rstrip("*")), value, prefix=True)
+                self[key] = value
+            else:
+                self[normalize_phone(key)] = value
+
+    def lookup(self, phone: str) -> Optional[Dict[str, Any]]:
+        """Mapping for phone: the exact number first, then the longest wildcard."""
+        phone = normalize_phone(phone)
+        value = self.get(phone)
+        if value is None and len(self._wildcards):
+            value = self._wildcards.longest(phone)
+        return value
+
+
+def lookup_phone(mapping: Dict[str, Any], phone: str) -> Optional[Dict[str, Any]]:
+    """Look phone up in a PhoneMapping, or in a plain dict keyed by normalized number."""
+    if isinstance(mapping, PhoneMapping):
+        return mapping.lookup(phone)
+    return mapping.get(normalize_phone(phone))
+
+
+class Allowlist:
+    """
+    Compiled inbound allowlist.
+
+    Entries: "*" (anyone), "+1440*" (prefix) or an exact number in any
+    format. match() returns the first entry in list order that matches.
+    """
+
+    def __init__(self, entries: Iterable[str]):
+        self.entries = list(entries)
+        self._trie: PhoneTrie[Tuple[int, str]] = PhoneTrie()
+        # Added last-to-first so an earlier duplicate overwrites a later one
+        for rank in range(len(self.entries) - 1, -1, -1):
+            entry = self.entries[rank]
+            if not entry:
+                continue
+            if entry.strip() == "*":
+                self._trie.add("", (rank, "*"), prefix=True)
+                continue
+            key = _normalize_entry(entry.rstrip("*"))
+            self._trie.add(key, (rank, entry), prefix=entry.endswith("*"))
+
+    def match(self, phone: str) -> Optional[str]:
+        """The matching entry that comes first in the list, or None."""
+        found = self._trie.matches(_normalize_entry(phone))
+        return min(found)[1] if found else None
+
+    def __len__(self) -> int:
+        return len(self._trie)
+
+
+def _normalize_entry(phone: str) -> str:
+    # Same rules as inbound_handler.normalize_phone (empty stays empty)
+    return normalize_phone(phone) if phone else ""
+
+
+# Single-slot memo: config loaders hand back the same list until the file changes
+_compiled_allowlist: Tuple[Optional[List[str]], Optional[Allowlist]] = (None, None)
+
+
+def compile_allowlist(entries: List[str]) -> Allowlist:
+    """
+    Compile entries, reusing the last result when given the same list object.
+
+    Allowlists are treated as immutable: a changed config produces a new
+    list, which is compiled and swapped in.
+    """
+    global _compiled_allowlist
+    source, compiled = _compiled_allowlist
+    if source is not entries or compiled is None:
+        compiled = Allowlist(entries)
+        _compiled_allowlist = (entries, compiled)
+    return compiled
+
+
+class WatchedPhoneFile(Generic[T]):
+    """A JSON file compiled by build() and recompiled when it changes on disk."""
+
+    def __init__(self, path: Path, build: Callable[[Dict[str, Any]], T],
+                 reload_interval: float = PHONE_ROUTING_RELOAD_INTERVAL):
+        self.path = Path(path)
+        self.build = build
+        self.reload_interval = reload_interval
+        self.version = 0
+        self._compiled: T = build({})
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def current(self) -> T:
+        """The compiled table, reloaded first if the file changed (checked at most every reload_interval)."""
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            self._reload_if_changed()
+        return self._compiled
+
+    def reload(self) -> T:
+        """The compiled table, checked against the file now (for background readers)."""
+        self._checked_at = time.monotonic()
+        self._reload_if_changed()
+        return self._compiled
+
+    def _reload_if_changed(self) -> None:
+        try:
+            stat = self.path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            if signature == self._signature:
+                return
+            data: Dict[str, Any] = {}
+            if signature is not None:
+                try:
+                    with open(self.path, 'r') as f:
+                        data = json.load(f)
+                    if not isinstance(data, dict):
+                        raise ValueError("top level must be an object")
+                except Exception as e:
+                    logger.error(f"Error loading {self.path}: {e}")
+                    self._signature = signature  # Don't retry until it changes again
+                    return
+            compiled = self.build(data)
+            self._compiled = compiled  # Atomic swap: readers see the old or the new table
+            self._signature = signature
+            self.version += 1
+            if signature is not None:
+                logger.info(f"Compiled {self.path} (version {self.version})")
+
+
+_watched_files: Dict[Path, WatchedPhoneFile] = {}
+_watched_lock = threading.Lock()
+
+
+def watch_phone_mapping(path: Path) -> WatchedPhoneFile[PhoneMapping]:
+    """Shared watcher for a phone_mapping.json (one per path per process)."""
+    path = Path(path)
+    watcher = _watched_files.get(path)
+    if watcher is None:
+        with _watched_lock:
+            watcher = _watched_files.setdefault(path, WatchedPhoneFile(path, PhoneMapping))
+    return watcher
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Post-Call Queue - Durable, SQLite-backed processing of finished calls.
+
+summarize_and_remember() used to be a fire-and-forget task: a restart lost
+in-flight work, a burst of hang-ups ran every summary at once, and failures
+were never retried. Jobs now go through this queue:
+
+- Persistent: jobs live in SQLite (POST_CALL_QUEUE_DB) and jobs that were
+  running when the process died are resumed on start()
+- Idempotent per call_sid: enqueueing the same call twice is a no-op
+- Bounded: POST_CALL_WORKERS workers process jobs concurrently
+- Retries with exponential backoff up to POST_CALL_MAX_ATTEMPTS
+- Checkpoints: a handler records finished steps in job.state (save_state),
+  so a retry resumes after the last step that succeeded
+- Metrics: queue depth by status, retries, and enqueue → done latency
+
+MemoryAppendBatcher coalesces daily-memory appends from concurrent jobs into
+one write per file per flush window.
+
+Usage:
+    queue = PostCallQueue(handler=process_job)
+    await queue.start()
+    await queue.enqueue(call_sid, {"transcript": [...], ...})
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+POST_CALL_QUEUE_DB = Path(os.getenv("POST_CALL_QUEUE_DB", "post_call_queue.db"))
+POST_CALL_WORKERS = int(os.getenv("POST_CALL_WORKERS", "2"))
+POST_CALL_MAX_ATTEMPTS = int(os.getenv("POST_CALL_MAX_ATTEMPTS", "5"))
+POST_CALL_RETRY_BASE_DELAY = 5.0     # seconds; doubles per attempt
+POST_CALL_RETRY_MAX_DELAY = 300.0    # seconds
+POST_CALL_IDLE_POLL = 30.0           # seconds; wakeups normally come from enqueue()
+MEMORY_APPEND_FLUSH_INTERVAL = float(os.getenv("MEMORY_APPEND_FLUSH_INTERVAL", "1.0"))
+
+
+class JobStatus(Enum):
+    """Post-call job states."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass
+class PostCallJob:
+    """A queued post-call job."""
+    call_sid: str
+    payload: Dict[str, Any]
+    status: str
+    attempts: int
+    max_attempts: int
+    created_at: float
+    state: Dict[str, Any] = field(default_factory=dict)
+    last_error: Optional[str] = None
+
+    @property
+    def is_final_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+
+class PostCallQueue:
+    """SQLite-backed job queue with a bounded async worker pool."""
+
+    def __init__(
+        self,
+        handler: Callable[[PostCallJob], Awaitable[None]],
+        db_path: Path = POST_CALL_QUEUE_DB,
+        workers: int = POST_CALL_WORKERS,
+        max_attempts: int = POST_CALL_MAX_ATTEMPTS,
+        base_delay: float = POST_CALL_RETRY_BASE_DELAY,
+        max_delay: float = POST_CALL_RETRY_MAX_DELAY,
+    ):
+        self.handler = handler
+        self.db_path = Path(db_path)
+        self.workers = max(workers, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._db_ready = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {
+            "enqueued": 0,
+            "duplicates": 0,
+            "completed": 0,
+            "failed": 0,
+            "retries": 0,
+            "latency_ms_total": 0.0,
+            "latency_ms_max": 0.0,
+        }
+
+    # ── Storage ─────────────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _ensure_db(self) -> None:
+        """Create the jobs table on first use (not at import)."""
+        if self._db_ready:
+            return
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS post_call_jobs (
+                    call_sid TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_run_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    completed_at REAL,
+                    last_error TEXT,
+                    state TEXT
+                )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_post_call_jobs_due '
+                'ON post_call_jobs(status, next_run_at)'
+            )
+            conn.commit()
+        self._db_ready = True
+
+    def enqueue_sync(self, call_sid: str, payload: Dict[str, Any]) -> bool:
+        """Persist a job. Returns False if call_sid was already queued (idempotent)."""
+        self._ensure_db()
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO post_call_jobs
+                    (call_sid, payload, status, attempts, next_run_at, created_at, updated_at, state)
+                VALUES (?, ?, ?, 0, ?, ?, ?, '{}')
+            ''', (call_sid, json.dumps(payload), JobStatus.PENDING.value, now, now, now))
+            conn.commit()
+            inserted = cursor.rowcount == 1
+
+        if inserted:
+            self.stats["enqueued"] += 1
+            logger.info(f"[call_id={call_sid}] Post-call job queued")
+        else:
+            self.stats["duplicates"] += 1
+            logger.info(f"[call_id={call_sid}] Post-call job already queued — ignoring duplicate")
+        return inserted
+
+    async def enqueue(self, call_sid: str, payload: Dict[str, Any]) -> bool:
+        """Persist a job off the event loop and wake a worker."""
+        inserted = await asyncio.to_thread(self.enqueue_sync, call_sid, payload)
+        if inserted and self._wakeup:
+            self._wakeup.set()
+        return inserted
+
+    def save_state(self, call_sid: str, state: Dict[str, Any]) -> None:
+        """Checkpoint a job's progress (finished steps, intermediate results)."""
+        with self._connect() as conn:
+            conn.execute(
+                'UPDATE post_call_jobs SET state = ?, updated_at = ? WHERE call_sid = ?',
+                (json.dumps(state), time.time(), call_sid)
+            )
+            conn.commit()
+
+    def _claim_next(self) -> Tuple[Optional[PostCallJob], Optional[float]]:
+        """
+        Atomically claim the next due job.
+
+        Returns (job, None), or (None, seconds until the next job is due).
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute('''
+                SELECT * FROM post_call_jobs
+                WHERE status = ? AND next_run_at <= ?
+                ORDER BY next_run_at LIMIT 1
+            ''', (JobStatus.PENDING.value, now)).fetchone()
+            if row is None:
+                upcoming = conn.execute(
+                    'SELECT MIN(next_run_at) FROM post_call_jobs WHERE status = ?',
+                    (JobStatus.PENDING.value,)
+                ).fetchone()[0]
+                conn.rollback()
+                return None, (max(upcoming - now, 0.0) if upcoming is not None else None)
+
+            conn.execute('''
+                UPDATE post_call_jobs SET status = ?, attempts = attempts + 1, updated_at = ?
+                WHERE call_sid = ?
+            ''', (JobStatus.RUNNING.value, now, row["call_sid"]))
+            conn.commit()
+
+        return PostCallJob(
+            call_sid=row["call_sid"],
+            payload=json.loads(row["payload"]),
+            status=JobStatus.RUNNING.value,
+            attempts=row["attempts"] + 1,
+            max_attempts=self.max_attempts,
+            created_at=row["created_at"],
+            state=json.loads(row["state"] or "{}"),
+            last_error=row["last_error"],
+        ), None
+
+    def _finish(self, job: PostCallJob, error: Optional[str]) -> None:
+        """Mark a job done, schedule a retry, or give up."""
+        now = time.time()
+        with self._connect() as conn:
+            if error is None:
+                conn.execute('''
+                    UPDATE post_call_jobs SET status = ?, completed_at = ?, updated_at = ?, last_error = NULL
+                    WHERE call_sid = ?
+                ''', (JobStatus.DONE.value, now, now, job.call_sid))
+                latency_ms = (now - job.created_at) * 1000
+                self.stats["completed"] += 1
+                self.stats["latency_ms_total"] += latency_ms
+                self.stats["latency_ms_max"] = max(self.stats["latency_ms_max"], latency_ms)
+            elif job.is_final_attempt:
+                conn.execute('''
+                    UPDATE post_call_jobs SET status = ?, updated_at = ?, last_error = ?
+                    WHERE call_sid = ?
+                ''', (JobStatus.FAILED.value, now, error, job.call_sid))
+                self.stats["failed"] += 1
+                logger.error(
+                    f"[call_id={job.call_sid}] Post-call job failed after {job.attempts} attempts: {error}"
+                )
+            else:
+                delay = self.retry_delay(job.attempts)
+                conn.execute('''
+                    UPDATE post_call_jobs SET status = ?, next_run_at = ?, updated_at = ?, last_error = ?
+                    WHERE call_sid = ?
+                ''', (JobStatus.PENDING.value, now + delay, now, error, job.call_sid))
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"[call_id={job.call_sid}] Post-call attempt {job.attempts}/{job.max_attempts} "
+                    f"failed ({error}) — retrying in {delay:.0f}s"
+                )
+            conn.commit()
+
+    def _recover_running(self) -> int:
+        """Jobs left RUNNING by a dead process go back to PENDING."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                'UPDATE post_call_jobs SET status = ?, next_run_at = ?, updated_at = ? WHERE status = ?',
+                (JobStatus.PENDING.value, time.time(), time.time(), JobStatus.RUNNING.value)
+            )
+            conn.commit()
+            return cursor.rowcount
+
+    def retry_delay(self, attempt: int) -> float:
+        """Exponential backoff with 10% jitter."""
+        delay = min(self.base_delay * (2 ** max(attempt - 1, 0)), self.max_delay)
+        return delay + delay * 0.1 * random.random()
+
+    # ── Workers ─────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        """Open the queue, resume interrupted jobs and start the worker pool."""
+        if self._tasks:
+            return
+        await asyncio.to_thread(self._ensure_db)
+        recovered = await asyncio.to_thread(self._recover_running)
+        if recovered:
+            logger.info(f"Post-call queue: resumed {recovered} interrupted job(s)")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"Post-call queue started ({self.workers} workers, db={self.db_path})")
+
+    async def stop(self) -> None:
+        """Stop workers; jobs in progress are resumed on the next start()."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job, due_in = await asyncio.to_thread(self._claim_next)
+            if job is None:
+                timeout = POST_CALL_IDLE_POLL if due_in is None else min(due_in, POST_CALL_IDLE_POLL)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            error = None
+            try:
+                await self.handler(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            await asyncio.to_thread(self._finish, job, error)
+
+    async def drain(self, timeout: float = 30.0) -> bool:
+        """Wait until no job is pending or running (tests, graceful shutdown)."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            counts = await asyncio.to_thread(self.get_counts)
+            if not counts.get(JobStatus.PENDING.value) and not counts.get(JobStatus.RUNNING.value):
+                return True
+            if self._wakeup:
+                self._wakeup.set()
+            await asyncio.sleep(0.05)
+        return False
+
+    # ── Metrics ─────────────────────────────────────────────────────────────
+
+    def get_counts(self) -> Dict[str, int]:
+        self._ensure_db()
+        with self._connect() as conn:
+            rows = conn.execute('SELECT status, COUNT(*) FROM post_call_jobs GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def get_stats(self) -> Dict[str, Any]:
+        counts = self.get_counts() if self._db_ready else {}
+        completed = self.stats["completed"]
+        return {
+            "running": bool(self._tasks),
+            "workers": self.workers,
+            "depth": counts.get(JobStatus.PENDING.value, 0) + counts.get(JobStatus.RUNNING.value, 0),
+            "by_status": counts,
+            "enqueued": self.stats["enqueued"],
+            "duplicates": self.stats["duplicates"],
+            "completed": completed,
+            "failed": self.stats["failed"],
+            "retries": self.stats["retries"],
+            "avg_latency_ms": round(self.stats["latency_ms_total"] / completed, 1) if completed else 0.0,
+            "max_latency_ms": round(self.stats["latency_ms_max"], 1),
+        }
+
+
+class MemoryAppendBatcher:
+    """
+    Coalesces appends to memory files.
+
+    append() resolves once the text is on disk, so a job only records its
+    memory step after the write actually happened. Entries arriving within
+    one flush window are written with a single open() per file.
+    """
+
+    def __init__(self, flush_interval: float = MEMORY_APPEND_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._pending: Dict[Path, List[Tuple[str, asyncio.Future]]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.stats = {"entries": 0, "writes": 0}
+
+    async def append(self, path: Path, text: str) -> None:
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(Path(path), []).append((text, fut))
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+        await fut
+
+    async def _flush_later(self) -> None:
+        # Loop: appends that land while a write is in flight see this task
+        # still running and rely on it to pick them up
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        for path, entries in pending.items():
+            try:
+                await asyncio.to_thread(self._write, path, "".join(text for text, _ in entries))
+                self.stats["entries"] += len(entries)
+                self.stats["writes"] += 1
+                for _, fut in entries:
+                    if not fut.done():
+                        fut.set_result(None)
+            except Exception as e:
+                for _, fut in entries:
+                    if not fut.done():
+                        fut.set_exception(e)
+
+    @staticmethod
+    def _write(path: Path, text: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "a") as f:
+            f.write(text)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Prompt Planner - Token-budgeted, relevance-ranked system prompt assembly.
+
+build_call_prompt() gathers context sections (identity, memory, daily notes,
+project status, call history, ...). Concatenating all of them yields a
+~15k char prompt for every caller, which inflates session.update size,
+session setup time and per-turn input tokens. The planner instead:
+
+1. Estimates tokens per section (chars / 4 — no tokenizer dependency)
+2. Scores each section: base priority × caller relevance × recency decay
+3. Packs required sections first, then the best-scoring ones that fit the
+   budget; truncatable sections are cut down instead of dropped
+4. Emits sections in their original reading order
+5. Caches packed prompts per caller, keyed on a source fingerprint
+
+Usage:
+    planner = PromptPlanner(budget_tokens=2500)
+    packed = planner.pack(header, sections)
+    packed.text, packed.dropped
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Total prompt budget in (estimated) tokens, header included
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2500"))
+# Recency decay: a section this many days old scores half as much
+RECENCY_HALF_LIFE_DAYS = float(os.getenv("PROMPT_RECENCY_HALF_LIFE_DAYS", "7"))
+# Packed prompts kept per (caller, sources) key
+PROMPT_CACHE_SIZE = 32
+
+CHARS_PER_TOKEN = 4
+SECTION_SEPARATOR = "\n\n---\n\n"
+TRUNCATION_MARKER = "\n[…]"
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 chars per token)."""
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class PromptSection:
+    """One candidate block of the system prompt."""
+    name: str                           # Stable id for logs ("memory", "daily", ...)
+    title: str                          # Markdown heading (without "# ")
+    body: str
+    priority: float = 0.5               # Base importance, 0..1
+    caller_relevance: float = 1.0       # How much this matters for *this* caller, 0..1
+    age_days: Optional[float] = None    # Age of the underlying source (None = timeless)
+    required: bool = False              # Always included (truncated if it must be)
+    min_tokens: int = 0                 # >0: may be truncated down to this instead of dropped
+
+    def render(self, body: Optional[str] = None) -> str:
+        return f"# {self.title}\n{self.body if body is None else body}"
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+    @property
+    def score(self) -> float:
+        recency = 1.0
+        if self.age_days is not None and RECENCY_HALF_LIFE_DAYS > 0:
+            recency = 0.5 ** (max(self.age_days, 0.0) / RECENCY_HALF_LIFE_DAYS)
+        return self.priority * self.caller_relevance * recency
+
+
+@dataclass
+class PackedPrompt:
+    """Result of packing sections into a budget."""
+    text: str
+    tokens: int
+    budget: int
+    included: List[str] = field(default_factory=list)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+
+
+def _truncate_to_tokens(section: PromptSection, max_tokens: int) -> Optional[str]:
+    """Rendered section cut to roughly max_tokens, or None if not even the heading fits."""
+    overhead = estimate_tokens(section.render("")) + estimate_tokens(TRUNCATION_MARKER)
+    room_chars = (max_tokens - overhead) * CHARS_PER_TOKEN
+    if room_chars <= 0:
+        return None
+    body = section.body[:room_chars]
+    # Prefer cutting at a line break so we don't end mid-sentence
+    cut = body.rfind("\n")
+    if cut > room_chars // 2:
+        body = body[:cut]
+    return section.render(body.rstrip() + TRUNCATION_MARKER)
+
+
+class PromptPlanner:
+    """Packs prompt sections into a token budget, with a per-caller LRU cache."""
+
+    def __init__(self, budget_tokens: int = PROMPT_TOKEN_BUDGET, cache_size: int = PROMPT_CACHE_SIZE):
+        self.budget_tokens = budget_tokens
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Hashable, PackedPrompt]" = OrderedDict()
+        self.stats = {"cache_hits": 0, "cache_misses": 0}
+
+    def pack(self, header: str, sections: List[PromptSection],
+             budget_tokens: Optional[int] = None) -> PackedPrompt:
+        """Select, truncate and order sections to fit the budget."""
+        budget = budget_tokens if budget_tokens is not None else self.budget_tokens
+        separator_tokens = estimate_tokens(SECTION_SEPARATOR)
+        remaining = budget - estimate_tokens(header)
+
+        chosen: dict = {}  # index → rendered text
+        truncated: List[str] = []
+        dropped: List[str] = []
+
+        # Required first (in order), then best score first
+        order = sorted(
+            range(len(sections)),
+            key=lambda i: (not sections[i].required, -sections[i].score, i)
+        )
+        for i in order:
+            section = sections[i]
+            if not section.body:
+                continue
+            cost = section.tokens + (separator_tokens if chosen else 0)
+            if cost <= remaining:
+                chosen[i] = section.render()
+                remaining -= cost
+                continue
+
+            room = remaining - (separator_tokens if chosen else 0)
+            floor = section.min_tokens if not section.required else 1
+            if (section.min_tokens or section.required) and room >= floor:
+                text = _truncate_to_tokens(section, room)
+                if text:
+                    chosen[i] = text
+                    remaining -= estimate_tokens(text) + (separator_tokens if len(chosen) > 1 else 0)
+                    truncated.append(section.name)
+                    continue
+            dropped.append(section.name)
+
+        body = SECTION_SEPARATOR.join(chosen[i] for i in sorted(chosen))
+        text = header + body
+        return PackedPrompt(
+            text=text,
+            tokens=estimate_tokens(text),
+            budget=budget,
+            included=[sections[i].name for i in sorted(chosen)],
+            truncated=truncated,
+            dropped=dropped,
+        )
+
+    # ── Cache ───────────────────────────────────────────────────────────────
+
+    def get_cached(self, key: Hashable) -> Optional[PackedPrompt]:
+        packed = self._cache.get(key)
+        if packed is None:
+            self.stats["cache_misses"] += 1
+            return None
+        self._cache.move_to_end(key)
+        self.stats["cache_hits"] += 1
+        return packed
+
+    def put_cached(self, key: Hashable, packed: PackedPrompt) -> None:
+        self._cache[key] = packed
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "cached_prompts": len(self._cache), "budget_tokens": self.budget_tokens}
+
+
+def source_fingerprint(paths: List[Any]) -> tuple:
+    """(path, mtime_ns, size) for each source — changes whenever a source does."""
+    fingerprint = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            fingerprint.append((str(path), st.st_mtime_ns, st.st_size))
+        except OSError:
+            fingerprint.append((str(path), None, None))
+    return tuple(fingerprint)
@@ -8,6 +8,13 @@ to receive and process function calls, executing them via OpenClaw.
 User context (timezone, location) is resolved from the caller's phone number
 and passed to the OpenClaw executor so tools return correct results.
 
+Function calls run as concurrent tasks (at most MAX_CONCURRENT_FUNCTION_CALLS
+per session) so the sideband socket is read continuously while OpenClaw works.
+
+All sideband connections are owned by one SidebandManager: it caps how many
+are open, spreads reconnects out after an upstream blip, reaps handlers whose
+calls have ended and keeps per-connection health and reconnect histograms.
+
 Architecture:
     Voice Call -> OpenAI Realtime -> Function Call Event
                         |
@@ -22,7 +29,8 @@ import asyncio
 import json
 import logging
 import os
-from typing import Dict, Optional, Callable, Any
+import time
+from typing import Awaitable, Dict, List, Optional, Callable, Any
 
 import websockets
 from websockets.exceptions import ConnectionClosed
@@ -33,6 +41,7 @@ from openclaw_executor import (
     set_call_id,
     set_user_context
 )
+from tool_scheduler import SchedulerOverloaded, tool_scheduler
 
 # Import user context resolver for timezone/location lookup
 try:
@@ -61,6 +70,119 @@ INITIAL_RECONNECT_DELAY = 0.5  # Start at 500ms
 MAX_RECONNECT_DELAY = 30  # Cap at 30 seconds
 MAX_RECONNECT_ATTEMPTS = 10  # Allow more attempts with backoff
 
+# Sideband connections across all calls; new calls are refused beyond this
+MAX_SIDEBAND_CONNECTIONS = int(os.getenv("MAX_SIDEBAND_CONNECTIONS", "100"))
+# Minimum gap between reconnects of different handlers (seconds)
+RECONNECT_SPACING = float(os.getenv("SIDEBAND_RECONNECT_SPACING", "0.05"))
+# How often ended handlers are reaped (seconds)
+SIDEBAND_REAP_INTERVAL = float(os.getenv("SIDEBAND_REAP_INTERVAL", "30"))
+# Histogram bucket upper bounds: disconnect → reconnected (ms), reconnects per connection
+RECONNECT_MS_BUCKETS = (250, 500, 1000, 2500, 5000, 10000, 30000)
+RECONNECT_COUNT_BUCKETS = (0, 1, 2, 5, 10)
+
+# Function calls run at once per session; further calls wait for a slot
+MAX_CONCURRENT_FUNCTION_CALLS = int(os.getenv("REALTIME_MAX_CONCURRENT_CALLS", "2"))
+OVERLOADED_MESSAGE = "I'm juggling too many requests right now. Ask me again in a moment."
+
+# Speech rate used to estimate how long a spoken chunk plays (~150 words/min)
+SPEECH_CHARS_PER_SECOND = float(os.getenv("SPEECH_CHARS_PER_SECOND", "15"))
+
+
+def _record_latency(call_id: str, event_type: str, duration_ms: float,
+                    metadata: Optional[Dict[str, Any]] = None) -> None:
+    """Best-effort latency event via call_metrics (blocking — run off the event loop)."""
+    try:
+        from call_metrics import metrics_manager
+        metrics_manager.record_latency_event(call_id, event_type, duration_ms, metadata)
+    except Exception as e:
+        logger.debug(f"[call_id={call_id}] Latency event {event_type} not recorded: {e}")
+
+
+class FollowupCoalescer:
+    """
+    Merges streamed follow-up chunks while the previous response is playing.
+
+    Sending each chunk with its own response.create while the model is still
+    speaking queues a response per chunk (or is rejected outright). Instead,
+    chunks that arrive during playback are held and sent together — one
+    conversation item and one response.create — once the response is done.
+
+    "Done" is response.done for the response our response.create started,
+    when the handler sees it, and otherwise an estimate from the spoken
+    text length.
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable[None]], call_id: str = "",
+                 chars_per_second: float = SPEECH_CHARS_PER_SECOND):
+        self._send = send
+        self.call_id = call_id
+        self.chars_per_second = max(chars_per_second, 1.0)
+        self._pending: List[str] = []
+        self._playing_until = 0.0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._awaiting_created = False
+        self._response_id: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"chunks": 0, "sends": 0}
+
+    def playing(self, text: str) -> None:
+        """A response speaking `text` was just requested."""
+        loop = asyncio.get_running_loop()
+        self._playing_until = loop.time() + len(text) / self.chars_per_second
+        self._idle.clear()
+        self._awaiting_created = True
+        self._response_id = None
+
+    def response_created(self, response_id: Optional[str]) -> None:
+        """The session started a response; the first one after playing() is ours."""
+        if self._awaiting_created:
+            self._awaiting_created = False
+            self._response_id = response_id
+
+    def response_done(self, response_id: Optional[str]) -> None:
+        """The session finished a response; ours finishing releases queued chunks."""
+        if response_id is not None and response_id == self._response_id:
+            self._idle.set()
+
+    def add(self, chunk: str) -> None:
+        """Queue a follow-up chunk; it is sent once nothing is playing."""
+        self._pending.append(chunk)
+        self.stats["chunks"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_when_idle())
+
+    async def _flush_when_idle(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            remaining = self._playing_until - loop.time()
+            if remaining > 0 and not self._idle.is_set():
+                try:
+                    await asyncio.wait_for(self._idle.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            text = " ".join(self._pending)
+            self._pending = []
+            try:
+                await self._send(text)
+            except Exception as e:
+                logger.warning(f"[call_id={self.call_id}] Dropped follow-up ({len(text)} chars): "
+                               f"{type(e).__name__}: {e}")
+                continue
+            self.stats["sends"] += 1
+            self.playing(text)
+
+    async def drain(self) -> None:
+        """Wait until every queued chunk has been sent."""
+        if self._task is not None:
+            await self._task
+
+    def cancel(self) -> None:
+        """Drop queued chunks (session over)."""
+        self._pending = []
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
 
 class RealtimeToolHandler:
     """
@@ -101,8 +223,23 @@ class RealtimeToolHandler:
         self.stats = {
             "function_calls": 0,
             "successful_calls": 0,
-            "failed_calls": 0
+            "failed_calls": 0,
+            "cancelled_calls": 0,
+            "first_audio_ms": None,  # Last ask_openclaw call → first chunk sent
+            "queue_wait_ms_total": 0.0,  # Event received → execution started
+            "queue_wait_ms_max": 0.0,
+        }
+        self.health = {
+            "state": "idle",  # idle → connected ⇄ reconnecting → stopped
+            "connects": 0,
+            "reconnects": 0,
+            "connected_at": None,
+            "last_event_at": None,
+            "last_error": None,
         }
+        self._disconnected_at: Optional[float] = None
+        self.followups: Optional[FollowupCoalescer] = None
+        self._call_slots = asyncio.Semaphore(MAX_CONCURRENT_FUNCTION_CALLS)
         
         # Resolve user context from phone number
         self.user_context = self._resolve_user_context()
@@ -194,15 +331,33 @@ class RealtimeToolHandler:
             
             print(f"[TOOL_HANDLER] ✅ Connected to Realtime session for call {self.call_id}")
             logger.info(f"Connected to Realtime session for call {self.call_id}")
+            self._mark_connected()
             self._notify_status("connected")
             return True
             
         except Exception as e:
             print(f"[TOOL_HANDLER] ❌ Failed to connect: {type(e).__name__}: {e}")
             logger.error(f"Failed to connect to Realtime: {e}")
+            self.health["last_error"] = f"{type(e).__name__}: {e}"[:200]
             self._notify_status("connection_failed")
             return False
     
+    def _mark_connected(self):
+        """Update health after a successful connect; report reconnect time to the manager."""
+        now = time.time()
+        self.health.update(state="connected", connected_at=now)
+        self.health["connects"] += 1
+        if self._disconnected_at is not None:
+            self.health["reconnects"] += 1
+            sideband_manager.record_reconnect((now - self._disconnected_at) * 1000)
+            self._disconnected_at = None
+    
+    def _mark_disconnected(self, reason: str):
+        """Update health after the connection dropped or failed."""
+        self.health.update(state="reconnecting", connected_at=None, last_error=reason[:200])
+        if self._disconnected_at is None:
+            self._disconnected_at = time.time()
+    
     async def start(self):
         """
         Start handling events for this session.
@@ -223,7 +378,7 @@ class RealtimeToolHandler:
                     connected = await self.connect()
                     if not connected:
                         reconnect_attempts += 1
-                        delay = self._get_backoff_delay(reconnect_attempts)
+                        delay = sideband_manager.spread_reconnect(self._get_backoff_delay(reconnect_attempts))
                         logger.warning(
                             f"[call_id={self.call_id}] Connection attempt {reconnect_attempts}/{MAX_RECONNECT_ATTEMPTS} failed, "
                             f"retrying in {delay:.1f}s (exponential backoff)"
@@ -239,8 +394,9 @@ class RealtimeToolHandler:
                 await self._handle_events()
                 
             except ConnectionClosed as e:
+                self._mark_disconnected(f"closed: code={e.code}")
                 reconnect_attempts += 1
-                delay = self._get_backoff_delay(reconnect_attempts)
+                delay = sideband_manager.spread_reconnect(self._get_backoff_delay(reconnect_attempts))
                 logger.warning(
                     f"[call_id={self.call_id}] WebSocket closed (code={e.code}, reason={e.reason}), "
                     f"attempt {reconnect_attempts}/{MAX_RECONNECT_ATTEMPTS}, retrying in {delay:.1f}s"
@@ -249,8 +405,9 @@ class RealtimeToolHandler:
                     await asyncio.sleep(delay)
                     
             except Exception as e:
+                self._mark_disconnected(f"{type(e).__name__}: {e}")
                 reconnect_attempts += 1
-                delay = self._get_backoff_delay(reconnect_attempts)
+                delay = sideband_manager.spread_reconnect(self._get_backoff_delay(reconnect_attempts))
                 logger.error(
                     f"[call_id={self.call_id}] Unexpected error in tool handler: {type(e).__name__}: {e}, "
                     f"attempt {reconnect_attempts}/{MAX_RECONNECT_ATTEMPTS}, retrying in {delay:.1f}s"
@@ -258,6 +415,8 @@ class RealtimeToolHandler:
                 if self.running:
                     await asyncio.sleep(delay)
         
+        await self._cancel_function_calls()
+        self.health["state"] = "stopped"
         self._notify_status("stopped")
         logger.info(f"[call_id={self.call_id}] Tool handler stopped. Stats: {self.stats}")
     
@@ -277,12 +436,21 @@ class RealtimeToolHandler:
     async def stop(self):
         """Stop the handler and close the connection."""
         self.running = False
+        if self.followups:
+            self.followups.cancel()
+        await self._cancel_function_calls()
         if self.ws and self.ws.state == websockets.State.OPEN:
             await self.ws.close()
     
     async def _handle_events(self):
-        """Process incoming events from the Realtime session."""
+        """
+        Process incoming events from the Realtime session.
+        
+        Function calls are spawned as tasks rather than awaited, so response
+        lifecycle events (and further calls) keep flowing while they run.
+        """
         async for message in self.ws:
+            self.health["last_event_at"] = time.time()
             try:
                 event = json.loads(message)
                 event_type = event.get("type", "")
@@ -293,12 +461,24 @@ class RealtimeToolHandler:
                 
                 # Handle function call completion
                 if event_type == "response.function_call_arguments.done":
-                    await self._handle_function_call(event)
+                    self._spawn_function_call(event)
+                
+                # Response lifecycle: queued follow-ups go out once ours is done
+                elif event_type in ("response.created", "response.done"):
+                    if self.followups:
+                        response_id = (event.get("response") or {}).get("id")
+                        if event_type == "response.created":
+                            self.followups.response_created(response_id)
+                        else:
+                            self.followups.response_done(response_id)
                 
                 # Handle session end
                 elif event_type == "session.closed":
                     logger.info(f"[call_id={self.call_id}] Session closed by server")
                     self.running = False
+                    if self.followups:
+                        self.followups.cancel()
+                    await self._cancel_function_calls()
                     break
                 
                 # Handle errors
@@ -313,6 +493,34 @@ class RealtimeToolHandler:
             except Exception as e:
                 logger.error(f"[call_id={self.call_id}] Error processing event: {type(e).__name__}: {e}")
     
+    def _spawn_function_call(self, event: Dict[str, Any]) -> asyncio.Task:
+        """Run a function call as a task in this call's scheduler group."""
+        received_at = asyncio.get_running_loop().time()
+        return tool_scheduler.spawn(self.call_id, self._run_function_call(event, received_at))
+    
+    async def _run_function_call(self, event: Dict[str, Any], received_at: float):
+        """Wait for a session slot and a subprocess slot, then handle the call."""
+        try:
+            async with self._call_slots, tool_scheduler.slot("subprocess"):
+                wait_ms = (asyncio.get_running_loop().time() - received_at) * 1000
+                self.stats["queue_wait_ms_total"] += wait_ms
+                self.stats["queue_wait_ms_max"] = max(self.stats["queue_wait_ms_max"], wait_ms)
+                if wait_ms >= 100:
+                    logger.info(f"[call_id={self.call_id}] Function call waited {wait_ms:.0f}ms for a slot")
+                await self._handle_function_call(event)
+        except SchedulerOverloaded:
+            logger.warning(f"[call_id={self.call_id}] Function call rejected: scheduler overloaded")
+            self.stats["failed_calls"] += 1
+            await self._send_function_result_safe(event.get("call_id"), OVERLOADED_MESSAGE)
+    
+    def pending_function_calls(self) -> int:
+        """Function calls queued or running for this session."""
+        return tool_scheduler.call_task_count(self.call_id)
+    
+    async def _cancel_function_calls(self):
+        """Cancel queued and running function calls (the session is gone)."""
+        self.stats["cancelled_calls"] += await tool_scheduler.cancel_call(self.call_id)
+    
     async def _handle_function_call(self, event: Dict[str, Any]):
         """
         Handle a function call from the Realtime session.
@@ -436,9 +644,11 @@ class RealtimeToolHandler:
         """
         Execute ask_openclaw with streaming, sending chunks progressively.
         
-        Each chunk is sent as a function_call_output (first chunk) or 
-        follow-up message (subsequent chunks), with response.create triggered
-        so the user hears each chunk immediately.
+        The first chunk is sent as the function_call_output with
+        response.create, so the user hears it immediately; the time from the
+        call to that point is recorded as tool_first_audio. Later chunks go
+        through the FollowupCoalescer: those that arrive while a response is
+        still playing are merged into a single follow-up.
         
         Args:
             function_call_id: The OpenAI function call ID for the response
@@ -449,8 +659,12 @@ class RealtimeToolHandler:
         """
         logger.info(f"[call_id={self.call_id}] Executing streaming request: {request[:80]}...")
         
+        loop = asyncio.get_running_loop()
+        started = loop.time()
         chunk_count = 0
         first_chunk_sent = False
+        if self.followups is None:
+            self.followups = FollowupCoalescer(self._send_followup_chunk, call_id=self.call_id)
         
         try:
             async for chunk in execute_openclaw_streaming(request):
@@ -462,20 +676,21 @@ class RealtimeToolHandler:
                 
                 logger.debug(f"[call_id={self.call_id}] Streaming chunk {chunk_count}: {len(chunk)} chars")
                 
+                if chunk_count > 1:
+                    # Subsequent chunks: follow-up content, coalesced while speaking
+                    self.followups.add(chunk)
+                    continue
+                
                 try:
-                    if chunk_count == 1:
-                        # First chunk: send as function_call_output (completes the function call)
-                        await self._send_function_result(function_call_id, chunk)
-                        first_chunk_sent = True
-                    else:
-                        # Subsequent chunks: send as follow-up content
-                        await self._send_followup_chunk(chunk)
+                    # First chunk: send as function_call_output (completes the function call)
+                    await self._send_function_result(function_call_id, chunk)
+                    first_chunk_sent = True
                 except Exception as send_error:
-                    # Log send error but continue streaming - connection may recover
-                    logger.warning(f"[call_id={self.call_id}] Failed to send chunk {chunk_count}: {type(send_error).__name__}: {send_error}")
+                    logger.warning(f"[call_id={self.call_id}] Failed to send chunk 1: {type(send_error).__name__}: {send_error}")
                     # If we couldn't send the first chunk, re-raise to trigger fallback
-                    if chunk_count == 1 and not first_chunk_sent:
-                        raise
+                    raise
+                self.followups.playing(chunk)
+                self._report_first_audio((loop.time() - started) * 1000, len(chunk))
             
             if chunk_count == 0:
                 # No chunks yielded - send a default response
@@ -483,7 +698,7 @@ class RealtimeToolHandler:
                 await self._send_function_result(function_call_id, "Done.")
                 self.stats["failed_calls"] += 1
             else:
-                logger.info(f"[call_id={self.call_id}] Streaming complete: {chunk_count} chunks sent")
+                logger.info(f"[call_id={self.call_id}] Streaming complete: {chunk_count} chunks received")
                 self.stats["successful_calls"] += 1
                 
         except Exception as e:
@@ -492,21 +707,28 @@ class RealtimeToolHandler:
             # If we already sent the first chunk, the function call is "complete" from Realtime's perspective
             # Send a graceful error message as follow-up
             if first_chunk_sent:
-                try:
-                    await self._send_followup_chunk("I'm sorry, I encountered an error while processing. Let me try again if you ask.")
-                except Exception:
-                    pass  # Best effort
+                self.followups.add("I'm sorry, I encountered an error while processing. Let me try again if you ask.")
                 self.stats["failed_calls"] += 1
             else:
                 # No chunks sent yet - re-raise to trigger fallback to non-streaming
                 raise
     
+    def _report_first_audio(self, elapsed_ms: float, chars: int):
+        """Record time-to-first-audio for ask_openclaw (stats, log, latency event)."""
+        self.stats["first_audio_ms"] = round(elapsed_ms, 1)
+        logger.info(f"[call_id={self.call_id}] ask_openclaw first audio after {elapsed_ms:.0f}ms ({chars} chars)")
+        asyncio.get_running_loop().run_in_executor(
+            None, _record_latency, self.call_id, "tool_first_audio", elapsed_ms,
+            {"tool": "ask_openclaw", "chars": chars}
+        )
+    
     async def _send_followup_chunk(self, chunk: str):
         """
         Send a follow-up chunk after the initial function result.
         
         Sends as an assistant message item, then triggers response.create
-        so the model speaks it.
+        so the model speaks it. Streaming calls this through the
+        FollowupCoalescer so it is not sent while a response is playing.
         """
         if not self.ws or self.ws.state != websockets.State.OPEN:
             logger.warning(f"[call_id={self.call_id}] Cannot send followup chunk - WebSocket closed")
@@ -595,8 +817,152 @@ class RealtimeToolHandler:
                 logger.warning(f"Status callback error: {e}")
 
 
-# Active handlers tracking
-active_handlers: Dict[str, RealtimeToolHandler] = {}
+def _bucket(value: float, bounds) -> str:
+    """Histogram label for value: "le_<bound>" for the first bound it fits, else "gt_<last>"."""
+    for bound in bounds:
+        if value <= bound:
+            return f"le_{bound}"
+    return f"gt_{bounds[-1]}"
+
+
+def _empty_histogram(bounds) -> Dict[str, int]:
+    labels = [f"le_{b}" for b in bounds] + [f"gt_{bounds[-1]}"]
+    return {label: 0 for label in labels}
+
+
+class SidebandManager:
+    """
+    Owns the sideband connections of all calls.
+    
+    - Caps open connections at max_connections (ended handlers are reaped
+      first; beyond the cap new calls get no tool handler)
+    - Spreads reconnects: each reconnect is scheduled at least
+      reconnect_spacing after the previous one from any handler, so an
+      upstream blip does not turn into a synchronized reconnect storm
+    - Reaps handlers whose run loop has ended (session closed, gave up)
+    - Tracks per-connection health and reconnect histograms
+    """
+    
+    def __init__(
+        self,
+        max_connections: int = MAX_SIDEBAND_CONNECTIONS,
+        reconnect_spacing: float = RECONNECT_SPACING,
+        reap_interval: float = SIDEBAND_REAP_INTERVAL
+    ):
+        self.max_connections = max_connections
+        self.reconnect_spacing = reconnect_spacing
+        self.reap_interval = reap_interval
+        self.handlers: Dict[str, RealtimeToolHandler] = {}
+        self._tasks: Dict[str, Any] = {}
+        self._reaper = None
+        self._next_reconnect_at = 0.0
+        self.stats = {"started": 0, "rejected": 0, "reaped": 0, "reconnects": 0}
+        self.reconnect_ms = _empty_histogram(RECONNECT_MS_BUCKETS)
+        self._closed_reconnect_counts = _empty_histogram(RECONNECT_COUNT_BUCKETS)
+    
+    async def start(self, handler: RealtimeToolHandler) -> bool:
+        """Register handler and run it in the background. False if at the connection cap."""
+        if handler.call_id in self.handlers:
+            await self.stop(handler.call_id)
+        
+        if len(self.handlers) >= self.max_connections and not self.reap():
+            self.stats["rejected"] += 1
+            logger.warning(
+                f"[call_id={handler.call_id}] Sideband connection cap ({self.max_connections}) reached, "
+                f"not starting tool handler"
+            )
+            return False
+        
+        self.handlers[handler.call_id] = handler
+        self._tasks[handler.call_id] = asyncio.create_task(handler.start())
+        self.stats["started"] += 1
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_loop())
+        return True
+    
+    async def stop(self, call_id: str) -> bool:
+        """Stop and forget the handler for call_id. False if there was none."""
+        handler = self.handlers.pop(call_id, None)
+        self._tasks.pop(call_id, None)
+        if handler is None:
+            return False
+        await handler.stop()
+        self._record_closed(handler)
+        return True
+    
+    def reap(self) -> int:
+        """Forget handlers whose run loop has ended. Returns how many were removed."""
+        ended = []
+        for call_id, handler in self.handlers.items():
+            task = self._tasks.get(call_id)
+            if handler.health["state"] == "stopped" or (task is not None and task.done()):
+                ended.append(call_id)
+        for call_id in ended:
+            handler = self.handlers.pop(call_id)
+            self._tasks.pop(call_id, None)
+            self._record_closed(handler)
+            logger.info(f"[call_id={call_id}] Reaped ended tool handler")
+        self.stats["reaped"] += len(ended)
+        return len(ended)
+    
+    async def _reap_loop(self):
+        while self.handlers:
+            await asyncio.sleep(self.reap_interval)
+            self.reap()
+    
+    def spread_reconnect(self, delay: float) -> float:
+        """
+        Return the delay to actually wait before reconnecting.
+        
+        At least the handler's own backoff delay, pushed back so reconnects
+        from different handlers are reconnect_spacing apart (by at most
+        MAX_RECONNECT_DELAY on top of the backoff).
+        """
+        now = time.monotonic()
+        at = max(now + delay, min(self._next_reconnect_at, now + delay + MAX_RECONNECT_DELAY))
+        self._next_reconnect_at = at + self.reconnect_spacing
+        return at - now
+    
+    def record_reconnect(self, elapsed_ms: float):
+        """Count a completed reconnect (disconnect → connected again)."""
+        self.stats["reconnects"] += 1
+        self.reconnect_ms[_bucket(elapsed_ms, RECONNECT_MS_BUCKETS)] += 1
+    
+    def _record_closed(self, handler: RealtimeToolHandler):
+        self._closed_reconnect_counts[_bucket(handler.health["reconnects"], RECONNECT_COUNT_BUCKETS)] += 1
+    
+    def get_health(self) -> Dict[str, Any]:
+        """Per-connection health plus manager-wide counters and histograms."""
+        now = time.time()
+        connections = {}
+        reconnect_counts = dict(self._closed_reconnect_counts)
+        for call_id, handler in self.handlers.items():
+            health = handler.health
+            connected_at = health["connected_at"]
+            last_event_at = health["last_event_at"]
+            connections[call_id] = {
+                "state": health["state"],
+                "connects": health["connects"],
+                "reconnects": health["reconnects"],
+                "connected_for_s": round(now - connected_at, 1) if connected_at else None,
+                "idle_s": round(now - last_event_at, 1) if last_event_at else None,
+                "last_error": health["last_error"],
+                "pending_function_calls": handler.pending_function_calls(),
+            }
+            reconnect_counts[_bucket(health["reconnects"], RECONNECT_COUNT_BUCKETS)] += 1
+        return {
+            "max_connections": self.max_connections,
+            "open": sum(1 for c in connections.values() if c["state"] == "connected"),
+            "stats": dict(self.stats),
+            "reconnect_ms": dict(self.reconnect_ms),
+            "reconnects_per_connection": reconnect_counts,
+            "connections": connections,
+        }
+
+
+# Singleton manager; active_handlers is its registry
+sideband_manager = SidebandManager()
+active_handlers: Dict[str, RealtimeToolHandler] = sideband_manager.handlers
 
 
 async def start_tool_handler(
@@ -616,12 +982,8 @@ async def start_tool_handler(
                      This is used to determine timezone and location for tool calls.
         
     Returns:
-        The handler if started successfully, None otherwise
+        The handler if started successfully, None otherwise (connection cap reached)
     """
-    # Clean up any existing handler for this call
-    if call_id in active_handlers:
-        await active_handlers[call_id].stop()
-    
     handler = RealtimeToolHandler(
         session_id=session_id,
         call_id=call_id,
@@ -630,9 +992,9 @@ async def start_tool_handler(
         caller_phone=caller_phone
     )
     
-    # Start in background
-    asyncio.create_task(handler.start())
-    active_handlers[call_id] = handler
+    # Replaces any existing handler for this call and starts in background
+    if not await sideband_manager.start(handler):
+        return None
     
     logger.info(f"Tool handler started for call {call_id}")
     return handler
@@ -640,9 +1002,7 @@ async def start_tool_handler(
 
 async def stop_tool_handler(call_id: str):
     """Stop the tool handler for a call."""
-    if call_id in active_handlers:
-        await active_handlers[call_id].stop()
-        del active_handlers[call_id]
+    if await sideband_manager.stop(call_id):
         logger.info(f"Tool handler stopped for call {call_id}")
 
 
@@ -652,12 +1012,18 @@ def get_active_handlers() -> Dict[str, Dict[str, Any]]:
         call_id: {
             "session_id": handler.session_id,
             "running": handler.running,
+            "pending_function_calls": handler.pending_function_calls(),
             "stats": handler.stats
         }
         for call_id, handler in active_handlers.items()
     }
 
 
+def get_sideband_health() -> Dict[str, Any]:
+    """Health of all sideband connections (see SidebandManager.get_health)."""
+    return sideband_manager.get_health()
+
+
 # Cleanup on module exit
 import atexit
 
@@ -3,29 +3,49 @@
 OpenClaw Session Context Extraction + Bridge Event Emitter
 
 This module provides:
-1. Context extraction from OpenClaw sessions for voice calls
+1. Context extraction from OpenClaw sessions for voice calls (precomputed
+   per known caller in the background, see caller_snapshots)
 2. Event emission to the TypeScript session bridge for transcript sync
 
 SCOPE DISCIPLINE: This module handles context extraction and bridge events.
 It does NOT modify call initiation, SIP handling, or Twilio integration.
 """
 
-import json
 import logging
 import os
 import re
 import threading
+import time
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Callable
+from typing import Deque, Dict, List, Optional, Any, Callable, Tuple
 
 import httpx  # For async HTTP (already a dep of webhook-server.py)
 
+from caller_snapshots import request_refresh, snapshot_refresher
+from phone_routing import normalize_phone, watch_phone_mapping
+
 logger = logging.getLogger(__name__)
 
 # Bridge configuration
 BRIDGE_URL = os.getenv("OPENCLAW_BRIDGE_URL", "http://localhost:8082")
 BRIDGE_ENABLED = os.getenv("OPENCLAW_BRIDGE_ENABLED", "true").lower() == "true"
+BRIDGE_QUEUE_SIZE = int(os.getenv("OPENCLAW_BRIDGE_QUEUE_SIZE", "1000"))            # events held while the bridge is slow
+BRIDGE_FLUSH_INTERVAL = float(os.getenv("OPENCLAW_BRIDGE_FLUSH_INTERVAL", "0.2"))   # seconds events wait to be batched
+BRIDGE_BATCH_SIZE = 100           # events per POST
+BRIDGE_MAX_ATTEMPTS = 5           # per batch before its events are counted failed
+BRIDGE_RETRY_BASE = 0.5           # seconds; doubled per retry
+BRIDGE_RETRY_MAX = 10.0
+BRIDGE_LATENCY_SAMPLES = 1000     # recent deliveries kept for latency quantiles
+# Requests carrying call_ended wait for the bridge's transcript sync before it replies
+BRIDGE_SYNC_TIMEOUT = float(os.getenv("OPENCLAW_BRIDGE_SYNC_TIMEOUT", "60"))        # seconds
+# 4xx answers that mean "try again later" rather than "this event is bad"
+BRIDGE_RETRYABLE_STATUS = frozenset({408, 429})
+# Dropped first (oldest first) when the queue is full
+LOW_PRIORITY_EVENTS = frozenset({"transcript_update"})
+
+RECENT_MEMORY_DAYS = 2            # daily memory files (today and back) included in caller context
 
 
 class BridgeEventEmitter:
@@ -39,12 +59,65 @@ class BridgeEventEmitter:
     - call_started: When a call begins (maps call_id to session)
     - transcript_update: Real-time transcript updates (if available)
     - call_ended: When a call ends (triggers transcript sync)
+    
+    Delivery: emit_* only appends to a bounded in-memory queue and returns.
+    One background sender thread owns the queue and the HTTP client. It
+    waits up to flush_interval for events to accumulate, posts them as one
+    batch to /call-events (falling back to /call-event, one at a time, on
+    bridges without the bulk endpoint) and retries a failed batch with
+    exponential backoff before sending anything newer, so events reach the
+    bridge in the order they were emitted. Only 5xx answers and transport
+    errors are retried: an event the bridge rejects (4xx, or an "error"
+    result in a bulk reply) is counted rejected and skipped, so it cannot
+    hold up the events behind it. A batch rejected as a whole is resent one
+    event at a time so only the offending event is skipped. When the queue is full the oldest
+    transcript_update is dropped to make room; call_started and call_ended
+    are only dropped if nothing else can be.
+
+    Delivery is at-least-once: a request that fails after the bridge
+    processed it (e.g. a reply lost in transit) is sent again. Requests
+    carrying call_ended, which the bridge answers only after syncing the
+    transcript, get BRIDGE_SYNC_TIMEOUT so a slow sync is not mistaken for
+    a failure and replayed.
     """
     
-    def __init__(self, bridge_url: str = BRIDGE_URL, enabled: bool = BRIDGE_ENABLED):
+    def __init__(
+        self,
+        bridge_url: str = BRIDGE_URL,
+        enabled: bool = BRIDGE_ENABLED,
+        queue_size: int = BRIDGE_QUEUE_SIZE,
+        flush_interval: float = BRIDGE_FLUSH_INTERVAL,
+        batch_size: int = BRIDGE_BATCH_SIZE,
+        max_attempts: int = BRIDGE_MAX_ATTEMPTS,
+    ):
         self.bridge_url = bridge_url.rstrip('/')
         self.enabled = enabled
+        self.queue_size = queue_size
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
         self._http_client: Optional[httpx.Client] = None
+        
+        # (enqueued_at, event), oldest first; guarded by _cond
+        self._queue: Deque[Tuple[float, Dict[str, Any]]] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._bulk_supported = True
+        self._latencies: Deque[float] = deque(maxlen=BRIDGE_LATENCY_SAMPLES)
+        self.stats = {
+            "queued": 0,
+            "sent": 0,
+            "batches": 0,
+            "retries": 0,
+            "dropped_low_priority": 0,
+            "dropped_high_priority": 0,
+            "failed": 0,
+            "rejected": 0,
+            "latency_sum_s": 0.0,
+        }
     
     @property
     def http_client(self) -> httpx.Client:
@@ -109,37 +182,251 @@ class BridgeEventEmitter:
         })
     
     def _emit_event(self, event: Dict[str, Any]) -> bool:
-        """Send event to bridge (fire-and-forget, non-blocking)."""
+        """Queue event for the background sender (non-blocking); False if it was not queued."""
         if not self.enabled:
             logger.debug(f"Bridge disabled, skipping event: {event.get('eventType')}")
             return False
         
-        def send():
+        with self._cond:
+            if self._closed:
+                return False
+            if len(self._queue) >= self.queue_size and not self._make_room(event):
+                return False
+            self._queue.append((time.monotonic(), event))
+            self.stats["queued"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="bridge-events", daemon=True)
+                self._thread.start()
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+        return True
+    
+    def _make_room(self, event: Dict[str, Any]) -> bool:
+        """Drop the oldest low-priority event (caller holds _cond); False to drop event itself."""
+        for i, (_, queued) in enumerate(self._queue):
+            if queued.get("eventType") in LOW_PRIORITY_EVENTS:
+                del self._queue[i]
+                self.stats["dropped_low_priority"] += 1
+                return True
+        if event.get("eventType") in LOW_PRIORITY_EVENTS:
+            self.stats["dropped_low_priority"] += 1
+            return False
+        self._queue.popleft()
+        self.stats["dropped_high_priority"] += 1
+        logger.warning("Bridge event queue full of call events, dropped the oldest")
+        return True
+    
+    # ── Sender thread ───────────────────────────────────────────────────────
+    
+    def _next_batch(self) -> Optional[List[Tuple[float, Dict[str, Any]]]]:
+        """Wait for a flush window's worth of events; None once closed and drained."""
+        with self._cond:
+            while not self._queue:
+                if self._closed:
+                    return None
+                self._cond.wait()
+            deadline = self._queue[0][0] + self.flush_interval
+            while len(self._queue) < self.batch_size and not (self._closed or self._flush_requested):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+            self._in_flight = len(batch)
+            return batch
+    
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
             try:
+                self._deliver(batch)
+            except Exception as e:
+                self.stats["failed"] += len(batch)
+                logger.error(f"Bridge event sender error: {e}", exc_info=True)
+            with self._cond:
+                self._in_flight = 0
+                if not self._queue:
+                    self._flush_requested = False
+                self._cond.notify_all()
+    
+    def _deliver(self, batch: List[Tuple[float, Dict[str, Any]]]) -> bool:
+        """Send batch, retrying with backoff; events the bridge answered for are not resent."""
+        pending = list(batch)
+        for attempt in range(self.max_attempts):
+            handled, rejected = self._post(pending)
+            now = time.monotonic()
+            for enqueued_at, _ in pending[:handled]:
+                self._latencies.append(now - enqueued_at)
+                self.stats["latency_sum_s"] += now - enqueued_at
+            self.stats["sent"] += handled - rejected
+            self.stats["rejected"] += rejected
+            del pending[:handled]
+            if not pending:
+                self.stats["batches"] += 1
+                return True
+            if attempt + 1 == self.max_attempts:
+                break
+            self.stats["retries"] += 1
+            delay = min(BRIDGE_RETRY_BASE * 2 ** attempt, BRIDGE_RETRY_MAX)
+            with self._cond:
+                if self._cond.wait_for(lambda: self._closed, delay):
+                    break  # Shutting down: don't hold up close()
+        self.stats["failed"] += len(pending)
+        logger.warning(f"Bridge unreachable, gave up on {len(pending)} event(s)")
+        return False
+    
+    @staticmethod
+    def _timeout_kwargs(events: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Per-request timeout override: long enough for a transcript sync when call_ended is sent."""
+        if any(event.get("eventType") == "call_ended" for event in events):
+            return {"timeout": BRIDGE_SYNC_TIMEOUT}
+        return {}
+    
+    def _post(self, pending: List[Tuple[float, Dict[str, Any]]]) -> Tuple[int, int]:
+        """
+        POST events in order.
+        
+        Returns (handled, rejected): how many events from the front the bridge
+        answered for, and how many of those it rejected. The rest are retried.
+        """
+        events = [event for _, event in pending]
+        handled = rejected = 0
+        try:
+            if self._bulk_supported:
+                response = self.http_client.post(
+                    f"{self.bridge_url}/call-events", json={"events": events}, **self._timeout_kwargs(events)
+                )
+                status = response.status_code
+                if status == 200:
+                    # One result per event, in order; "error" means the bridge threw on it
+                    try:
+                        results = response.json().get("results") or []
+                    except Exception as e:
+                        # The batch was delivered, only the per-event outcome is unknown: don't resend
+                        logger.warning(f"Unreadable bridge batch reply: {e}")
+                        results = []
+                    rejected = sum(1 for result in results if result.get("status") == "error")
+                    if rejected:
+                        logger.warning(f"Bridge rejected {rejected} of {len(events)} event(s)")
+                    logger.debug(f"Bridge events sent: {len(events)}")
+                    return len(events), rejected
+                if status == 404:
+                    self._bulk_supported = False
+                    logger.info("Bridge has no /call-events endpoint, sending events one at a time")
+                elif 400 <= status < 500 and status not in BRIDGE_RETRYABLE_STATUS:
+                    # One bad event fails the whole batch: resend it event by event so only that one is skipped
+                    logger.warning(f"Bridge rejected event batch: HTTP {status}, sending it one event at a time")
+                else:
+                    logger.warning(f"Bridge event batch failed: HTTP {status}")
+                    return 0, 0
+            for event in events:
                 response = self.http_client.post(
                     f"{self.bridge_url}/call-event",
                     json=event,
-                    headers={"Content-Type": "application/json"}
+                    headers={"Content-Type": "application/json"},
+                    **self._timeout_kwargs([event])
                 )
-                if response.status_code == 200:
-                    logger.debug(f"Bridge event sent: {event.get('eventType')} for {event.get('callId')}")
+                status = response.status_code
+                if 400 <= status < 500 and status not in BRIDGE_RETRYABLE_STATUS:
+                    # The bridge will never accept this event: skip it, keep the rest moving
+                    logger.warning(
+                        f"Bridge rejected {event.get('eventType')} for {event.get('callId')}: HTTP {status}"
+                    )
+                    rejected += 1
+                elif status != 200:
+                    logger.warning(f"Bridge event failed: HTTP {status}")
+                    return handled, rejected
                 else:
-                    logger.warning(f"Bridge event failed: HTTP {response.status_code}")
-                return response.status_code == 200
-            except Exception as e:
-                logger.debug(f"Bridge event send failed (bridge may not be running): {e}")
-                return False
-        
-        # Fire-and-forget in background thread to avoid blocking
-        thread = threading.Thread(target=send, daemon=True)
-        thread.start()
-        return True  # Returns immediately, actual result is async
-    
-    def close(self):
-        """Close HTTP client."""
+                    logger.debug(f"Bridge event sent: {event.get('eventType')} for {event.get('callId')}")
+                handled += 1
+            return handled, rejected
+        except Exception as e:
+            logger.debug(f"Bridge event send failed (bridge may not be running): {e}")
+            return handled, rejected
+    
+    # ── Control and stats ───────────────────────────────────────────────────
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Send queued events now and wait until they are delivered or given up; False on timeout."""
+        with self._cond:
+            if self._thread is None:
+                return not self._queue
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._queue and not self._in_flight, timeout)
+    
+    def close(self, timeout: float = 2.0):
+        """Stop the sender, giving queued events up to timeout to go out, and close HTTP client."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"Bridge sender still busy after {timeout}s, {len(self._queue)} event(s) unsent")
+                return
+            self._thread = None
         if self._http_client:
             self._http_client.close()
             self._http_client = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, delivery counters and delivery latency (enqueue to bridge ack)."""
+        latencies = sorted(self._latencies)
+        
+        def quantile(q: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(int(q * len(latencies)), len(latencies) - 1)] * 1000, 1)
+        
+        return {
+            "enabled": self.enabled,
+            "queue_depth": len(self._queue),
+            "queue_size": self.queue_size,
+            "bulk_endpoint": self._bulk_supported,
+            **{k: v for k, v in self.stats.items() if k != "latency_sum_s"},
+            "latency_ms": {"p50": quantile(0.5), "p95": quantile(0.95), "p99": quantile(0.99)},
+        }
+    
+    def get_prometheus_metrics(self) -> str:
+        """Bridge delivery counters and latency in Prometheus format."""
+        stats = self.get_stats()
+        latency = stats["latency_ms"]
+        lines = [
+            "# HELP voice_bridge_events_total Session bridge events by outcome",
+            "# TYPE voice_bridge_events_total counter",
+            f'voice_bridge_events_total{{outcome="queued"}} {stats["queued"]}',
+            f'voice_bridge_events_total{{outcome="sent"}} {stats["sent"]}',
+            f'voice_bridge_events_total{{outcome="failed"}} {stats["failed"]}',
+            f'voice_bridge_events_total{{outcome="rejected"}} {stats["rejected"]}',
+            "",
+            "# HELP voice_bridge_events_dropped_total Events dropped because the queue was full",
+            "# TYPE voice_bridge_events_dropped_total counter",
+            f'voice_bridge_events_dropped_total{{priority="low"}} {stats["dropped_low_priority"]}',
+            f'voice_bridge_events_dropped_total{{priority="high"}} {stats["dropped_high_priority"]}',
+            "",
+            "# HELP voice_bridge_retries_total Batch send retries",
+            "# TYPE voice_bridge_retries_total counter",
+            f"voice_bridge_retries_total {stats['retries']}",
+            "",
+            "# HELP voice_bridge_queue_depth Events waiting to be sent",
+            "# TYPE voice_bridge_queue_depth gauge",
+            f"voice_bridge_queue_depth {stats['queue_depth']}",
+            "",
+            "# HELP voice_bridge_delivery_latency_seconds Time from emit to bridge acknowledgement",
+            "# TYPE voice_bridge_delivery_latency_seconds summary",
+        ]
+        for q, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+            if latency[key] is not None:
+                lines.append(f'voice_bridge_delivery_latency_seconds{{quantile="{q}"}} {latency[key] / 1000:.4f}')
+        lines += [
+            f"voice_bridge_delivery_latency_seconds_sum {self.stats['latency_sum_s']:.4f}",
+            f"voice_bridge_delivery_latency_seconds_count {stats['sent']}",
+        ]
+        return "\n".join(lines) + "\n"
 
 
 # Global bridge emitter instance
@@ -211,8 +498,8 @@ class SessionContextExtractor:
                 logger.info("No workspace found - using base instructions")
                 return self._add_initial_message(base_instructions, initial_message)
             
-            # Extract context
-            context = self._extract_context(caller_phone)
+            # Precomputed snapshot for known callers; live extraction otherwise
+            context = self.get_cached_context(caller_phone) or self._extract_context(caller_phone)
             
             # Enhance instructions
             enhanced = self._build_enhanced_instructions(
@@ -226,6 +513,51 @@ class SessionContextExtractor:
             logger.warning(f"Context extraction failed: {e} - using base instructions")
             return self._add_initial_message(base_instructions, initial_message)
     
+    def get_cached_context(self, phone: str) -> Optional[Dict[str, Any]]:
+        """
+        Precomputed context for a known caller, or None.
+
+        Snapshots are rebuilt in the background (see caller_snapshots) after
+        calls end and when phone_mapping.json or the memory files change.
+        None for unknown and wildcard-matched callers and before the first
+        build, which callers treat as "extract live".
+        """
+        if not self.workspace_path or not (self.workspace_path / "phone_mapping.json").exists():
+            return None
+        refresher = snapshot_refresher(self.workspace_path, self.build_caller_snapshots, self.snapshot_sources)
+        return refresher.store.get(self._normalize_phone(phone))
+
+    def build_caller_snapshots(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Context for every exact number in phone_mapping.json, keyed by normalized number.
+
+        Same shape as _extract_context for a known caller. The memory files
+        are parsed once and shared by every caller.
+        """
+        mapping = watch_phone_mapping(self.workspace_path / "phone_mapping.json").reload()
+        conversations = self._get_recent_conversations()
+        snapshots = {}
+        for phone, mapped in mapping.items():
+            if phone.endswith("*") or not isinstance(mapped, dict):
+                continue  # Wildcard entries are resolved per call
+            context = {
+                "caller_info": {**mapped, "phone": phone, "known_caller": True},
+                "recent_conversations": list(conversations),
+                "context_summary": ""
+            }
+            context["context_summary"] = self._build_context_summary(context)
+            snapshots[phone] = context
+        return snapshots
+
+    def snapshot_sources(self) -> List[Path]:
+        """Files build_caller_snapshots reads; the daily ones follow the date."""
+        sources = [self.workspace_path / "phone_mapping.json", self.workspace_path / "MEMORY.md"]
+        if self.memory_path:
+            for days in range(RECENT_MEMORY_DAYS):
+                date = datetime.now() - timedelta(days=days)
+                sources.append(self.memory_path / f"{date.strftime('%Y-%m-%d')}.md")
+        return sources
+
     def _extract_context(self, phone: str) -> Dict[str, Any]:
         """Extract context for a phone number."""
         context = {
@@ -251,20 +583,16 @@ class SessionContextExtractor:
         return context
     
     def _get_caller_info(self, phone: str) -> Dict[str, Any]:
-        """Get caller information from phone mapping."""
+        """Get caller information from phone mapping (compiled once, reloaded on change)."""
         try:
-            # Try to load phone mapping
-            mapping_file = self.workspace_path / "phone_mapping.json"
-            if mapping_file.exists():
-                with open(mapping_file, 'r') as f:
-                    mapping = json.load(f)
-                
-                normalized_phone = self._normalize_phone(phone)
-                if normalized_phone in mapping:
-                    caller_info = mapping[normalized_phone].copy()
-                    caller_info["phone"] = normalized_phone
-                    caller_info["known_caller"] = True
-                    return caller_info
+            mapping = watch_phone_mapping(self.workspace_path / "phone_mapping.json").current()
+            normalized_phone = self._normalize_phone(phone)
+            mapped = mapping.lookup(normalized_phone)
+            if mapped is not None:
+                caller_info = mapped.copy()
+                caller_info["phone"] = normalized_phone
+                caller_info["known_caller"] = True
+                return caller_info
             
             # Unknown caller
             return {
@@ -278,7 +606,7 @@ class SessionContextExtractor:
             logger.warning(f"Error getting caller info: {e}")
             return {"phone": phone, "name": "Unknown", "known_caller": False}
     
-    def _get_recent_conversations(self, days_back: int = 2) -> List[Dict[str, str]]:
+    def _get_recent_conversations(self, days_back: int = RECENT_MEMORY_DAYS) -> List[Dict[str, str]]:
         """Get recent conversations from memory files."""
         conversations = []
         
@@ -486,10 +814,7 @@ class SessionContextExtractor:
     
     def _normalize_phone(self, phone: str) -> str:
         """Normalize phone number to E.164 format."""
-        clean = "".join(c for c in phone if c.isdigit() or c == "+")
-        if not clean.startswith("+"):
-            clean = "+" + clean
-        return clean
+        return normalize_phone(phone)
     
     def _mask_phone(self, phone: str) -> str:
         """Mask phone number for logging."""
@@ -556,6 +881,9 @@ def notify_call_ended(call_id: str, phone_number: str, direction: str = "inbound
     Call this when a call completes. The bridge will:
     1. Fetch the full transcript from /history/{call_id}/transcript
     2. Inject it into the corresponding OpenClaw session
+
+    Caller context snapshots are rebuilt too, so the next call from any
+    known caller starts with up-to-date context.
     
     Args:
         call_id: Call identifier
@@ -565,6 +893,7 @@ def notify_call_ended(call_id: str, phone_number: str, direction: str = "inbound
     Returns:
         True if event was queued for sending
     """
+    request_refresh("call_ended")
     return get_bridge_emitter().emit_call_ended(call_id, phone_number, direction)
 
 
@@ -11,15 +11,44 @@ Boundary priority (best to worst):
 3. Sentence endings (. ! ?)
 4. Clause endings (, ; :)
 5. Word boundaries (spaces)
+
+AdaptiveChunker starts with a clause-sized chunk and grows from there, for
+a fast first response on voice calls.
 """
 
 import re
-from typing import List, Optional
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+
+# Candidate tables, in priority order (lower index = better break point).
+# Word gaps (WORD) are the fallback and are located on demand, not tabled.
+PARAGRAPH, LIST_ITEM, SENTENCE, CLAUSE, WORD = range(5)
+
+# Whitespace after sentence/clause punctuation, or a single newline
+_EVENT = re.compile(r'(?<=[.!?,;:])(\s+)|\n')
+_WS_RUN = re.compile(r'\s+')
+# List-item lookahead after a newline, and the prefixes that may still become one
+_LIST_AHEAD = re.compile(r'\s*[-*•]\s|\s*\d+[.)]\s')
+_LIST_PARTIAL = re.compile(r'\s*(?:[-*•]|\d+[.)]?)?')
+_SENTENCE_PUNCT = '.!?'
+_COMPACT_MIN = 4096
+
+# AdaptiveChunker: first chunk size (about one clause) and per-chunk growth
+FIRST_CHUNK_SIZE = 60
+CHUNK_GROWTH = 2.0
 
 
 class SmartChunker:
     """
     Buffers streaming text and yields chunks at natural boundaries.
+
+    Incoming text is scanned once: a scan cursor moves forward through the
+    buffer and records candidate break positions (paragraph breaks, list
+    items, whitespace after sentence/clause punctuation) in one sorted table
+    per priority. Choosing a break is a bisect over those tables, falling
+    back to the word gap nearest the target — nothing already scanned is
+    searched again, so token-by-token input costs O(1) amortized per
+    character.
     
     Usage:
         chunker = SmartChunker(target_size=500)
@@ -35,12 +64,17 @@ class SmartChunker:
             send_to_tts(final)
     """
     
-    # Boundary patterns in priority order (higher = better break point)
+    # Boundary patterns in priority order (higher = better break point).
+    # The scanner implements exactly these matches incrementally.
     PARAGRAPH_BREAK = re.compile(r'\n\n+')
     LIST_ITEM = re.compile(r'\n(?=\s*[-*•]\s|\s*\d+[.)]\s)')
     SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
     CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
     WORD_BOUNDARY = re.compile(r'\s+')
+
+    # Only break at a word gap once the search region is complete, i.e. no
+    # better boundary can still arrive (off: break as soon as one is seen)
+    HOLD_WORD_BREAKS = False
     
     def __init__(
         self,
@@ -59,8 +93,29 @@ class SmartChunker:
         self.target_size = target_size
         self.min_size = min_size
         self.max_size = max_size
-        self._buffer = ""
         self._ready_chunks: List[str] = []
+        self._reset()
+
+    def _reset(self) -> None:
+        """Empty the buffer and scanner state."""
+        # Text storage: _text holds absolute offsets [_offset, _offset + len);
+        # fragments not yet needed for slicing wait in _pending.
+        self._text = ""
+        self._offset = 0
+        self._pending: List[str] = []
+        self._base = 0          # Absolute offset where the buffer starts
+        self._end = 0           # Absolute offset of the end of the buffer
+        self._cursor = 0        # Scan cursor: candidates are known for [.., _cursor)
+
+        # Scanner state
+        self._ws_open: Optional[int] = None  # Table whose last candidate may still grow
+        self._nl_start = -1                  # Start / end / length of the current newline run
+        self._nl_end = -1
+        self._nl_count = 0
+        self._list_checks: List[int] = []    # Newlines whose list-item lookahead hit the cursor
+
+        # Candidate tables: (starts, ends) per priority, sorted, non-overlapping
+        self._cands: List[Tuple[List[int], List[int]]] = [([], []) for _ in range(WORD)]
     
     def add_text(self, text: str) -> None:
         """
@@ -72,7 +127,8 @@ class SmartChunker:
         if not text:
             return
         
-        self._buffer += text
+        self._pending.append(text)
+        self._end += len(text)
         self._process_buffer()
     
     def get_chunks(self) -> List[str]:
@@ -93,13 +149,92 @@ class SmartChunker:
         Returns:
             Any remaining buffered text
         """
-        remaining = self._buffer.strip()
-        self._buffer = ""
+        remaining = self._buffer_text().strip()
+        self._reset()
         return remaining
-    
+
+    # ── Scanner ─────────────────────────────────────────────────────────────
+
+    def _scan_to(self, limit: int) -> None:
+        """
+        Advance the scan cursor to absolute offset `limit`, recording candidates.
+
+        Text before the current search region can never hold a break point,
+        so the cursor jumps straight to the region. Lookaheads stop at
+        `limit` (the region end), just as a regex over the region would.
+        """
+        skip_to = self._base + max(self.min_size, self.target_size // 2) - 1
+        if self._cursor < skip_to:
+            self._cursor = skip_to
+            self._ws_open = None
+            self._nl_end = -1
+            self._list_checks = []
+        if self._cursor >= limit:
+            return
+
+        text = self._materialize()
+        off = self._offset
+        j, end = self._cursor - off, limit - off
+
+        if self._list_checks:
+            checks, self._list_checks = self._list_checks, []
+            for pos in checks:
+                self._check_list_item(text, pos - off, end, off)
+        if self._ws_open is not None:
+            m = _WS_RUN.match(text, j, end)
+            if m:
+                self._cands[self._ws_open][1][-1] = off + m.end()
+                self._scan_newlines(text, j, m.end(), end, off)
+                j = m.end()
+            if j < end:
+                self._ws_open = None
+
+        for m in _EVENT.finditer(text, j, end):
+            a, b = m.span()
+            if m.lastindex is None:
+                self._scan_newlines(text, a, b, end, off)
+                continue
+            kind = SENTENCE if text[a - 1] in _SENTENCE_PUNCT else CLAUSE
+            starts, ends = self._cands[kind]
+            starts.append(off + a)
+            ends.append(off + b)
+            self._ws_open = kind if b == end else None
+            self._scan_newlines(text, a, b, end, off)
+        self._cursor = limit
+
+    def _scan_newlines(self, text: str, a: int, b: int, end: int, off: int) -> None:
+        """Record paragraph runs and list-item lookaheads for newlines in text[a:b]."""
+        q = text.find('\n', a, b)
+        while q != -1:
+            i = off + q
+            if self._nl_end == i:
+                self._nl_count += 1
+                starts, ends = self._cands[PARAGRAPH]
+                if self._nl_count == 2:
+                    starts.append(self._nl_start)
+                    ends.append(i + 1)
+                else:
+                    ends[-1] = i + 1
+            else:
+                self._nl_start, self._nl_count = i, 1
+            self._nl_end = i + 1
+            self._check_list_item(text, q, end, off)
+            q = text.find('\n', q + 1, b)
+
+    def _check_list_item(self, text: str, q: int, end: int, off: int) -> None:
+        """Test whether the newline at text[q] starts a list item."""
+        if _LIST_AHEAD.match(text, q + 1, end):
+            starts, ends = self._cands[LIST_ITEM]
+            starts.append(off + q)
+            ends.append(off + q + 1)
+        elif _LIST_PARTIAL.fullmatch(text, q + 1, end):
+            self._list_checks.append(off + q)  # Undecided until more text is scanned
+
+    # ── Chunk extraction ────────────────────────────────────────────────────
+
     def _process_buffer(self) -> None:
         """Process buffer and extract complete chunks."""
-        while len(self._buffer) >= self.min_size:
+        while self._end - self._base >= self.min_size:
             chunk = self._extract_chunk()
             if chunk:
                 self._ready_chunks.append(chunk)
@@ -113,106 +248,237 @@ class SmartChunker:
         Returns:
             Extracted chunk or None if no good boundary found
         """
+        length = self._end - self._base
         # Don't extract if buffer is too small
-        if len(self._buffer) < self.min_size:
+        if length < self.min_size:
             return None
         
-        # Search window: from min_size to min(max_size, buffer_length)
-        search_end = min(self.max_size, len(self._buffer))
-        search_text = self._buffer[:search_end]
-        
         # Find best boundary in priority order
-        break_pos = self._find_best_boundary(search_text)
+        break_pos = self._find_best_boundary()
         
         if break_pos is None:
             # No boundary found - only force break if we hit max_size
-            if len(self._buffer) >= self.max_size:
-                break_pos = self._force_word_boundary(search_text)
+            if length >= self.max_size:
+                break_pos = self._force_word_boundary()
             else:
                 return None
         
-        # Extract chunk and update buffer
-        chunk = self._buffer[:break_pos].strip()
-        self._buffer = self._buffer[break_pos:].lstrip()
+        # Extract chunk and advance the buffer start past leading whitespace
+        text = self._materialize()
+        start = self._base - self._offset
+        cut = start + break_pos
+        chunk = text[start:cut].strip()
+        while cut < len(text) and text[cut].isspace():
+            cut += 1
+        self._advance_base(self._offset + cut)
         
         return chunk if chunk else None
     
-    def _find_best_boundary(self, text: str) -> Optional[int]:
+    def _find_best_boundary(self) -> Optional[int]:
         """
-        Find the best boundary position in text.
-        
-        Searches from target_size backward, preferring higher-priority
-        boundaries (paragraphs > sentences > clauses > words).
+        Find the best boundary position in the buffer.
         
-        Args:
-            text: Text to search for boundaries
+        Searches around target_size, preferring higher-priority
+        boundaries (paragraphs > lists > sentences > clauses > words).
             
         Returns:
-            Position of best boundary or None
+            Break position relative to the buffer start, or None
         """
-        # Ideal: find boundary near target_size
-        # Search backward from target to find natural break
-        search_start = max(self.min_size, self.target_size // 2)
-        search_end = min(len(text), self.target_size + 100)
-        search_region = text[search_start:search_end]
-        
-        # Try each boundary type in priority order
-        boundaries = [
-            (self.PARAGRAPH_BREAK, 'paragraph'),
-            (self.LIST_ITEM, 'list'),
-            (self.SENTENCE_END, 'sentence'),
-            (self.CLAUSE_END, 'clause'),
-            (self.WORD_BOUNDARY, 'word'),
-        ]
-        
-        for pattern, _ in boundaries:
-            matches = list(pattern.finditer(search_region))
-            if matches:
-                # Find match closest to target_size
-                best_match = self._closest_to_target(matches, search_start)
-                return search_start + best_match.end()
-        
-        return None
-    
-    def _closest_to_target(self, matches: list, offset: int) -> re.Match:
-        """Find match closest to target size."""
-        target_pos = self.target_size - offset
-        return min(matches, key=lambda m: abs(m.start() - target_pos))
+        base = self._base
+        search_len = min(self.max_size, self._end - base)
+        region_start = base + max(self.min_size, self.target_size // 2)
+        region_end = base + min(search_len, self.target_size + 100)
+        if region_end <= region_start:
+            return None
+        self._scan_to(region_end)
+        target = base + self.target_size
+
+        for kind, (starts, ends) in enumerate(self._cands):
+            if kind in (SENTENCE, CLAUSE):
+                # The punctuation itself must lie inside the search region
+                lo = bisect_right(starts, region_start)
+            else:
+                lo = bisect_right(ends, region_start)
+            hi = bisect_left(starts, region_end, lo)
+            if kind == PARAGRAPH:
+                # A run cut by the region edges must still hold two newlines
+                if lo < hi and min(ends[lo], region_end) - max(starts[lo], region_start) < 2:
+                    lo += 1
+                if lo < hi and min(ends[hi - 1], region_end) - max(starts[hi - 1], region_start) < 2:
+                    hi -= 1
+            if lo >= hi:
+                continue
+            # Closest (clipped) start to target; ties go to the earlier one
+            k = bisect_left(starts, target, lo, hi)
+            best = None
+            for idx in (k - 1, k):
+                if lo <= idx < hi:
+                    dist = abs(max(starts[idx], region_start) - target)
+                    if best is None or dist < best[0]:
+                        best = (dist, idx)
+            return min(ends[best[1]], region_end) - base
+
+        if self.HOLD_WORD_BREAKS and region_end < base + min(self.max_size, self.target_size + 100):
+            return None
+        gap = self._nearest_word_gap(region_start, region_end, target)
+        return gap - base if gap is not None else None
+
+    def _nearest_word_gap(self, region_start: int, region_end: int, target: int) -> Optional[int]:
+        """
+        End of the whitespace run whose (clipped) start is closest to target.
+
+        Only the runs on either side of target are examined.
+        """
+        text = self._materialize()
+        off = self._offset
+        rs, re_, tg = region_start - off, region_end - off, target - off
+        best = None
+
+        # Last run starting before target
+        q = min(tg, re_) - 1
+        while q >= rs and not text[q].isspace():
+            q -= 1
+        if q >= rs:
+            s = q
+            while s > rs and text[s - 1].isspace():
+                s -= 1
+            best = (tg - s, _WS_RUN.match(text, q, re_).end())
+
+        # First run starting at or after target
+        p = min(max(tg, rs), re_)
+        if p > rs and text[p - 1].isspace():
+            m = _WS_RUN.match(text, p, re_)
+            if m:
+                p = m.end()
+        m = _WS_RUN.search(text, p, re_)
+        if m and (best is None or m.start() - tg < best[0]):
+            best = (m.start() - tg, m.end())
+
+        return best[1] + off if best is not None else None
     
-    def _force_word_boundary(self, text: str) -> int:
+    def _force_word_boundary(self) -> int:
         """
         Force a break at a word boundary when max_size reached.
-        
-        Args:
-            text: Text to find word boundary in
             
         Returns:
             Position of last word boundary before max_size
         """
+        text = self._materialize()
+        start = self._base - self._offset
         # Find last space before max_size
-        last_space = text.rfind(' ')
+        last_space = text.rfind(' ', start, start + self.max_size) - start
         if last_space > self.min_size:
             return last_space + 1
         
         # No space found - break at max_size (shouldn't happen with normal text)
         return self.max_size
+
+    # ── Buffer storage ──────────────────────────────────────────────────────
+
+    def _materialize(self) -> str:
+        """Fold pending fragments into _text (only when a slice is needed)."""
+        if self._pending:
+            self._text = "".join([self._text, *self._pending])
+            self._pending = []
+        return self._text
+
+    def _advance_base(self, new_base: int) -> None:
+        """Drop consumed text and candidates that can no longer be chosen."""
+        self._base = new_base
+        if new_base >= self._cursor:
+            # The open whitespace/newline run (if any) was consumed with the chunk
+            self._ws_open = None
+            self._nl_end = -1
+        for starts, ends in self._cands:
+            k = bisect_right(ends, new_base)
+            if k:
+                del starts[:k]
+                del ends[:k]
+        consumed = new_base - self._offset
+        if consumed > _COMPACT_MIN and consumed * 2 > len(self._text):
+            self._text = self._text[consumed:]
+            self._offset = new_base
+
+    def _buffer_text(self) -> str:
+        text = self._materialize()
+        return text[self._base - self._offset:]
     
     @property
     def buffer_size(self) -> int:
         """Current buffer size in characters."""
-        return len(self._buffer)
+        return self._end - self._base
     
     @property
     def has_content(self) -> bool:
         """Whether buffer has any content."""
-        return bool(self._buffer.strip())
+        return bool(self._buffer_text().strip())
     
     def clear(self) -> None:
         """Clear buffer and ready chunks."""
-        self._buffer = ""
+        self._reset()
         self._ready_chunks = []
 
 
+class AdaptiveChunker(SmartChunker):
+    """
+    SmartChunker whose chunks start small and grow.
+
+    The first chunk targets first_size characters (about one clause), so the
+    caller hears something as soon as possible; each following chunk doubles
+    the target until it reaches target_size, where larger chunks keep TTS
+    prosody natural and cut per-chunk overhead.
+
+    Word gaps are held back until the search region is complete, so a
+    small chunk ends on punctuation whenever the text allows it.
+    force_chunk() releases whatever is buffered regardless of size, for a
+    deadline-driven first chunk; it counts as a chunk for the growth
+    schedule.
+    """
+
+    HOLD_WORD_BREAKS = True
+
+    def __init__(
+        self,
+        target_size: int = 500,
+        min_size: int = 100,
+        max_size: int = 1000,
+        first_size: int = FIRST_CHUNK_SIZE,
+        growth: float = CHUNK_GROWTH
+    ):
+        self.final_sizes = (target_size, min_size, max_size)
+        self.first_size = min(first_size, target_size)
+        self.growth = max(growth, 1.0)
+        self.chunks_emitted = 0
+        super().__init__(*self._sizes_for(0))
+
+    def _sizes_for(self, n: int) -> Tuple[int, int, int]:
+        """(target, min, max) for the n-th chunk; never shrinks as n grows."""
+        final_target, final_min, final_max = self.final_sizes
+        target = min(final_target, int(self.first_size * self.growth ** n))
+        if target >= final_target:
+            return self.final_sizes
+        min_size = min(final_min, max(target // 3, 1))
+        max_size = min(final_max, max(target * 2, target + 100))
+        return target, min_size, max_size
+
+    def _advance_schedule(self) -> None:
+        self.chunks_emitted += 1
+        self.target_size, self.min_size, self.max_size = self._sizes_for(self.chunks_emitted)
+
+    def _extract_chunk(self) -> Optional[str]:
+        chunk = super()._extract_chunk()
+        if chunk:
+            self._advance_schedule()
+        return chunk
+
+    def force_chunk(self) -> str:
+        """Release the whole buffer as one chunk now (empty string if nothing buffered)."""
+        chunk = self.flush()
+        if chunk:
+            self._advance_schedule()
+        return chunk
+
+
 def chunk_text(text: str, target_size: int = 500) -> List[str]:
     """
     Convenience function to chunk a complete text.
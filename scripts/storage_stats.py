@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Storage Stats - Incrementally maintained call_history.db storage counters.
+
+get_storage_stats used to run four COUNT(*) queries over calls and walk the
+whole recordings directory summing file sizes, every time it was asked.
+The counters now live in the storage_stats table (see db_migrations):
+
+- Calls by status, calls with audio / transcripts and transcript entries
+  are kept by triggers, so every writer (the server, cleanup scripts,
+  retention) updates them in the same transaction as the rows
+- recording_bytes is kept by the recording write path: files are counted
+  when their call ends and subtracted when they are deleted or archived
+- reconcile() recomputes everything from scratch (counts plus a walk of the
+  recordings directory) and logs any drift; StorageStatsMonitor runs it
+  every STORAGE_STATS_RECONCILE_INTERVAL in a thread
+
+StorageStatsMonitor also re-reads the table every
+STORAGE_STATS_REFRESH_INTERVAL and renders Prometheus gauges from that
+cached snapshot, so a scrape runs no query at all.
+
+Usage:
+    monitor = StorageStatsMonitor(db_path, recordings_dir)
+    await monitor.start()
+    monitor.get_prometheus_metrics()
+    add_recording_bytes(conn, size)          # inside a write transaction
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from db_migrations import STORAGE_STATS_VERSION, schema_version, storage_counts
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+STORAGE_STATS_REFRESH_INTERVAL = float(os.getenv("STORAGE_STATS_REFRESH_INTERVAL", "15"))       # seconds
+STORAGE_STATS_RECONCILE_INTERVAL = float(os.getenv("STORAGE_STATS_RECONCILE_INTERVAL", "21600"))  # seconds
+
+STATUS_PREFIX = "calls_status:"
+
+
+def read_storage_stats(conn: sqlite3.Connection) -> Optional[Dict[str, int]]:
+    """The storage_stats counters, or None before the migration that adds them."""
+    if schema_version(conn) < STORAGE_STATS_VERSION:
+        return None
+    return dict(conn.execute("SELECT key, value FROM storage_stats"))
+
+
+def add_recording_bytes(conn: sqlite3.Connection, delta: int) -> None:
+    """Adjust recording_bytes by delta (no-op before the storage_stats migration)."""
+    if delta and schema_version(conn) >= STORAGE_STATS_VERSION:
+        conn.execute(
+            "UPDATE storage_stats SET value = value + ? WHERE key = 'recording_bytes'", (delta,)
+        )
+
+
+def file_size(path: Optional[str]) -> int:
+    """Size of path in bytes, 0 if it is unset or gone."""
+    try:
+        return os.stat(path).st_size if path else 0
+    except OSError:
+        return 0
+
+
+def directory_size(directory: Path) -> int:
+    if not directory.exists():
+        return 0
+    return sum(f.stat().st_size for f in directory.rglob("*") if f.is_file())
+
+
+def reconcile(db_path: Path, recordings_dir: Path) -> Dict[str, int]:
+    """
+    Recompute every counter from the tables and the recordings directory.
+
+    Returns the drift that was corrected, {key: actual - stored}, empty if
+    the incremental counters were exact.
+    """
+    recording_bytes = directory_size(recordings_dir)  # Slow part: outside the transaction
+    conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) < STORAGE_STATS_VERSION:
+                conn.execute("ROLLBACK")
+                return {}
+            stored = dict(conn.execute("SELECT key, value FROM storage_stats"))
+            actual = {**storage_counts(conn), "recording_bytes": recording_bytes}
+            for key in stored:
+                if key.startswith(STATUS_PREFIX):
+                    actual.setdefault(key, 0)
+            conn.execute("DELETE FROM storage_stats")
+            conn.executemany(
+                "INSERT INTO storage_stats (key, value) VALUES (?, ?)",
+                [*actual.items(), ("reconciled_at", int(time.time()))]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+    drift = {key: value - stored.get(key, 0) for key, value in actual.items() if value != stored.get(key, 0)}
+    if drift:
+        logger.info(f"Storage stats reconciled, corrected drift: {drift}")
+    return drift
+
+
+def summarize(counters: Dict[str, int]) -> Dict[str, Any]:
+    """get_storage_stats-shaped view of the raw counters."""
+    by_status = {
+        key[len(STATUS_PREFIX):]: value
+        for key, value in sorted(counters.items())
+        if key.startswith(STATUS_PREFIX) and value
+    }
+    return {
+        "total_calls": counters.get("calls_total", 0),
+        "active_calls": by_status.get("active", 0),
+        "calls_by_status": by_status,
+        "calls_with_audio": counters.get("calls_with_audio", 0),
+        "calls_with_transcripts": counters.get("calls_with_transcripts", 0),
+        "transcript_entries": counters.get("transcript_entries", 0),
+        "recordings_size_mb": counters.get("recording_bytes", 0) / 1024 / 1024,
+        "reconciled_at": counters.get("reconciled_at") or None,
+    }
+
+
+class StorageStatsMonitor:
+    """Cached storage counters for gauges; refreshed and reconciled in the background."""
+
+    def __init__(
+        self,
+        db_path: Path,
+        recordings_dir: Path,
+        refresh_interval: float = STORAGE_STATS_REFRESH_INTERVAL,
+        reconcile_interval: float = STORAGE_STATS_RECONCILE_INTERVAL,
+    ):
+        self.db_path = Path(db_path)
+        self.recordings_dir = Path(recordings_dir)
+        self.refresh_interval = refresh_interval
+        self.reconcile_interval = reconcile_interval
+        self.snapshot: Dict[str, int] = {}
+        self.database_bytes = 0
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "refreshes": 0,
+            "reconciles": 0,
+            "last_drift": {},
+            "errors": 0,
+        }
+
+    def refresh(self) -> Dict[str, int]:
+        """Re-read the counters (one small query) into the cached snapshot."""
+        with sqlite3.connect(self.db_path, timeout=30.0) as conn:
+            counters = read_storage_stats(conn)
+        if counters is not None:
+            self.snapshot = counters
+        self.database_bytes = sum(
+            file_size(f"{self.db_path}{suffix}") for suffix in ("", "-wal")
+        )
+        self.stats["refreshes"] += 1
+        return self.snapshot
+
+    def reconcile(self) -> Dict[str, int]:
+        drift = reconcile(self.db_path, self.recordings_dir)
+        self.stats["reconciles"] += 1
+        self.stats["last_drift"] = drift
+        self.refresh()
+        return drift
+
+    def _reconcile_due(self) -> bool:
+        if not self.snapshot:
+            return False  # Before the migration: nothing to reconcile yet
+        return time.time() - self.snapshot.get("reconciled_at", 0) >= self.reconcile_interval
+
+    def tick(self) -> None:
+        """One background step: refresh, and reconcile when due."""
+        self.refresh()
+        if self._reconcile_due():
+            self.reconcile()
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.tick)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error(f"Storage stats refresh failed: {e}", exc_info=True)
+            await asyncio.sleep(self.refresh_interval)
+
+    def get_prometheus_metrics(self) -> str:
+        """Storage gauges from the cached snapshot (no database access)."""
+        summary = summarize(self.snapshot)
+        lines = [
+            "# HELP voice_storage_calls Stored call records by status",
+            "# TYPE voice_storage_calls gauge",
+            *(f'voice_storage_calls{{status="{status}"}} {count}'
+              for status, count in summary["calls_by_status"].items()),
+            "",
+            "# HELP voice_storage_calls_with_audio Stored calls with an audio recording",
+            "# TYPE voice_storage_calls_with_audio gauge",
+            f"voice_storage_calls_with_audio {summary['calls_with_audio']}",
+            "",
+            "# HELP voice_storage_calls_with_transcripts Stored calls with a transcript",
+            "# TYPE voice_storage_calls_with_transcripts gauge",
+            f"voice_storage_calls_with_transcripts {summary['calls_with_transcripts']}",
+            "",
+            "# HELP voice_storage_transcript_entries Transcript entries in call_history.db",
+            "# TYPE voice_storage_transcript_entries gauge",
+            f"voice_storage_transcript_entries {summary['transcript_entries']}",
+            "",
+            "# HELP voice_storage_recordings_bytes Bytes in the recordings directory",
+            "# TYPE voice_storage_recordings_bytes gauge",
+            f"voice_storage_recordings_bytes {self.snapshot.get('recording_bytes', 0)}",
+            "",
+            "# HELP voice_storage_database_bytes Size of call_history.db and its WAL",
+            "# TYPE voice_storage_database_bytes gauge",
+            f"voice_storage_database_bytes {self.database_bytes}",
+            "",
+            "# HELP voice_storage_reconciled_timestamp_seconds Last full recount of the storage counters",
+            "# TYPE voice_storage_reconciled_timestamp_seconds gauge",
+            f"voice_storage_reconciled_timestamp_seconds {self.snapshot.get('reconciled_at', 0)}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "storage": summarize(self.snapshot),
+            "database_bytes": self.database_bytes,
+            "refresh_interval_s": self.refresh_interval,
+            **self.stats,
+        }
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tool Scheduler - Bounded, prioritized execution of voice tool calls.
+
+Every tool call used to be a bare asyncio.create_task(): tasks could outlive
+the call, and nothing limited how many subprocesses or gateway requests ran
+across all concurrent calls. The scheduler adds:
+
+- Per-call task groups, cancelled together when the media stream stops
+- A global slot limit per tool class (subprocess, http, file)
+- Priority: interactive tool calls are served before background work
+  (post-call summaries, mid-call compaction) waiting on the same class
+- Graceful overload: when a class's wait queue is full, new work is
+  rejected immediately with SchedulerOverloaded instead of piling up
+  (background work is shed first, at half the queue depth)
+- Queue depth and wait-time metrics per class
+
+Usage in webhook-server.py:
+    task = tool_scheduler.spawn(call_sid, dispatch_tool_call(...))
+
+    async with tool_scheduler.slot("subprocess", Priority.INTERACTIVE):
+        await run_the_tool()
+
+    await tool_scheduler.cancel_call(call_sid)   # on stream stop
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Coroutine, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Concurrent slots per tool class, shared by all calls
+TOOL_CLASS_LIMITS: Dict[str, int] = {
+    "subprocess": int(os.getenv("TOOL_SUBPROCESS_CONCURRENCY", "4")),
+    "http": int(os.getenv("TOOL_HTTP_CONCURRENCY", "8")),
+    "file": int(os.getenv("TOOL_FILE_CONCURRENCY", "8")),
+}
+# Waiters allowed per class before new work is rejected
+TOOL_MAX_QUEUE_DEPTH = int(os.getenv("TOOL_MAX_QUEUE_DEPTH", "16"))
+
+
+class Priority(IntEnum):
+    """Lower value is served first."""
+    INTERACTIVE = 0   # The caller is waiting on it
+    BACKGROUND = 1    # Summaries, compaction, housekeeping
+
+
+class SchedulerOverloaded(Exception):
+    """Raised when a tool class's wait queue is full."""
+
+
+class PrioritySemaphore:
+    """
+    Counting semaphore whose waiters are woken by (priority, arrival order).
+
+    A released slot is handed directly to the next waiter, so a burst of new
+    arrivals cannot starve queued interactive work.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(limit, 1)
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = Priority.INTERACTIVE) -> None:
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just as we were cancelled — pass it on
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.active -= 1
+        while self._waiters and self.active < self.limit:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue  # Cancelled waiter
+            self.active += 1
+            fut.set_result(None)
+
+
+class ToolScheduler:
+    """Per-call task groups plus prioritized, bounded slots per tool class."""
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None,
+                 max_queue_depth: int = TOOL_MAX_QUEUE_DEPTH):
+        self.limits = dict(TOOL_CLASS_LIMITS if limits is None else limits)
+        self.max_queue_depth = max_queue_depth
+        self._semaphores = {cls: PrioritySemaphore(n) for cls, n in self.limits.items()}
+        self._groups: Dict[str, Set[asyncio.Task]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {
+            cls: {"started": 0, "rejected": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+            for cls in self.limits
+        }
+
+    # ── Slots ───────────────────────────────────────────────────────────────
+
+    @asynccontextmanager
+    async def slot(self, tool_class: str, priority: Priority = Priority.INTERACTIVE):
+        """Hold one slot of tool_class for the duration of the block."""
+        sem = self._semaphores.get(tool_class)
+        if sem is None:
+            yield  # Unclassified work is not limited
+            return
+
+        stats = self._stats[tool_class]
+        queue_limit = self.max_queue_depth if priority == Priority.INTERACTIVE else self.max_queue_depth // 2
+        if sem.active >= sem.limit and sem.waiting >= queue_limit:
+            stats["rejected"] += 1
+            logger.warning(
+                f"Tool scheduler overloaded: class={tool_class} active={sem.active} "
+                f"waiting={sem.waiting} priority={priority.name}"
+            )
+            raise SchedulerOverloaded(f"Too many {tool_class} tasks queued")
+
+        queued_at = time.monotonic()
+        await sem.acquire(priority)
+        wait_ms = (time.monotonic() - queued_at) * 1000
+        stats["started"] += 1
+        stats["wait_ms_total"] += wait_ms
+        stats["wait_ms_max"] = max(stats["wait_ms_max"], wait_ms)
+        try:
+            yield
+        finally:
+            sem.release()
+
+    # ── Per-call task groups ────────────────────────────────────────────────
+
+    def spawn(self, call_sid: Optional[str], coro: Coroutine[Any, Any, Any]) -> asyncio.Task:
+        """Run coro as a task owned by call_sid's group."""
+        task = asyncio.create_task(coro)
+        group = self._groups.setdefault(call_sid or "", set())
+        group.add(task)
+
+        def _forget(t: asyncio.Task) -> None:
+            group.discard(t)
+            if not group and self._groups.get(call_sid or "") is group:
+                del self._groups[call_sid or ""]
+            if not t.cancelled() and t.exception() is not None:
+                logger.error(f"[call_id={call_sid}] Tool task failed: {t.exception()}")
+
+        task.add_done_callback(_forget)
+        return task
+
+    async def cancel_call(self, call_sid: Optional[str]) -> int:
+        """Cancel and await every task still running for a call."""
+        tasks = list(self._groups.pop(call_sid or "", set()))
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"[call_id={call_sid}] Cancelled {len(tasks)} outstanding tool task(s)")
+        return len(tasks)
+
+    def call_task_count(self, call_sid: Optional[str]) -> int:
+        return len(self._groups.get(call_sid or "", ()))
+
+    # ── Metrics ─────────────────────────────────────────────────────────────
+
+    def get_stats(self) -> Dict[str, Any]:
+        classes = {}
+        for cls, sem in self._semaphores.items():
+            stats = self._stats[cls]
+            started = stats["started"]
+            classes[cls] = {
+                "limit": sem.limit,
+                "active": sem.active,
+                "queue_depth": sem.waiting,
+                "started": int(started),
+                "rejected": int(stats["rejected"]),
+                "avg_wait_ms": round(stats["wait_ms_total"] / started, 1) if started else 0.0,
+                "max_wait_ms": round(stats["wait_ms_max"], 1),
+            }
+        return {
+            "classes": classes,
+            "calls_with_tasks": len(self._groups),
+            "tasks_in_flight": sum(len(g) for g in self._groups.values()),
+        }
+
+
+# Global scheduler shared by all calls in this process
+tool_scheduler = ToolScheduler()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Transcript Archive - Append-only call transcript storage with a recent-calls manifest.
+
+Transcripts used to be written as one pretty-printed JSON file per call, and
+every pre-call prompt globbed and sorted the whole directory just to read the
+newest three. The archive instead keeps:
+
+- segments/YYYY-MM.jsonl   append-only, one compact JSON record per call
+- manifest.jsonl           append-only index of recent calls
+                           (call_sid, time, turns, excerpts, segment offset)
+
+The newest TRANSCRIPT_MANIFEST_SIZE manifest entries are held in memory, so
+recent() is O(1) and never touches the segments; the manifest file is
+compacted back to that size once it doubles. A directory that only holds
+legacy per-call *.json files is indexed once on first use. Retention
+(call_retention.py) gzips finished months to segments/YYYY-MM.jsonl.gz;
+reads go through to them with the same offsets.
+
+Writes are synchronous and thread-safe; callers on the event loop should use
+asyncio.to_thread(archive.append, ...).
+
+Usage:
+    archive = get_archive(WORKSPACE_ROOT / "memory" / "call-transcripts")
+    archive.append(call_sid, transcript)
+    archive.recent(3)        # newest first
+    archive.get(call_sid)    # full record
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Recent calls kept in the in-memory manifest
+TRANSCRIPT_MANIFEST_SIZE = int(os.getenv("TRANSCRIPT_MANIFEST_SIZE", "50"))
+
+MANIFEST_NAME = "manifest.jsonl"
+SEGMENTS_DIR = "segments"
+EXCERPT_CHARS = 80
+
+
+@dataclass
+class ManifestEntry:
+    """Index record for one archived call."""
+    call_sid: str
+    recorded_at: str
+    turns: int
+    user_excerpt: str = ""        # First caller line
+    assistant_excerpt: str = ""   # First assistant line
+    segment: str = ""             # Segment file name ("" for legacy per-call files)
+    offset: int = 0
+    length: int = 0
+    legacy_file: str = ""         # Legacy per-call JSON file name, if any
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ManifestEntry":
+        fields = cls.__dataclass_fields__
+        return cls(**{k: v for k, v in data.items() if k in fields})
+
+
+def _excerpts(transcript: List[Dict[str, Any]]) -> tuple:
+    user = next((t.get("content", "") for t in transcript if t.get("speaker") == "user"), "")
+    assistant = next((t.get("content", "") for t in transcript if t.get("speaker") == "assistant"), "")
+    return user[:EXCERPT_CHARS], assistant[:EXCERPT_CHARS]
+
+
+class TranscriptArchive:
+    """Segment files plus a bounded recent-calls manifest for one directory."""
+
+    def __init__(self, root: Path, manifest_size: int = TRANSCRIPT_MANIFEST_SIZE):
+        self.root = Path(root)
+        self.manifest_size = max(manifest_size, 1)
+        self.manifest_path = self.root / MANIFEST_NAME
+        self._recent: Deque[ManifestEntry] = deque(maxlen=self.manifest_size)  # newest first
+        self._by_sid: Dict[str, ManifestEntry] = {}
+        self._manifest_lines = 0
+        self._manifest_mtime: Optional[tuple] = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    # ── Loading ─────────────────────────────────────────────────────────────
+
+    def _manifest_stat(self) -> Optional[tuple]:
+        """(mtime, size, inode): appends change the size, rewrites the inode."""
+        try:
+            st = self.manifest_path.stat()
+            return st.st_mtime_ns, st.st_size, st.st_ino
+        except OSError:
+            return None
+
+    def _ensure_loaded(self) -> None:
+        """Load the manifest once, and again only if another process rewrote it."""
+        mtime = self._manifest_stat()
+        if self._loaded and mtime == self._manifest_mtime:
+            return
+
+        entries: List[ManifestEntry] = []
+        lines = 0
+        if mtime is not None:
+            try:
+                with open(self.manifest_path) as f:
+                    for line in f:
+                        lines += 1
+                        try:
+                            entries.append(ManifestEntry.from_dict(json.loads(line)))
+                        except (ValueError, TypeError):
+                            continue  # Torn or foreign line
+            except OSError as e:
+                logger.warning(f"Could not read transcript manifest {self.manifest_path}: {e}")
+        elif self.root.exists():
+            entries = self._index_legacy_files()
+
+        self._recent.clear()
+        for entry in entries[-self.manifest_size:]:
+            self._recent.appendleft(entry)
+        self._by_sid = {e.call_sid: e for e in self._recent}
+        self._manifest_lines = lines
+        self._manifest_mtime = mtime
+        self._loaded = True
+
+    def _index_legacy_files(self) -> List[ManifestEntry]:
+        """Build entries (oldest first) from legacy per-call JSON files."""
+        entries = []
+        files = sorted(self.root.glob("*.json"), reverse=True)[:self.manifest_size]
+        for path in reversed(files):
+            try:
+                data = json.loads(path.read_text())
+                transcript = data.get("transcript", [])
+                user, assistant = _excerpts(transcript)
+                entries.append(ManifestEntry(
+                    call_sid=data.get("call_sid", path.stem),
+                    recorded_at=data.get("recorded_at", ""),
+                    turns=data.get("turns", len(transcript)),
+                    user_excerpt=user,
+                    assistant_excerpt=assistant,
+                    legacy_file=path.name,
+                ))
+            except Exception:
+                continue
+        return entries
+
+    # ── Writes ──────────────────────────────────────────────────────────────
+
+    def append(self, call_sid: str, transcript: List[Dict[str, Any]],
+               recorded_at: Optional[datetime] = None) -> ManifestEntry:
+        """Append one call to the current segment and index it."""
+        recorded_at = recorded_at or datetime.now()
+        record = {
+            "call_sid": call_sid,
+            "recorded_at": recorded_at.isoformat(),
+            "turns": len(transcript),
+            "transcript": transcript,
+        }
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+        with self._lock:
+            self._ensure_loaded()
+            segments = self.root / SEGMENTS_DIR
+            segments.mkdir(parents=True, exist_ok=True)
+            segment = f"{recorded_at.strftime('%Y-%m')}.jsonl"
+            with open(segments / segment, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+
+            user, assistant = _excerpts(transcript)
+            entry = ManifestEntry(
+                call_sid=call_sid,
+                recorded_at=record["recorded_at"],
+                turns=record["turns"],
+                user_excerpt=user,
+                assistant_excerpt=assistant,
+                segment=segment,
+                offset=offset,
+                length=len(line),
+            )
+            if len(self._recent) == self._recent.maxlen:
+                self._by_sid.pop(self._recent[-1].call_sid, None)
+            self._recent.appendleft(entry)
+            self._by_sid[call_sid] = entry
+
+            if self._manifest_lines + 1 > 2 * self.manifest_size or self._manifest_mtime is None:
+                self._rewrite_manifest()
+            else:
+                with open(self.manifest_path, "a") as f:
+                    f.write(json.dumps(asdict(entry)) + "\n")
+                self._manifest_lines += 1
+            self._manifest_mtime = self._manifest_stat()
+        return entry
+
+    def _rewrite_manifest(self) -> None:
+        """Atomically replace the manifest with the in-memory entries."""
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            for entry in reversed(self._recent):
+                f.write(json.dumps(asdict(entry)) + "\n")
+        os.replace(tmp, self.manifest_path)
+        self._manifest_lines = len(self._recent)
+
+    def compress_segments(self, before: datetime) -> int:
+        """Gzip segments for months that ended before `before`; returns how many."""
+        segments = self.root / SEGMENTS_DIR
+        if not segments.exists():
+            return 0
+        cutoff = before.strftime("%Y-%m")
+        compressed = 0
+        with self._lock:
+            for path in sorted(segments.glob("*.jsonl")):
+                if path.stem >= cutoff:
+                    continue  # Month not over yet (or still inside retention)
+                target = path.with_name(f"{path.name}.gz")
+                tmp = path.with_name(f"{path.name}.gz.tmp")
+                with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+                    while True:
+                        chunk = src.read(1 << 20)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                os.replace(tmp, target)
+                path.unlink()
+                compressed += 1
+        if compressed:
+            logger.info(f"Compressed {compressed} transcript segment(s) in {segments}")
+        return compressed
+
+    # ── Reads ───────────────────────────────────────────────────────────────
+
+    def _open_segment(self, name: str) -> IO[bytes]:
+        """A segment for reading; falls back to its gzipped copy (same offsets)."""
+        path = self.root / SEGMENTS_DIR / name
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            return gzip.open(path.with_name(f"{name}.gz"), "rb")
+
+    def recent(self, limit: int) -> List[ManifestEntry]:
+        """Newest archived calls first, straight from the manifest."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._recent)[:max(limit, 0)]
+
+    def get(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        """Full transcript record for a call, or None."""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._by_sid.get(call_sid)
+        if entry is not None:
+            try:
+                if entry.legacy_file:
+                    return json.loads((self.root / entry.legacy_file).read_text())
+                with self._open_segment(entry.segment) as f:
+                    f.seek(entry.offset)
+                    return json.loads(f.read(entry.length))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Archived transcript for {call_sid} unreadable: {e}")
+                return None
+        return self._scan_segments(call_sid)
+
+    def _scan_segments(self, call_sid: str) -> Optional[Dict[str, Any]]:
+        """Slow path for calls that have aged out of the manifest."""
+        segments = self.root / SEGMENTS_DIR
+        if not segments.exists():
+            return None
+        needle = f'"call_sid":{json.dumps(call_sid)}'
+        paths = list(segments.glob("*.jsonl")) + list(segments.glob("*.jsonl.gz"))
+        for path in sorted(paths, key=lambda p: p.name.split(".")[0], reverse=True):
+            opener = gzip.open if path.suffix == ".gz" else open
+            with opener(path, "rt") as f:
+                for line in f:
+                    if needle in line:
+                        try:
+                            return json.loads(line)
+                        except ValueError:
+                            continue
+        return None
+
+
+_archives: Dict[Path, TranscriptArchive] = {}
+_archives_lock = threading.Lock()
+
+
+def get_archive(root: Path) -> TranscriptArchive:
+    """Process-wide archive for a directory."""
+    root = Path(root)
+    with _archives_lock:
+        archive = _archives.get(root)
+        if archive is None:
+            archive = _archives[root] = TranscriptArchive(root)
+        return archive
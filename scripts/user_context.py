@@ -15,7 +15,6 @@ Usage:
     # Returns: {"timezone": "Africa/Kigali", "location": "Rwanda", "name": "Remi", ...}
 """
 
-import json
 import logging
 import os
 import re
@@ -23,6 +22,8 @@ from datetime import datetime, timezone as tz
 from pathlib import Path
 from typing import Dict, Optional, Any
 
+from phone_routing import PhoneMapping, PhoneTrie, normalize_phone, watch_phone_mapping
+
 logger = logging.getLogger(__name__)
 
 # Country code to timezone mapping (primary timezone for each country)
@@ -172,6 +173,12 @@ COUNTRY_CODE_NAMES = {
 }
 
 
+# Country codes compiled for longest-prefix lookup on the digits after "+"
+_COUNTRY_CODE_TRIE: PhoneTrie[str] = PhoneTrie()
+for _code in COUNTRY_CODE_TIMEZONES:
+    _COUNTRY_CODE_TRIE.add(_code, _code, prefix=True)
+
+
 class UserContextResolver:
     """
     Resolve user context (timezone, location, name) from phone numbers.
@@ -179,6 +186,9 @@ class UserContextResolver:
     Priority:
     1. Explicit mapping in phone_mapping.json (highest priority)
     2. Country code inference (fallback)
+    
+    The mapping file is compiled once and recompiled when it changes
+    (see phone_routing.watch_phone_mapping).
     """
     
     def __init__(self, mapping_path: Optional[Path] = None):
@@ -194,31 +204,19 @@ class UserContextResolver:
             script_dir = Path(__file__).parent
             mapping_path = script_dir.parent / "phone_mapping.json"
         
-        self.mapping_path = mapping_path
-        self.phone_mapping = self._load_mapping()
-    
-    def _load_mapping(self) -> Dict[str, Dict[str, Any]]:
-        """Load phone mapping from JSON file."""
+        self.mapping_path = Path(mapping_path)
         if not self.mapping_path.exists():
             logger.warning(f"Phone mapping not found at {self.mapping_path}")
-            return {}
-        
-        try:
-            with open(self.mapping_path, 'r') as f:
-                data = json.load(f)
-                # Filter out comments
-                return {k: v for k, v in data.items() if not k.startswith("_")}
-        except Exception as e:
-            logger.error(f"Error loading phone mapping: {e}")
-            return {}
+        self._mapping_file = watch_phone_mapping(self.mapping_path)
+    
+    @property
+    def phone_mapping(self) -> PhoneMapping:
+        """Current compiled phone mapping (comments filtered out)."""
+        return self._mapping_file.current()
     
     def _normalize_phone(self, phone: str) -> str:
         """Normalize phone number to E.164 format."""
-        # Remove all non-digit characters except leading +
-        clean = "".join(c for c in phone if c.isdigit() or c == "+")
-        if not clean.startswith("+"):
-            clean = "+" + clean
-        return clean
+        return normalize_phone(phone)
     
     def _extract_country_code(self, phone: str) -> Optional[str]:
         """
@@ -230,18 +228,8 @@ class UserContextResolver:
         if not phone.startswith("+"):
             return None
         
-        # Remove the leading +
-        digits = phone[1:]
-        
-        # Try matching from longest to shortest country codes
-        # Most country codes are 1-3 digits
-        for length in [3, 2, 1]:
-            if len(digits) >= length:
-                code = digits[:length]
-                if code in COUNTRY_CODE_TIMEZONES:
-                    return code
-        
-        return None
+        # Longest matching country code after the leading +
+        return _COUNTRY_CODE_TRIE.longest(phone[1:])
     
     def _infer_from_country_code(self, phone: str) -> Dict[str, Any]:
         """
@@ -294,8 +282,8 @@ class UserContextResolver:
         context["known_user"] = False
         
         # Override with explicit mapping if available
-        if phone in self.phone_mapping:
-            explicit = self.phone_mapping[phone]
+        explicit = self.phone_mapping.lookup(phone)
+        if explicit is not None:
             context.update(explicit)
             context["known_user"] = True
             context["inferred"] = False
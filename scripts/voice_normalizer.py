@@ -0,0 +1,169 @@
+"""
+Voice Normalizer for OpenClaw Output
+
+Turns markdown from the OpenClaw agent into plain text for TTS. Works
+incrementally: feed it stdout as it arrives and it keeps the state that
+spans lines, so streamed output is cleaned the same way as a full reply.
+
+State carried across feeds:
+- Code fences: everything between ``` (or ~~~) fences is replaced by a
+  single "[code snippet omitted]", however many lines or chunks it spans
+- Emphasis: a ** / __ / * / _ opened on one line is closed on a later one
+- Lists: bullets are dropped and items end with a period so TTS pauses
+- Length budget: output stops at max_chars for the whole stream
+"""
+
+import re
+from typing import List, Optional
+
+MAX_VOICE_CHARS = 2000  # ~30 seconds of speech
+TRUNCATION_SUFFIX = "... I can provide more details if you'd like."
+CODE_PLACEHOLDER = "[code snippet omitted]"
+
+_FENCE = re.compile(r'\s*(```|~~~)')
+_INLINE_FENCE = re.compile(r'```.*?```')
+_INLINE_CODE = re.compile(r'`([^`]+)`')
+_HEADER = re.compile(r'#{1,6}\s+')
+_BULLET = re.compile(r'([-*+•]|\d+[.)])\s+')
+_LINK = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_STRONG = re.compile(r'\*\*([^*]+)\*\*|__([^_]+)__')
+_EMPHASIS = re.compile(r'\*([^*]+)\*|(?<!\w)_([^_]+)_(?!\w)')
+# Emphasis markers left unpaired on a line: openers precede a word, closers follow one
+_OPENER = re.compile(r'(?<!\S)(\*\*|__|\*|_)(?=\S)')
+_CLOSER = re.compile(r'(?<=\S)(\*\*|__|\*|_)(?=[\s.,;:!?)"\']|$)')
+_END_PUNCT = '.!?:;,'
+
+
+class VoiceNormalizer:
+    """
+    Incremental markdown-to-speech normalizer.
+
+    Usage:
+        normalizer = VoiceNormalizer()
+        for line in stream:
+            text = normalizer.feed(line)
+            if text:
+                speak(text)
+        speak(normalizer.finish())
+    """
+
+    def __init__(self, max_chars: int = MAX_VOICE_CHARS):
+        self.max_chars = max_chars
+        self.truncated = False
+        self._partial = ""
+        self._in_fence = False
+        self._fence = ""
+        self._open: List[str] = []  # Unclosed emphasis markers, innermost last
+        self._in_list = False
+        self._blank = True  # At the start of the stream or after a blank line
+        self._emitted = 0
+
+    def feed(self, text: str) -> str:
+        """
+        Add raw output and return the normalized text for every complete line.
+
+        A trailing line without a newline is held until more text arrives or
+        finish() is called. Lines are joined with "\\n"; runs of blank lines
+        collapse to one.
+        """
+        if self.truncated or not text:
+            return ""
+        text = self._partial + text
+        lines = text.split('\n')
+        self._partial = lines.pop()
+        return self._emit(lines)
+
+    def finish(self) -> str:
+        """Normalize any held partial line. Unclosed fences and emphasis are dropped."""
+        partial, self._partial = self._partial, ""
+        if self.truncated or not partial:
+            return ""
+        return self._emit([partial])
+
+    def normalize(self, text: str) -> str:
+        """Normalize a complete reply in one call."""
+        out = [self.feed(text), self.finish()]
+        return '\n'.join(part for part in out if part).strip()
+
+    def _emit(self, lines: List[str]) -> str:
+        out = []
+        for raw in lines:
+            line = self._normalize_line(raw)
+            if line is None:
+                continue
+            if not line:
+                if self._blank:
+                    continue  # Collapse blank runs
+                self._blank = True
+            else:
+                self._blank = False
+            cost = len(line) + (1 if self._emitted else 0)
+            if self._emitted + cost > self.max_chars:
+                room = max(self.max_chars - self._emitted, 0)
+                head = line[:room].rsplit(' ', 1)[0] if room else ""
+                out.append(head + TRUNCATION_SUFFIX)
+                self.truncated = True
+                self._partial = ""
+                break
+            self._emitted += cost
+            out.append(line)
+        return '\n'.join(out)
+
+    def _normalize_line(self, line: str) -> Optional[str]:
+        """Return the spoken form of one line, or None to drop it."""
+        fence = _FENCE.match(line)
+        if self._in_fence:
+            if fence and fence.group(1) == self._fence and not line[fence.end():].strip():
+                self._in_fence = False
+            return None
+        if fence:
+            self._in_fence = True
+            self._fence = fence.group(1)
+            self._in_list = False
+            return CODE_PLACEHOLDER
+
+        stripped = line.strip()
+        if not stripped:
+            self._in_list = False
+            return ""
+
+        if '`' in stripped:
+            stripped = _INLINE_FENCE.sub(CODE_PLACEHOLDER, stripped)
+            stripped = _INLINE_CODE.sub(r'\1', stripped)
+        if stripped[0] == '#':
+            stripped = _HEADER.sub('', stripped, count=1)
+
+        bullet = _BULLET.match(stripped)
+        if bullet:
+            stripped = stripped[bullet.end():]
+            self._in_list = True
+        elif self._in_list and not line[:1].isspace():
+            self._in_list = False  # Unindented text ends the list
+
+        if '[' in stripped:
+            stripped = _LINK.sub(r'\1', stripped)
+        if '*' in stripped or '_' in stripped:
+            stripped = self._strip_emphasis(stripped)
+
+        stripped = stripped.strip()
+        if self._in_list and stripped and stripped[-1] not in _END_PUNCT:
+            stripped += '.'
+        return stripped
+
+    def _strip_emphasis(self, line: str) -> str:
+        """Remove paired emphasis, then close or open markers that span lines."""
+        line = _STRONG.sub(lambda m: m.group(1) or m.group(2), line)
+        line = _EMPHASIS.sub(lambda m: m.group(1) or m.group(2), line)
+
+        if self._open:
+            def close(m):
+                if self._open and m.group(1) == self._open[-1]:
+                    self._open.pop()
+                    return ''
+                return m.group(0)
+            line = _CLOSER.sub(close, line)
+
+        def open_(m):
+            self._open.append(m.group(1))
+            return ''
+        return _OPENER.sub(open_, line)
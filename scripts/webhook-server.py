@@ -22,6 +22,14 @@ Environment:
   PUBLIC_URL            - Public URL of this server (default: https://api.niavoice.org)
   PORT                  - Server port (default: 8080)
   ALLOW_INBOUND_CALLS   - Allow inbound calls (default: false)
+  OPENAI_RECONNECT_MAX_ATTEMPTS - Realtime reconnect attempts after a drop (default: 5)
+  AUDIO_BACKLOG_MAX_FRAMES      - Caller audio frames buffered while reconnecting (default: 250)
+  PROMPT_TOKEN_BUDGET           - Estimated token budget for the per-call prompt (default: 2500)
+  TOOL_INTERIM_DEADLINE         - Seconds before a slow tool answers "working on it" (default: 3)
+  TOOL_DEFERRED_TIMEOUT         - Max seconds a deferred tool may keep running (default: 60)
+  POST_CALL_QUEUE_DB            - SQLite file for durable post-call jobs (default: post_call_queue.db)
+  POST_CALL_WORKERS             - Post-call jobs processed concurrently (default: 2)
+  RECORD_CALL_AUDIO             - Record both call legs to a stereo WAV (default: false)
 """
 
 import asyncio
@@ -30,9 +38,12 @@ import json
 import logging
 import math
 import os
+import random
 import struct
+import sys
 import time
-from datetime import datetime
+from collections import deque
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 
@@ -58,6 +69,18 @@ import uvicorn
 from twilio.rest import Client as TwilioClient
 from twilio.base.exceptions import TwilioException
 
+# Sibling helper modules live next to this script
+sys.path.insert(0, str(Path(__file__).parent))
+from call_reaper import CallReaper
+from call_retention import CallRetentionManager
+from session_context import get_bridge_emitter
+from storage_stats import StorageStatsMonitor
+from conversation_compactor import ConversationCompactor, fallback_summary
+from prompt_planner import PromptPlanner, PromptSection, source_fingerprint
+from post_call_queue import MemoryAppendBatcher, PostCallJob, PostCallQueue
+from tool_scheduler import Priority, SchedulerOverloaded, tool_scheduler
+from transcript_archive import get_archive
+
 # ─── Logging ──────────────────────────────────────────────────────────────────
 
 logging.basicConfig(
@@ -573,42 +596,162 @@ def generate_thinking_tone(duration_ms: int = 600, freq: int = 440, volume: floa
     return base64.b64encode(mulaw).decode()
 
 
-async def dispatch_tool_call(oai_ws, tool_name: str, tool_args: dict, call_id: str) -> None:
-    """Execute a tool call and inject the result back into the OpenAI conversation."""
-    logger.info(f"🔧 Tool call: {tool_name}({list(tool_args.keys())})")
+# Deferred tool mode: tools still running after the interim deadline answer
+# "working on it" and report back when done (bounded by TOOL_DEFERRED_TIMEOUT)
+TOOL_INTERIM_DEADLINE = float(os.getenv("TOOL_INTERIM_DEADLINE", "3.0"))  # seconds
+TOOL_DEFERRED_TIMEOUT = float(os.getenv("TOOL_DEFERRED_TIMEOUT", "60.0"))  # seconds
+DEFERRED_RESULT_MAX_WAIT = 10.0  # Max wait for Nia to finish speaking before injecting
 
-    # Execute with timeout (max 3s)
-    result = ""
-    try:
-        handler = TOOL_REGISTRY.get(tool_name)
-        if handler:
-            result = await asyncio.wait_for(handler(**tool_args), timeout=3.0)
-        else:
-            result = f"Unknown tool: '{tool_name}'"
-            logger.warning(f"Unknown tool requested: {tool_name}")
-    except asyncio.TimeoutError:
-        result = f"Tool '{tool_name}' timed out — try again."
-        logger.warning(f"Tool timeout: {tool_name}")
-    except Exception as e:
-        result = f"Tool error: {str(e)}"
-        logger.error(f"Tool error ({tool_name}): {e}", exc_info=True)
 
-    logger.info(f"🔧 Tool result ({tool_name}): {result[:100]}...")
+# Scheduler slot class per tool (see tool_scheduler.TOOL_CLASS_LIMITS)
+TOOL_CLASSES = {
+    "memory_search": "file",
+    "read_file": "file",
+    "get_project_status": "file",
+    "memory_get": "file",
+    "cron_create": "subprocess",
+    "message_send": "http",
+    "sessions_send": "http",
+}
+TOOL_OVERLOADED_MESSAGE = "I'm juggling too many requests right now — ask me again in a moment."
 
-    # Inject result as function_call_output
+
+async def _run_scheduled_tool(tool_name: str, handler, tool_args: dict,
+                              priority: Priority = Priority.INTERACTIVE):
+    """Run a tool handler inside its class's scheduler slot."""
+    async with tool_scheduler.slot(TOOL_CLASSES.get(tool_name, "file"), priority):
+        return await handler(**tool_args)
+
+
+async def _send_tool_output(oai_ws, call_id: str, output: str) -> None:
+    """Inject a function_call_output and trigger Nia to respond with it."""
     await oai_ws.send(json.dumps({
         "type": "conversation.item.create",
         "item": {
             "type": "function_call_output",
             "call_id": call_id,
-            "output": result
+            "output": output
         }
     }))
-
-    # Trigger Nia to respond with the result
     await oai_ws.send(json.dumps({"type": "response.create"}))
 
 
+async def _complete_deferred_tool(task: asyncio.Future, tool_name: str, call_state: dict) -> None:
+    """Await a deferred tool and inject its real result as a new conversation item."""
+    started = time.monotonic()
+    try:
+        result = await asyncio.wait_for(task, timeout=TOOL_DEFERRED_TIMEOUT)
+    except asyncio.TimeoutError:
+        result = f"'{tool_name}' did not finish in time and was abandoned."
+        logger.warning(f"Deferred tool timeout: {tool_name}")
+    except asyncio.CancelledError:
+        logger.info(f"Deferred tool cancelled (call ended): {tool_name}")
+        raise
+    except Exception as e:
+        result = f"Tool error: {str(e)}"
+        logger.error(f"Deferred tool error ({tool_name}): {e}", exc_info=True)
+
+    # Don't talk over Nia — and don't send into a session that is being replaced
+    waited = 0.0
+    while (call_state.get("nia_speaking") or call_state.get("reconnecting")) \
+            and waited < DEFERRED_RESULT_MAX_WAIT:
+        await asyncio.sleep(0.2)
+        waited += 0.2
+
+    logger.info(
+        f"🔧 Deferred tool result ({tool_name}, {time.monotonic() - started:.1f}s "
+        f"after interim): {str(result)[:100]}..."
+    )
+    oai_ws = call_state.get("openai_ws")
+    if not oai_ws or call_state.get("closing"):
+        return
+    try:
+        await oai_ws.send(json.dumps({
+            "type": "conversation.item.create",
+            "item": {
+                "type": "message",
+                "role": "system",
+                "content": [{
+                    "type": "input_text",
+                    "text": (
+                        f"The earlier '{tool_name}' request has finished. Result: {result}\n"
+                        "Briefly let the caller know."
+                    )
+                }]
+            }
+        }))
+        await oai_ws.send(json.dumps({"type": "response.create"}))
+    except Exception as e:
+        logger.warning(f"Could not inject deferred result for {tool_name}: {e}")
+
+
+async def dispatch_tool_call(oai_ws, tool_name: str, tool_args: dict, call_id: str,
+                             call_state: Optional[dict] = None) -> None:
+    """
+    Execute a tool call and inject the result back into the OpenAI conversation.
+
+    With call_state (the media bridge ctx) the call runs in deferred mode: a tool
+    still running after TOOL_INTERIM_DEADLINE gets an interim "working on it"
+    output, keeps running in a task tracked in call_state["deferred_tools"], and
+    its real result is injected when it completes. Without call_state the tool
+    is cut off after 3s.
+    """
+    logger.info(f"🔧 Tool call: {tool_name}({list(tool_args.keys())})")
+    handler = TOOL_REGISTRY.get(tool_name)
+
+    if handler and call_state is not None:
+        oai_ws = call_state.get("openai_ws") or oai_ws
+        try:
+            task = asyncio.ensure_future(_run_scheduled_tool(tool_name, handler, tool_args))
+            result = await asyncio.wait_for(asyncio.shield(task), timeout=TOOL_INTERIM_DEADLINE)
+        except asyncio.CancelledError:
+            task.cancel()  # Call ended before the interim deadline: the shield must not outlive it
+            raise
+        except asyncio.TimeoutError:
+            logger.info(f"🔧 Tool {tool_name} still running after {TOOL_INTERIM_DEADLINE}s — deferring")
+            deferred = tool_scheduler.spawn(
+                call_state.get("call_sid"), _complete_deferred_tool(task, tool_name, call_state)
+            )
+            pending = call_state.setdefault("deferred_tools", set())
+            pending.add(deferred)
+            deferred.add_done_callback(pending.discard)
+            await _send_tool_output(
+                oai_ws, call_id,
+                f"Still working on '{tool_name}' — the result will follow shortly. "
+                "Tell the caller you're on it and keep the conversation going."
+            )
+            return
+        except SchedulerOverloaded:
+            result = TOOL_OVERLOADED_MESSAGE
+        except Exception as e:
+            result = f"Tool error: {str(e)}"
+            logger.error(f"Tool error ({tool_name}): {e}", exc_info=True)
+    else:
+        # Execute with timeout (max 3s)
+        result = ""
+        try:
+            if handler:
+                result = await asyncio.wait_for(
+                    _run_scheduled_tool(tool_name, handler, tool_args), timeout=3.0
+                )
+            else:
+                result = f"Unknown tool: '{tool_name}'"
+                logger.warning(f"Unknown tool requested: {tool_name}")
+        except asyncio.TimeoutError:
+            result = f"Tool '{tool_name}' timed out — try again."
+            logger.warning(f"Tool timeout: {tool_name}")
+        except SchedulerOverloaded:
+            result = TOOL_OVERLOADED_MESSAGE
+        except Exception as e:
+            result = f"Tool error: {str(e)}"
+            logger.error(f"Tool error ({tool_name}): {e}", exc_info=True)
+
+    logger.info(f"🔧 Tool result ({tool_name}): {result[:100]}...")
+
+    # Inject result as function_call_output and trigger Nia to respond with it
+    await _send_tool_output(oai_ws, call_id, result)
+
+
 # ─── Twilio client ────────────────────────────────────────────────────────────
 
 twilio_client: Optional[TwilioClient] = None
@@ -664,47 +807,33 @@ def read_file_safe(path, max_chars=2000) -> str:
     return ""
 
 
+def _transcripts_dir() -> Path:
+    return WORKSPACE_ROOT / "memory" / "call-transcripts"
+
+
 def _get_recent_call_history(max_calls: int = 3, max_chars_each: int = 300) -> str:
     """
-    Read recent call transcript files and return brief summaries for context.
-    Looks for JSON transcripts in workspace/memory/call-transcripts/.
+    Brief summaries of recent calls for context, from the transcript archive
+    manifest (no transcript files are read).
     Returns up to max_calls entries, each truncated to max_chars_each.
     """
-    transcripts_dir = WORKSPACE_ROOT / "memory" / "call-transcripts"
+    transcripts_dir = _transcripts_dir()
     if not transcripts_dir.exists():
         return ""
 
     try:
-        # Get transcript files, sorted newest first
-        files = sorted(
-            [f for f in transcripts_dir.glob("*.json")],
-            reverse=True
-        )[:max_calls]
-
-        if not files:
-            return ""
-
         summaries = []
-        for f in files:
-            try:
-                data = json.loads(f.read_text())
-                recorded_at = data.get("recorded_at", "")[:16]  # YYYY-MM-DDTHH:MM
-                turns = data.get("turns", 0)
-                transcript = data.get("transcript", [])
-
-                # Build a brief excerpt: first Nia turn + last user turn
-                if transcript:
-                    nia_lines = [t["content"] for t in transcript if t.get("speaker") == "assistant"]
-                    user_lines = [t["content"] for t in transcript if t.get("speaker") == "user"]
-                    excerpt = ""
-                    if user_lines:
-                        excerpt += f"Remi: {user_lines[0][:80]}"
-                    if nia_lines:
-                        excerpt += f" | Nia: {nia_lines[0][:80]}"
-                    summary = f"[{recorded_at}, {turns} turns] {excerpt}"
-                    summaries.append(summary[:max_chars_each])
-            except Exception:
-                pass
+        for entry in get_archive(transcripts_dir).recent(max_calls):
+            if not entry.turns:
+                continue
+            # Brief excerpt: first user turn + first Nia turn
+            excerpt = ""
+            if entry.user_excerpt:
+                excerpt += f"Remi: {entry.user_excerpt}"
+            if entry.assistant_excerpt:
+                excerpt += f" | Nia: {entry.assistant_excerpt}"
+            summary = f"[{entry.recorded_at[:16]}, {entry.turns} turns] {excerpt}"
+            summaries.append(summary[:max_chars_each])
 
         return "\n".join(summaries) if summaries else ""
 
@@ -713,65 +842,129 @@ def _get_recent_call_history(max_calls: int = 3, max_chars_each: int = 300) -> s
         return ""
 
 
+# Section relevance per caller profile (missing entries = 1.0). Sections scoring
+# below PROMPT_MIN_SCORE are left out entirely — e.g. Remi's USER.md and call
+# history are not read to a stranger.
+CALLER_RELEVANCE: dict[str, dict[str, float]] = {
+    "primary": {},
+    "unresolved": {},  # Inbound calls where the number isn't known yet
+    "known": {"user": 0.3, "memory": 0.7, "call_history": 0.4, "projects": 0.8, "heartbeat": 0.5},
+    "unknown": {"user": 0.1, "memory": 0.4, "call_history": 0.15, "projects": 0.3,
+                "heartbeat": 0.2, "daily": 0.5},
+}
+PROMPT_MIN_SCORE = 0.1
+
+PROJECT_STATUS_REPOS = [
+    ("Voice skill", "openai-voice-skill"),
+    ("Trust skill", "agent-trust"),
+    ("Bakkt app", "bakkt-agent-app"),
+]
+
+prompt_planner = PromptPlanner()
+
+
+def _resolve_caller(caller_number: str) -> tuple[str, str]:
+    """(display name, relevance profile) for a caller — KNOWN_CALLERS, then phone mapping."""
+    if not caller_number:
+        return "someone", "unresolved"
+    if caller_number in KNOWN_CALLERS:
+        return KNOWN_CALLERS[caller_number], "primary"
+    try:
+        from user_context import get_user_context
+        info = get_user_context(caller_number)
+        if info.get("known_user"):
+            profile = "primary" if info.get("relationship") == "primary_user" else "known"
+            return info.get("name") or "someone", profile
+    except Exception as e:
+        logger.debug(f"Phone mapping lookup failed: {e}")
+    return "someone", "unknown"
+
+
+def _prompt_sources() -> list[Path]:
+    """Every file/dir build_call_prompt reads — their stat() is the cache key."""
+    today = datetime.now()
+    days = [today, today - timedelta(days=1)]
+    return [
+        WORKSPACE_ROOT / "SOUL.md",
+        WORKSPACE_ROOT / "IDENTITY.md",
+        WORKSPACE_ROOT / "USER.md",
+        WORKSPACE_ROOT / "MEMORY.md",
+        *[WORKSPACE_ROOT / "memory" / f"{d.strftime('%Y-%m-%d')}.md" for d in days],
+        *[Path.home() / "repos" / repo / "STATUS.md" for _, repo in PROJECT_STATUS_REPOS],
+        WORKSPACE_ROOT / "memory" / "call-transcripts",
+        WORKSPACE_ROOT / "memory" / "call-transcripts" / "manifest.jsonl",
+        WORKSPACE_ROOT / "memory" / "heartbeat-state.json",
+    ]
+
+
 def build_call_prompt(caller_number: str = "") -> str:
     """
-    Build a rich, per-call system prompt with full OpenClaw context.
-    Called fresh on each incoming call so context is always current.
+    Build a per-call system prompt with OpenClaw context, packed to a token budget.
+
+    Sections are scored by caller relevance and recency and packed by
+    prompt_planner (PROMPT_TOKEN_BUDGET); the result is cached per caller until
+    a source file changes.
     """
-    parts: list[str] = []
+    caller_name, profile = _resolve_caller(caller_number)
+    cache_key = (caller_number, caller_name, profile, prompt_planner.budget_tokens,
+                 datetime.now().strftime("%Y-%m-%d"), source_fingerprint(_prompt_sources()))
+    cached = prompt_planner.get_cached(cache_key)
+    if cached:
+        logger.info(f"Call prompt cache hit: {len(cached.text)} chars, caller={caller_name}")
+        return cached.text
+
+    relevance = CALLER_RELEVANCE.get(profile, {})
+    sections: list[PromptSection] = []
+
+    def add(name: str, title: str, body: str, priority: float, **kwargs) -> None:
+        if body:
+            sections.append(PromptSection(
+                name=name, title=title, body=body, priority=priority,
+                caller_relevance=relevance.get(name, 1.0), **kwargs
+            ))
 
     # 1. Core identity
-    soul = read_file_safe(WORKSPACE_ROOT / "SOUL.md", 2000)
-    identity = read_file_safe(WORKSPACE_ROOT / "IDENTITY.md", 800)
-    if soul:
-        parts.append(f"# Who You Are\n{soul}")
-    if identity:
-        parts.append(f"# Your Identity Details\n{identity}")
+    add("soul", "Who You Are", read_file_safe(WORKSPACE_ROOT / "SOUL.md", 2000), 1.0, required=True)
+    add("identity", "Your Identity Details", read_file_safe(WORKSPACE_ROOT / "IDENTITY.md", 800), 0.9)
 
     # 2. Who you're talking to
-    caller_name = KNOWN_CALLERS.get(caller_number, "someone")
-    parts.append(
-        f"# This Call\nYou are on a phone call with {caller_name} "
+    add(
+        "this_call", "This Call",
+        f"You are on a phone call with {caller_name} "
         f"({caller_number or 'unknown number'}). "
         f"You called them (or they called you). "
         f"Speak naturally and concisely — this is voice, not text. "
         f"Always respond in English by default, unless the caller explicitly and clearly requests another language. "
-        f"Keep responses short (1-3 sentences). Don't use bullet points or markdown."
+        f"Keep responses short (1-3 sentences). Don't use bullet points or markdown.",
+        1.0, required=True
     )
 
     # 3. Who Remi is
-    user_context = read_file_safe(WORKSPACE_ROOT / "USER.md", 1500)
-    if user_context:
-        parts.append(f"# About {caller_name}\n{user_context}")
+    add("user", f"About {caller_name}", read_file_safe(WORKSPACE_ROOT / "USER.md", 1500), 0.8)
 
-    # 4. Long-term memory
-    memory = read_file_safe(WORKSPACE_ROOT / "MEMORY.md", 5000)
-    if memory:
-        parts.append(f"# Your Long-Term Memory\n{memory}")
+    # 4. Long-term memory (may be trimmed rather than dropped)
+    add("memory", "Your Long-Term Memory", read_file_safe(WORKSPACE_ROOT / "MEMORY.md", 5000), 0.7,
+        min_tokens=200)
 
     # 5. Today's recent context
-    today = datetime.now().strftime("%Y-%m-%d")
-    yesterday = (datetime.now() - __import__('datetime').timedelta(days=1)).strftime("%Y-%m-%d")
-    for date in [today, yesterday]:
-        daily = read_file_safe(WORKSPACE_ROOT / "memory" / f"{date}.md", 2500)
+    for age, date in enumerate([datetime.now(), datetime.now() - timedelta(days=1)]):
+        date_str = date.strftime("%Y-%m-%d")
+        daily = read_file_safe(WORKSPACE_ROOT / "memory" / f"{date_str}.md", 2500)
         if daily:
-            parts.append(f"# Recent Context ({date})\n{daily}")
+            add("daily", f"Recent Context ({date_str})", daily, 0.75, age_days=age, min_tokens=150)
             break
 
     # 6. Project pulse (brief status summaries)
     project_statuses = []
-    for proj, repo in [("Voice skill", "openai-voice-skill"), ("Trust skill", "agent-trust"), ("Bakkt app", "bakkt-agent-app")]:
+    for proj, repo in PROJECT_STATUS_REPOS:
         status = read_file_safe(Path.home() / "repos" / repo / "STATUS.md", 400)
         if status:
-            # Just first 400 chars — enough for a pulse
+            # Just first 300 chars — enough for a pulse
             project_statuses.append(f"**{proj}:** {status[:300]}")
-    if project_statuses:
-        parts.append("# Project Status\n" + "\n\n".join(project_statuses))
+    add("projects", "Project Status", "\n\n".join(project_statuses), 0.5)
 
     # 7. Recent call history (last 3 calls, max 300 chars each)
-    call_history = _get_recent_call_history(max_calls=3, max_chars_each=300)
-    if call_history:
-        parts.append(f"# Recent Call History\n{call_history}")
+    add("call_history", "Recent Call History", _get_recent_call_history(max_calls=3, max_chars_each=300), 0.6)
 
     # 8. Heartbeat state (last check timestamps)
     heartbeat = read_file_safe(WORKSPACE_ROOT / "memory" / "heartbeat-state.json", 500)
@@ -781,10 +974,13 @@ def build_call_prompt(caller_number: str = "") -> str:
             hb_summary = ", ".join(
                 f"{k}: {str(v)[:30]}" for k, v in list(hb.items())[:5]
             )
-            parts.append(f"# Recent Activity\nLast heartbeat checks: {hb_summary}")
+            add("heartbeat", "Recent Activity", f"Last heartbeat checks: {hb_summary}", 0.2)
         except Exception:
             pass  # Not critical
 
+    irrelevant = [s.name for s in sections if not s.required and s.score < PROMPT_MIN_SCORE]
+    sections = [s for s in sections if s.required or s.score >= PROMPT_MIN_SCORE]
+
     header = (
         "ABSOLUTE RULE #1 — LANGUAGE: You MUST respond in English only. "
         "This overrides everything. No exceptions. No matter what language the caller speaks, "
@@ -808,9 +1004,15 @@ def build_call_prompt(caller_number: str = "") -> str:
         "If asked about yesterday, last week, a project, or any past event — use a tool first.\n\n"
     )
 
-    prompt = header + "\n\n---\n\n".join(parts)
-    logger.info(f"Built call prompt: {len(prompt)} chars, caller={caller_name} ({caller_number})")
-    return prompt
+    packed = prompt_planner.pack(header, sections)
+    packed.dropped = irrelevant + packed.dropped
+    prompt_planner.put_cached(cache_key, packed)
+    logger.info(
+        f"Built call prompt: {len(packed.text)} chars (~{packed.tokens}/{packed.budget} tokens), "
+        f"caller={caller_name} ({caller_number}), profile={profile}, "
+        f"dropped={packed.dropped or 'none'}, truncated={packed.truncated or 'none'}"
+    )
+    return packed.text
 
 
 # Static fallback prompt (used before first call)
@@ -822,6 +1024,24 @@ logger.info(f"Identity prompt ready ({len(NIA_SYSTEM_PROMPT)} chars)")
 active_calls: dict[str, dict] = {}
 
 
+async def close_zombie_calls(call_ids: List[str]) -> None:
+    """Close reaped calls in the recording DB (one transaction) and tell the bridge."""
+    try:
+        from call_recording import recording_manager
+    except ImportError:
+        return
+    closed = await asyncio.to_thread(recording_manager.close_stale_calls, call_ids, "timeout")
+    recording_manager.notify_calls_ended(closed)
+
+
+# Reaps calls whose media stream went quiet without a clean hang-up
+call_reaper = CallReaper(close_zombie_calls, active_calls)
+# Archives aged call_history.db rows and recordings; created once migrations finish
+call_retention: Optional[CallRetentionManager] = None
+# Cached call_history.db storage counters for /metrics; created with retention
+storage_monitor: Optional[StorageStatsMonitor] = None
+
+
 def mask_phone(phone: str) -> str:
     """Mask phone number for safe logging."""
     if not phone or len(phone) < 7:
@@ -882,6 +1102,202 @@ async def voice_incoming(request: Request):
     return Response(content=twiml, media_type="application/xml")
 
 
+# ─── OpenAI Realtime session ──────────────────────────────────────────────────
+
+# Reconnect policy when the Realtime WS drops mid-call
+OPENAI_RECONNECT_MAX_ATTEMPTS = int(os.getenv("OPENAI_RECONNECT_MAX_ATTEMPTS", "5"))
+OPENAI_RECONNECT_INITIAL_DELAY = 0.25  # seconds
+OPENAI_RECONNECT_MAX_DELAY = 4.0       # seconds
+
+# Caller audio held while reconnecting (Twilio frames are 20ms → 250 ≈ 5s)
+AUDIO_BACKLOG_MAX_FRAMES = int(os.getenv("AUDIO_BACKLOG_MAX_FRAMES", "250"))
+RECORD_CALL_AUDIO = os.getenv("RECORD_CALL_AUDIO", "false").lower() == "true"
+
+# Transcript replayed into a fresh session so Nia keeps the thread
+REPLAY_MAX_TURNS = 12
+REPLAY_MAX_CHARS_PER_TURN = 400
+
+
+def build_session_config(call_prompt: str) -> dict:
+    """session.update payload for a call (sent on connect and again on reconnect)."""
+    return {
+        "type": "session.update",
+        "session": {
+            "modalities": ["text", "audio"],
+            "instructions": call_prompt,
+            "voice": OPENAI_VOICE,
+            "input_audio_format": "pcm16",
+            "output_audio_format": "pcm16",
+            "input_audio_transcription": {
+                "model": "whisper-1"
+            },
+            "turn_detection": {
+                "type": "semantic_vad",
+                "eagerness": "balanced"
+            },
+            "temperature": 0.6,
+            "tools": VOICE_TOOLS,  # Tier 1 + Tier 2 live tools
+            "tool_choice": "auto"
+        }
+    }
+
+
+async def open_realtime_session(call_prompt: str):
+    """Connect to OpenAI Realtime and configure the session. Returns the WS."""
+    oai_ws = await websockets.connect(
+        OPENAI_REALTIME_URL,
+        additional_headers={
+            "Authorization": f"Bearer {OPENAI_API_KEY}",
+            "OpenAI-Beta": "realtime=v1"
+        }
+    )
+    await oai_ws.send(json.dumps(build_session_config(call_prompt)))
+    return oai_ws
+
+
+def build_replay_items(
+    transcript: list[dict],
+    max_turns: int = REPLAY_MAX_TURNS,
+    max_chars: int = REPLAY_MAX_CHARS_PER_TURN,
+    summary: str = ""
+) -> list[dict]:
+    """
+    Compact the tail of a call transcript into conversation.item.create events.
+
+    Used after a reconnect: the new Realtime session starts empty, so the rolling
+    summary (if any) and the last few turns are replayed as text items (audio is
+    not re-sent).
+    """
+    events = []
+    if summary:
+        events.append({
+            "type": "conversation.item.create",
+            "item": {
+                "type": "message",
+                "role": "system",
+                "content": [{"type": "input_text", "text": f"Summary of the call so far: {summary}"}]
+            }
+        })
+    for turn in transcript[-max_turns:] if max_turns > 0 else []:
+        text = (turn.get("content") or "").strip()
+        if not text:
+            continue
+        if len(text) > max_chars:
+            text = text[:max_chars].rstrip() + "…"
+        if turn.get("speaker") == "assistant":
+            item = {
+                "type": "message",
+                "role": "assistant",
+                "content": [{"type": "text", "text": text}]
+            }
+        else:
+            item = {
+                "type": "message",
+                "role": "user",
+                "content": [{"type": "input_text", "text": text}]
+            }
+        events.append({"type": "conversation.item.create", "item": item})
+    return events
+
+
+def reconnect_delay(attempt: int) -> float:
+    """Exponential backoff with 10% jitter (attempt 0 → immediate)."""
+    if attempt <= 0:
+        return 0.0
+    delay = min(OPENAI_RECONNECT_INITIAL_DELAY * (2 ** (attempt - 1)), OPENAI_RECONNECT_MAX_DELAY)
+    return delay + delay * 0.1 * random.random()
+
+
+def record_latency_event(call_id: str, event_type: str, duration_ms: float,
+                         metadata: Optional[dict] = None) -> None:
+    """Best-effort latency event via call_metrics (blocking — run off the event loop)."""
+    try:
+        from call_metrics import metrics_manager
+    except ImportError:
+        logger.debug("call_metrics unavailable — latency event not recorded")
+        return
+    try:
+        metrics_manager.record_latency_event(call_id, event_type, duration_ms, metadata)
+    except Exception as e:
+        logger.warning(f"[call_id={call_id}] Failed to record latency event {event_type}: {e}")
+
+
+async def start_audio_recording(call_sid: str, caller_number: str, outbound: bool):
+    """
+    Open the call record and a streaming recorder for both legs.
+
+    Returns the recorder the bridge feeds frames to, or None. Recording is
+    best-effort: any failure just means the call isn't recorded.
+    """
+    try:
+        from call_recording import recording_manager
+        record = await recording_manager.start_call_recording(
+            call_sid,
+            "outbound" if outbound else "inbound",
+            caller_number=None if outbound else (caller_number or None),
+            callee_number=caller_number if outbound else None,
+        )
+        if record and record.recording_path:
+            return recording_manager.open_audio_recorder(call_sid, record.recording_path)
+    except Exception as e:
+        logger.error(f"[call_id={call_sid}] Audio recording unavailable: {e}")
+    return None
+
+
+async def finish_audio_recording(call_sid: str) -> None:
+    """Finalize the WAV file and close the call record."""
+    try:
+        from call_recording import recording_manager
+        await recording_manager.end_call_recording(call_sid)
+    except Exception as e:
+        logger.error(f"[call_id={call_sid}] Failed to finalize audio recording: {e}")
+
+
+async def summarize_conversation(previous_summary: str, turns_text: str) -> str:
+    """
+    Condense older call turns (plus the previous rolling summary) for
+    mid-call compaction. Falls back to an extractive summary on failure.
+    """
+    if not OPENAI_API_KEY:
+        return fallback_summary(previous_summary, turns_text)
+
+    try:
+        async with tool_scheduler.slot("http", Priority.BACKGROUND), httpx.AsyncClient(timeout=10.0) as client:
+            resp = await client.post(
+                "https://api.openai.com/v1/chat/completions",
+                headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
+                json={
+                    "model": "gpt-4o-mini",
+                    "messages": [
+                        {
+                            "role": "system",
+                            "content": (
+                                "You condense the earlier part of a live phone call so the "
+                                "assistant can keep going without the full history. Merge the "
+                                "previous summary with the new turns into one summary of at most "
+                                "8 short sentences. Keep names, numbers, decisions, open questions "
+                                "and promises made. Note the language being spoken."
+                            )
+                        },
+                        {
+                            "role": "user",
+                            "content": (
+                                f"Previous summary:\n{previous_summary or '(none)'}\n\n"
+                                f"New turns:\n{turns_text}"
+                            )
+                        }
+                    ],
+                    "max_tokens": 300,
+                    "temperature": 0.2
+                }
+            )
+            resp.raise_for_status()
+            return resp.json()["choices"][0]["message"]["content"].strip()
+    except Exception as e:
+        logger.warning(f"Compaction summary failed, using excerpt: {e}")
+        return fallback_summary(previous_summary, turns_text)
+
+
 # ─── /media-stream WebSocket ──────────────────────────────────────────────────
 
 @app.websocket("/media-stream")
@@ -918,163 +1334,299 @@ async def media_stream_ws(websocket: WebSocket):
         "nia_speaking": False,     # True while Nia is outputting audio (mutes mic input)
         "tool_call_args": {},      # Accumulate partial tool call arguments: call_id → {name, args_str}
         "session_ready": asyncio.Event(),  # Set when session.updated is confirmed
+        "call_prompt": "",         # Instructions sent in session.update (reused on reconnect)
+        "greeted": False,          # Initial outbound greeting already triggered
+        "reconnecting": False,     # True while the OpenAI WS is being re-established
+        "reconnects": 0,
+        "audio_backlog": deque(maxlen=AUDIO_BACKLOG_MAX_FRAMES),  # PCM24 b64 frames held during reconnect
+        "closing": False,
+        "compactor": ConversationCompactor(),  # Mirrors live Realtime items for rolling compaction
+        "compaction_task": None,
+        "deferred_tools": set(),   # Long-running tool tasks that report back later
+        "recorder": None,          # StreamingWavRecorder when RECORD_CALL_AUDIO is on
     }
 
-    # ── OpenAI receiver coroutine ─────────────────────────────────────────────
-
-    async def receive_from_openai():
-        """Forward OpenAI Realtime audio/events to Twilio."""
+    # ── OpenAI reconnect ──────────────────────────────────────────────────────
+
+    async def reconnect_openai() -> bool:
+        """
+        Re-establish the Realtime session after a drop.
+
+        Caller audio is buffered in ctx["audio_backlog"] meanwhile. On success the
+        session config is re-sent, the recent transcript replayed, and the backlog
+        flushed before live audio resumes.
+        """
+        call_sid = ctx.get("call_sid")
+        dropped_at = time.monotonic()
+        ctx["reconnecting"] = True
+        ctx["session_ready"].clear()
+        ctx["nia_speaking"] = False
+        ctx["tool_call_args"] = {}
+        ctx["compactor"].reset()  # Item IDs die with the old session
+
+        for attempt in range(OPENAI_RECONNECT_MAX_ATTEMPTS):
+            if ctx["closing"]:
+                break
+            delay = reconnect_delay(attempt)
+            if delay:
+                await asyncio.sleep(delay)
+            try:
+                oai_ws = await open_realtime_session(ctx["call_prompt"])
+                replay = build_replay_items(ctx["transcript"], summary=ctx["compactor"].summary)
+                for event in replay:
+                    await oai_ws.send(json.dumps(event))
+            except Exception as e:
+                logger.warning(
+                    f"[call_id={call_sid}] Realtime reconnect attempt "
+                    f"{attempt + 1}/{OPENAI_RECONNECT_MAX_ATTEMPTS} failed: {e}"
+                )
+                continue
+
+            ctx["openai_ws"] = oai_ws
+            backlog = ctx["audio_backlog"]
+            flushed = 0
+            while backlog:
+                await oai_ws.send(json.dumps({
+                    "type": "input_audio_buffer.append",
+                    "audio": backlog.popleft()
+                }))
+                flushed += 1
+            ctx["reconnecting"] = False
+            ctx["reconnects"] += 1
+
+            recovery_ms = (time.monotonic() - dropped_at) * 1000
+            logger.info(
+                f"[call_id={call_sid}] Realtime session recovered in {recovery_ms:.0f}ms "
+                f"(attempts={attempt + 1}, replayed={len(replay)}, flushed_frames={flushed})"
+            )
+            if call_sid:
+                asyncio.create_task(asyncio.to_thread(
+                    record_latency_event, call_sid, "session_recovery", recovery_ms,
+                    {"attempts": attempt + 1, "replayed_items": len(replay), "flushed_frames": flushed}
+                ))
+            return True
+
+        ctx["reconnecting"] = False
+        logger.error(f"[call_id={call_sid}] Realtime reconnect failed — ending stream")
+        return False
+
+    # ── Rolling compaction ────────────────────────────────────────────────────
+
+    async def compact_conversation():
+        """Fold older conversation items into one summary item (background)."""
+        compactor = ctx["compactor"]
+        plan = compactor.plan()
+        if not plan:
+            return
+        compactor.in_flight = True
         oai_ws = ctx["openai_ws"]
         try:
-            async for raw_msg in oai_ws:
-                msg = json.loads(raw_msg)
-                event_type = msg.get("type", "")
-
-                if event_type == "session.created":
-                    logger.info("OpenAI session created")
-
-                elif event_type == "session.updated":
-                    ctx["session_ready"].set()
-                    logger.info("OpenAI session updated — ready")
-                    # Trigger initial greeting for outbound calls
-                    call_sid = ctx.get("call_sid")
-                    initial_msg = active_calls.get(call_sid, {}).get("initial_message")
-                    if initial_msg:
-                        await oai_ws.send(json.dumps({
-                            "type": "conversation.item.create",
-                            "item": {
-                                "type": "message",
-                                "role": "user",
-                                "content": [{"type": "input_text", "text": f"[Start the call by saying this naturally]: {initial_msg}"}]
-                            }
-                        }))
-                        await oai_ws.send(json.dumps({"type": "response.create"}))
-                        logger.info(f"Triggered initial greeting for {call_sid}")
-
-                elif event_type == "response.audio.delta":
-                    # PCM16 24kHz → mulaw 8kHz → Twilio
-                    ctx["nia_speaking"] = True
-                    delta = msg.get("delta", "")
-                    ctx.setdefault("audio_chunks_sent", 0)
-                    if delta:
-                        # Wait up to 2s for stream_sid if not yet set (race condition guard)
-                        if ctx.get("stream_sid") is None:
-                            waited = 0.0
-                            while ctx.get("stream_sid") is None and waited < 2.0:
-                                await asyncio.sleep(0.05)
-                                waited += 0.05
-                            if ctx.get("stream_sid") is None:
-                                logger.warning(f"⚠️ stream_sid still None after 2s wait — dropping audio chunk")
-                        if ctx.get("stream_sid"):
-                            pcm24 = base64.b64decode(delta)
-                            # Resample 24kHz → 8kHz
-                            pcm8, ctx["ratecv_state_out"] = audioop.ratecv(
-                                pcm24, 2, 1, 24000, 8000, ctx["ratecv_state_out"]
-                            )
-                            # PCM16 → mulaw
-                            mulaw = audioop.lin2ulaw(pcm8, 2)
-                            payload = base64.b64encode(mulaw).decode()
-                            ctx["audio_chunks_sent"] += 1
-                            if ctx["audio_chunks_sent"] == 1:
-                                logger.info(f"🔊 First audio chunk → Twilio (streamSid={ctx['stream_sid']})")
-                            await websocket.send_text(json.dumps({
-                                "event": "media",
-                                "streamSid": ctx["stream_sid"],
-                                "media": {"payload": payload}
-                            }))
-
-                elif event_type == "response.audio_transcript.done":
-                    text = msg.get("transcript", "").strip()
-                    if text:
-                        ctx["transcript"].append({
-                            "speaker": "assistant",
-                            "content": text,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                        logger.info(f"[Nia] {text[:120]}")
-
-                elif event_type == "conversation.item.input_audio_transcription.completed":
-                    text = msg.get("transcript", "").strip()
-                    if text:
-                        ctx["transcript"].append({
-                            "speaker": "user",
-                            "content": text,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                        logger.info(f"[User] {text[:120]}")
-
-                elif event_type == "response.function_call_arguments.delta":
-                    # Accumulate partial tool call arguments (streaming)
-                    call_id = msg.get("call_id", "")
-                    delta = msg.get("delta", "")
-                    if call_id:
-                        ctx.setdefault("tool_call_args", {})
-                        ctx["tool_call_args"].setdefault(call_id, {"name": "", "args_str": ""})
-                        ctx["tool_call_args"][call_id]["args_str"] += delta
-                        # Capture name if present in this event
-                        if msg.get("name"):
-                            ctx["tool_call_args"][call_id]["name"] = msg["name"]
-
-                elif event_type == "response.function_call_arguments.done":
-                    # Tool call complete — execute it
-                    call_id = msg.get("call_id", "")
-                    tool_name = msg.get("name", "")
-                    args_str = msg.get("arguments", "{}")
-
-                    # Fallback: use accumulated args if event args is empty
-                    if not args_str or args_str == "{}":
-                        accumulated = ctx.get("tool_call_args", {}).get(call_id, {})
-                        args_str = accumulated.get("args_str", "{}")
-                    if not tool_name:
-                        accumulated = ctx.get("tool_call_args", {}).get(call_id, {})
-                        tool_name = accumulated.get("name", "")
-
-                    logger.info(f"🔧 Tool call complete: {tool_name} call_id={call_id}")
-
-                    try:
-                        tool_args = json.loads(args_str) if args_str else {}
-                    except json.JSONDecodeError:
-                        tool_args = {}
-
-                    # Play thinking tone to fill silence during tool execution
-                    stream_sid = ctx.get("stream_sid")
-                    if stream_sid and audioop:
-                        try:
-                            tone_payload = generate_thinking_tone()
-                            await websocket.send_text(json.dumps({
-                                "event": "media",
-                                "streamSid": stream_sid,
-                                "media": {"payload": tone_payload}
-                            }))
-                        except Exception as _tone_err:
-                            logger.debug(f"Thinking tone send failed (non-fatal): {_tone_err}")
-
-                    # Dispatch tool call (non-blocking — runs in background)
-                    asyncio.create_task(
-                        dispatch_tool_call(oai_ws, tool_name, tool_args, call_id)
-                    )
+            summary = await summarize_conversation(plan.previous_summary, plan.text)
+            if ctx["openai_ws"] is not oai_ws or ctx["reconnecting"]:
+                # Session was replaced meanwhile — its items are gone anyway
+                compactor.summary = summary
+                return
+            for event in compactor.build_events(plan, summary):
+                await oai_ws.send(json.dumps(event))
+            compactor.apply(plan, summary)
+            logger.info(
+                f"[call_id={ctx.get('call_sid')}] Conversation compacted — "
+                f"live items={len(compactor.items)}, ~{compactor.total_tokens} tokens"
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"[call_id={ctx.get('call_sid')}] Conversation compaction failed: {e}")
+        finally:
+            compactor.in_flight = False
 
-                    # Clean up accumulated args
-                    ctx.get("tool_call_args", {}).pop(call_id, None)
+    def maybe_compact():
+        task = ctx.get("compaction_task")
+        if (task is None or task.done()) and ctx["compactor"].needs_compaction():
+            ctx["compaction_task"] = asyncio.create_task(compact_conversation())
 
-                elif event_type == "response.done":
-                    ctx["nia_speaking"] = False
-                    # Clear any echo captured while Nia was speaking
-                    await oai_ws.send(json.dumps({"type": "input_audio_buffer.clear"}))
-                    logger.debug("OpenAI response turn complete — mic unmuted")
+    # ── OpenAI receiver coroutine ─────────────────────────────────────────────
 
-                elif event_type == "error":
-                    logger.error(f"OpenAI Realtime error: {msg.get('error', msg)}")
+    async def receive_from_openai():
+        """Forward OpenAI Realtime audio/events to Twilio, reconnecting on drops."""
+        while True:
+            oai_ws = ctx["openai_ws"]
+            try:
+                async for raw_msg in oai_ws:
+                    msg = json.loads(raw_msg)
+                    event_type = msg.get("type", "")
+
+                    if event_type == "session.created":
+                        logger.info("OpenAI session created")
+
+                    elif event_type == "session.updated":
+                        ctx["session_ready"].set()
+                        logger.info("OpenAI session updated — ready")
+                        # Trigger initial greeting for outbound calls (once — not again after a reconnect)
+                        call_sid = ctx.get("call_sid")
+                        initial_msg = active_calls.get(call_sid, {}).get("initial_message")
+                        if initial_msg and not ctx["greeted"]:
+                            ctx["greeted"] = True
+                            await oai_ws.send(json.dumps({
+                                "type": "conversation.item.create",
+                                "item": {
+                                    "type": "message",
+                                    "role": "user",
+                                    "content": [{"type": "input_text", "text": f"[Start the call by saying this naturally]: {initial_msg}"}]
+                                }
+                            }))
+                            await oai_ws.send(json.dumps({"type": "response.create"}))
+                            logger.info(f"Triggered initial greeting for {call_sid}")
+
+                    elif event_type == "response.audio.delta":
+                        # PCM16 24kHz → mulaw 8kHz → Twilio
+                        ctx["nia_speaking"] = True
+                        delta = msg.get("delta", "")
+                        ctx.setdefault("audio_chunks_sent", 0)
+                        if delta:
+                            # Wait up to 2s for stream_sid if not yet set (race condition guard)
+                            if ctx.get("stream_sid") is None:
+                                waited = 0.0
+                                while ctx.get("stream_sid") is None and waited < 2.0:
+                                    await asyncio.sleep(0.05)
+                                    waited += 0.05
+                                if ctx.get("stream_sid") is None:
+                                    logger.warning(f"⚠️ stream_sid still None after 2s wait — dropping audio chunk")
+                            if ctx.get("stream_sid"):
+                                pcm24 = base64.b64decode(delta)
+                                # Resample 24kHz → 8kHz
+                                pcm8, ctx["ratecv_state_out"] = audioop.ratecv(
+                                    pcm24, 2, 1, 24000, 8000, ctx["ratecv_state_out"]
+                                )
+                                # PCM16 → mulaw
+                                mulaw = audioop.lin2ulaw(pcm8, 2)
+                                payload = base64.b64encode(mulaw).decode()
+                                if ctx["recorder"]:
+                                    ctx["recorder"].feed_agent(payload)
+                                ctx["audio_chunks_sent"] += 1
+                                if ctx["audio_chunks_sent"] == 1:
+                                    logger.info(f"🔊 First audio chunk → Twilio (streamSid={ctx['stream_sid']})")
+                                await websocket.send_text(json.dumps({
+                                    "event": "media",
+                                    "streamSid": ctx["stream_sid"],
+                                    "media": {"payload": payload}
+                                }))
+
+                    elif event_type == "conversation.item.created":
+                        ctx["compactor"].on_item_created(msg.get("item", {}))
+
+                    elif event_type == "conversation.item.deleted":
+                        ctx["compactor"].on_item_deleted(msg.get("item_id", ""))
+
+                    elif event_type == "response.audio_transcript.done":
+                        text = msg.get("transcript", "").strip()
+                        if text:
+                            ctx["compactor"].on_item_text(msg.get("item_id", ""), text)
+                            ctx["transcript"].append({
+                                "speaker": "assistant",
+                                "content": text,
+                                "timestamp": datetime.now().isoformat()
+                            })
+                            logger.info(f"[Nia] {text[:120]}")
+
+                    elif event_type == "conversation.item.input_audio_transcription.completed":
+                        text = msg.get("transcript", "").strip()
+                        if text:
+                            ctx["compactor"].on_item_text(msg.get("item_id", ""), text)
+                            ctx["transcript"].append({
+                                "speaker": "user",
+                                "content": text,
+                                "timestamp": datetime.now().isoformat()
+                            })
+                            logger.info(f"[User] {text[:120]}")
+
+                    elif event_type == "response.function_call_arguments.delta":
+                        # Accumulate partial tool call arguments (streaming)
+                        call_id = msg.get("call_id", "")
+                        delta = msg.get("delta", "")
+                        if call_id:
+                            ctx.setdefault("tool_call_args", {})
+                            ctx["tool_call_args"].setdefault(call_id, {"name": "", "args_str": ""})
+                            ctx["tool_call_args"][call_id]["args_str"] += delta
+                            # Capture name if present in this event
+                            if msg.get("name"):
+                                ctx["tool_call_args"][call_id]["name"] = msg["name"]
+
+                    elif event_type == "response.function_call_arguments.done":
+                        # Tool call complete — execute it
+                        call_id = msg.get("call_id", "")
+                        tool_name = msg.get("name", "")
+                        args_str = msg.get("arguments", "{}")
+
+                        # Fallback: use accumulated args if event args is empty
+                        if not args_str or args_str == "{}":
+                            accumulated = ctx.get("tool_call_args", {}).get(call_id, {})
+                            args_str = accumulated.get("args_str", "{}")
+                        if not tool_name:
+                            accumulated = ctx.get("tool_call_args", {}).get(call_id, {})
+                            tool_name = accumulated.get("name", "")
+
+                        logger.info(f"🔧 Tool call complete: {tool_name} call_id={call_id}")
 
-                else:
-                    logger.debug(f"OpenAI event: {event_type}")
+                        try:
+                            tool_args = json.loads(args_str) if args_str else {}
+                        except json.JSONDecodeError:
+                            tool_args = {}
+
+                        # Play thinking tone to fill silence during tool execution
+                        stream_sid = ctx.get("stream_sid")
+                        if stream_sid and audioop:
+                            try:
+                                tone_payload = generate_thinking_tone()
+                                await websocket.send_text(json.dumps({
+                                    "event": "media",
+                                    "streamSid": stream_sid,
+                                    "media": {"payload": tone_payload}
+                                }))
+                            except Exception as _tone_err:
+                                logger.debug(f"Thinking tone send failed (non-fatal): {_tone_err}")
+
+                        # Dispatch tool call (non-blocking — owned by this call's task group, may defer)
+                        tool_scheduler.spawn(
+                            ctx.get("call_sid"),
+                            dispatch_tool_call(oai_ws, tool_name, tool_args, call_id, call_state=ctx)
+                        )
 
-        except websockets.exceptions.ConnectionClosed as e:
-            logger.info(f"OpenAI WS closed: {e}")
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            logger.error(f"OpenAI receiver error: {e}", exc_info=True)
+                        # Clean up accumulated args
+                        ctx.get("tool_call_args", {}).pop(call_id, None)
+
+                    elif event_type == "response.done":
+                        ctx["nia_speaking"] = False
+                        # Clear any echo captured while Nia was speaking
+                        await oai_ws.send(json.dumps({"type": "input_audio_buffer.clear"}))
+                        logger.debug("OpenAI response turn complete — mic unmuted")
+                        # Between turns is the cheapest moment to shrink the context
+                        maybe_compact()
+
+                    elif event_type == "error":
+                        logger.error(f"OpenAI Realtime error: {msg.get('error', msg)}")
+
+                    else:
+                        logger.debug(f"OpenAI event: {event_type}")
+
+                logger.info("OpenAI WS stream ended")
+            except websockets.exceptions.ConnectionClosed as e:
+                logger.info(f"OpenAI WS closed: {e}")
+            except asyncio.CancelledError:
+                return
+            except Exception as e:
+                logger.error(f"OpenAI receiver error: {e}", exc_info=True)
+                return
+
+            if ctx["closing"]:
+                return
+            if not await reconnect_openai():
+                # Hang up rather than leave the caller in silence
+                try:
+                    await websocket.close()
+                except Exception:
+                    pass
+                return
 
     # ── Main Twilio event loop ────────────────────────────────────────────────
 
@@ -1083,6 +1635,7 @@ async def media_stream_ws(websocket: WebSocket):
             raw = await websocket.receive_text()
             msg = json.loads(raw)
             event = msg.get("event")
+            call_reaper.touch(ctx["call_sid"])
 
             if event == "connected":
                 logger.info("Twilio: stream connected")
@@ -1108,47 +1661,22 @@ async def media_stream_ws(websocket: WebSocket):
                         "status": "active"
                     })
                     active_calls[ctx["call_sid"]] = existing
+                    call_reaper.track(ctx["call_sid"])
+
+                    if RECORD_CALL_AUDIO:
+                        ctx["recorder"] = await start_audio_recording(
+                            ctx["call_sid"], ctx["caller_number"], outbound=bool(ctx["caller_number"])
+                        )
 
                 # ── Connect to OpenAI Realtime ──────────────────────────────
                 try:
                     logger.info(f"Connecting to OpenAI Realtime: {OPENAI_REALTIME_URL}")
-                    oai_ws = await websockets.connect(
-                        OPENAI_REALTIME_URL,
-                        additional_headers={
-                            "Authorization": f"Bearer {OPENAI_API_KEY}",
-                            "OpenAI-Beta": "realtime=v1"
-                        }
-                    )
-                    ctx["openai_ws"] = oai_ws
-                    logger.info("OpenAI Realtime WS connected")
-
-                    # ── Send session.update with fresh per-call context ─────
-                    call_prompt = build_call_prompt(ctx.get("caller_number", ""))
-                    tools = VOICE_TOOLS  # Tier 1 + Tier 2 live tools
-                    session_config = {
-                        "type": "session.update",
-                        "session": {
-                            "modalities": ["text", "audio"],
-                            "instructions": call_prompt,
-                            "voice": OPENAI_VOICE,
-                            "input_audio_format": "pcm16",
-                            "output_audio_format": "pcm16",
-                            "input_audio_transcription": {
-                                "model": "whisper-1"
-                            },
-                            "turn_detection": {
-                                "type": "semantic_vad",
-                                "eagerness": "balanced"
-                            },
-                            "temperature": 0.6,
-                            "tools": tools,
-                            "tool_choice": "auto"
-                        }
-                    }
-                    await oai_ws.send(json.dumps(session_config))
+                    # ── Build fresh per-call context and open the session ────
+                    ctx["call_prompt"] = build_call_prompt(ctx.get("caller_number", ""))
+                    ctx["openai_ws"] = await open_realtime_session(ctx["call_prompt"])
                     logger.info(
-                        f"session.update sent (voice={OPENAI_VOICE}, "
-                        f"tools={len(tools)}, prompt={len(call_prompt)}c, "
+                        f"OpenAI Realtime WS connected — session.update sent (voice={OPENAI_VOICE}, "
+                        f"tools={len(VOICE_TOOLS)}, prompt={len(ctx['call_prompt'])}c, "
                         f"caller={KNOWN_CALLERS.get(ctx.get('caller_number',''), 'unknown')})"
                     )
 
@@ -1159,11 +1687,14 @@ async def media_stream_ws(websocket: WebSocket):
                     logger.error(f"Failed to connect to OpenAI Realtime: {e}", exc_info=True)
 
             elif event == "media":
+                # Record the caller leg even while the mic is muted for Nia
+                if ctx["recorder"]:
+                    ctx["recorder"].feed_caller(msg.get("media", {}).get("payload", ""))
                 # Twilio mulaw 8kHz → PCM16 24kHz → OpenAI
                 oai_ws = ctx["openai_ws"]
                 if oai_ws and not ctx.get("nia_speaking"):
                     # Wait for session to be ready before forwarding audio
-                    if not ctx["session_ready"].is_set():
+                    if not ctx["reconnecting"] and not ctx["session_ready"].is_set():
                         try:
                             await asyncio.wait_for(ctx["session_ready"].wait(), timeout=3.0)
                         except asyncio.TimeoutError:
@@ -1177,11 +1708,20 @@ async def media_stream_ws(websocket: WebSocket):
                         linear24, ctx["ratecv_state_in"] = audioop.ratecv(
                             linear8, 2, 1, 8000, 24000, ctx["ratecv_state_in"]
                         )
-                        # Forward to OpenAI
-                        await oai_ws.send(json.dumps({
-                            "type": "input_audio_buffer.append",
-                            "audio": base64.b64encode(linear24).decode()
-                        }))
+                        audio_b64 = base64.b64encode(linear24).decode()
+                        if ctx["reconnecting"]:
+                            # Hold until the new session is up (oldest frames dropped first)
+                            ctx["audio_backlog"].append(audio_b64)
+                        else:
+                            # Forward to OpenAI (re-read: a reconnect may have swapped the WS)
+                            try:
+                                await ctx["openai_ws"].send(json.dumps({
+                                    "type": "input_audio_buffer.append",
+                                    "audio": audio_b64
+                                }))
+                            except websockets.exceptions.ConnectionClosed:
+                                # Receiver will notice the drop and reconnect; keep the frame
+                                ctx["audio_backlog"].append(audio_b64)
 
             elif event == "stop":
                 logger.info(f"Stream stopped: {ctx['stream_sid']}")
@@ -1197,15 +1737,23 @@ async def media_stream_ws(websocket: WebSocket):
 
     finally:
         # ── Cleanup ───────────────────────────────────────────────────────────
+        ctx["closing"] = True
+        call_reaper.untrack(ctx["call_sid"])
+
+        # Cancel OpenAI receiver and compaction tasks
+        for key in ("openai_task", "compaction_task"):
+            task = ctx.get(key)
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
 
-        # Cancel OpenAI receiver task
-        task = ctx.get("openai_task")
-        if task and not task.done():
+        # Cancel this call's tool tasks (in-flight and deferred)
+        await tool_scheduler.cancel_call(ctx.get("call_sid"))
+        for task in list(ctx["deferred_tools"]):
             task.cancel()
-            try:
-                await task
-            except (asyncio.CancelledError, Exception):
-                pass
 
         # Close OpenAI WebSocket
         oai_ws = ctx.get("openai_ws")
@@ -1216,20 +1764,34 @@ async def media_stream_ws(websocket: WebSocket):
             except Exception:
                 pass
 
+        # Finalize the audio recording (writer thread joins off the loop)
+        if ctx["recorder"]:
+            await finish_audio_recording(ctx["call_sid"])
+
         # Save transcript
         call_sid = ctx["call_sid"]
         transcript = ctx["transcript"]
         if call_sid and transcript:
-            _save_transcript(call_sid, transcript)
+            await asyncio.to_thread(_save_transcript, call_sid, transcript)
 
-        # Post-call handler: summarize, write memory, wake OpenClaw (async, non-blocking)
+        # Post-call handler: summarize, write memory, wake OpenClaw (durable queue)
         if call_sid and transcript:
             call_duration = time.time() - ctx["started_at"]
             caller_number = ctx.get("caller_number", "")
-            asyncio.create_task(
-                summarize_and_remember(call_sid, transcript, caller_number, call_duration)
-            )
-            logger.info("Post-call handler dispatched (async)")
+            payload = {
+                "transcript": transcript,
+                "caller_number": caller_number,
+                "duration_s": call_duration,
+                "ended_at": time.time(),
+            }
+            try:
+                await post_call_queue.enqueue(call_sid, payload)
+            except Exception as e:
+                # Queue DB unavailable — fall back to a one-shot task
+                logger.error(f"Post-call queue unavailable ({e}) — running handler directly")
+                asyncio.create_task(
+                    summarize_and_remember(call_sid, transcript, caller_number, call_duration)
+                )
 
         # Update active calls
         if call_sid and call_sid in active_calls:
@@ -1248,11 +1810,21 @@ async def summarize_and_remember(
     call_sid: str,
     transcript: list[dict],
     caller_number: str = "",
-    duration_s: float = 0.0
+    duration_s: float = 0.0,
+    state: Optional[dict] = None,
+    checkpoint=None,
+    final_attempt: bool = True,
+    ended_at: Optional[float] = None,
 ) -> None:
     """
     Post-call handler: summarize transcript, write to daily memory, wake OpenClaw.
-    Called async/non-blocking from the cleanup block via asyncio.create_task().
+
+    Run by the post-call queue (see _run_post_call_job). Finished steps are
+    recorded in `state` and persisted via `checkpoint(state)`, so a retry
+    resumes where the last attempt stopped instead of writing the memory
+    entry twice. Step failures raise (→ retry with backoff) unless this is
+    the final attempt, which degrades as before: excerpt instead of summary,
+    logged write/wake errors.
     """
     if not transcript:
         logger.info("Post-call: no transcript to summarize")
@@ -1262,8 +1834,14 @@ async def summarize_and_remember(
         logger.warning("Post-call: no OpenAI key, skipping summary")
         return
 
+    state = state if state is not None else {}
+
+    async def _checkpoint() -> None:
+        if checkpoint:
+            await asyncio.to_thread(checkpoint, state)
+
     caller_name = KNOWN_CALLERS.get(caller_number, caller_number or "unknown")
-    now = datetime.now()
+    now = datetime.fromtimestamp(ended_at) if ended_at else datetime.now()
     date_str = now.strftime("%Y-%m-%d")
     time_str = now.strftime("%H:%M")
 
@@ -1274,65 +1852,72 @@ async def summarize_and_remember(
     )
 
     # ── Step 1: Summarize with GPT-4o-mini ────────────────────────────────────
-    summary = ""
-    try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            resp = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
-                json={
-                    "model": "gpt-4o-mini",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": (
-                                "Summarize this voice call transcript in 2-4 sentences. "
-                                "Focus on: what was discussed, any decisions made, any action items. "
-                                "Be concise and factual. Write in third person "
-                                "(e.g. 'Remi asked about...')."
-                            )
-                        },
-                        {
-                            "role": "user",
-                            "content": (
-                                f"Call with {caller_name} on {date_str} at {time_str} "
-                                f"({int(duration_s)}s, {len(transcript)} turns):\n\n"
-                                f"{transcript_text}"
-                            )
-                        }
-                    ],
-                    "max_tokens": 200,
-                    "temperature": 0.3
-                }
-            )
-            resp.raise_for_status()
-            summary = resp.json()["choices"][0]["message"]["content"].strip()
-            logger.info(f"Post-call summary generated: {summary[:100]}...")
-    except Exception as e:
-        logger.error(f"Post-call summarization failed: {e}")
-        # Fallback: raw excerpt
-        summary = f"[Auto-summary unavailable] Transcript excerpt: {transcript_text[:300]}"
+    summary = state.get("summary", "")
+    if not summary:
+        try:
+            async with tool_scheduler.slot("http", Priority.BACKGROUND), httpx.AsyncClient(timeout=20.0) as client:
+                resp = await client.post(
+                    "https://api.openai.com/v1/chat/completions",
+                    headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
+                    json={
+                        "model": "gpt-4o-mini",
+                        "messages": [
+                            {
+                                "role": "system",
+                                "content": (
+                                    "Summarize this voice call transcript in 2-4 sentences. "
+                                    "Focus on: what was discussed, any decisions made, any action items. "
+                                    "Be concise and factual. Write in third person "
+                                    "(e.g. 'Remi asked about...')."
+                                )
+                            },
+                            {
+                                "role": "user",
+                                "content": (
+                                    f"Call with {caller_name} on {date_str} at {time_str} "
+                                    f"({int(duration_s)}s, {len(transcript)} turns):\n\n"
+                                    f"{transcript_text}"
+                                )
+                            }
+                        ],
+                        "max_tokens": 200,
+                        "temperature": 0.3
+                    }
+                )
+                resp.raise_for_status()
+                summary = resp.json()["choices"][0]["message"]["content"].strip()
+                logger.info(f"Post-call summary generated: {summary[:100]}...")
+        except Exception as e:
+            logger.error(f"Post-call summarization failed: {e}")
+            if not final_attempt:
+                raise
+            # Fallback: raw excerpt
+            summary = f"[Auto-summary unavailable] Transcript excerpt: {transcript_text[:300]}"
+        state["summary"] = summary
+        await _checkpoint()
 
     # ── Step 2: Append to daily memory file ───────────────────────────────────
-    try:
-        memory_dir = WORKSPACE_ROOT / "memory"
-        memory_dir.mkdir(parents=True, exist_ok=True)
-        daily_file = memory_dir / f"{date_str}.md"
-
-        call_entry = (
-            f"\n## 📞 Call with {caller_name} at {time_str} "
-            f"({int(duration_s)}s, {len(transcript)} turns)\n"
-            f"{summary}\n"
-        )
-
-        with open(daily_file, "a") as f:
-            f.write(call_entry)
-
-        logger.info(f"Post-call: summary written to {daily_file}")
-    except Exception as e:
-        logger.error(f"Post-call: failed to write memory: {e}")
+    if not state.get("memory_written"):
+        try:
+            daily_file = WORKSPACE_ROOT / "memory" / f"{date_str}.md"
+            call_entry = (
+                f"\n## 📞 Call with {caller_name} at {time_str} "
+                f"({int(duration_s)}s, {len(transcript)} turns)\n"
+                f"{summary}\n"
+            )
+            await memory_batcher.append(daily_file, call_entry)
+            logger.info(f"Post-call: summary written to {daily_file}")
+            state["memory_written"] = True
+            await _checkpoint()
+        except Exception as e:
+            logger.error(f"Post-call: failed to write memory: {e}")
+            if not final_attempt:
+                raise
 
     # ── Step 3: Wake OpenClaw gateway ─────────────────────────────────────────
+    if state.get("woken"):
+        return
+
     token = OPENCLAW_TOKEN
     if not token:
         logger.warning("Post-call: no OPENCLAW_TOKEN, skipping wake event")
@@ -1344,7 +1929,7 @@ async def summarize_and_remember(
     )
 
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with tool_scheduler.slot("http", Priority.BACKGROUND), httpx.AsyncClient(timeout=5.0) as client:
             resp = await client.post(
                 f"{OPENCLAW_GATEWAY_URL}/internal/events/wake",
                 headers={
@@ -1353,34 +1938,48 @@ async def summarize_and_remember(
                 },
                 json={"text": wake_text, "mode": "now"}
             )
-            if resp.status_code < 300:
-                logger.info("Post-call: OpenClaw wake event sent ✅")
-            else:
-                logger.warning(
-                    f"Post-call: wake event returned {resp.status_code}: "
-                    f"{resp.text[:100]}"
+            if resp.status_code >= 300:
+                raise RuntimeError(
+                    f"wake event returned {resp.status_code}: {resp.text[:100]}"
                 )
+            logger.info("Post-call: OpenClaw wake event sent ✅")
+            state["woken"] = True
+            await _checkpoint()
     except Exception as e:
         logger.error(f"Post-call: failed to send wake event: {e}")
+        if not final_attempt:
+            raise
+
+
+async def _run_post_call_job(job: PostCallJob) -> None:
+    """Post-call queue handler: one resumable summarize_and_remember() run."""
+    payload = job.payload
+    await summarize_and_remember(
+        job.call_sid,
+        payload.get("transcript", []),
+        payload.get("caller_number", ""),
+        payload.get("duration_s", 0.0),
+        state=job.state,
+        checkpoint=lambda state: post_call_queue.save_state(job.call_sid, state),
+        final_attempt=job.is_final_attempt,
+        ended_at=payload.get("ended_at"),
+    )
 
 
-def _save_transcript(call_sid: str, transcript: list[dict]) -> None:
-    """Persist call transcript to workspace/memory/call-transcripts/."""
-    try:
-        transcripts_dir = WORKSPACE_ROOT / "memory" / "call-transcripts"
-        transcripts_dir.mkdir(parents=True, exist_ok=True)
+# Durable post-call processing (summary → memory → wake), shared by all calls
+memory_batcher = MemoryAppendBatcher()
+post_call_queue = PostCallQueue(handler=_run_post_call_job)
 
-        ts = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        path = transcripts_dir / f"{ts}_{call_sid}.json"
 
-        data = {
-            "call_sid": call_sid,
-            "recorded_at": datetime.now().isoformat(),
-            "turns": len(transcript),
-            "transcript": transcript
-        }
-        path.write_text(json.dumps(data, indent=2))
-        logger.info(f"Transcript saved → {path}")
+def _save_transcript(call_sid: str, transcript: list[dict]) -> None:
+    """
+    Archive a call transcript under workspace/memory/call-transcripts/.
+
+    Blocking — the media bridge runs it via asyncio.to_thread().
+    """
+    try:
+        entry = get_archive(_transcripts_dir()).append(call_sid, transcript)
+        logger.info(f"Transcript archived → {entry.segment} (offset {entry.offset})")
 
     except Exception as e:
         logger.error(f"Failed to save transcript for {call_sid}: {e}")
@@ -1625,9 +2224,23 @@ async def health():
         "openai_configured": bool(OPENAI_API_KEY),
         "stream_url": MEDIA_STREAM_WS_URL,
         "inbound_calls_enabled": ALLOW_INBOUND_CALLS,
+        "tool_scheduler": tool_scheduler.get_stats(),
+        "post_call_queue": await asyncio.to_thread(post_call_queue.get_stats),
+        "call_reaper": call_reaper.get_stats(),
+        "call_retention": call_retention.get_stats() if call_retention else None,
+        "storage_stats": storage_monitor.get_stats() if storage_monitor else None,
+        "bridge_events": get_bridge_emitter().get_stats(),
     }
 
 
+@app.get("/metrics")
+async def metrics():
+    """Storage and bridge delivery gauges in Prometheus format (no database access)."""
+    body = storage_monitor.get_prometheus_metrics() + "\n" if storage_monitor else ""
+    body += get_bridge_emitter().get_prometheus_metrics()
+    return Response(content=body, media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -1644,6 +2257,7 @@ async def root():
             "cancel_call":     "DELETE /call/{id} — cancel outbound call",
             "calls":           "GET  /calls — list active calls",
             "health":          "GET  /health — health check",
+            "metrics":         "GET  /metrics — storage and bridge gauges (Prometheus)",
         }
     }
 
@@ -1662,6 +2276,25 @@ async def on_startup():
     # Update Twilio phone number webhook
     asyncio.create_task(_update_twilio_webhook())
 
+    # Resume post-call jobs interrupted by the last shutdown
+    try:
+        await post_call_queue.start()
+    except Exception as e:
+        logger.error(f"❌  Post-call queue failed to start: {e}")
+
+    # Reap calls left active by the last run, then any that go idle
+    recovered = []
+    try:
+        from call_recording import recording_manager
+        recovered = [c["call_id"] for c in await asyncio.to_thread(recording_manager.get_active_calls)]
+    except Exception as e:
+        logger.warning(f"Could not load active calls for the reaper: {e}")
+    await call_reaper.start(recovered)
+
+    # Finish call_history.db migrations that rewrite rows, then start retention,
+    # without holding up startup
+    asyncio.create_task(_maintain_call_history())
+
     logger.info(f"🎙️  Nia Voice Server ready (Twilio Media Streams)")
     logger.info(f"   Voice:      {OPENAI_VOICE}")
     logger.info(f"   Stream URL: {MEDIA_STREAM_WS_URL}")
@@ -1669,6 +2302,38 @@ async def on_startup():
     logger.info(f"   Inbound:    {'enabled' if ALLOW_INBOUND_CALLS else 'disabled'}")
 
 
+@app.on_event("shutdown")
+async def on_shutdown():
+    await call_reaper.stop()
+    if call_retention:
+        await call_retention.stop()
+    if storage_monitor:
+        await storage_monitor.stop()
+    await post_call_queue.stop()
+    await memory_batcher.flush()
+    # Let session bridge events still queued (e.g. the last call_ended) go out
+    await asyncio.to_thread(get_bridge_emitter().close)
+
+
+async def _maintain_call_history():
+    """Run pending online migrations of call_history.db, then archive aged data and keep storage stats."""
+    global call_retention, storage_monitor
+    try:
+        from call_recording import recording_manager
+        from db_migrations import run_backfill
+        await asyncio.to_thread(run_backfill, recording_manager.db_path)
+        call_retention = CallRetentionManager(
+            recording_manager.db_path,
+            recordings_dir=recording_manager.recordings_dir,
+            transcripts_dir=_transcripts_dir(),
+        )
+        await call_retention.start()
+        storage_monitor = StorageStatsMonitor(recording_manager.db_path, recording_manager.recordings_dir)
+        await storage_monitor.start()
+    except Exception as e:
+        logger.error(f"call_history.db maintenance failed: {e}")
+
+
 async def _update_twilio_webhook():
     """Update the Twilio phone number webhook to /voice/incoming."""
     if not twilio_client or not TWILIO_PHONE_NUMBER:
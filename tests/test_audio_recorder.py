@@ -0,0 +1,152 @@
+"""
+Unit tests for the streaming call audio recorder
+
+Tests the SPSC ring buffer, stereo leg placement, WAV headers (PCM and
+µ-law), the size cap and frame dropping when the ring is full.
+"""
+
+import base64
+import math
+import struct
+import sys
+import os
+import wave
+
+import pytest
+
+# Add scripts to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import audio_recorder
+from audio_recorder import SPSCRingBuffer, StreamingWavRecorder
+
+audioop = audio_recorder.audioop
+pytestmark = pytest.mark.skipif(audioop is None, reason="audioop not available")
+
+FRAME_SAMPLES = 160  # 20 ms at 8 kHz
+
+
+def _tone_frame(freq=440, amplitude=8000):
+    """One 20 ms Twilio-style frame: base64 µ-law."""
+    pcm = b"".join(
+        struct.pack("<h", int(amplitude * math.sin(2 * math.pi * freq * i / 8000)))
+        for i in range(FRAME_SAMPLES)
+    )
+    return base64.b64encode(audioop.lin2ulaw(pcm, 2)).decode()
+
+
+def _channels(path):
+    with wave.open(str(path)) as w:
+        assert w.getnchannels() == 2
+        assert w.getframerate() == 8000
+        data = w.readframes(w.getnframes())
+    return audioop.tomono(data, 2, 1, 0), audioop.tomono(data, 2, 0, 1)
+
+
+class TestSPSCRingBuffer:
+    """Ring buffer semantics."""
+
+    def test_write_read_roundtrip(self):
+        ring = SPSCRingBuffer(64)
+        assert ring.write(b"hello")
+        assert ring.used == 5
+        assert ring.read_all() == b"hello"
+        assert ring.read_all() == b""
+
+    def test_wraps_around(self):
+        ring = SPSCRingBuffer(64)
+        ring.write(b"x" * 50)
+        ring.read_all()
+        assert ring.write(b"abcdefghijklmnopqrstuvwxyz")
+        assert ring.read_all() == b"abcdefghijklmnopqrstuvwxyz"
+
+    def test_full_ring_rejects_whole_record(self):
+        ring = SPSCRingBuffer(64)
+        assert ring.write(b"a" * 60)
+        assert not ring.write(b"b" * 10)
+        assert ring.read_all() == b"a" * 60
+
+
+class TestStreamingWavRecorder:
+    """End-to-end recording through the writer thread."""
+
+    def test_caller_left_agent_right(self, tmp_path):
+        path = tmp_path / "call.wav"
+        rec = StreamingWavRecorder(path)
+        rec.start()
+        for _ in range(50):
+            rec.feed_caller(_tone_frame(440))
+        for _ in range(25):
+            rec.feed_agent(_tone_frame(880))
+        stats = rec.close()
+
+        left, right = _channels(path)
+        assert stats["duration_s"] == pytest.approx(1.0, abs=0.05)
+        assert audioop.rms(left, 2) > 1000
+        assert audioop.rms(right, 2) > 1000
+        # Agent spoke for 0.5 s: the rest of the right channel is silent
+        tail_start = (len(right) // 4) * 2 + 1600  # 0.1 s past the middle
+        assert audioop.rms(right[tail_start:], 2) == 0
+
+    def test_header_valid_before_close(self, tmp_path):
+        path = tmp_path / "live.wav"
+        rec = StreamingWavRecorder(path)
+        rec.start()
+        for _ in range(10):
+            rec.feed_caller(_tone_frame())
+        try:
+            rec._stop.wait(audio_recorder.HEADER_UPDATE_INTERVAL + 0.3)
+            with wave.open(str(path)) as w:
+                assert w.getnframes() > 0
+        finally:
+            rec.close()
+
+    def test_compressed_output_is_mulaw(self, tmp_path):
+        path = tmp_path / "call.wav"
+        rec = StreamingWavRecorder(path, compress=True)
+        rec.start()
+        for _ in range(50):
+            rec.feed_caller(_tone_frame())
+        stats = rec.close()
+
+        raw = path.read_bytes()
+        fmt_code, channels, rate = struct.unpack_from("<HHI", raw, 20)
+        assert (fmt_code, channels, rate) == (audio_recorder.WAVE_FORMAT_MULAW, 2, 8000)
+        assert b"fact" in raw[:64]
+        data_size = struct.unpack_from("<I", raw, raw.index(b"data") + 4)[0]
+        assert data_size == stats["bytes"]
+        assert data_size == pytest.approx(8000 * 2, abs=2 * 80)  # 1 s, 1 byte/sample/channel
+
+    def test_size_cap_truncates(self, tmp_path):
+        path = tmp_path / "capped.wav"
+        rec = StreamingWavRecorder(path, max_bytes=4000)
+        rec.start()
+        for _ in range(50):
+            rec.feed_caller(_tone_frame())
+        stats = rec.close()
+        assert stats["truncated"] is True
+        assert stats["bytes"] == 4000
+        with wave.open(str(path)) as w:
+            assert w.getnframes() == 1000
+
+    def test_full_ring_drops_frames(self, tmp_path):
+        # A ring smaller than one frame record can never accept it
+        rec = StreamingWavRecorder(tmp_path / "drop.wav", ring_bytes=64)
+        rec.start()
+        rec.feed_caller(_tone_frame())
+        stats = rec.close()
+        assert stats["frames_in"] == 1
+        assert stats["frames_dropped"] == 1
+        assert stats["bytes"] == 0
+
+    def test_feed_before_start_ignored(self, tmp_path):
+        rec = StreamingWavRecorder(tmp_path / "idle.wav")
+        rec.feed_caller(_tone_frame())
+        assert rec.stats["frames_in"] == 0
+
+    def test_bad_payload_counted(self, tmp_path):
+        rec = StreamingWavRecorder(tmp_path / "bad.wav")
+        rec.start()
+        rec.feed_caller("!!!not-base64")
+        stats = rec.close()
+        assert stats["bad_frames"] == 1
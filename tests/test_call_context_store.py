@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/call_context_store.py
+
+Covers:
+- Module API: store/get/clear, user_phone by call type, batch get/put
+- TTL expiry and LRU eviction, for both backends
+- SQLite backend shared between store instances (other processes)
+- Hit/miss stats
+
+Run with:
+    python3 -m pytest tests/test_call_context_store.py -v
+"""
+
+import os
+import sys
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import call_context_store as ccs
+from call_context_store import CallContextStore, MemoryContextBackend, SQLiteContextBackend
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_backend(request, tmp_path):
+    def make(max_entries=100):
+        if request.param == "memory":
+            return MemoryContextBackend(max_entries)
+        return SQLiteContextBackend(tmp_path / "ctx.db", max_entries)
+    return make
+
+
+@pytest.fixture
+def store():
+    """Fresh in-memory singleton for the module-level functions."""
+    fresh = CallContextStore(MemoryContextBackend(100), ttl=60)
+    with patch.object(ccs, "call_context_store", fresh):
+        yield fresh
+
+
+class TestModuleApi:
+    """store_call_context / get_call_context and friends."""
+
+    def test_inbound_user_is_caller(self, store):
+        ccs.store_call_context("c1", caller_phone="+15551111", callee_phone="+15552222", call_type="inbound")
+        assert ccs.get_user_phone("c1") == "+15551111"
+
+    def test_outbound_user_is_callee(self, store):
+        ccs.store_call_context("c1", caller_phone="+15551111", callee_phone="+15552222",
+                               call_type="outbound", agent="nia")
+        context = ccs.get_call_context("c1")
+        assert context["user_phone"] == "+15552222"
+        assert context["agent"] == "nia"
+
+    def test_missing_and_cleared(self, store):
+        assert ccs.get_call_context("nope") == {}
+        assert ccs.get_user_phone("nope") is None
+        ccs.store_call_context("c1", caller_phone="+1", call_type="inbound")
+        ccs.clear_call_context("c1")
+        ccs.clear_call_context("c1")  # Second clear is a no-op
+        assert ccs.get_all_contexts() == {}
+
+    def test_batch_put_and_get(self, store):
+        ccs.store_call_contexts({
+            "a": {"caller_phone": "+1", "call_type": "inbound"},
+            "b": {"callee_phone": "+2", "call_type": "outbound", "lang": "en"},
+        })
+        found = ccs.get_call_contexts(["a", "b", "missing"])
+        assert found["a"]["user_phone"] == "+1"
+        assert found["b"]["user_phone"] == "+2"
+        assert found["b"]["lang"] == "en"
+        assert "missing" not in found
+
+    def test_stats(self, store):
+        ccs.store_call_context("c1", caller_phone="+1", call_type="inbound")
+        ccs.get_call_context("c1")
+        ccs.get_call_context("c1")
+        ccs.get_call_context("c2")
+        stats = ccs.get_store_stats()
+        assert (stats["hits"], stats["misses"], stats["puts"]) == (2, 1, 1)
+        assert stats["hit_rate"] == pytest.approx(0.667)
+        assert stats["entries"] == 1
+        assert stats["backend"] == "MemoryContextBackend"
+
+
+class TestBounds:
+    """TTL and LRU eviction, for each backend."""
+
+    def test_ttl_expiry(self, make_backend):
+        store = CallContextStore(make_backend(), ttl=60)
+        with patch.object(ccs.time, "time", return_value=1000.0):
+            store.put("c1", {"user_phone": "+1"})
+        with patch.object(ccs.time, "time", return_value=1059.0):
+            assert store.get("c1") == {"user_phone": "+1"}
+        with patch.object(ccs.time, "time", return_value=1061.0):
+            assert store.get("c1") is None
+        assert store.stats["expired"] == 1
+        assert len(store.backend) == 0
+
+    def test_lru_eviction(self, make_backend):
+        store = CallContextStore(make_backend(max_entries=2), ttl=60)
+        store.put("a", {"n": 1})
+        store.put("b", {"n": 2})
+        store.get("a")  # b is now least recently used
+        store.put("c", {"n": 3})
+        assert set(store.items()) == {"a", "c"}
+        assert store.stats["evictions"] == 1
+
+    def test_purge_expired(self, make_backend):
+        store = CallContextStore(make_backend(), ttl=60)
+        with patch.object(ccs.time, "time", return_value=1000.0):
+            store.put_many({"a": {}, "b": {}})
+        with patch.object(ccs.time, "time", return_value=2000.0):
+            assert store.purge_expired() == 2
+            assert store.items() == {}
+
+
+class TestSQLiteShared:
+    """The SQLite backend is visible across store instances (processes)."""
+
+    def test_other_instance_sees_context(self, tmp_path):
+        writer = CallContextStore(SQLiteContextBackend(tmp_path / "ctx.db"), ttl=60)
+        reader = CallContextStore(SQLiteContextBackend(tmp_path / "ctx.db"), ttl=60)
+        writer.put("c1", {"user_phone": "+15551111", "tags": ["vip"]})
+        assert reader.get("c1") == {"user_phone": "+15551111", "tags": ["vip"]}
+        writer.delete("c1")
+        assert reader.get("c1") is None
+
+    def test_sqlite_backend_selected_by_env(self, tmp_path):
+        with patch.object(ccs, "CALL_CONTEXT_BACKEND", "sqlite"), \
+             patch.object(ccs, "CALL_CONTEXT_DB", tmp_path / "env.db"):
+            store = ccs._create_store()
+        assert isinstance(store.backend, SQLiteContextBackend)
+        assert store.backend.db_path == tmp_path / "env.db"
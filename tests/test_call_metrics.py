@@ -532,7 +532,64 @@ class TestLatencyEventTypes:
         assert LatencyEventType.SPEECH_END_TO_FIRST_AUDIO.value == "speech_end_to_first_audio"
         assert LatencyEventType.TOOL_CALL_DURATION.value == "tool_call_duration"
         assert LatencyEventType.SESSION_DURATION.value == "session_duration"
+        assert LatencyEventType.SESSION_RECOVERY.value == "session_recovery"
+        assert LatencyEventType.TOOL_FIRST_AUDIO.value == "tool_first_audio"
 
 
+
+class TestSqlAggregation:
+    """Grouped SQL aggregates and sketch percentiles."""
+    
+    def test_sketch_percentiles_close_to_exact(self, tmp_path):
+        import random
+        rng = random.Random(3)
+        manager = CallMetricsManager(db_path=tmp_path / "metrics.db")
+        durations = [rng.lognormvariate(4, 1) for _ in range(2000)]
+        now = datetime.now(timezone.utc)
+        with sqlite3.connect(manager.db_path) as conn:
+            conn.execute(
+                "CREATE TABLE calls (call_id TEXT PRIMARY KEY, call_type TEXT, started_at TEXT, "
+                "duration_seconds REAL, status TEXT, has_transcript BOOLEAN)"
+            )
+            conn.executemany(
+                "INSERT INTO calls VALUES (?, 'inbound', ?, ?, 'completed', 0)",
+                [(f"c{i}", (now - timedelta(minutes=1)).isoformat(), d) for i, d in enumerate(durations)]
+            )
+        
+        metrics = manager.get_metrics()
+        exact = sorted(durations)
+        for value, q in ((metrics.p50_duration, 0.50), (metrics.p95_duration, 0.95),
+                         (metrics.p99_duration, 0.99)):
+            expected = exact[int(len(exact) * q)]
+            assert abs(value - expected) <= expected * 0.005
+        assert metrics.min_duration == exact[0]
+        assert metrics.max_duration == exact[-1]
+        assert metrics.avg_duration == pytest.approx(sum(durations) / len(durations))
+    
+    def test_dashboard_reads_one_snapshot(self, metrics_manager):
+        """The whole dashboard is served from one connection."""
+        real_connect = sqlite3.connect
+        connections = []
+        
+        def counting_connect(*args, **kwargs):
+            connections.append(args)
+            return real_connect(*args, **kwargs)
+        
+        with patch("call_metrics.sqlite3.connect", side_effect=counting_connect):
+            dashboard = metrics_manager.get_dashboard_data()
+        
+        assert len(connections) == 1
+        assert dashboard["summary"]["total_calls"] == 6
+        assert dashboard["summary"]["active_now"] == 1
+        # The series stops at the start of the current hour, so the call from
+        # 5 minutes ago is only included in the first minutes of an hour
+        assert sum(b["total"] for b in dashboard["timeseries"]["hourly"]) in (5, 6)
+    
+    def test_daily_timeseries_counts(self, metrics_manager):
+        """Daily buckets add up to the calls in the window."""
+        timeseries = metrics_manager.get_daily_timeseries(days=2)
+        assert sum(b.total for b in timeseries) == 6
+        assert sum(b.failed for b in timeseries) == 2  # failed + timeout
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
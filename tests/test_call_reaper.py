@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/call_reaper.py
+
+Covers:
+- Deadlines: idle timeout, activity extending it, max duration cap
+- Normal hang-ups (untrack) are never reaped
+- Batched close and active_calls reconciliation
+- The reaper loop waking for new, earlier deadlines
+- Recovery of calls left active by a previous process
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from call_reaper import CallReaper
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_reaper(clock, closed=None, active_calls=None, **kwargs):
+    closed = closed if closed is not None else []
+
+    async def close_calls(call_ids):
+        closed.append(list(call_ids))
+
+    kwargs.setdefault("idle_timeout", 60)
+    kwargs.setdefault("max_duration", 3600)
+    return CallReaper(close_calls, active_calls, clock=clock, **kwargs)
+
+
+class TestDeadlines:
+    def test_idle_call_expires(self, clock):
+        reaper = make_reaper(clock)
+        reaper.track("CA1")
+        clock.now += 59
+        assert reaper.expired() == []
+        clock.now += 2
+        assert reaper.expired() == ["CA1"]
+        assert not reaper.is_tracked("CA1")
+
+    def test_activity_pushes_deadline_back(self, clock):
+        reaper = make_reaper(clock)
+        reaper.track("CA1")
+        for _ in range(10):
+            clock.now += 30
+            reaper.touch("CA1")
+            assert reaper.expired() == []
+        assert len(reaper._heap) == 1  # Re-pushed lazily, never duplicated
+        clock.now += 61
+        assert reaper.expired() == ["CA1"]
+
+    def test_max_duration_caps_active_calls(self, clock):
+        reaper = make_reaper(clock, max_duration=120)
+        reaper.track("CA1")
+        for _ in range(4):
+            clock.now += 30
+            reaper.touch("CA1")
+        clock.now += 1
+        assert reaper.expired() == ["CA1"]
+
+    def test_untracked_calls_are_skipped(self, clock):
+        reaper = make_reaper(clock)
+        reaper.track("CA1")
+        reaper.untrack("CA1")
+        clock.now += 120
+        assert reaper.expired() == []
+        assert reaper._heap == []
+
+    def test_touch_ignores_unknown_calls(self, clock):
+        reaper = make_reaper(clock)
+        reaper.touch(None)
+        reaper.touch("CA-unknown")
+        assert reaper.get_stats()["tracked_calls"] == 0
+
+    def test_expires_in_deadline_order(self, clock):
+        reaper = make_reaper(clock)
+        for n in range(5):
+            reaper.track(f"CA{n}")
+            clock.now += 1
+        clock.now += 56
+        assert reaper.expired() == ["CA0", "CA1"]
+
+
+class TestReap:
+    def test_batch_close_and_active_calls_reconciled(self, clock):
+        closed = []
+        active_calls = {"CA1": {"status": "active"}, "CA2": {"status": "active"}, "CA3": {}}
+        reaper = make_reaper(clock, closed, active_calls)
+        for call_id in ("CA1", "CA2", "CA3"):
+            reaper.track(call_id)
+        clock.now += 30
+        reaper.touch("CA3")
+        clock.now += 31
+
+        reaped = asyncio.run(reaper.reap())
+
+        assert reaped == ["CA1", "CA2"]
+        assert closed == [["CA1", "CA2"]]
+        assert list(active_calls) == ["CA3"]
+        assert reaper.stats["batches"] == 1
+
+    def test_close_failure_is_counted(self, clock):
+        async def failing(call_ids):
+            raise RuntimeError("db locked")
+
+        reaper = CallReaper(failing, clock=clock, idle_timeout=1)
+        reaper.track("CA1")
+        clock.now += 2
+        assert asyncio.run(reaper.reap()) == ["CA1"]
+        assert reaper.stats["close_errors"] == 1
+
+
+class TestLoop:
+    def test_reaps_soon_after_deadline(self):
+        closed = []
+
+        async def run():
+            reaper = make_reaper(time.monotonic, closed,
+                                 idle_timeout=0.05, batch_window=0.01)
+            await reaper.start()
+            await asyncio.sleep(0.01)
+            reaper.track("CA1")  # Earlier than "no deadline": wakes the loop
+            await asyncio.sleep(0.2)
+            await reaper.stop()
+
+        asyncio.run(run())
+        assert closed == [["CA1"]]
+
+    def test_recovered_calls_are_tracked(self, clock):
+        closed = []
+
+        async def run():
+            reaper = make_reaper(clock, closed)
+            await reaper.start(["CA-old-1", "CA-old-2"])
+            stats = reaper.get_stats()
+            clock.now += 61
+            await reaper.reap()
+            await reaper.stop()
+            return stats
+
+        stats = asyncio.run(run())
+        assert stats["recovered"] == 2
+        assert stats["tracked_calls"] == 2
+        assert closed == [["CA-old-1", "CA-old-2"]]
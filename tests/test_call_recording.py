@@ -5,7 +5,7 @@ Unit tests for scripts/call_recording.py
 Covers:
 - CallRecord and TranscriptEntry dataclasses
 - CallRecordingManager: init, start/end recording, transcripts, list, delete, stats
-- cleanup_stale_calls, get_zombie_calls
+- cleanup_stale_calls, close_stale_calls, get_zombie_calls
 """
 
 import asyncio
@@ -252,6 +252,35 @@ class TestEndCallRecording:
         assert record.status == "failed"
 
 
+# ─── audio recorder ──────────────────────────────────────────────────────────
+
+class TestAudioRecorder:
+    """Tests for open_audio_recorder / close_audio_recorder."""
+
+    def test_recording_written_and_has_audio_set(self, tmp_path):
+        import base64
+        mgr = make_manager(tmp_path)
+        record = asyncio.run(mgr.start_call_recording("call-audio", "inbound"))
+        recorder = mgr.open_audio_recorder("call-audio", record.recording_path)
+        assert recorder is not None
+        for _ in range(25):
+            recorder.feed_caller(base64.b64encode(b"\x10" * 160).decode())
+
+        ended = asyncio.run(mgr.end_call_recording("call-audio"))
+        assert ended.has_audio is True
+        assert Path(record.recording_path).stat().st_size > 44
+        assert "call-audio" not in mgr.audio_recorders
+
+    def test_close_without_recorder_is_noop(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        assert asyncio.run(mgr.close_audio_recorder("nope")) is None
+
+    def test_disabled_recording_returns_none(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        with patch.object(cr, "ENABLE_RECORDING", False):
+            assert mgr.open_audio_recorder("c1", str(tmp_path / "x.wav")) is None
+
+
 # ─── add_transcript_entry ────────────────────────────────────────────────────
 
 class TestAddTranscriptEntry:
@@ -346,6 +375,122 @@ class TestListCalls:
         calls = asyncio.run(mgr.list_calls())
         assert calls == []
 
+    def test_filters_by_status_and_date(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        _insert_calls(mgr, 6)
+        base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        calls = asyncio.run(mgr.list_calls(status="completed", since=base + timedelta(minutes=2)))
+        assert [c.call_id for c in calls] == ["call-k4", "call-k2"]
+
+
+def _insert_calls(mgr, count):
+    """count calls a minute apart; odd ones outbound, even ones completed."""
+    base = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    with sqlite3.connect(mgr.db_path) as conn:
+        conn.executemany(
+            "INSERT INTO calls (call_id, call_type, started_at, status) VALUES (?, ?, ?, ?)",
+            [(f"call-k{i}", "outbound" if i % 2 else "inbound",
+              (base + timedelta(minutes=i)).isoformat(), "failed" if i % 2 else "completed")
+             for i in range(count)]
+        )
+
+
+class TestListCallsPage:
+    """Tests for list_calls_page (keyset pagination)."""
+
+    def test_walks_all_pages_newest_first(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        _insert_calls(mgr, 7)
+        seen, cursor = [], None
+        while True:
+            page, cursor = asyncio.run(mgr.list_calls_page(limit=3, cursor=cursor))
+            seen.extend(c.call_id for c in page)
+            if cursor is None:
+                break
+        assert seen == [f"call-k{i}" for i in reversed(range(7))]
+
+    def test_ties_on_started_at_are_not_skipped(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        with sqlite3.connect(mgr.db_path) as conn:
+            conn.executemany(
+                "INSERT INTO calls (call_id, call_type, started_at, status) VALUES (?, 'inbound', ?, 'completed')",
+                [(f"tie{i}", "2026-03-01T00:00:00+00:00") for i in range(5)]
+            )
+        first, cursor = asyncio.run(mgr.list_calls_page(limit=2))
+        rest, last = asyncio.run(mgr.list_calls_page(limit=10, cursor=cursor))
+        assert last is None
+        assert sorted(c.call_id for c in first + rest) == [f"tie{i}" for i in range(5)]
+
+    def test_filters_apply_across_pages(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        _insert_calls(mgr, 10)
+        page, cursor = asyncio.run(mgr.list_calls_page(limit=2, call_type="outbound", status="failed"))
+        more, _ = asyncio.run(mgr.list_calls_page(limit=2, cursor=cursor, call_type="outbound", status="failed"))
+        assert [c.call_id for c in page + more] == ["call-k9", "call-k7", "call-k5", "call-k3"]
+
+    def test_invalid_cursor_raises(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        with pytest.raises(ValueError):
+            asyncio.run(mgr.list_calls_page(cursor="not-a-cursor"))
+
+    def test_filtered_page_uses_index(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        with sqlite3.connect(mgr.db_path) as conn:
+            where, params, started = mgr._call_filters(conn, call_type="inbound")
+            plan = " ".join(row[-1] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM calls {where} "
+                f"AND ({started}, call_id) < (?, ?) ORDER BY {started} DESC, call_id DESC LIMIT 10",
+                (*params, 0, "x")
+            ))
+        assert "idx_calls_type_started_ms" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+class TestSearchTranscripts:
+    """Tests for search_transcripts."""
+
+    def _seed(self, mgr):
+        _insert_calls(mgr, 3)
+        lines = {
+            "call-k0": ["Hi, I wanted to ask about pricing", "What does the premium plan cost?"],
+            "call-k1": ["Can you reschedule my appointment?"],
+            "call-k2": ["The price is fine", "We discussed pricing and pricing tiers at length"],
+        }
+        for call_id, contents in lines.items():
+            for content in contents:
+                asyncio.run(mgr.add_transcript_entry(call_id, "user", content))
+
+    def test_returns_ranked_calls_with_snippets(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        self._seed(mgr)
+        hits = asyncio.run(mgr.search_transcripts("pricing"))
+        assert {h.call_id for h in hits} == {"call-k0", "call-k2"}
+        assert hits[0].score >= hits[1].score
+        assert all("[pricing]" in h.snippet for h in hits)
+        assert hits[0].call_type == "inbound" and hits[0].started_at is not None
+
+    def test_stemming_and_all_terms_required(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        self._seed(mgr)
+        assert [h.call_id for h in asyncio.run(mgr.search_transcripts("discuss prices"))] == ["call-k2"]
+        assert asyncio.run(mgr.search_transcripts("pricing appointment")) == []
+
+    def test_filters_and_punctuation(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        self._seed(mgr)
+        hits = asyncio.run(mgr.search_transcripts('"reschedule" OR NOT(', call_type="outbound"))
+        assert [h.call_id for h in hits] == []
+        hits = asyncio.run(mgr.search_transcripts("reschedule?", call_type="outbound"))
+        assert [h.call_id for h in hits] == ["call-k1"]
+        assert asyncio.run(mgr.search_transcripts("  ?! ")) == []
+
+    def test_deleted_transcripts_leave_the_index(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        self._seed(mgr)
+        with sqlite3.connect(mgr.db_path) as conn:
+            conn.execute("DELETE FROM transcripts WHERE call_id = 'call-k2'")
+        assert [h.call_id for h in asyncio.run(mgr.search_transcripts("pricing"))] == ["call-k0"]
+
 
 # ─── get_call_transcript ─────────────────────────────────────────────────────
 
@@ -479,6 +624,56 @@ class TestCleanupStaleCalls:
         assert "errors" in result
 
 
+    def test_cleans_many_calls_in_one_batch(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        old_time = (datetime.now(timezone.utc) - timedelta(seconds=7200)).isoformat()
+        with sqlite3.connect(mgr.db_path) as conn:
+            conn.executemany(
+                'INSERT INTO calls (call_id, call_type, started_at, status) VALUES (?, ?, ?, ?)',
+                [(f"stale-{i}", "inbound", old_time, "active") for i in range(1200)]
+            )
+            conn.commit()
+
+        with patch.object(mgr, 'notify_calls_ended') as notify:
+            result = asyncio.run(mgr.cleanup_stale_calls(threshold_seconds=3600))
+
+        assert result["cleaned_count"] == 1200
+        notify.assert_called_once()
+        assert mgr.get_active_calls() == []
+
+
+# ─── close_stale_calls ────────────────────────────────────────────────────────
+
+class TestCloseStaleCalls:
+    """Tests for close_stale_calls (used by the in-process call reaper)."""
+
+    def test_closes_only_active_calls(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        asyncio.run(mgr.start_call_recording("live-1", "inbound", caller_number="+15550001"))
+        asyncio.run(mgr.start_call_recording("done-1", "inbound"))
+        asyncio.run(mgr.end_call_recording("done-1"))
+
+        closed = mgr.close_stale_calls(["live-1", "done-1", "missing"])
+
+        assert [c["call_id"] for c in closed] == ["live-1"]
+        assert closed[0]["caller_number"] == "+15550001"
+        assert closed[0]["duration_seconds"] >= 0
+        with sqlite3.connect(mgr.db_path) as conn:
+            statuses = dict(conn.execute("SELECT call_id, status FROM calls").fetchall())
+        assert statuses == {"live-1": "timeout", "done-1": "completed"}
+
+    def test_empty_batch(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        assert mgr.close_stale_calls([]) == []
+
+    def test_get_active_calls(self, tmp_path):
+        mgr = make_manager(tmp_path)
+        asyncio.run(mgr.start_call_recording("a-1", "inbound"))
+        asyncio.run(mgr.start_call_recording("a-2", "outbound"))
+        asyncio.run(mgr.end_call_recording("a-2"))
+        assert [c["call_id"] for c in mgr.get_active_calls()] == ["a-1"]
+
+
 # ─── get_zombie_calls ────────────────────────────────────────────────────────
 
 class TestGetZombieCalls:
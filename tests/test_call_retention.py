@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/call_retention.py
+
+Run with: python -m pytest tests/test_call_retention.py -v
+"""
+
+import asyncio
+import gzip
+import os
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import call_retention
+from call_retention import (
+    CallRetentionManager,
+    RetentionPolicy,
+    iter_archived,
+    read_archived,
+)
+from db_migrations import migrate
+
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "calls.db"
+    migrate(path)
+    return path
+
+
+def add_transcripts(db, call_id, when, count=3):
+    with sqlite3.connect(db) as conn:
+        conn.executemany(
+            "INSERT INTO transcripts (call_id, timestamp, speaker, content, event_type) "
+            "VALUES (?, ?, 'user', ?, 'speech')",
+            [(call_id, (when + timedelta(seconds=i)).isoformat(), f"{call_id} line {i}")
+             for i in range(count)]
+        )
+
+
+def add_latency(db, call_id, when, count=2):
+    with sqlite3.connect(db) as conn:
+        conn.executemany(
+            "INSERT INTO latency_events (call_id, event_type, duration_ms, timestamp) "
+            "VALUES (?, 'tool_call_duration', ?, ?)",
+            [(call_id, 100.0 + i, (when + timedelta(seconds=i)).isoformat()) for i in range(count)]
+        )
+
+
+def make_manager(db, tmp_path, **kwargs):
+    kwargs.setdefault("policies", [RetentionPolicy("transcripts", 90), RetentionPolicy("latency_events", 30)])
+    return CallRetentionManager(db, archive_root=tmp_path / "archive", **kwargs)
+
+
+class TestArchiveTable:
+    def test_old_rows_move_to_day_partitions(self, db, tmp_path):
+        add_transcripts(db, "old", NOW - timedelta(days=100))
+        add_transcripts(db, "new", NOW - timedelta(days=1))
+        manager = make_manager(db, tmp_path, batch_size=2)
+
+        assert manager.archive_table(manager.policies[0], NOW) == 3
+        day = (NOW - timedelta(days=100)).date().isoformat()
+        assert (tmp_path / "archive" / "transcripts" / f"{day}.jsonl.gz").exists()
+        with sqlite3.connect(db) as conn:
+            assert [r[0] for r in conn.execute("SELECT DISTINCT call_id FROM transcripts")] == ["new"]
+            assert conn.execute(
+                "SELECT day, rows FROM archive_index WHERE table_name = 'transcripts' AND call_id = 'old'"
+            ).fetchall() == [(day, 3)]
+
+    def test_read_archived_returns_rows_in_order(self, db, tmp_path):
+        add_transcripts(db, "old", NOW - timedelta(days=100), count=5)
+        manager = make_manager(db, tmp_path, batch_size=2)
+        manager.archive_table(manager.policies[0], NOW)
+        with sqlite3.connect(db) as conn:
+            rows = read_archived(conn, "transcripts", "old", tmp_path / "archive")
+        assert [r["content"] for r in rows] == [f"old line {i}" for i in range(5)]
+
+    def test_duplicate_archive_writes_are_deduplicated(self, db, tmp_path):
+        add_transcripts(db, "old", NOW - timedelta(days=100))
+        with sqlite3.connect(db) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = [dict(r) for r in conn.execute("SELECT * FROM transcripts")]
+        manager = make_manager(db, tmp_path)
+        conn = manager._connect()
+        manager._archive_rows(conn, "transcripts", rows, "timestamp_ms")  # As if a crash lost the DELETE
+        conn.close()
+        manager.archive_table(manager.policies[0], NOW)
+        with sqlite3.connect(db) as conn:
+            assert len(read_archived(conn, "transcripts", "old", tmp_path / "archive")) == 3
+
+    def test_torn_archive_tail_is_tolerated(self, db, tmp_path):
+        add_transcripts(db, "old", NOW - timedelta(days=100))
+        manager = make_manager(db, tmp_path)
+        manager.archive_table(manager.policies[0], NOW)
+        day = (NOW - timedelta(days=100)).date().isoformat()
+        with open(tmp_path / "archive" / "transcripts" / f"{day}.jsonl.gz", "ab") as f:
+            f.write(gzip.compress(b'{"id": 99}\n')[:10])
+        with sqlite3.connect(db) as conn:
+            assert len(read_archived(conn, "transcripts", "old", tmp_path / "archive")) == 3
+
+    def test_waits_for_migrations(self, tmp_path):
+        db = tmp_path / "legacy.db"
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE transcripts (id INTEGER PRIMARY KEY, call_id TEXT, timestamp TEXT)")
+        manager = make_manager(db, tmp_path)
+        assert manager.archive_table(manager.policies[0], NOW) == 0
+
+    def test_iter_archived_by_day_range(self, db, tmp_path):
+        add_latency(db, "a", NOW - timedelta(days=40))
+        add_latency(db, "b", NOW - timedelta(days=35))
+        manager = make_manager(db, tmp_path)
+        manager.archive_table(manager.policies[1], NOW)
+        start = (NOW - timedelta(days=41)).date()
+        rows = list(iter_archived("latency_events", start, (NOW - timedelta(days=38)).date(),
+                                  tmp_path / "archive"))
+        assert {r["call_id"] for r in rows} == {"a"}
+
+
+class TestReadThrough:
+    def test_call_transcript_merges_archive(self, tmp_path):
+        import call_recording as cr
+        db = tmp_path / "calls.db"
+        mgr = cr.CallRecordingManager.__new__(cr.CallRecordingManager)
+        mgr.db_path = db
+        mgr.recordings_dir = tmp_path / "recordings"
+        mgr._init_database()
+        now = datetime.now(timezone.utc)
+        add_transcripts(db, "CA1", now - timedelta(days=100), count=2)
+        add_transcripts(db, "CA1", now, count=1)
+        make_manager(db, tmp_path).archive_table(RetentionPolicy("transcripts", 90))
+
+        with patch.object(call_retention, "RETENTION_ARCHIVE_DIR", tmp_path / "archive"):
+            entries = asyncio.run(mgr.get_call_transcript("CA1"))
+        assert [e.content for e in entries] == ["CA1 line 0", "CA1 line 1", "CA1 line 0"]
+
+    def test_latency_events_merge_archive(self, tmp_path):
+        from call_metrics import CallMetricsManager
+        db = tmp_path / "calls.db"
+        migrate(db)
+        now = datetime.now(timezone.utc)
+        add_latency(db, "CA1", now - timedelta(days=40))
+        add_latency(db, "CA1", now, count=1)
+        make_manager(db, tmp_path).archive_table(RetentionPolicy("latency_events", 30))
+
+        metrics = CallMetricsManager(db_path=db)
+        with patch.object(call_retention, "RETENTION_ARCHIVE_DIR", tmp_path / "archive"):
+            events = metrics.get_latency_events(call_id="CA1")
+            limited = metrics.get_latency_events(call_id="CA1", limit=2)
+        assert [e.duration_ms for e in events] == [100.0, 101.0, 100.0]
+        assert len(limited) == 2
+
+    def _archived_metrics(self, tmp_path):
+        from call_metrics import CallMetricsManager
+        db = tmp_path / "calls.db"
+        migrate(db)
+        now = datetime.now(timezone.utc)
+        add_latency(db, "CA1", now - timedelta(days=40))
+        add_latency(db, "CA2", now - timedelta(minutes=5), count=1)
+        make_manager(db, tmp_path).archive_table(RetentionPolicy("latency_events", 30))
+        return db, now, CallMetricsManager(db_path=db)
+
+    def test_latency_stats_window_reads_archive(self, tmp_path):
+        db, now, metrics = self._archived_metrics(tmp_path)
+        with patch.object(call_retention, "RETENTION_ARCHIVE_DIR", tmp_path / "archive"):
+            month = metrics.get_latency_stats(start_time=now - timedelta(days=60), end_time=now)
+            day = metrics.get_latency_stats()
+        assert month.tool_call_count == 3
+        assert month.tool_call_max_ms == 101.0 and month.tool_call_avg_ms == pytest.approx(301 / 3)
+        assert day.tool_call_count == 1
+
+    def test_archived_rows_still_in_hot_table_counted_once(self, tmp_path):
+        db, now, metrics = self._archived_metrics(tmp_path)
+        archived = read_archived(sqlite3.connect(db), "latency_events", "CA1", tmp_path / "archive")
+        with sqlite3.connect(db) as conn:  # A crash before the delete committed
+            conn.execute(
+                "INSERT INTO latency_events (id, call_id, event_type, duration_ms, timestamp) "
+                "VALUES (?, 'CA1', 'tool_call_duration', ?, ?)",
+                (archived[0]["id"], archived[0]["duration_ms"], archived[0]["timestamp"])
+            )
+        with patch.object(call_retention, "RETENTION_ARCHIVE_DIR", tmp_path / "archive"):
+            stats = metrics.get_latency_stats(start_time=now - timedelta(days=60), end_time=now)
+        assert stats.tool_call_count == 3
+
+    def test_latency_events_without_call_id_continue_into_archive(self, tmp_path):
+        db, now, metrics = self._archived_metrics(tmp_path)
+        with patch.object(call_retention, "RETENTION_ARCHIVE_DIR", tmp_path / "archive"):
+            events = metrics.get_latency_events()
+            limited = metrics.get_latency_events(limit=2)
+        assert [e.call_id for e in events] == ["CA2", "CA1", "CA1"]
+        assert [e.duration_ms for e in events[1:]] == [101.0, 100.0]  # Newest first
+        assert len(limited) == 2
+
+
+class TestFiles:
+    def test_old_recordings_gzipped_and_repointed(self, db, tmp_path):
+        recordings = tmp_path / "recordings"
+        recordings.mkdir()
+        old = recordings / "CA1.wav"
+        old.write_bytes(b"RIFF" + b"\0" * 1000)
+        aged = (NOW - timedelta(days=100)).timestamp()
+        os.utime(old, (aged, aged))
+        fresh = recordings / "CA2.wav"
+        fresh.write_bytes(b"RIFF")
+        with sqlite3.connect(db) as conn:
+            conn.execute(
+                "INSERT INTO calls (call_id, call_type, started_at, status, recording_path) "
+                "VALUES ('CA1', 'inbound', ?, 'completed', ?)",
+                ((NOW - timedelta(days=100)).isoformat(), str(old))
+            )
+
+        manager = make_manager(db, tmp_path, recordings_dir=recordings)
+        assert manager.archive_recordings(NOW) == 1
+        assert not old.exists() and fresh.exists()
+        with sqlite3.connect(db) as conn:
+            path = Path(conn.execute("SELECT recording_path FROM calls").fetchone()[0])
+        assert path.parent.parent == tmp_path / "archive" / "recordings"
+        assert gzip.decompress(path.read_bytes()).startswith(b"RIFF")
+
+
+class TestRun:
+    def test_run_vacuums_incrementally(self, db, tmp_path):
+        with sqlite3.connect(db) as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        add_transcripts(db, "old", NOW - timedelta(days=100), count=2000)
+        manager = make_manager(db, tmp_path)
+        result = manager.run(NOW)
+        assert result["tables"]["transcripts"] == 2000
+        assert result["pages_vacuumed"] > 0
+        with sqlite3.connect(db) as conn:
+            assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+        stats = manager.get_stats()
+        assert stats["runs"] == 1 and stats["rows_archived"] == 2000
+
+    def test_enable_incremental_vacuum_on_existing_db(self, tmp_path):
+        db = tmp_path / "old.db"
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE t (x)")
+        migrate(db)
+        manager = make_manager(db, tmp_path)
+        manager.enable_incremental_vacuum()
+        with sqlite3.connect(db) as conn:
+            assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/caller_snapshots.py
+
+Run with: python -m pytest tests/test_caller_snapshots.py -v
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import caller_snapshots
+from caller_snapshots import CallerSnapshotRefresher, CallerSnapshotStore
+from session_context import SessionContextExtractor, notify_call_ended
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    root = tmp_path / "workspace"
+    (root / "memory").mkdir(parents=True)
+    (root / "phone_mapping.json").write_text(json.dumps({
+        "+1234567890": {"name": "Remi", "relationship": "primary_user"},
+        "+2507*": {"name": "Rwanda office", "relationship": "team_member"},
+    }))
+    (root / "memory" / f"{datetime.now():%Y-%m-%d}.md").write_text("14:30 - User: working on the voice project\n")
+    return root
+
+
+@pytest.fixture
+def extractor(workspace):
+    extractor = SessionContextExtractor.__new__(SessionContextExtractor)
+    extractor.workspace_path = workspace
+    extractor.memory_path = workspace / "memory"
+    return extractor
+
+
+@pytest.fixture
+def refresher(extractor, tmp_path):
+    store = CallerSnapshotStore(tmp_path / "snapshots.db", str(extractor.workspace_path))
+    return CallerSnapshotRefresher(store, extractor.build_caller_snapshots, extractor.snapshot_sources)
+
+
+def touch(path, text):
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # Coarse mtime clocks
+
+
+class TestBuild:
+    def test_snapshot_per_exact_caller(self, extractor):
+        snapshots = extractor.build_caller_snapshots()
+        assert list(snapshots) == ["+1234567890"]  # Wildcard entries resolve live
+        context = snapshots["+1234567890"]
+        assert context["caller_info"]["name"] == "Remi" and context["caller_info"]["known_caller"]
+        assert context["recent_conversations"][-1]["message"] == "working on the voice project"
+        assert context["context_summary"] == "Caller: Remi | Recent activity: 1 messages"
+
+
+class TestRefresher:
+    def test_rebuilds_when_memory_changes(self, refresher, workspace):
+        assert refresher.check() is True and refresher.stats["last_reason"] == "startup"
+        assert refresher.check() is False
+
+        touch(workspace / "MEMORY.md", "## Focus\n- Shipping the caller snapshot pipeline\n")
+        assert refresher.check() is True and refresher.stats["last_reason"] == "sources_changed"
+        messages = [c["message"] for c in refresher.store.get("+1234567890")["recent_conversations"]]
+        assert "Focus: Shipping the caller snapshot pipeline" in messages
+
+    def test_rebuilds_on_request(self, refresher):
+        refresher.check()
+        refresher.request("call_ended")
+        assert refresher.check() is True and refresher.stats["last_reason"] == "call_ended"
+
+    def test_picks_up_mapping_changes_immediately(self, refresher, workspace):
+        refresher.check()
+        touch(workspace / "phone_mapping.json", json.dumps({"+1999": {"name": "New"}}))
+        refresher.check()
+        assert refresher.store.get("+1234567890") is None
+        assert refresher.store.get("+1999")["caller_info"]["name"] == "New"
+
+    def test_background_thread_serves_requests(self, refresher):
+        refresher.poll_interval = 60
+        refresher.start()
+        try:
+            deadline = time.monotonic() + 5
+            while refresher.stats["rebuilds"] < 1 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            refresher.request("call_ended")
+            while refresher.stats["rebuilds"] < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            refresher.stop()
+        assert refresher.stats["rebuilds"] == 2
+
+
+class TestStore:
+    def test_snapshots_survive_restart(self, refresher, tmp_path, workspace):
+        refresher.rebuild()
+        reloaded = CallerSnapshotStore(tmp_path / "snapshots.db", str(workspace))
+        assert reloaded.get("+1234567890")["caller_info"]["name"] == "Remi"
+        assert CallerSnapshotStore(tmp_path / "snapshots.db", "/other").get("+1234567890") is None
+
+    def test_reading_does_not_create_the_database(self, tmp_path):
+        store = CallerSnapshotStore(tmp_path / "snapshots.db", "/ws")
+        assert store.get("+1234567890") is None
+        assert store.stats == {"hits": 0, "misses": 1}
+        assert not (tmp_path / "snapshots.db").exists()
+
+
+class TestExtractorIntegration:
+    @pytest.fixture(autouse=True)
+    def isolated_refreshers(self, tmp_path):
+        with patch.object(caller_snapshots, "CALLER_SNAPSHOT_DB", tmp_path / "snapshots.db"):
+            yield
+        caller_snapshots.stop_refreshers()
+
+    def test_instructions_served_from_snapshot(self, extractor, workspace):
+        refresher = caller_snapshots.snapshot_refresher(
+            workspace, extractor.build_caller_snapshots, extractor.snapshot_sources
+        )
+        refresher.rebuild()
+        with patch.object(extractor, "_extract_context") as live:
+            enhanced = extractor.get_enhanced_instructions("+1 (234) 567-890", "Base.")
+        live.assert_not_called()
+        assert "You are speaking with Remi" in enhanced
+
+    def test_unknown_and_wildcard_callers_extracted_live(self, extractor, workspace):
+        caller_snapshots.snapshot_refresher(
+            workspace, extractor.build_caller_snapshots, extractor.snapshot_sources
+        ).rebuild()
+        assert "UNKNOWN CALLER" in extractor.get_enhanced_instructions("+1555000000", "Base.")
+        assert "Rwanda office" in extractor.get_enhanced_instructions("+250794002033", "Base.")
+
+    def test_call_ended_requests_refresh(self, extractor, workspace):
+        refresher = caller_snapshots.snapshot_refresher(
+            workspace, extractor.build_caller_snapshots, extractor.snapshot_sources
+        )
+        with patch.object(refresher, "request") as request, \
+             patch("session_context.get_bridge_emitter"):
+            notify_call_ended("CA1", "+1234567890")
+        request.assert_called_once_with("call_ended")
@@ -0,0 +1,237 @@
+"""
+Unit tests for ConversationCompactor
+
+Tests item tracking, compaction thresholds, plan selection and event building.
+"""
+
+import sys
+import os
+
+# Add scripts to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from conversation_compactor import (
+    ConversationCompactor,
+    SUMMARY_ITEM_PREFIX,
+    estimate_tokens,
+    fallback_summary,
+)
+
+
+def _message(item_id, role="user", text="hello there", audio=False):
+    part_type = "input_audio" if audio else ("input_text" if role == "user" else "text")
+    part = {"type": part_type}
+    if audio:
+        part["transcript"] = text
+    else:
+        part["text"] = text
+    return {"id": item_id, "type": "message", "role": role, "content": [part]}
+
+
+def _fill(compactor, count, prefix="item"):
+    for n in range(count):
+        role = "user" if n % 2 == 0 else "assistant"
+        compactor.on_item_created(_message(f"{prefix}_{n}", role=role, text=f"turn {n}"))
+
+
+class TestItemTracking:
+    """Tracking of conversation.item.* events."""
+
+    def test_created_items_tracked_in_order(self):
+        compactor = ConversationCompactor()
+        _fill(compactor, 3)
+        assert [i.item_id for i in compactor.items] == ["item_0", "item_1", "item_2"]
+        assert compactor.items[1].role == "assistant"
+        assert compactor.items[0].text == "turn 0"
+
+    def test_duplicate_and_idless_items_ignored(self):
+        compactor = ConversationCompactor()
+        compactor.on_item_created(_message("a"))
+        compactor.on_item_created(_message("a"))
+        compactor.on_item_created({"type": "message"})
+        assert len(compactor.items) == 1
+
+    def test_late_transcript_attached(self):
+        compactor = ConversationCompactor()
+        compactor.on_item_created({"id": "u1", "type": "message", "role": "user",
+                                   "content": [{"type": "input_audio"}]})
+        compactor.on_item_text("u1", "what's on my calendar")
+        assert compactor.items[0].text == "what's on my calendar"
+        assert compactor.items[0].audio is True
+
+    def test_audio_items_cost_more(self):
+        compactor = ConversationCompactor()
+        compactor.on_item_created(_message("t", text="x" * 400))
+        compactor.on_item_created(_message("a", text="x" * 400, audio=True))
+        text_item, audio_item = compactor.items
+        assert audio_item.tokens > text_item.tokens
+
+    def test_deleted_items_forgotten(self):
+        compactor = ConversationCompactor()
+        _fill(compactor, 2)
+        compactor.on_item_deleted("item_0")
+        compactor.on_item_deleted("missing")
+        assert [i.item_id for i in compactor.items] == ["item_1"]
+
+    def test_function_items_tracked(self):
+        compactor = ConversationCompactor()
+        compactor.on_item_created({"id": "f1", "type": "function_call", "call_id": "c1",
+                                   "name": "memory_search", "arguments": '{"query": "x"}'})
+        compactor.on_item_created({"id": "o1", "type": "function_call_output",
+                                   "call_id": "c1", "output": "found it"})
+        assert compactor.items[0].text.startswith("memory_search(")
+        assert compactor.items[1].text == "found it"
+
+    def test_reset_keeps_summary(self):
+        compactor = ConversationCompactor()
+        _fill(compactor, 3)
+        compactor.summary = "earlier stuff"
+        compactor.reset()
+        assert compactor.items == []
+        assert compactor.summary == "earlier stuff"
+
+
+class TestThresholds:
+    """needs_compaction() triggers."""
+
+    def test_item_count_threshold(self):
+        compactor = ConversationCompactor(max_items=10, max_tokens=10**6, keep_recent=4)
+        _fill(compactor, 10)
+        assert not compactor.needs_compaction()
+        _fill(compactor, 1, prefix="extra")
+        assert compactor.needs_compaction()
+
+    def test_token_threshold(self):
+        compactor = ConversationCompactor(max_items=1000, max_tokens=200, keep_recent=2)
+        for n in range(4):
+            compactor.on_item_created(_message(f"m{n}", text="word " * 100))
+        assert compactor.needs_compaction()
+
+    def test_not_while_in_flight(self):
+        compactor = ConversationCompactor(max_items=2, keep_recent=1)
+        _fill(compactor, 5)
+        compactor.in_flight = True
+        assert not compactor.needs_compaction()
+
+    def test_not_when_only_recent_items(self):
+        compactor = ConversationCompactor(max_items=0, max_tokens=0, keep_recent=5)
+        _fill(compactor, 5)
+        assert not compactor.needs_compaction()
+
+
+class TestPlan:
+    """plan() item selection."""
+
+    def test_keeps_recent_items(self):
+        compactor = ConversationCompactor(keep_recent=3)
+        _fill(compactor, 8)
+        plan = compactor.plan()
+        assert [i.item_id for i in plan.items] == [f"item_{n}" for n in range(5)]
+        assert "User: turn 0" in plan.text
+        assert "Assistant: turn 1" in plan.text
+
+    def test_nothing_to_fold(self):
+        compactor = ConversationCompactor(keep_recent=5)
+        _fill(compactor, 3)
+        assert compactor.plan() is None
+
+    def test_stops_before_unresolved_function_call(self):
+        compactor = ConversationCompactor(keep_recent=1)
+        _fill(compactor, 2)
+        compactor.on_item_created({"id": "f1", "type": "function_call", "call_id": "c1",
+                                   "name": "cron_create", "arguments": "{}"})
+        _fill(compactor, 3, prefix="later")
+        plan = compactor.plan()
+        assert [i.item_id for i in plan.items] == ["item_0", "item_1"]
+
+    def test_function_output_folded_with_its_call(self):
+        compactor = ConversationCompactor(keep_recent=2)
+        compactor.on_item_created({"id": "f1", "type": "function_call", "call_id": "c1",
+                                   "name": "memory_search", "arguments": "{}"})
+        compactor.on_item_created(_message("a1", role="assistant"))
+        compactor.on_item_created({"id": "o1", "type": "function_call_output",
+                                   "call_id": "c1", "output": "result"})
+        compactor.on_item_created(_message("u2"))
+        plan = compactor.plan()
+        ids = [i.item_id for i in plan.items]
+        assert "f1" in ids and "o1" in ids
+        assert "u2" not in ids
+
+    def test_previous_summary_carried(self):
+        compactor = ConversationCompactor(keep_recent=2)
+        _fill(compactor, 5)
+        compactor.summary = "Remi asked about the launch."
+        plan = compactor.plan()
+        assert plan.previous_summary == "Remi asked about the launch."
+
+    def test_summary_only_fold_skipped(self):
+        compactor = ConversationCompactor(keep_recent=1)
+        compactor.on_item_created(_message(f"{SUMMARY_ITEM_PREFIX}1", role="system", text="s"))
+        compactor.on_item_created(_message("u1"))
+        assert compactor.plan() is None
+
+
+class TestBuildAndApply:
+    """build_events() and apply()."""
+
+    def test_events_insert_summary_then_delete(self):
+        compactor = ConversationCompactor(keep_recent=2)
+        _fill(compactor, 5)
+        plan = compactor.plan()
+        events = compactor.build_events(plan, "They talked.")
+
+        create = events[0]
+        assert create["type"] == "conversation.item.create"
+        assert create["previous_item_id"] == "root"
+        assert create["item"]["id"].startswith(SUMMARY_ITEM_PREFIX)
+        assert create["item"]["role"] == "system"
+        assert "They talked." in create["item"]["content"][0]["text"]
+
+        deletes = [e["item_id"] for e in events[1:]]
+        assert all(e["type"] == "conversation.item.delete" for e in events[1:])
+        assert deletes == ["item_0", "item_1", "item_2"]
+
+    def test_summary_item_id_fits_realtime_limit(self):
+        compactor = ConversationCompactor(keep_recent=1)
+        _fill(compactor, 3)
+        assert len(compactor.plan().summary_item_id) <= 32
+
+    def test_apply_bounds_live_items(self):
+        compactor = ConversationCompactor(max_items=10, keep_recent=4)
+        for round_no in range(5):
+            _fill(compactor, 12, prefix=f"r{round_no}")
+            plan = compactor.plan()
+            compactor.apply(plan, f"summary {round_no}")
+            assert len(compactor.items) <= 5
+            assert compactor.items[0].is_summary
+
+        assert compactor.summary == "summary 4"
+        assert compactor.stats["items_removed"] > 0
+
+    def test_summary_echo_kept_at_front(self):
+        compactor = ConversationCompactor(keep_recent=2)
+        _fill(compactor, 5)
+        plan = compactor.plan()
+        # Server echoes our summary item before apply() runs
+        compactor.on_item_created(_message(plan.summary_item_id, role="system", text="s"))
+        compactor.apply(plan, "s")
+        assert compactor.items[0].item_id == plan.summary_item_id
+        assert sum(1 for i in compactor.items if i.is_summary) == 1
+
+
+class TestHelpers:
+    """estimate_tokens() and fallback_summary()."""
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abc") == 1
+        assert estimate_tokens("x" * 400) == 100
+
+    def test_fallback_summary_includes_previous(self):
+        result = fallback_summary("Earlier.", "User: hi\nAssistant: hello")
+        assert result.startswith("Earlier.")
+        assert "User: hi" in result
+
+    def test_fallback_summary_bounded(self):
+        result = fallback_summary("p" * 2000, "User: " + "x" * 2000, max_chars=300)
+        assert len(result) <= 300
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/db_migrations.py
+
+Run with: python -m pytest tests/test_db_migrations.py -v
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import db_migrations
+from db_migrations import (
+    EPOCH_MS_READY_VERSION,
+    MIGRATIONS,
+    SCHEMA_VERSION,
+    TRANSCRIPT_SEARCH_VERSION,
+    epoch_ms_ready,
+    migrate,
+    pending_migrations,
+    run_backfill,
+    to_epoch_ms,
+)
+
+
+LEGACY_CALLS = '''
+    CREATE TABLE calls (
+        call_id TEXT PRIMARY KEY,
+        call_type TEXT NOT NULL,
+        caller_number TEXT,
+        callee_number TEXT,
+        started_at TEXT NOT NULL,
+        ended_at TEXT,
+        duration_seconds REAL,
+        status TEXT NOT NULL,
+        recording_path TEXT,
+        transcript_path TEXT,
+        has_audio BOOLEAN DEFAULT FALSE,
+        has_transcript BOOLEAN DEFAULT FALSE,
+        metadata TEXT
+    )
+'''
+
+
+def make_legacy_db(path: Path, calls: int) -> datetime:
+    """A pre-migration database (no *_ms columns, user_version 0) with rows."""
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    with sqlite3.connect(path) as conn:
+        conn.execute(LEGACY_CALLS)
+        conn.executemany(
+            "INSERT INTO calls (call_id, call_type, started_at, status) VALUES (?, 'inbound', ?, 'completed')",
+            [(f"c{i}", (base + timedelta(seconds=i)).isoformat()) for i in range(calls)]
+        )
+    return base
+
+
+class TestMigrate:
+    def test_fresh_database_reaches_current_version(self, tmp_path):
+        db = tmp_path / "calls.db"
+        assert migrate(db) == SCHEMA_VERSION
+        with sqlite3.connect(db) as conn:
+            assert epoch_ms_ready(conn)
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(calls)")}
+            assert {"started_at_ms", "ended_at_ms"} <= columns
+            indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_calls_status_started_ms", "idx_calls_started_ms",
+                "idx_latency_type_ts_ms", "idx_latency_call_ts_ms",
+                "idx_transcripts_call_ts_ms"} <= indexes
+        assert pending_migrations(db) == []
+
+    def test_migrate_is_idempotent(self, tmp_path):
+        db = tmp_path / "calls.db"
+        migrate(db)
+        assert migrate(db) == SCHEMA_VERSION
+
+    def test_triggers_normalize_timestamp_suffixes(self, tmp_path):
+        db = tmp_path / "calls.db"
+        migrate(db)
+        with sqlite3.connect(db) as conn:
+            conn.executemany(
+                "INSERT INTO calls (call_id, call_type, started_at, status) VALUES (?, 'inbound', ?, 'active')",
+                [
+                    ("z", "2026-03-01T12:00:00.250Z"),
+                    ("utc", "2026-03-01T12:00:00.250+00:00"),
+                    ("offset", "2026-03-01T14:00:00.250+02:00"),
+                    ("micro", "2026-03-01T12:00:00.250999+00:00"),
+                ]
+            )
+            rows = dict(conn.execute("SELECT call_id, started_at_ms FROM calls"))
+        expected = to_epoch_ms(datetime(2026, 3, 1, 12, 0, 0, 250000, tzinfo=timezone.utc))
+        assert rows["z"] == rows["utc"] == rows["offset"] == expected
+        # Microseconds round to the nearest millisecond, as to_epoch_ms does
+        assert rows["micro"] == expected + 1 == to_epoch_ms(
+            datetime(2026, 3, 1, 12, 0, 0, 250999, tzinfo=timezone.utc)
+        )
+
+    def test_update_trigger_sets_ended_at_ms(self, tmp_path):
+        db = tmp_path / "calls.db"
+        migrate(db)
+        ended = datetime(2026, 3, 1, 12, 5, tzinfo=timezone.utc)
+        with sqlite3.connect(db) as conn:
+            conn.execute(
+                "INSERT INTO calls (call_id, call_type, started_at, status) VALUES ('c', 'inbound', ?, 'active')",
+                ("2026-03-01T12:00:00+00:00",)
+            )
+            conn.execute("UPDATE calls SET ended_at = ?, status = 'completed' WHERE call_id = 'c'",
+                         (ended.isoformat(),))
+            assert conn.execute("SELECT ended_at_ms FROM calls").fetchone()[0] == to_epoch_ms(ended)
+
+
+class TestOnlineBackfill:
+    def test_small_legacy_database_backfills_inline(self, tmp_path):
+        db = tmp_path / "calls.db"
+        base = make_legacy_db(db, 5)
+        assert migrate(db) == SCHEMA_VERSION
+        with sqlite3.connect(db) as conn:
+            ms = [row[0] for row in conn.execute("SELECT started_at_ms FROM calls ORDER BY rowid")]
+        assert ms == [to_epoch_ms(base + timedelta(seconds=i)) for i in range(5)]
+
+    def test_large_legacy_database_is_left_for_run_backfill(self, tmp_path):
+        db = tmp_path / "calls.db"
+        make_legacy_db(db, 50)
+        version = migrate(db, batch_size=10)
+        assert version == EPOCH_MS_READY_VERSION - 1
+        with sqlite3.connect(db) as conn:
+            assert not epoch_ms_ready(conn)
+            # One batch was done inline, the rest is still NULL
+            assert conn.execute("SELECT COUNT(*) FROM calls WHERE started_at_ms IS NULL").fetchone()[0] == 40
+
+        assert run_backfill(db, batch_size=10, batch_pause=0) == SCHEMA_VERSION
+        with sqlite3.connect(db) as conn:
+            assert epoch_ms_ready(conn)
+            assert conn.execute("SELECT COUNT(*) FROM calls WHERE started_at_ms IS NULL").fetchone()[0] == 0
+
+    def test_rows_written_during_backfill_are_covered(self, tmp_path):
+        db = tmp_path / "calls.db"
+        make_legacy_db(db, 30)
+        migrate(db, batch_size=10)
+        # A live writer between batches: the trigger fills the new row
+        with sqlite3.connect(db) as conn:
+            conn.execute(
+                "INSERT INTO calls (call_id, call_type, started_at, status) VALUES ('live', 'inbound', ?, 'active')",
+                ("2026-06-01T00:00:00+00:00",)
+            )
+        run_backfill(db, batch_size=10, batch_pause=0)
+        with sqlite3.connect(db) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM calls WHERE started_at_ms IS NULL").fetchone()[0] == 0
+
+    def test_unparseable_timestamp_does_not_stall_backfill(self, tmp_path):
+        db = tmp_path / "calls.db"
+        make_legacy_db(db, 3)
+        with sqlite3.connect(db) as conn:
+            conn.execute(
+                "INSERT INTO calls (call_id, call_type, started_at, status) VALUES ('bad', 'inbound', 'yesterday', 'failed')"
+            )
+        assert run_backfill(db, batch_size=2, batch_pause=0) == SCHEMA_VERSION
+        with sqlite3.connect(db) as conn:
+            assert conn.execute("SELECT started_at_ms FROM calls WHERE call_id = 'bad'").fetchone()[0] is None
+
+
+class TestReaders:
+    def test_metrics_window_uses_covering_index(self, tmp_path):
+        from call_metrics import CallMetricsManager
+        db = tmp_path / "calls.db"
+        migrate(db)
+        manager = CallMetricsManager(db_path=db)
+        with sqlite3.connect(db) as conn:
+            in_window, window = manager._window(
+                conn, "started_at", datetime.now(timezone.utc) - timedelta(hours=1), datetime.now(timezone.utc)
+            )
+            plan = " ".join(row[-1] for row in conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT COUNT(*), SUM(status = 'completed') FROM calls WHERE {in_window}",
+                window
+            ))
+        assert "COVERING INDEX idx_calls_started_ms" in plan
+
+    def test_metrics_match_before_and_after_backfill(self, tmp_path):
+        from call_metrics import CallMetricsManager
+        db = tmp_path / "calls.db"
+        now = datetime.now(timezone.utc)
+        with sqlite3.connect(db) as conn:
+            conn.execute(LEGACY_CALLS)
+            conn.executemany(
+                "INSERT INTO calls (call_id, call_type, started_at, duration_seconds, status) VALUES (?, 'inbound', ?, ?, ?)",
+                [
+                    ("a", (now - timedelta(hours=1)).isoformat(), 30.0, "completed"),
+                    ("b", (now - timedelta(hours=2)).isoformat().replace("+00:00", "Z"), 60.0, "completed"),
+                    ("c", (now - timedelta(hours=3)).isoformat(), None, "failed"),
+                    ("old", (now - timedelta(days=3)).isoformat(), 10.0, "completed"),
+                ]
+            )
+        manager = CallMetricsManager(db_path=db)
+        before = manager.get_metrics()
+
+        run_backfill(db, batch_pause=0)
+        after = manager.get_metrics()
+
+        assert (after.total_calls, after.completed_calls, after.failed_calls) == (3, 2, 1)
+        assert after.avg_duration == before.avg_duration == 45.0
+        assert before.total_calls == after.total_calls
+
+
+class TestTranscriptSearch:
+    def _legacy_with_transcripts(self, path, count):
+        make_legacy_db(path, 1)
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TABLE transcripts (id INTEGER PRIMARY KEY AUTOINCREMENT, call_id TEXT NOT NULL, "
+                "timestamp TEXT NOT NULL, speaker TEXT NOT NULL, content TEXT NOT NULL, "
+                "event_type TEXT NOT NULL, metadata TEXT)"
+            )
+            conn.executemany(
+                "INSERT INTO transcripts (call_id, timestamp, speaker, content, event_type) "
+                "VALUES ('c0', '2026-01-01T00:00:00+00:00', 'user', ?, 'speech')",
+                [(f"line {i} about invoices",) for i in range(count)]
+            )
+
+    def test_existing_transcripts_are_indexed_by_backfill(self, tmp_path):
+        db = tmp_path / "calls.db"
+        self._legacy_with_transcripts(db, 25)
+        assert migrate(db, batch_size=10) < TRANSCRIPT_SEARCH_VERSION
+        with sqlite3.connect(db) as conn:
+            # Rows written mid-backfill are indexed by the trigger, not twice
+            conn.execute(
+                "INSERT INTO transcripts (call_id, timestamp, speaker, content, event_type) "
+                "VALUES ('c0', '2026-01-01T00:00:01+00:00', 'user', 'late invoices', 'speech')"
+            )
+        assert run_backfill(db, batch_size=10, batch_pause=0) == SCHEMA_VERSION
+        with sqlite3.connect(db) as conn:
+            count = conn.execute(
+                "SELECT COUNT(*) FROM transcripts_fts WHERE transcripts_fts MATCH 'invoice'"
+            ).fetchone()[0]
+        assert count == 26
+
+    def test_backfill_cursor_survives_restart(self, tmp_path):
+        db = tmp_path / "calls.db"
+        self._legacy_with_transcripts(db, 30)
+        with patch.object(db_migrations, "MIGRATIONS",
+                          [m for m in MIGRATIONS if m.version < TRANSCRIPT_SEARCH_VERSION]):
+            migrate(db, online=True)
+        # Each migrate() is a process start that indexes one batch and exits
+        cursors = []
+        for _ in range(2):
+            assert migrate(db, batch_size=10) < TRANSCRIPT_SEARCH_VERSION
+            with sqlite3.connect(db) as conn:
+                cursors.append(conn.execute(
+                    "SELECT value FROM schema_meta WHERE key = 'transcripts_fts_cursor'"
+                ).fetchone()[0])
+        assert cursors == [10, 20]
+        assert run_backfill(db, batch_size=10, batch_pause=0) == SCHEMA_VERSION
+        with sqlite3.connect(db) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM transcripts_fts").fetchone()[0] == 30
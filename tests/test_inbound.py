@@ -22,9 +22,18 @@ from inbound_handler import (
     ContextRequest,
     CallerHistory,
     caller_history,
+    inbound_store,
 )
 
 
+@pytest.fixture(autouse=True)
+def inbound_db(tmp_path):
+    """Keep the module's caller store in a per-test database."""
+    inbound_store.open(tmp_path / "inbound.db")
+    yield
+    inbound_store.close()
+
+
 class TestPhoneNormalization:
     """Test phone number normalization."""
     
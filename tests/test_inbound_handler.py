@@ -8,6 +8,7 @@ Covers:
 - mask_phone(): masking logic
 - check_allowlist(): exact match, pattern match, no match
 - authorize_caller(): open/allowlist/pairing policies
+- InboundPolicy / get_policy(): decision cache, versioned reload
 - build_context(): context building
 """
 
@@ -34,9 +35,19 @@ from inbound_handler import (
     ContextRequest,
     AuthorizeResponse,
     AuthorizeRequest,
+    InboundPolicy,
+    get_policy,
 )
 
 
+@pytest.fixture(autouse=True)
+def inbound_db(tmp_path):
+    """Keep the module's caller store in a per-test database."""
+    ih.inbound_store.open(tmp_path / "inbound.db")
+    yield
+    ih.inbound_store.close()
+
+
 # ─── load_config ──────────────────────────────────────────────────────────────
 
 class TestLoadConfig:
@@ -97,6 +108,19 @@ class TestLoadConfig:
         assert config["afterHoursMessage"] == "custom message"
         assert "voicemailEnabled" in config  # Default still present
 
+    def test_cached_until_file_changes(self, tmp_path):
+        config_file = tmp_path / "inbound.json"
+        config_file.write_text(json.dumps({"allowFrom": ["+1111111111"]}))
+
+        with patch.object(ih, 'CONFIG_PATH', config_file), patch.object(ih, 'VOICE_ALLOWLIST', [""]):
+            first = load_config()
+            assert load_config() is first
+            config_file.write_text(json.dumps({"allowFrom": ["+1111111111", "+2222222222"]}))
+            second = load_config()
+
+        assert second is not first
+        assert second["allowFrom"] == ["+1111111111", "+2222222222"]
+
 
 # ─── normalize_phone ──────────────────────────────────────────────────────────
 
@@ -246,6 +270,70 @@ class TestAuthorizeCaller:
         assert hasattr(response, "policy")
 
 
+# ─── InboundPolicy ────────────────────────────────────────────────────────────
+
+class TestInboundPolicy:
+    """Tests for the compiled InboundPolicy and get_policy()."""
+
+    def test_matches_authorize_caller(self):
+        configs = [
+            {"policy": "open", "allowFrom": []},
+            {"policy": "allowlist", "allowFrom": []},
+            {"policy": "allowlist", "allowFrom": ["+1 (212) 555-1234", "+44*"]},
+            {"policy": "pairing", "allowFrom": ["+12125551234"]},
+        ]
+        for config in configs:
+            policy = InboundPolicy(config)
+            for phone in ["+12125551234", "12125551234", "+447700900123", "+99999999999"]:
+                assert policy.authorize(phone) == authorize_caller(phone, config)
+
+    def test_caches_decision_per_number(self):
+        policy = InboundPolicy({"policy": "allowlist", "allowFrom": ["+12125551234"]})
+        first = policy.authorize("+1 212 555 1234")
+        assert policy.authorize("+12125551234") is first
+        assert policy.stats == {"decisions": 2, "cache_hits": 1}
+
+    def test_decision_cache_is_bounded(self):
+        policy = InboundPolicy({"policy": "open", "allowFrom": []})
+        with patch.object(ih, 'POLICY_DECISION_CACHE_SIZE', 3):
+            for n in range(10):
+                policy.authorize(f"+1555000{n:04d}")
+        assert policy.get_stats()["cached_decisions"] <= 3
+
+    def test_reload_bumps_version_and_drops_decisions(self, tmp_path):
+        config_file = tmp_path / "inbound.json"
+        config_file.write_text(json.dumps({"allowFrom": ["+1111111111"]}))
+
+        with patch.object(ih, 'CONFIG_PATH', config_file), \
+                patch.object(ih, 'VOICE_ALLOWLIST', [""]), \
+                patch.object(ih, 'VOICE_POLICY', "allowlist"):
+            first = get_policy()
+            assert get_policy() is first
+            assert first.authorize("+2222222222").authorized is False
+
+            config_file.write_text(json.dumps({"allowFrom": ["+1111111111", "+2222222222"]}))
+            second = get_policy()
+
+        assert second is not first
+        assert second.version == first.version + 1
+        assert second.authorize("+2222222222").authorized is True
+
+    def test_config_and_health_report_version(self, tmp_path):
+        import asyncio
+
+        config_file = tmp_path / "inbound.json"
+        config_file.write_text(json.dumps({"allowFrom": ["+1111111111"]}))
+
+        with patch.object(ih, 'CONFIG_PATH', config_file), patch.object(ih, 'VOICE_ALLOWLIST', [""]):
+            version = get_policy().version
+            config = asyncio.run(ih.get_config())
+            health = asyncio.run(ih.health_check())
+
+        assert config["version"] == version
+        assert health["policy"]["version"] == version
+        assert health["policy"]["allowlist_entries"] == 1
+
+
 # ─── build_context ────────────────────────────────────────────────────────────
 
 class TestBuildContext:
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/inbound_store.py
+
+Covers:
+- Caller history: batched record_call, read-after-write, persistence
+- Missed calls: insert, retention cap, callbacks
+- Trigger-maintained counters
+- Keyset pagination for callers and missed calls
+- inbound_handler endpoints backed by the store
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import inbound_handler as ih
+from inbound_store import CallerHistory, InboundStore, MissedCall
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InboundStore(tmp_path / "inbound.db")
+    yield store
+    store.close()
+
+
+def _missed(n, voicemail=True):
+    return MissedCall(
+        timestamp=f"2026-10-19T10:00:{n:02d}Z",
+        from_number=f"+1555000{n:04d}",
+        reason="no_answer",
+        has_voicemail=voicemail,
+        voicemail_transcript="call me" if voicemail else None,
+    )
+
+
+class TestCallerHistory:
+    def test_record_call_creates_and_updates(self, store):
+        store.record_call("+14402915517", None, "2026-10-19T10:00:00Z")
+        store.record_call("+14402915517", "Jane", "2026-10-19T11:00:00Z")
+
+        history = store.get_caller("+14402915517")
+        assert history.call_count == 2
+        assert history.name == "Jane"
+        assert history.first_seen_at == "2026-10-19T10:00:00Z"
+        assert history.last_call_at == "2026-10-19T11:00:00Z"
+
+    def test_batched_calls_coalesce_into_one_write(self, store):
+        async def burst():
+            for i in range(50):
+                store.record_call("+14402915517" if i % 2 else "+12125551234", None, f"t{i:02d}")
+            assert store.stats["flushes"] == 0
+            await asyncio.sleep(store.flush_interval * 4)
+
+        asyncio.run(burst())
+
+        assert store.stats["flushes"] == 1
+        assert store.stats["rows_flushed"] == 2
+        assert store.get_caller("+14402915517").call_count == 25
+
+    def test_call_recorded_during_flush_is_written(self, store):
+        flush_locked = store._flush_locked
+        started = threading.Event()
+
+        def slow_flush():
+            flushed = flush_locked()
+            started.set()  # Batch taken, flush still in flight
+            time.sleep(0.1)
+            return flushed
+
+        store._flush_locked = slow_flush
+
+        async def record_during_flush():
+            store.record_call("+14402915517", None, "t1")
+            await asyncio.to_thread(started.wait, 5)
+            store.record_call("+12125551234", None, "t2")
+            await asyncio.wait_for(store._flush_task, 5)
+
+        asyncio.run(record_during_flush())
+        assert store.stats["flushes"] == 2 and store.stats["rows_flushed"] == 2
+
+    def test_reads_see_unflushed_calls(self, store):
+        async def record_then_read():
+            store.record_call("+14402915517", "Jane", "t1")
+            return store.get_caller("+14402915517"), store.counts()["callers"], store.stats["flushes"]
+
+        history, count, flushes = asyncio.run(record_then_read())
+        assert history.call_count == 1
+        assert count == 1
+        assert flushes == 0  # Merged from the batch, not written by the read
+
+    def test_reads_merge_batch_into_committed_row(self, store):
+        store.record_call("+14402915517", None, "t1")  # Outside a loop: written at once
+        store.update_notes("+14402915517", "prefers email")
+
+        async def record_then_read():
+            store.record_call("+14402915517", "Jane", "t2")
+            store.record_call("+12125551234", None, "t3")
+            return store.get_caller("+14402915517"), store.counts()["callers"], store.stats["flushes"]
+
+        history, count, flushes = asyncio.run(record_then_read())
+        assert (history.call_count, history.last_call_at, history.name) == (2, "t2", "Jane")
+        assert history.notes == "prefers email" and history.first_seen_at == "t1"
+        assert count == 2
+        assert flushes == 1  # Only the first, loop-less record_call
+
+    def test_name_is_not_overwritten(self, store):
+        store.record_call("+14402915517", "Jane", "t1")
+        store.record_call("+14402915517", "Caller ID", "t2")
+        assert store.get_caller("+14402915517").name == "Jane"
+
+    def test_persists_across_instances(self, tmp_path):
+        first = InboundStore(tmp_path / "inbound.db")
+        first.record_call("+14402915517", "Jane", "t1")
+        first.update_notes("+14402915517", "VIP")
+        first.add_missed_call(_missed(1))
+        first.close()
+
+        second = InboundStore(tmp_path / "inbound.db")
+        assert second.get_caller("+14402915517").notes == "VIP"
+        assert second.counts() == {"callers": 1, "missed_calls": 1, "pending_callbacks": 1}
+        second.close()
+
+    def test_update_notes_unknown_caller(self, store):
+        assert store.update_notes("+19999999999", "x") is False
+
+    def test_mapping_view(self, store):
+        callers = store.callers
+        callers["+14402915517"] = CallerHistory(phone="+14402915517", name="Jane", call_count=3)
+
+        assert "+14402915517" in callers
+        assert callers.get("+14402915517").call_count == 3
+        assert callers.get("+19999999999") is None
+        assert list(callers) == ["+14402915517"]
+        assert len(callers) == 1
+
+        del callers["+14402915517"]
+        assert len(callers) == 0
+        with pytest.raises(KeyError):
+            callers["+14402915517"]
+
+
+class TestMissedCalls:
+    def test_counters_follow_inserts_callbacks_and_pruning(self, tmp_path):
+        store = InboundStore(tmp_path / "inbound.db", max_missed_calls=3)
+        for n in range(5):
+            store.add_missed_call(_missed(n, voicemail=n % 2 == 0))
+
+        assert store.counts()["missed_calls"] == 3
+        assert store.counts()["pending_callbacks"] == 2  # n=2, n=4
+
+        assert store.schedule_callback(_missed(4).timestamp, "later") is True
+        assert store.counts()["pending_callbacks"] == 1
+        assert store.schedule_callback("no-such-timestamp", "later") is False
+        store.close()
+
+    def test_pending_only(self, store):
+        for n in range(6):
+            store.add_missed_call(_missed(n, voicemail=n % 3 == 0))
+
+        calls, cursor = store.list_missed_calls(limit=10, pending_only=True)
+        assert [c.from_number for c in calls] == ["+15550000003", "+15550000000"]
+        assert cursor is None
+
+
+class TestPagination:
+    def test_callers_keyset_pages_cover_everything_once(self, store):
+        for n in range(23):
+            store.record_call(f"+1555000{n:04d}", None, f"2026-10-19T10:{n % 7:02d}:00Z")
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page, cursor = store.list_callers(limit=5, cursor=cursor)
+            seen.extend(page)
+            pages += 1
+            if cursor is None:
+                break
+
+        assert pages == 5
+        assert len({h.phone for h in seen}) == 23
+        keys = [(h.last_call_at, h.phone) for h in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    def test_missed_calls_keyset_pages(self, store):
+        for n in range(7):
+            store.add_missed_call(_missed(n))
+
+        first, cursor = store.list_missed_calls(limit=4)
+        second, end = store.list_missed_calls(limit=4, cursor=cursor)
+
+        assert [c.id for c in first + second] == [7, 6, 5, 4, 3, 2, 1]
+        assert end is None
+
+
+class TestEndpoints:
+    @pytest.fixture(autouse=True)
+    def inbound_db(self, tmp_path):
+        ih.inbound_store.open(tmp_path / "inbound.db")
+        yield
+        ih.inbound_store.close()
+
+    def test_call_started_then_context(self):
+        async def flow():
+            await ih.record_call_started(ih.ContextRequest(caller_phone="+1 440 291 5517"))
+            await ih.record_call_started(ih.ContextRequest(caller_phone="+14402915517"))
+            return await ih.get_session_context(ih.ContextRequest(caller_phone="+14402915517"))
+
+        context = asyncio.run(flow())
+        assert context.is_known_caller is True
+        assert context.previous_call_count == 2
+
+    def test_missed_call_callback_and_health(self):
+        async def flow():
+            recorded = await ih.record_missed_call(
+                ih.MissedCallRecord(from_number="+14402915517", reason="busy", voicemail_transcript="hi")
+            )
+            before = await ih.health_check()
+            await ih.schedule_callback(recorded["timestamp"])
+            after = await ih.health_check()
+            listing = await ih.list_missed_calls(limit=20, pending_only=False, cursor=None)
+            return before, after, listing
+
+        before, after, listing = asyncio.run(flow())
+        assert before["pending_callbacks"] == 1
+        assert after["pending_callbacks"] == 0
+        assert listing["missed_calls"][0]["callback_scheduled"] is True
+        assert listing["next_cursor"] is None
+
+    def test_update_notes_unknown_caller_404(self):
+        with pytest.raises(ih.HTTPException):
+            asyncio.run(ih.update_caller_notes("+19999999999", "notes"))
@@ -223,6 +223,22 @@ class TestGetCallHistory:
 
         assert len(result) == 2
 
+    def test_get_call_history_from_transcript_archive(self, tmp_path):
+        from transcript_archive import TranscriptArchive
+
+        fake_log = tmp_path / "nonexistent.json"
+        memory_dir = tmp_path / "memory"
+        archive = TranscriptArchive(memory_dir / "call-transcripts")
+        for i in range(3):
+            archive.append(f"CA{i}", [{"speaker": "user", "content": f"call {i}"}])
+
+        with patch("mcp_server.CALL_LOG_PATH", fake_log):
+            with patch("mcp_server.MEMORY_DIR", memory_dir):
+                result = run(ms.get_call_history(limit=2))
+
+        assert [c["call_sid"] for c in result] == ["CA2", "CA1"]
+        assert result[0]["user_excerpt"] == "call 2"
+
     def test_get_call_history_empty_when_no_sources(self, tmp_path):
         fake_log = tmp_path / "nonexistent.json"
         fake_memory = tmp_path / "no_memory"
@@ -9,7 +9,7 @@ Covers:
 - _normalize_phone_number
 - _enhance_context_for_caller, _filter_personal_context, _limit_context_for_unknown
 - _is_work_related_conversation, _find_relevant_conversations
-- get_caller_context: cache hits, fallback on error
+- get_caller_context: caller snapshots, cache hits, fallback on error
 - update_call_context, finalize_call_context
 - create_openclaw_bridge factory
 """
@@ -41,6 +41,7 @@ _mock_extractor.extract_recent_context = MagicMock(return_value={
     "recent_decisions": [],
     "context_summary": "Test context"
 })
+_mock_extractor.get_cached_context = MagicMock(return_value=None)  # No snapshot: extract live
 
 _mock_session.SessionContextExtractor = MagicMock(return_value=_mock_extractor)
 _mock_session.create_context_extractor = MagicMock(return_value=_mock_extractor)
@@ -382,6 +383,29 @@ class TestGetCallerContext:
         assert isinstance(result, dict)
         assert "conversation_history" in result  # Fallback structure
 
+    def test_uses_caller_snapshot(self):
+        bridge = make_bridge()
+        caller_info = {"name": "Remi", "session_id": "main", "phone": "+250794002033",
+                       "relationship": "primary_user", "known_caller": True}
+        snapshot = {
+            "caller_info": {"name": "Remi", "phone": "+250794002033", "known_caller": True},
+            "recent_conversations": [{"time": "14:30", "speaker": "User", "message": "Ship the voice feature"}],
+            "context_summary": "Caller: Remi | Recent activity: 1 messages",
+        }
+        bridge.session_cache["main_+250794002033"] = {"context": {"stale": True}, "cached_at": time.time()}
+
+        with patch.object(_mock_extractor, 'get_cached_context', return_value=snapshot), \
+             patch.object(_mock_extractor, 'extract_recent_context') as live:
+            result = asyncio.run(bridge.get_caller_context(caller_info))
+
+        live.assert_not_called()
+        assert "stale" not in result  # Snapshots take precedence over the TTL cache
+        assert result["conversation_history"] == [
+            {"timestamp": "14:30", "speaker": "User", "content": "Ship the voice feature"}
+        ]
+        assert result["context_summary"] == snapshot["context_summary"]
+        assert result["caller_info"] is caller_info
+
     def test_unknown_caller_limited_context(self):
         bridge = make_bridge()
         caller_info = {"name": "Unknown", "session_id": "guest", "phone": "+999000000001", "known_caller": False}
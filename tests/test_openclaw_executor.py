@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming execution in scripts/openclaw_executor.py
+
+Covers:
+- execute_streaming: small first chunk, growing follow-ups
+- execute_streaming: first-chunk deadline flush for slow output
+- execute_streaming: markdown normalized across lines, voice budget
+
+Run with:
+    python3 -m pytest tests/test_openclaw_executor.py -v
+"""
+
+import asyncio
+import os
+import sys
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from openclaw_executor import OpenClawExecutor
+
+
+def _process(lines, delays=None):
+    """Fake subprocess whose stdout gets `lines`, waiting delays[i] before line i."""
+    delays = delays or [0.0] * len(lines)
+    stdout = asyncio.StreamReader()
+
+    async def feed():
+        for delay, line in zip(delays, lines):
+            await asyncio.sleep(delay)
+            stdout.feed_data(line)
+        stdout.feed_eof()
+        process.returncode = 0
+
+    process = MagicMock()
+    process.stdout = stdout
+    process.stderr.read = AsyncMock(return_value=b"")
+    process.returncode = None  # Still running
+    process.wait = AsyncMock()
+    process.feeder = asyncio.ensure_future(feed())
+    return process
+
+
+async def _collect(executor, process, **kwargs):
+    with patch("openclaw_executor.asyncio.create_subprocess_exec",
+               new_callable=AsyncMock, return_value=process):
+        return [chunk async for chunk in executor.execute_streaming("What's up?", **kwargs)]
+
+
+class TestAdaptiveStreaming:
+    """Chunk sizes during streaming."""
+
+    @pytest.mark.asyncio
+    async def test_first_chunk_small_then_growing(self):
+        sentence = b"Your flight leaves at nine from gate twelve, boarding starts at half past eight.\n"
+        process = _process([sentence] * 12)
+        chunks = await _collect(OpenClawExecutor(timeout=5), process)
+
+        assert len(chunks[0]) < 100
+        assert chunks[0].endswith(".")
+        assert max(len(c) for c in chunks[1:]) > 2 * len(chunks[0])
+
+    @pytest.mark.asyncio
+    async def test_deadline_flushes_buffered_text(self):
+        # A short line, then nothing for a while: it must not sit in the buffer
+        process = _process([b"Let me check\n", b"The answer is 42.\n"], delays=[0.0, 0.5])
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        seen = []
+        with patch("openclaw_executor.asyncio.create_subprocess_exec",
+                   new_callable=AsyncMock, return_value=process):
+            async for chunk in OpenClawExecutor(timeout=5).execute_streaming(
+                    "What's up?", first_chunk_deadline=0.1):
+                seen.append((chunk, loop.time() - started))
+
+        assert seen[0][0] == "Let me check"
+        assert seen[0][1] < 0.4
+        assert seen[-1][0] == "The answer is 42."
+
+    @pytest.mark.asyncio
+    async def test_no_deadline_flush_when_chunk_already_sent(self):
+        lines = [b"First, a complete sentence that is long enough to be a chunk.\n",
+                 b"short tail\n"]
+        process = _process(lines, delays=[0.0, 0.3])
+        chunks = await _collect(OpenClawExecutor(timeout=5), process, first_chunk_deadline=0.05)
+        assert chunks[-1] == "short tail"
+
+
+class TestStreamingNormalization:
+    """Markdown handling across streamed lines."""
+
+    @pytest.mark.asyncio
+    async def test_code_fence_across_lines_is_omitted(self):
+        lines = [b"Here you go:\n", b"```\n", b"rm -rf /tmp/cache\n", b"```\n",
+                 b"That clears the **cache\n", b"folder**.\n"]
+        chunks = await _collect(OpenClawExecutor(timeout=5), _process(lines))
+        spoken = " ".join(chunks)
+        assert "rm -rf" not in spoken
+        assert "[code snippet omitted]" in spoken
+        assert "*" not in spoken
+
+    @pytest.mark.asyncio
+    async def test_budget_stops_agent(self):
+        line = b"This is a fairly long sentence that keeps the agent talking on and on.\n"
+        process = _process([line] * 100)
+        chunks = await _collect(OpenClawExecutor(timeout=5), process)
+        assert chunks[-1].endswith("I can provide more details if you'd like.")
+        assert sum(len(c) for c in chunks) < 2200
+        process.terminate.assert_called()
+        process.feeder.cancel()
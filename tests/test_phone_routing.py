@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/phone_routing.py
+
+Covers:
+- PhoneTrie exact/prefix terminals and longest match
+- PhoneMapping exact numbers and wildcard entries
+- Allowlist: same answers as the old linear first-match scan
+- compile_allowlist reuse, WatchedPhoneFile reload and atomic swap
+
+Run with:
+    python3 -m pytest tests/test_phone_routing.py -v
+"""
+
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from phone_routing import (
+    Allowlist,
+    PhoneMapping,
+    PhoneTrie,
+    WatchedPhoneFile,
+    compile_allowlist,
+    lookup_phone,
+    normalize_phone,
+    watch_phone_mapping,
+)
+
+
+def _linear_allowlist(phone, allow_from):
+    """The pre-trie inbound_handler.check_allowlist, as a reference."""
+    def norm(p):
+        return normalize_phone(p) if p else ""
+    normalized = norm(phone)
+    for entry in allow_from:
+        if not entry:
+            continue
+        if entry.strip() == "*":
+            return "*"
+        entry_normalized = norm(entry.rstrip("*"))
+        if entry.endswith("*") and normalized.startswith(entry_normalized):
+            return entry
+        if normalized == entry_normalized:
+            return entry
+    return None
+
+
+class TestPhoneTrie:
+    """Exact and prefix terminals."""
+
+    def test_longest_prefix(self):
+        trie = PhoneTrie()
+        for code in ("1", "44", "250", "25"):
+            trie.add(code, code, prefix=True)
+        assert trie.longest("250794002033") == "250"
+        assert trie.longest("2547") == "25"
+        assert trie.longest("14155551234") == "1"
+        assert trie.longest("999") is None
+        assert len(trie) == 4
+
+    def test_exact_needs_full_number(self):
+        trie = PhoneTrie()
+        trie.add("+1555", "exact")
+        assert trie.longest("+1555") == "exact"
+        assert trie.longest("+15551") is None
+        assert trie.longest("+155") is None
+
+    def test_matches_order(self):
+        trie = PhoneTrie()
+        trie.add("", "any", prefix=True)
+        trie.add("+1", "us", prefix=True)
+        trie.add("+1555", "me")
+        assert trie.matches("+1555") == ["any", "us", "me"]
+
+
+class TestPhoneMapping:
+    """phone_mapping.json lookups."""
+
+    def test_exact_keys_are_normalized(self):
+        mapping = PhoneMapping({"+1 (555) 000-1111": {"name": "Ana"}, "_comment": "skip"})
+        assert mapping.lookup("+15550001111") == {"name": "Ana"}
+        assert "_comment" not in mapping
+        assert "+15550001111" in mapping
+
+    def test_wildcards_fall_back_longest_first(self):
+        mapping = PhoneMapping({
+            "+250*": {"name": "Rwanda office"},
+            "+2507*": {"name": "Kigali mobile"},
+            "+250794002033": {"name": "Remi"},
+        })
+        assert mapping.lookup("+250794002033")["name"] == "Remi"
+        assert mapping.lookup("+250781234567")["name"] == "Kigali mobile"
+        assert mapping.lookup("+250221234567")["name"] == "Rwanda office"
+        assert mapping.lookup("+14155551234") is None
+
+    def test_lookup_phone_accepts_plain_dict(self):
+        assert lookup_phone({"+1555": {"name": "x"}}, "1-555") == {"name": "x"}
+        assert lookup_phone(PhoneMapping({"+1*": {"name": "us"}}), "+1555") == {"name": "us"}
+
+
+class TestAllowlist:
+    """Compiled allowlist matches the linear scan."""
+
+    @pytest.mark.parametrize("phone, allow_from", [
+        ("+14402915517", ["+14402915517", "+15551234567"]),
+        ("+19999999999", ["+1440*", "*"]),
+        ("+14409876543", ["+15551234567", "+1440*", "+44*"]),
+        ("+14409876543", ["+1*", "+1440*"]),
+        ("+14409876543", ["+14409876543", "+1*"]),
+        ("+14402915517", ["1-440-291-5517"]),
+        ("+14402915517", ["", "  *  "]),
+        ("", ["+1*", "*"]),
+        ("+61412345678", ["+1440*", "+44*"]),
+    ])
+    def test_known_cases(self, phone, allow_from):
+        assert Allowlist(allow_from).match(phone) == _linear_allowlist(phone, allow_from)
+
+    def test_random_lists_match_linear_scan(self):
+        rng = random.Random(40)
+        for _ in range(300):
+            entries = []
+            for _ in range(rng.randint(0, 12)):
+                digits = "".join(rng.choice("1234") for _ in range(rng.randint(1, 5)))
+                entries.append(rng.choice(["+", ""]) + digits + rng.choice(["", "*"]))
+            if rng.random() < 0.1:
+                entries.insert(rng.randint(0, len(entries)), "*")
+            allowlist = Allowlist(entries)
+            for _ in range(10):
+                phone = "+" + "".join(rng.choice("1234") for _ in range(rng.randint(1, 6)))
+                assert allowlist.match(phone) == _linear_allowlist(phone, entries), (phone, entries)
+
+    def test_compile_reuses_same_list(self):
+        entries = ["+1440*"]
+        assert compile_allowlist(entries) is compile_allowlist(entries)
+        assert compile_allowlist(list(entries)) is not compile_allowlist(entries)
+
+
+class TestWatchedPhoneFile:
+    """Compile once, recompile on change, keep last good table."""
+
+    def test_reload_on_change(self, tmp_path):
+        path = tmp_path / "phone_mapping.json"
+        path.write_text(json.dumps({"+1555": {"name": "Old"}}))
+        watched = WatchedPhoneFile(path, PhoneMapping, reload_interval=0)
+        first = watched.current()
+        assert first.lookup("+1555") == {"name": "Old"}
+        assert watched.current() is first  # Unchanged file: no rebuild
+
+        path.write_text(json.dumps({"+1555": {"name": "Newer name"}}))
+        second = watched.current()
+        assert second is not first
+        assert second.lookup("+1555") == {"name": "Newer name"}
+        assert first.lookup("+1555") == {"name": "Old"}  # Old snapshot untouched
+        assert watched.version == 2
+
+    def test_invalid_json_keeps_previous(self, tmp_path):
+        path = tmp_path / "phone_mapping.json"
+        path.write_text(json.dumps({"+1555": {"name": "Good"}}))
+        watched = WatchedPhoneFile(path, PhoneMapping, reload_interval=0)
+        watched.current()
+        path.write_text("{ not json")
+        assert watched.current().lookup("+1555") == {"name": "Good"}
+
+    def test_missing_file_is_empty(self, tmp_path):
+        watched = WatchedPhoneFile(tmp_path / "none.json", PhoneMapping, reload_interval=0)
+        assert watched.current() == {}
+
+    def test_reload_interval_limits_checks(self, tmp_path):
+        path = tmp_path / "phone_mapping.json"
+        path.write_text(json.dumps({"+1555": {"name": "A"}}))
+        watched = WatchedPhoneFile(path, PhoneMapping, reload_interval=3600)
+        watched.current()
+        path.write_text(json.dumps({"+1555": {"name": "Changed"}}))
+        assert watched.current().lookup("+1555") == {"name": "A"}
+
+    def test_watchers_shared_per_path(self, tmp_path):
+        path = tmp_path / "phone_mapping.json"
+        assert watch_phone_mapping(path) is watch_phone_mapping(path)
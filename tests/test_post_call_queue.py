@@ -0,0 +1,239 @@
+"""
+Unit tests for PostCallQueue
+
+Tests idempotent enqueue, worker processing, retries with backoff,
+checkpointed state, crash recovery, metrics and the memory append batcher.
+"""
+
+import asyncio
+import sqlite3
+import time
+import pytest
+import sys
+import os
+
+# Add scripts to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from post_call_queue import (
+    JobStatus,
+    MemoryAppendBatcher,
+    PostCallQueue,
+)
+
+
+def _queue(tmp_path, handler, **kwargs):
+    kwargs.setdefault("base_delay", 0.0)
+    return PostCallQueue(handler=handler, db_path=tmp_path / "jobs.db", **kwargs)
+
+
+def _status(queue, call_sid):
+    with sqlite3.connect(queue.db_path) as conn:
+        return conn.execute(
+            "SELECT status, attempts, last_error FROM post_call_jobs WHERE call_sid = ?",
+            (call_sid,)
+        ).fetchone()
+
+
+class TestEnqueue:
+    """Persistence and idempotency."""
+
+    def test_db_created_lazily(self, tmp_path):
+        queue = _queue(tmp_path, handler=None)
+        assert not queue.db_path.exists()
+        queue.enqueue_sync("CA1", {"x": 1})
+        assert queue.db_path.exists()
+
+    def test_duplicate_call_sid_ignored(self, tmp_path):
+        queue = _queue(tmp_path, handler=None)
+        assert queue.enqueue_sync("CA1", {"x": 1}) is True
+        assert queue.enqueue_sync("CA1", {"x": 2}) is False
+        assert queue.get_counts() == {"pending": 1}
+        assert queue.stats["duplicates"] == 1
+
+
+class TestWorkers:
+    """Processing, retries and recovery."""
+
+    def test_job_processed(self, tmp_path):
+        seen = []
+
+        async def handler(job):
+            seen.append((job.call_sid, job.payload))
+
+        async def run():
+            queue = _queue(tmp_path, handler)
+            await queue.start()
+            await queue.enqueue("CA1", {"turns": 3})
+            assert await queue.drain(timeout=5)
+            await queue.stop()
+            return queue
+
+        queue = asyncio.run(run())
+        assert seen == [("CA1", {"turns": 3})]
+        assert _status(queue, "CA1")[0] == JobStatus.DONE.value
+        stats = queue.get_stats()
+        assert stats["completed"] == 1
+        assert stats["depth"] == 0
+
+    def test_failure_retried_then_succeeds(self, tmp_path):
+        attempts = []
+
+        async def handler(job):
+            attempts.append(job.attempts)
+            if job.attempts < 3:
+                raise RuntimeError("gateway down")
+
+        async def run():
+            queue = _queue(tmp_path, handler)
+            await queue.start()
+            await queue.enqueue("CA1", {})
+            assert await queue.drain(timeout=5)
+            await queue.stop()
+            return queue
+
+        queue = asyncio.run(run())
+        assert attempts == [1, 2, 3]
+        assert queue.get_stats()["retries"] == 2
+        assert _status(queue, "CA1")[0] == JobStatus.DONE.value
+
+    def test_gives_up_after_max_attempts(self, tmp_path):
+        final_flags = []
+
+        async def handler(job):
+            final_flags.append(job.is_final_attempt)
+            raise RuntimeError("still down")
+
+        async def run():
+            queue = _queue(tmp_path, handler, max_attempts=2)
+            await queue.start()
+            await queue.enqueue("CA1", {})
+            assert await queue.drain(timeout=5)
+            await queue.stop()
+            return queue
+
+        queue = asyncio.run(run())
+        assert final_flags == [False, True]
+        status, attempts, error = _status(queue, "CA1")
+        assert (status, attempts, error) == ("failed", 2, "still down")
+        assert queue.get_stats()["failed"] == 1
+
+    def test_checkpointed_state_survives_retry(self, tmp_path):
+        states = []
+
+        async def handler(job):
+            states.append(dict(job.state))
+            if "summary" not in job.state:
+                job.state["summary"] = "done"
+                queue.save_state(job.call_sid, job.state)
+                raise RuntimeError("memory write failed")
+
+        queue = _queue(tmp_path, handler)
+
+        async def run():
+            await queue.start()
+            await queue.enqueue("CA1", {})
+            assert await queue.drain(timeout=5)
+            await queue.stop()
+
+        asyncio.run(run())
+        assert states == [{}, {"summary": "done"}]
+
+    def test_running_jobs_resumed_on_start(self, tmp_path):
+        seen = []
+
+        async def handler(job):
+            seen.append(job.call_sid)
+
+        queue = _queue(tmp_path, handler)
+        queue.enqueue_sync("CA1", {})
+        with sqlite3.connect(queue.db_path) as conn:
+            conn.execute("UPDATE post_call_jobs SET status = 'running'")
+
+        async def run():
+            await queue.start()
+            assert await queue.drain(timeout=5)
+            await queue.stop()
+
+        asyncio.run(run())
+        assert seen == ["CA1"]
+
+    def test_worker_pool_bounded(self, tmp_path):
+        peak = {"now": 0, "max": 0}
+
+        async def handler(job):
+            peak["now"] += 1
+            peak["max"] = max(peak["max"], peak["now"])
+            await asyncio.sleep(0.02)
+            peak["now"] -= 1
+
+        async def run():
+            queue = _queue(tmp_path, handler, workers=2)
+            await queue.start()
+            for n in range(6):
+                await queue.enqueue(f"CA{n}", {})
+            assert await queue.drain(timeout=5)
+            await queue.stop()
+
+        asyncio.run(run())
+        assert peak["max"] == 2
+
+
+class TestRetryDelay:
+    """retry_delay() backoff."""
+
+    def test_grows_and_caps(self):
+        queue = PostCallQueue(handler=None, base_delay=5.0, max_delay=300.0)
+        assert 5.0 <= queue.retry_delay(1) <= 5.5
+        assert 10.0 <= queue.retry_delay(2) <= 11.0
+        assert queue.retry_delay(20) <= 330.0
+
+
+class TestMemoryAppendBatcher:
+    """Batched appends."""
+
+    def test_concurrent_appends_share_one_write(self, tmp_path):
+        target = tmp_path / "memory" / "2026-01-01.md"
+
+        async def run():
+            batcher = MemoryAppendBatcher(flush_interval=0.01)
+            await asyncio.gather(
+                batcher.append(target, "one\n"),
+                batcher.append(target, "two\n"),
+            )
+            return batcher
+
+        batcher = asyncio.run(run())
+        assert target.read_text() == "one\ntwo\n"
+        assert batcher.stats == {"entries": 2, "writes": 1}
+
+    def test_write_error_propagates(self, tmp_path):
+        blocker = tmp_path / "memory"
+        blocker.write_text("not a directory")
+
+        async def run():
+            batcher = MemoryAppendBatcher(flush_interval=0.0)
+            await batcher.append(blocker / "2026-01-01.md", "x")
+
+        with pytest.raises(OSError):
+            asyncio.run(run())
+
+    def test_append_during_write_is_flushed(self, tmp_path):
+        target = tmp_path / "2026-01-01.md"
+        batcher = MemoryAppendBatcher(flush_interval=0.0)
+        write = batcher._write
+
+        def slow_write(path, text):
+            time.sleep(0.05)
+            write(path, text)
+
+        batcher._write = slow_write
+
+        async def run():
+            first = asyncio.create_task(batcher.append(target, "one\n"))
+            await asyncio.sleep(0.02)  # First write now in flight
+            await asyncio.wait_for(asyncio.gather(first, batcher.append(target, "two\n")), 2)
+
+        asyncio.run(run())
+        assert target.read_text() == "one\ntwo\n"
+        assert batcher.stats == {"entries": 2, "writes": 2}
@@ -0,0 +1,164 @@
+"""
+Unit tests for PromptPlanner
+
+Tests token estimation, scoring, budget packing, truncation and caching.
+"""
+
+import pytest
+import sys
+import os
+
+# Add scripts to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import prompt_planner
+from prompt_planner import (
+    PromptPlanner,
+    PromptSection,
+    SECTION_SEPARATOR,
+    estimate_tokens,
+    source_fingerprint,
+)
+
+
+def _section(name, chars=400, **kwargs):
+    kwargs.setdefault("priority", 0.5)
+    return PromptSection(name=name, title=name.title(), body="x" * chars, **kwargs)
+
+
+class TestEstimateAndScore:
+    """estimate_tokens() and PromptSection.score."""
+
+    def test_estimate_tokens(self):
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("a") == 1
+        assert estimate_tokens("x" * 400) == 100
+
+    def test_score_combines_priority_and_relevance(self):
+        section = _section("a", priority=0.8, caller_relevance=0.5)
+        assert section.score == pytest.approx(0.4)
+
+    def test_recency_decays_score(self):
+        fresh = _section("a", age_days=0)
+        old = _section("b", age_days=prompt_planner.RECENCY_HALF_LIFE_DAYS)
+        assert old.score == pytest.approx(fresh.score / 2)
+
+    def test_render_has_heading(self):
+        assert _section("memory", chars=3).render() == "# Memory\nxxx"
+
+
+class TestPack:
+    """PromptPlanner.pack() budget behaviour."""
+
+    def test_everything_fits(self):
+        planner = PromptPlanner(budget_tokens=10_000)
+        packed = planner.pack("HEADER\n", [_section("a"), _section("b")])
+        assert packed.included == ["a", "b"]
+        assert packed.dropped == []
+        assert packed.text.startswith("HEADER\n# A\n")
+        assert SECTION_SEPARATOR + "# B\n" in packed.text
+
+    def test_lowest_score_dropped_first(self):
+        planner = PromptPlanner(budget_tokens=250)
+        sections = [
+            _section("low", priority=0.1),
+            _section("high", priority=0.9),
+            _section("mid", priority=0.5),
+        ]
+        packed = planner.pack("", sections)
+        assert "high" in packed.included
+        assert packed.dropped[-1] == "low" or "low" in packed.dropped
+        assert packed.tokens <= 250
+
+    def test_original_order_preserved(self):
+        planner = PromptPlanner(budget_tokens=10_000)
+        sections = [_section("first", priority=0.1), _section("second", priority=0.9)]
+        packed = planner.pack("", sections)
+        assert packed.text.index("# First") < packed.text.index("# Second")
+
+    def test_required_always_included_and_truncated(self):
+        planner = PromptPlanner(budget_tokens=60)
+        packed = planner.pack("", [_section("soul", chars=2000, required=True)])
+        assert packed.included == ["soul"]
+        assert packed.truncated == ["soul"]
+        assert packed.tokens <= 60
+
+    def test_truncatable_section_cut_instead_of_dropped(self):
+        planner = PromptPlanner(budget_tokens=300)
+        sections = [
+            _section("core", chars=400, priority=1.0),
+            _section("memory", chars=4000, priority=0.7, min_tokens=50),
+        ]
+        packed = planner.pack("", sections)
+        assert packed.included == ["core", "memory"]
+        assert packed.truncated == ["memory"]
+        assert packed.tokens <= 300
+
+    def test_truncatable_section_dropped_below_floor(self):
+        planner = PromptPlanner(budget_tokens=120)
+        sections = [
+            _section("core", chars=400, priority=1.0),
+            _section("memory", chars=4000, priority=0.7, min_tokens=200),
+        ]
+        packed = planner.pack("", sections)
+        assert packed.dropped == ["memory"]
+
+    def test_empty_sections_skipped(self):
+        planner = PromptPlanner(budget_tokens=1000)
+        packed = planner.pack("", [_section("empty", chars=0), _section("a")])
+        assert packed.included == ["a"]
+        assert packed.dropped == []
+
+    def test_header_counts_against_budget(self):
+        planner = PromptPlanner(budget_tokens=150)
+        packed = planner.pack("h" * 400, [_section("a", chars=400)])
+        assert packed.dropped == ["a"]
+
+    def test_budget_override(self):
+        planner = PromptPlanner(budget_tokens=10)
+        packed = planner.pack("", [_section("a")], budget_tokens=10_000)
+        assert packed.included == ["a"]
+        assert packed.budget == 10_000
+
+
+class TestCache:
+    """Per-caller LRU cache."""
+
+    def test_hit_and_miss_counted(self):
+        planner = PromptPlanner()
+        assert planner.get_cached("k") is None
+        packed = planner.pack("", [_section("a")])
+        planner.put_cached("k", packed)
+        assert planner.get_cached("k") is packed
+        assert planner.stats == {"cache_hits": 1, "cache_misses": 1}
+
+    def test_lru_eviction(self):
+        planner = PromptPlanner(cache_size=2)
+        packed = planner.pack("", [])
+        planner.put_cached("a", packed)
+        planner.put_cached("b", packed)
+        planner.get_cached("a")
+        planner.put_cached("c", packed)
+        assert planner.get_cached("b") is None
+        assert planner.get_cached("a") is packed
+
+    def test_clear_cache(self):
+        planner = PromptPlanner()
+        planner.put_cached("a", planner.pack("", []))
+        planner.clear_cache()
+        assert planner.get_stats()["cached_prompts"] == 0
+
+
+class TestSourceFingerprint:
+    """source_fingerprint() change detection."""
+
+    def test_changes_when_file_changes(self, tmp_path):
+        f = tmp_path / "MEMORY.md"
+        f.write_text("one")
+        before = source_fingerprint([f])
+        f.write_text("one two")
+        assert source_fingerprint([f]) != before
+
+    def test_missing_file_tolerated(self, tmp_path):
+        fp = source_fingerprint([tmp_path / "nope.md"])
+        assert fp == ((str(tmp_path / "nope.md"), None, None),)
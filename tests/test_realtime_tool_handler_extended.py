@@ -6,6 +6,9 @@ Covers:
 - stop() with open WebSocket
 - _handle_events() with various event types
 - _send_followup_chunk()
+- FollowupCoalescer and streaming follow-up coalescing
+- Concurrent function calls: session limit, queue wait, cancellation
+- SidebandManager: connection cap, reaping, reconnect spreading, health
 - _send_function_result()
 - start_tool_handler()
 - _cleanup() via atexit
@@ -17,6 +20,7 @@ import asyncio
 import json
 import os
 import sys
+from contextlib import asynccontextmanager
 from unittest.mock import MagicMock, AsyncMock, patch
 import unittest.mock
 
@@ -160,7 +164,11 @@ class TestHandleEvents:
         # Mock _handle_function_call to avoid deep execution
         handler._handle_function_call = AsyncMock()
 
-        asyncio.run(handler._handle_events())
+        async def run():
+            await handler._handle_events()
+            await asyncio.sleep(0.01)  # Let the spawned call run
+
+        asyncio.run(run())
         handler._handle_function_call.assert_awaited_once()
 
     def test_handle_session_closed_event(self):
@@ -280,6 +288,282 @@ class TestSendFollowupChunk:
             asyncio.run(handler._send_followup_chunk("Test"))
 
 
+# ─── Streaming follow-ups ─────────────────────────────────────────────────────
+
+def _stream(*chunks, delay=0.0):
+    async def gen(request):
+        for chunk in chunks:
+            await asyncio.sleep(delay)
+            yield chunk
+    return gen
+
+
+class TestFollowupCoalescer:
+    """Follow-up chunks are merged while a response plays."""
+
+    def test_chunks_during_playback_sent_once(self):
+        sent = []
+
+        async def send(text):
+            sent.append(text)
+
+        async def run():
+            coalescer = rth.FollowupCoalescer(send, chars_per_second=1000)
+            coalescer.playing("x" * 50)  # ~50 ms of speech
+            for text in ("one.", "two.", "three."):
+                coalescer.add(text)
+            assert sent == []
+            await coalescer.drain()
+            return coalescer
+
+        coalescer = asyncio.run(run())
+        assert sent == ["one. two. three."]
+        assert coalescer.stats == {"chunks": 3, "sends": 1}
+
+    def test_sent_immediately_when_idle(self):
+        sent = []
+
+        async def send(text):
+            sent.append(text)
+
+        async def run():
+            coalescer = rth.FollowupCoalescer(send)
+            coalescer.add("now")
+            await coalescer.drain()
+
+        asyncio.run(run())
+        assert sent == ["now"]
+
+    def test_only_our_response_done_releases(self):
+        sent = []
+
+        async def send(text):
+            sent.append(text)
+
+        async def run():
+            coalescer = rth.FollowupCoalescer(send, chars_per_second=1)
+            coalescer.playing("long answer")  # ~11 s estimate
+            coalescer.response_created("resp_ours")
+            coalescer.add("more")
+            coalescer.response_done("resp_old")
+            await asyncio.sleep(0.01)
+            assert sent == []
+            coalescer.response_done("resp_ours")
+            await asyncio.wait_for(coalescer.drain(), timeout=1)
+
+        asyncio.run(run())
+        assert sent == ["more"]
+
+    def test_cancel_drops_pending(self):
+        sent = []
+
+        async def send(text):
+            sent.append(text)
+
+        async def run():
+            coalescer = rth.FollowupCoalescer(send, chars_per_second=1)
+            coalescer.playing("long answer")
+            coalescer.add("never")
+            await asyncio.sleep(0)
+            coalescer.cancel()
+            await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        assert sent == []
+
+
+class TestStreamingFunction:
+    """_execute_streaming_function() with the coalescer."""
+
+    def test_first_chunk_is_function_result_rest_coalesced(self):
+        handler = make_handler("stream-coalesce")
+        handler._send_function_result = AsyncMock()
+        handler._send_followup_chunk = AsyncMock()
+
+        async def run():
+            handler.followups = rth.FollowupCoalescer(
+                handler._send_followup_chunk, chars_per_second=1000)
+            with patch.object(rth, "execute_openclaw_streaming", _stream("First.", "Second.", "Third.")), \
+                    patch.object(rth, "_record_latency") as record:
+                await handler._execute_streaming_function("fn-1", "request")
+                await handler.followups.drain()
+                await asyncio.sleep(0)
+            return record
+
+        record = asyncio.run(run())
+        handler._send_function_result.assert_awaited_once_with("fn-1", "First.")
+        handler._send_followup_chunk.assert_awaited_once_with("Second. Third.")
+        assert handler.stats["successful_calls"] == 1
+        assert handler.stats["first_audio_ms"] is not None
+        assert record.call_args.args[1] == "tool_first_audio"
+
+    def test_first_chunk_send_failure_raises_for_fallback(self):
+        handler = make_handler("stream-first-fail")
+        handler._send_function_result = AsyncMock(side_effect=Exception("ws down"))
+
+        async def run():
+            with patch.object(rth, "execute_openclaw_streaming", _stream("First.")):
+                await handler._execute_streaming_function("fn-1", "request")
+
+        with pytest.raises(Exception, match="ws down"):
+            asyncio.run(run())
+
+    def test_session_closed_cancels_followups(self):
+        handler = make_handler("stream-closed")
+        handler.running = True
+        cancel = MagicMock()
+        handler.followups = MagicMock(cancel=cancel)
+        mock_ws = MagicMock()
+
+        async def aiter_messages():
+            yield json.dumps({"type": "session.closed"})
+
+        mock_ws.__aiter__ = lambda self_: aiter_messages()
+        handler.ws = mock_ws
+        asyncio.run(handler._handle_events())
+        cancel.assert_called_once()
+
+    def test_response_events_forwarded(self):
+        handler = make_handler("stream-events")
+        handler.followups = MagicMock()
+        mock_ws = MagicMock()
+
+        async def aiter_messages():
+            yield json.dumps({"type": "response.created", "response": {"id": "resp_1"}})
+            yield json.dumps({"type": "response.done", "response": {"id": "resp_1"}})
+
+        mock_ws.__aiter__ = lambda self_: aiter_messages()
+        handler.ws = mock_ws
+        asyncio.run(handler._handle_events())
+        handler.followups.response_created.assert_called_once_with("resp_1")
+        handler.followups.response_done.assert_called_once_with("resp_1")
+
+
+# ─── Concurrent function calls ───────────────────────────────────────────────
+
+def _fn_event(fn_id):
+    return json.dumps({
+        "type": "response.function_call_arguments.done",
+        "call_id": fn_id,
+        "name": "ask_openclaw",
+        "arguments": '{"request": "test"}'
+    })
+
+
+def _ws_from(*messages):
+    mock_ws = MagicMock()
+
+    async def aiter_messages():
+        for msg in messages:
+            yield msg
+
+    mock_ws.__aiter__ = lambda self_: aiter_messages()
+    return mock_ws
+
+
+class TestConcurrentFunctionCalls:
+    """Function calls run as tasks while events keep flowing."""
+
+    def test_events_read_while_call_runs(self):
+        handler = make_handler("conc-events")
+        handler.followups = MagicMock()
+        release = None
+
+        async def slow_call(event):
+            await release.wait()
+
+        handler._handle_function_call = slow_call
+        handler.ws = _ws_from(_fn_event("fn-1"),
+                              json.dumps({"type": "response.done", "response": {"id": "r1"}}))
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            await handler._handle_events()
+            await asyncio.sleep(0)
+            # The call is still running, yet the later event was processed
+            assert handler.pending_function_calls() == 1
+            handler.followups.response_done.assert_called_once_with("r1")
+            release.set()
+            await asyncio.sleep(0.01)
+            assert handler.pending_function_calls() == 0
+
+        asyncio.run(run())
+
+    def test_session_limit_and_queue_wait(self):
+        handler = make_handler("conc-limit")
+        running = []
+        peak = 0
+
+        async def call(event):
+            nonlocal peak
+            running.append(event["call_id"])
+            peak = max(peak, len(running))
+            await asyncio.sleep(0.05)
+            running.remove(event["call_id"])
+
+        handler._handle_function_call = call
+        handler.ws = _ws_from(*[_fn_event(f"fn-{i}") for i in range(3)])
+
+        async def run():
+            handler._call_slots = asyncio.Semaphore(1)
+            await handler._handle_events()
+            while handler.pending_function_calls():
+                await asyncio.sleep(0.01)
+
+        asyncio.run(run())
+        assert peak == 1
+        assert handler.stats["queue_wait_ms_max"] >= 80
+        assert handler.stats["queue_wait_ms_total"] >= handler.stats["queue_wait_ms_max"]
+
+    def test_session_closed_cancels_pending_calls(self):
+        handler = make_handler("conc-closed")
+        handler.running = True
+
+        async def forever(event):
+            await asyncio.sleep(60)
+
+        handler._handle_function_call = forever
+        handler.ws = _ws_from(_fn_event("fn-1"), _fn_event("fn-2"),
+                              json.dumps({"type": "session.closed"}))
+
+        async def run():
+            handler._call_slots = asyncio.Semaphore(1)  # fn-2 is still queued
+            await handler._handle_events()
+            assert handler.pending_function_calls() == 0
+
+        asyncio.run(run())
+        assert handler.stats["cancelled_calls"] == 2
+        assert handler.running is False
+
+    def test_overloaded_scheduler_answers_caller(self):
+        handler = make_handler("conc-overload")
+        handler._handle_function_call = AsyncMock()
+        handler._send_function_result_safe = AsyncMock()
+
+        @asynccontextmanager
+        async def full_slot(tool_class):
+            raise rth.SchedulerOverloaded("full")
+            yield
+
+        async def run():
+            with patch.object(rth.tool_scheduler, "slot", full_slot):
+                await handler._run_function_call(json.loads(_fn_event("fn-1")), 0.0)
+
+        asyncio.run(run())
+        handler._handle_function_call.assert_not_awaited()
+        handler._send_function_result_safe.assert_awaited_once_with("fn-1", rth.OVERLOADED_MESSAGE)
+        assert handler.stats["failed_calls"] == 1
+
+    def test_active_handlers_report_pending_calls(self):
+        handler = make_handler("conc-status")
+        active_handlers["conc-status"] = handler
+        try:
+            assert get_active_handlers()["conc-status"]["pending_function_calls"] == 0
+        finally:
+            active_handlers.pop("conc-status", None)
+
+
 # ─── _send_function_result ────────────────────────────────────────────────────
 
 class TestSendFunctionResult:
@@ -438,3 +722,104 @@ class TestModuleCleanup:
         assert h2.running is False
 
         active_handlers.clear()
+
+
+# ─── SidebandManager ──────────────────────────────────────────────────────────
+
+def _idle_handler(call_id):
+    """Handler whose run loop just waits to be stopped."""
+    handler = make_handler(call_id)
+
+    async def run_forever():
+        await asyncio.sleep(60)
+
+    handler.start = run_forever
+    handler.stop = AsyncMock()
+    return handler
+
+
+class TestSidebandManager:
+    """Connection cap, reaping, reconnect spreading, health."""
+
+    def test_cap_rejects_then_reaps_ended(self):
+        manager = rth.SidebandManager(max_connections=1)
+        first, second, third = (_idle_handler(f"cap-{i}") for i in range(3))
+
+        async def run():
+            assert await manager.start(first) is True
+            assert await manager.start(second) is False
+            first.health["state"] = "stopped"  # Its call ended
+            assert await manager.start(third) is True
+            for task in manager._tasks.values():
+                task.cancel()
+
+        asyncio.run(run())
+        assert list(manager.handlers) == ["cap-2"]
+        assert manager.stats == {"started": 2, "rejected": 1, "reaped": 1, "reconnects": 0}
+
+    def test_reaper_removes_finished_handlers(self):
+        manager = rth.SidebandManager(reap_interval=0.01)
+        handler = make_handler("reap-1")
+        handler.start = AsyncMock()  # Run loop ends at once
+
+        async def run():
+            await manager.start(handler)
+            await asyncio.sleep(0.05)
+
+        asyncio.run(run())
+        assert manager.handlers == {}
+        assert manager.stats["reaped"] == 1
+
+    def test_stop_forgets_handler(self):
+        manager = rth.SidebandManager()
+        handler = _idle_handler("stop-1")
+
+        async def run():
+            await manager.start(handler)
+            assert await manager.stop("stop-1") is True
+            assert await manager.stop("stop-1") is False
+
+        asyncio.run(run())
+        handler.stop.assert_awaited_once()
+        assert manager.get_health()["reconnects_per_connection"]["le_0"] == 1
+
+    def test_reconnects_are_spread_out(self):
+        manager = rth.SidebandManager(reconnect_spacing=0.1)
+        delays = [manager.spread_reconnect(0.5) for _ in range(5)]
+        assert delays[0] == pytest.approx(0.5, abs=0.01)
+        gaps = [b - a for a, b in zip(delays, delays[1:])]
+        assert all(gap == pytest.approx(0.1, abs=0.01) for gap in gaps)
+
+    def test_spread_never_shortens_backoff(self):
+        manager = rth.SidebandManager(reconnect_spacing=0.1)
+        manager.spread_reconnect(0.5)
+        assert manager.spread_reconnect(5.0) >= 5.0
+
+    def test_health_and_reconnect_histogram(self):
+        manager = rth.SidebandManager()
+        handler = make_handler("health-1")
+        manager.handlers["health-1"] = handler
+
+        with patch.object(rth, "sideband_manager", manager):
+            handler._mark_connected()
+            handler._mark_disconnected("closed: code=1006")
+            handler._disconnected_at -= 0.3  # Dropped 300ms ago
+            handler._mark_connected()
+
+        health = manager.get_health()
+        conn = health["connections"]["health-1"]
+        assert conn["state"] == "connected"
+        assert (conn["connects"], conn["reconnects"]) == (2, 1)
+        assert conn["last_error"] == "closed: code=1006"
+        assert health["open"] == 1
+        assert health["reconnect_ms"]["le_500"] == 1
+        assert health["reconnects_per_connection"]["le_1"] == 1
+        assert health["stats"]["reconnects"] == 1
+
+    def test_start_tool_handler_returns_none_at_cap(self):
+        async def run():
+            with patch.object(rth.sideband_manager, "max_connections", 0):
+                return await start_tool_handler(call_id="cap-call", session_id="sess")
+
+        assert asyncio.run(run()) is None
+        assert "cap-call" not in active_handlers
@@ -4,6 +4,7 @@ Unit tests for scripts/session_context.py
 
 Covers:
 - BridgeEventEmitter: emit_call_started, emit_transcript_update, emit_call_ended, _emit_event
+- Bridge event sender: batching, ordering, retries, drop policy, delivery stats
 - SessionContextExtractor: context extraction, phone normalization, memory parsing
 - Helper functions: notify_call_started, notify_transcript_update, notify_call_ended
 - Factory functions: get_bridge_emitter, create_context_extractor
@@ -159,6 +160,215 @@ class TestBridgeEventEmitterEnabled:
             assert result is True
 
 
+class FakeBridge:
+    """Stands in for the httpx client; records what reaches the bridge."""
+
+    def __init__(self, statuses=(), bulk=True, reject=()):
+        self.statuses = list(statuses)  # Status per POST, then 200
+        self.bulk = bulk
+        self.reject = set(reject)  # Event types handleCallEvent throws on
+        self.received = []
+        self.timeouts = []
+        self.posts = 0
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        self.gate.wait(5)
+        self.posts += 1
+        self.timeouts.append(timeout)
+        status = self.statuses.pop(0) if self.statuses else 200
+        if url.endswith("/call-events"):
+            if not self.bulk:
+                return MagicMock(status_code=404)
+            results = []
+            if status == 200:
+                for event in json["events"]:
+                    if event["eventType"] in self.reject:
+                        results.append({"status": "error", "error": "boom"})
+                    else:
+                        self.received.append(event)
+                        results.append({"status": "ok"})
+            return MagicMock(status_code=status, **{"json.return_value": {"results": results}})
+        if status == 200 and json["eventType"] in self.reject:
+            status = 400
+        if status == 200:
+            self.received.append(json)
+        return MagicMock(status_code=status)
+
+    def close(self):
+        pass
+
+
+def make_sender(bridge, **kwargs):
+    kwargs.setdefault("flush_interval", 0.05)
+    emitter = BridgeEventEmitter(enabled=True, **kwargs)
+    emitter._http_client = bridge
+    return emitter
+
+
+class TestBridgeEventSender:
+    """The background sender behind BridgeEventEmitter."""
+
+    def test_events_batched_in_order(self):
+        bridge = FakeBridge()
+        emitter = make_sender(bridge)
+        emitter.emit_call_started("call-1", "+1234567890")
+        for i in range(5):
+            emitter.emit_transcript_update("call-1", "user", f"line {i}")
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        assert bridge.posts == 1
+        assert [e["eventType"] for e in bridge.received] == (
+            ["call_started"] + ["transcript_update"] * 5 + ["call_ended"]
+        )
+        assert [e["data"]["content"] for e in bridge.received[1:6]] == [f"line {i}" for i in range(5)]
+        emitter.close()
+
+    def test_failed_batch_retried_before_newer_events(self):
+        bridge = FakeBridge(statuses=[503, 503])
+        emitter = make_sender(bridge)
+        with patch.object(session_context, "BRIDGE_RETRY_BASE", 0.01):
+            emitter.emit_call_started("call-1", "+1234567890")
+            emitter.emit_call_ended("call-1", "+1234567890")
+            assert emitter.flush()
+            emitter.emit_call_started("call-2", "+1234567890")
+            assert emitter.flush()
+        assert [(e["callId"], e["eventType"]) for e in bridge.received] == [
+            ("call-1", "call_started"), ("call-1", "call_ended"), ("call-2", "call_started")
+        ]
+        assert emitter.stats["retries"] == 2 and emitter.stats["failed"] == 0
+        emitter.close()
+
+    def test_rejected_event_skipped_without_holding_up_the_rest(self):
+        bridge = FakeBridge(bulk=False, reject={"transcript_update"})
+        emitter = make_sender(bridge)
+        emitter.emit_call_started("call-1", "+1234567890")
+        emitter.emit_transcript_update("call-1", "user", "hello")
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        assert [e["eventType"] for e in bridge.received] == ["call_started", "call_ended"]
+        assert emitter.stats["sent"] == 2 and emitter.stats["rejected"] == 1
+        assert emitter.stats["retries"] == 0 and emitter.stats["failed"] == 0
+        emitter.close()
+
+    def test_bulk_results_count_rejected_events_without_resending(self):
+        bridge = FakeBridge(reject={"transcript_update"})
+        emitter = make_sender(bridge)
+        emitter.emit_call_started("call-1", "+1234567890")
+        emitter.emit_transcript_update("call-1", "user", "hello")
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        assert bridge.posts == 1
+        assert emitter.stats["sent"] == 2 and emitter.stats["rejected"] == 1
+        assert 'voice_bridge_events_total{outcome="rejected"} 1' in emitter.get_prometheus_metrics()
+        emitter.close()
+
+    def test_rejected_batch_resent_one_event_at_a_time(self):
+        bridge = FakeBridge(statuses=[422], reject={"transcript_update"})
+        emitter = make_sender(bridge)
+        emitter.emit_call_started("call-1", "+1234567890")
+        emitter.emit_transcript_update("call-1", "user", "hello")
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        assert [e["eventType"] for e in bridge.received] == ["call_started", "call_ended"]
+        assert emitter.stats["sent"] == 2 and emitter.stats["rejected"] == 1
+        assert emitter.stats["retries"] == 0 and emitter.get_stats()["bulk_endpoint"] is True
+        emitter.close()
+
+    def test_unreadable_bulk_reply_not_resent(self):
+        bridge = FakeBridge()
+        post = bridge.post
+
+        def garbled(url, **kwargs):
+            response = post(url, **kwargs)
+            response.json.side_effect = ValueError("not JSON")
+            return response
+
+        bridge.post = garbled
+        emitter = make_sender(bridge)
+        emitter.emit_call_started("call-1", "+1234567890")
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        assert bridge.posts == 1
+        assert emitter.stats["sent"] == 2 and emitter.stats["retries"] == 0
+        emitter.close()
+
+    def test_call_ended_waits_for_transcript_sync(self):
+        bridge = FakeBridge(bulk=False)
+        emitter = make_sender(bridge)
+        emitter.emit_transcript_update("call-1", "user", "hello")
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        # Bulk probe (404), then one POST per event; only call_ended gets the sync timeout
+        assert bridge.timeouts == [session_context.BRIDGE_SYNC_TIMEOUT, None, session_context.BRIDGE_SYNC_TIMEOUT]
+        emitter.close()
+
+    def test_gives_up_after_max_attempts(self):
+        bridge = FakeBridge(statuses=[500] * 10)
+        emitter = make_sender(bridge, max_attempts=3)
+        with patch.object(session_context, "BRIDGE_RETRY_BASE", 0.01):
+            emitter.emit_call_ended("call-1", "+1234567890")
+            assert emitter.flush()
+        assert bridge.received == []
+        assert emitter.stats["failed"] == 1 and bridge.posts == 3
+        emitter.close()
+
+    def test_falls_back_to_single_event_endpoint(self):
+        bridge = FakeBridge(bulk=False)
+        emitter = make_sender(bridge)
+        emitter.emit_call_started("call-1", "+1234567890")
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        assert [e["eventType"] for e in bridge.received] == ["call_started", "call_ended"]
+        assert emitter.get_stats()["bulk_endpoint"] is False
+        emitter.close()
+
+    def test_full_queue_drops_oldest_transcript_updates(self):
+        bridge = FakeBridge()
+        bridge.gate.clear()  # The bridge hangs on the first batch
+        emitter = make_sender(bridge, queue_size=3, flush_interval=0)
+        emitter.emit_call_started("call-1", "+1234567890")
+        deadline = time.monotonic() + 5
+        while emitter._in_flight == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        for i in range(3):
+            emitter.emit_transcript_update("call-1", "user", f"line {i}")
+        emitter.emit_call_ended("call-1", "+1234567890")   # Evicts line 0
+        emitter.emit_transcript_update("call-1", "user", "line 3")  # Evicts line 1
+        bridge.gate.set()
+        assert emitter.flush()
+
+        assert [e["data"].get("content", e["eventType"]) for e in bridge.received] == [
+            "call_started", "line 2", "call_ended", "line 3"
+        ]
+        assert emitter.stats["dropped_low_priority"] == 2
+        assert emitter.stats["dropped_high_priority"] == 0
+        emitter.close()
+
+    def test_delivery_latency_and_counters_exported(self):
+        bridge = FakeBridge()
+        emitter = make_sender(bridge)
+        emitter.emit_call_ended("call-1", "+1234567890")
+        assert emitter.flush()
+        stats = emitter.get_stats()
+        assert stats["sent"] == 1 and stats["queue_depth"] == 0
+        assert stats["latency_ms"]["p50"] is not None
+        text = emitter.get_prometheus_metrics()
+        assert 'voice_bridge_events_total{outcome="sent"} 1' in text
+        assert 'voice_bridge_events_dropped_total{priority="low"} 0' in text
+        assert "voice_bridge_delivery_latency_seconds_count 1" in text
+        emitter.close()
+
+    def test_close_drains_queue_and_rejects_new_events(self):
+        bridge = FakeBridge()
+        emitter = make_sender(bridge, flush_interval=10)
+        emitter.emit_call_ended("call-1", "+1234567890")
+        emitter.close()
+        assert len(bridge.received) == 1
+        assert emitter.emit_call_ended("call-2", "+1234567890") is False
+
+
 # ─── get_bridge_emitter (singleton) ────────────────────────────────────────────
 
 class TestGetBridgeEmitter:
@@ -1,9 +1,10 @@
 """
 Unit tests for SmartChunker
 
-Tests boundary detection, chunk sizing, and edge cases.
+Tests boundary detection, chunk sizing, incremental scanning and edge cases.
 """
 
+import random
 import pytest
 import sys
 import os
@@ -11,7 +12,7 @@ import os
 # Add scripts to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 
-from smart_chunker import SmartChunker, chunk_text
+from smart_chunker import AdaptiveChunker, SmartChunker, chunk_text
 
 
 class TestSmartChunkerBasic:
@@ -209,6 +210,138 @@ class TestStreamingBehavior:
         assert len(chunks2) == 0  # Already retrieved
 
 
+def _window_chunks(parts, target_size, min_size, max_size):
+    """Reference: re-run the boundary regexes over the search window on every add."""
+    patterns = [SmartChunker.PARAGRAPH_BREAK, SmartChunker.LIST_ITEM,
+                SmartChunker.SENTENCE_END, SmartChunker.CLAUSE_END,
+                SmartChunker.WORD_BOUNDARY]
+    buffer, chunks = "", []
+    for part in parts:
+        buffer += part
+        while len(buffer) >= min_size:
+            window = buffer[:min(max_size, len(buffer))]
+            start = max(min_size, target_size // 2)
+            region = window[start:min(len(window), target_size + 100)]
+            cut = None
+            for pattern in patterns:
+                matches = list(pattern.finditer(region))
+                if matches:
+                    best = min(matches, key=lambda m: abs(m.start() - (target_size - start)))
+                    cut = start + best.end()
+                    break
+            if cut is None:
+                if len(buffer) < max_size:
+                    break
+                space = window.rfind(' ')
+                cut = space + 1 if space > min_size else max_size
+            chunk, buffer = buffer[:cut].strip(), buffer[cut:].lstrip()
+            if not chunk:
+                break
+            chunks.append(chunk)
+    return chunks + [buffer.strip()]
+
+
+class TestIncrementalScanning:
+    """The scan cursor finds the same boundaries as searching the whole window."""
+
+    TEXT = (
+        "Here is the plan for today. First, we review the report; then we call "
+        "the vendor.\n\n"
+        "- Check the invoice totals\n"
+        "- Confirm the delivery date\n"
+        "1. Email the summary\n"
+        "2) Book the follow-up\n\n\n"
+        "After that, if there is time, we can go over the budget: travel, "
+        "equipment and training are the three open items. Let me know!\n"
+    ) * 4
+
+    def _chunks(self, parts, **kwargs):
+        chunker = SmartChunker(**kwargs)
+        chunks = []
+        for part in parts:
+            chunker.add_text(part)
+            chunks.extend(chunker.get_chunks())
+        chunks.append(chunker.flush())
+        return chunks
+
+    @pytest.mark.parametrize("step", [1, 2, 5, 13, 64, 10_000])
+    @pytest.mark.parametrize("sizes", [(120, 40, 300), (60, 20, 90), (500, 100, 1000)])
+    def test_matches_window_search(self, step, sizes):
+        target, min_size, max_size = sizes
+        parts = [self.TEXT[i:i + step] for i in range(0, len(self.TEXT), step)]
+        assert self._chunks(parts, target_size=target, min_size=min_size, max_size=max_size) == \
+            _window_chunks(parts, target, min_size, max_size)
+
+    def test_random_fragments_match_window_search(self):
+        rng = random.Random(7)
+        words = ["alpha", "beta.", "gamma,", "delta;", "-", "*", "12)", "3.", "•", "x" * 40, "ok!"]
+        seps = [" ", "  ", "\n", "\n\n", " \n ", "\t"]
+        for _ in range(200):
+            text = "".join(rng.choice(words) + rng.choice(seps) for _ in range(rng.randint(5, 120)))
+            parts, i = [], 0
+            while i < len(text):
+                n = rng.randint(1, 9)
+                parts.append(text[i:i + n])
+                i += n
+            assert self._chunks(parts, target_size=50, min_size=20, max_size=100) == \
+                _window_chunks(parts, 50, 20, 100)
+
+    def test_candidates_pruned_as_chunks_leave(self):
+        chunker = SmartChunker(target_size=100, min_size=40, max_size=200)
+        for _ in range(500):
+            chunker.add_text("Some words here, more words. ")
+        chunker.get_chunks()
+        assert chunker.buffer_size < 200
+        assert all(len(starts) < 20 for starts, _ in chunker._cands)
+        assert len(chunker._text) < 2 * 4096 + 200
+
+
+class TestAdaptiveChunker:
+    """Small first chunk, growing follow-ups."""
+
+    TEXT = ("Sure, here is what I found about your flight. It leaves at nine from "
+            "gate twelve, and boarding starts thirty minutes before. ") * 12
+
+    def _stream(self, chunker, text, step=5):
+        chunks = []
+        for i in range(0, len(text), step):
+            chunker.add_text(text[i:i + step])
+            chunks.extend(chunker.get_chunks())
+        return chunks
+
+    def test_first_chunk_ends_on_punctuation(self):
+        chunks = self._stream(AdaptiveChunker(), self.TEXT)
+        assert chunks[0] == "Sure, here is what I found about your flight."
+
+    def test_chunks_grow_to_target(self):
+        chunker = AdaptiveChunker(target_size=500, min_size=100, max_size=1000)
+        chunks = self._stream(chunker, self.TEXT)
+        assert len(chunks[0]) < len(chunks[2]) < len(chunks[4])
+        assert (chunker.target_size, chunker.min_size, chunker.max_size) == (500, 100, 1000)
+
+    def test_schedule_never_shrinks(self):
+        chunker = AdaptiveChunker(first_size=40, growth=1.5)
+        sizes = [chunker._sizes_for(n) for n in range(12)]
+        for earlier, later in zip(sizes, sizes[1:]):
+            assert all(a <= b for a, b in zip(earlier, later))
+        assert sizes[-1] == (500, 100, 1000)
+
+    def test_force_chunk_advances_schedule(self):
+        chunker = AdaptiveChunker()
+        chunker.add_text("Let me check ")
+        assert chunker.get_chunks() == []
+        assert chunker.force_chunk() == "Let me check"
+        assert chunker.chunks_emitted == 1
+        assert chunker.target_size > chunker.first_size
+        assert chunker.force_chunk() == ""
+        assert chunker.chunks_emitted == 1
+
+    def test_smart_chunker_still_breaks_at_words(self):
+        chunker = SmartChunker(target_size=60, min_size=20, max_size=160)
+        chunker.add_text("one two three four five six seven eight nine ten")
+        assert chunker.get_chunks()
+
+
 class TestEdgeCases:
     """Test edge cases and unusual inputs."""
     
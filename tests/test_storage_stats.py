@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/storage_stats.py
+
+Run with: python -m pytest tests/test_storage_stats.py -v
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+from db_migrations import migrate, storage_counts
+from storage_stats import StorageStatsMonitor, read_storage_stats, reconcile
+
+
+@pytest.fixture
+def manager(tmp_path):
+    import call_recording as cr
+    mgr = cr.CallRecordingManager.__new__(cr.CallRecordingManager)
+    mgr.db_path = tmp_path / "calls.db"
+    mgr.recordings_dir = tmp_path / "recordings"
+    mgr.recordings_dir.mkdir()
+    mgr._init_database()
+    return mgr
+
+
+def counters(db):
+    with sqlite3.connect(db) as conn:
+        return read_storage_stats(conn)
+
+
+def assert_exact(db):
+    """Incremental counters equal a recount."""
+    stats = counters(db)
+    with sqlite3.connect(db) as conn:
+        actual = storage_counts(conn)
+    assert {k: v for k, v in stats.items() if k in actual or (k.startswith("calls_status:") and v)} == actual
+
+
+class TestCounters:
+    def test_triggers_follow_call_lifecycle(self, manager):
+        run = asyncio.run
+        run(manager.start_call_recording("CA1", "inbound", "+15550001"))
+        run(manager.start_call_recording("CA2", "outbound", callee_number="+15550002"))
+        run(manager.add_transcript_entry("CA1", "user", "hello"))
+        run(manager.add_transcript_entry("CA1", "assistant", "hi there"))
+        run(manager.end_call_recording("CA1"))
+
+        stats = counters(manager.db_path)
+        assert stats["calls_total"] == 2
+        assert stats["calls_status:active"] == 1 and stats["calls_status:completed"] == 1
+        assert stats["transcript_entries"] == 2
+        assert_exact(manager.db_path)
+
+        run(manager.delete_call_record("CA1"))
+        assert counters(manager.db_path)["calls_total"] == 1
+        assert_exact(manager.db_path)
+
+    def test_stale_close_counts_recording_bytes(self, manager):
+        record = asyncio.run(manager.start_call_recording("CA1", "inbound"))
+        Path(record.recording_path).write_bytes(b"\0" * 4096)
+        assert [call["call_id"] for call in manager.close_stale_calls(["CA1"])] == ["CA1"]
+        assert counters(manager.db_path)["recording_bytes"] == 4096
+
+        asyncio.run(manager.delete_call_record("CA1", delete_files=True))
+        assert counters(manager.db_path)["recording_bytes"] == 0
+
+    def test_get_storage_stats_reads_counters(self, manager):
+        asyncio.run(manager.start_call_recording("CA1", "inbound"))
+        with sqlite3.connect(manager.db_path) as conn:
+            # Only the counters table is consulted
+            conn.execute("UPDATE storage_stats SET value = 42 WHERE key = 'calls_total'")
+        stats = manager.get_storage_stats()
+        assert stats["total_calls"] == 42
+        assert stats["active_calls"] == 1
+        assert stats["calls_by_status"] == {"active": 1}
+
+    def test_recording_bytes_counted_at_call_end_and_delete(self, manager):
+        record = asyncio.run(manager.start_call_recording("CA1", "inbound"))
+        Path(record.recording_path).write_bytes(b"\0" * 4096)
+        asyncio.run(manager.end_call_recording("CA1"))
+        asyncio.run(manager.end_call_recording("CA1"))  # Ending twice counts once
+        assert counters(manager.db_path)["recording_bytes"] == 4096
+
+        asyncio.run(manager.delete_call_record("CA1", delete_files=True))
+        assert counters(manager.db_path)["recording_bytes"] == 0
+
+    def test_archived_recordings_leave_the_count(self, manager, tmp_path):
+        from call_retention import CallRetentionManager
+        record = asyncio.run(manager.start_call_recording("CA1", "inbound"))
+        path = Path(record.recording_path)
+        path.write_bytes(b"\0" * 2048)
+        asyncio.run(manager.end_call_recording("CA1"))
+        aged = (datetime.now(timezone.utc) - timedelta(days=100)).timestamp()
+        os.utime(path, (aged, aged))
+
+        CallRetentionManager(manager.db_path, archive_root=tmp_path / "archive",
+                             recordings_dir=manager.recordings_dir).archive_recordings()
+        assert counters(manager.db_path)["recording_bytes"] == 0
+
+
+class TestReconcile:
+    def test_corrects_drift(self, manager):
+        asyncio.run(manager.start_call_recording("CA1", "inbound"))
+        (manager.recordings_dir / "stray.wav").write_bytes(b"\0" * 100)
+        with sqlite3.connect(manager.db_path) as conn:
+            conn.execute("UPDATE storage_stats SET value = 7 WHERE key = 'calls_total'")
+
+        drift = reconcile(manager.db_path, manager.recordings_dir)
+        assert drift == {"calls_total": -6, "recording_bytes": 100}
+        stats = counters(manager.db_path)
+        assert stats["calls_total"] == 1 and stats["recording_bytes"] == 100
+        assert stats["reconciled_at"] > 0
+        assert reconcile(manager.db_path, manager.recordings_dir) == {}
+
+    def test_waits_for_migration(self, tmp_path):
+        db = tmp_path / "legacy.db"
+        with sqlite3.connect(db) as conn:
+            conn.execute("CREATE TABLE calls (call_id TEXT)")
+        assert reconcile(db, tmp_path) == {}
+
+
+class TestMonitor:
+    def test_gauges_served_from_cache(self, tmp_path):
+        db = tmp_path / "calls.db"
+        migrate(db)
+        with sqlite3.connect(db) as conn:
+            conn.execute(
+                "INSERT INTO calls (call_id, call_type, started_at, status) "
+                "VALUES ('CA1', 'inbound', '2026-01-01T00:00:00+00:00', 'completed')"
+            )
+        monitor = StorageStatsMonitor(db, tmp_path)
+        monitor.refresh()
+        monitor.db_path = tmp_path / "missing" / "calls.db"  # A scrape must not touch the database
+
+        text = monitor.get_prometheus_metrics()
+        assert 'voice_storage_calls{status="completed"} 1' in text
+        assert "voice_storage_transcript_entries 0" in text
+        assert monitor.database_bytes > 0
+
+    def test_tick_reconciles_when_due(self, tmp_path):
+        db = tmp_path / "calls.db"
+        migrate(db)
+        monitor = StorageStatsMonitor(db, tmp_path, reconcile_interval=3600)
+        monitor.tick()
+        assert monitor.stats["reconciles"] == 1  # Never reconciled since the migration
+        monitor.tick()
+        assert monitor.stats["reconciles"] == 1
+        assert monitor.snapshot["reconciled_at"] >= int(time.time()) - 5
@@ -0,0 +1,200 @@
+"""
+Unit tests for ToolScheduler
+
+Tests class concurrency limits, priority ordering, overload shedding,
+per-call task groups and metrics.
+"""
+
+import asyncio
+import pytest
+import sys
+import os
+
+# Add scripts to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from tool_scheduler import (
+    Priority,
+    PrioritySemaphore,
+    SchedulerOverloaded,
+    ToolScheduler,
+)
+
+
+class TestPrioritySemaphore:
+    """PrioritySemaphore ordering and handoff."""
+
+    def test_immediate_acquire_under_limit(self):
+        async def run():
+            sem = PrioritySemaphore(2)
+            await sem.acquire()
+            await sem.acquire()
+            assert sem.active == 2
+            sem.release()
+            assert sem.active == 1
+
+        asyncio.run(run())
+
+    def test_interactive_served_before_background(self):
+        order = []
+
+        async def worker(sem, priority, label):
+            await sem.acquire(priority)
+            order.append(label)
+            sem.release()
+
+        async def run():
+            sem = PrioritySemaphore(1)
+            await sem.acquire()
+            tasks = [
+                asyncio.create_task(worker(sem, Priority.BACKGROUND, "bg1")),
+                asyncio.create_task(worker(sem, Priority.BACKGROUND, "bg2")),
+                asyncio.create_task(worker(sem, Priority.INTERACTIVE, "live")),
+            ]
+            await asyncio.sleep(0)
+            assert sem.waiting == 3
+            sem.release()
+            await asyncio.gather(*tasks)
+
+        asyncio.run(run())
+        assert order == ["live", "bg1", "bg2"]
+
+    def test_cancelled_waiter_skipped(self):
+        async def run():
+            sem = PrioritySemaphore(1)
+            await sem.acquire()
+            waiter = asyncio.create_task(sem.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert sem.waiting == 0
+            sem.release()
+            assert sem.active == 0
+
+        asyncio.run(run())
+
+
+class TestSlots:
+    """ToolScheduler.slot() limits, overload and metrics."""
+
+    def test_class_limit_enforced(self):
+        peak = {"now": 0, "max": 0}
+
+        async def job(scheduler):
+            async with scheduler.slot("subprocess"):
+                peak["now"] += 1
+                peak["max"] = max(peak["max"], peak["now"])
+                await asyncio.sleep(0.01)
+                peak["now"] -= 1
+
+        async def run():
+            scheduler = ToolScheduler(limits={"subprocess": 2}, max_queue_depth=100)
+            await asyncio.gather(*(job(scheduler) for _ in range(8)))
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        assert peak["max"] == 2
+        stats = scheduler.get_stats()["classes"]["subprocess"]
+        assert stats["started"] == 8
+        assert stats["active"] == 0
+        assert stats["max_wait_ms"] > 0
+
+    def test_unknown_class_unlimited(self):
+        async def run():
+            scheduler = ToolScheduler(limits={})
+            async with scheduler.slot("gpu"):
+                return True
+
+        assert asyncio.run(run()) is True
+
+    def test_overload_rejects_new_work(self):
+        async def hold(scheduler, gate):
+            async with scheduler.slot("http"):
+                await gate.wait()
+
+        async def run():
+            scheduler = ToolScheduler(limits={"http": 1}, max_queue_depth=2)
+            gate = asyncio.Event()
+            holders = [asyncio.create_task(hold(scheduler, gate)) for _ in range(3)]
+            await asyncio.sleep(0)
+            with pytest.raises(SchedulerOverloaded):
+                async with scheduler.slot("http"):
+                    pass
+            gate.set()
+            await asyncio.gather(*holders)
+            return scheduler
+
+        scheduler = asyncio.run(run())
+        assert scheduler.get_stats()["classes"]["http"]["rejected"] == 1
+
+    def test_background_shed_before_interactive(self):
+        async def hold(scheduler, gate):
+            async with scheduler.slot("http"):
+                await gate.wait()
+
+        async def run():
+            scheduler = ToolScheduler(limits={"http": 1}, max_queue_depth=4)
+            gate = asyncio.Event()
+            holders = [asyncio.create_task(hold(scheduler, gate)) for _ in range(3)]
+            await asyncio.sleep(0)
+            # 2 waiting: background limit (4 // 2) reached, interactive still admitted
+            with pytest.raises(SchedulerOverloaded):
+                async with scheduler.slot("http", Priority.BACKGROUND):
+                    pass
+            live = asyncio.create_task(hold(scheduler, gate))
+            await asyncio.sleep(0)
+            gate.set()
+            await asyncio.gather(*holders, live)
+
+        asyncio.run(run())
+
+
+class TestTaskGroups:
+    """spawn() / cancel_call()."""
+
+    def test_cancel_call_cancels_only_that_call(self):
+        async def forever():
+            await asyncio.sleep(999)
+
+        async def run():
+            scheduler = ToolScheduler(limits={})
+            a1 = scheduler.spawn("CA1", forever())
+            a2 = scheduler.spawn("CA1", forever())
+            b1 = scheduler.spawn("CA2", forever())
+            await asyncio.sleep(0)
+            assert scheduler.call_task_count("CA1") == 2
+            cancelled = await scheduler.cancel_call("CA1")
+            assert cancelled == 2
+            assert a1.cancelled() and a2.cancelled()
+            assert not b1.done()
+            await scheduler.cancel_call("CA2")
+            assert scheduler.get_stats()["tasks_in_flight"] == 0
+
+        asyncio.run(run())
+
+    def test_finished_tasks_leave_group(self):
+        async def quick():
+            return 1
+
+        async def run():
+            scheduler = ToolScheduler(limits={})
+            task = scheduler.spawn("CA1", quick())
+            await task
+            await asyncio.sleep(0)
+            assert scheduler.call_task_count("CA1") == 0
+            assert scheduler.get_stats()["calls_with_tasks"] == 0
+
+        asyncio.run(run())
+
+    def test_failed_task_does_not_break_group(self):
+        async def boom():
+            raise RuntimeError("x")
+
+        async def run():
+            scheduler = ToolScheduler(limits={})
+            task = scheduler.spawn(None, boom())
+            await asyncio.gather(task, return_exceptions=True)
+            await asyncio.sleep(0)
+            assert await scheduler.cancel_call(None) == 0
+
+        asyncio.run(run())
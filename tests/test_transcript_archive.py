@@ -0,0 +1,161 @@
+"""
+Unit tests for TranscriptArchive
+
+Tests segment appends, the recent-calls manifest, manifest compaction,
+reloads, legacy per-call file indexing and record lookup.
+"""
+
+import json
+import sys
+import os
+from datetime import datetime
+
+# Add scripts to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from transcript_archive import (
+    MANIFEST_NAME,
+    SEGMENTS_DIR,
+    TranscriptArchive,
+    get_archive,
+)
+
+TRANSCRIPT = [
+    {"speaker": "user", "content": "Hello Nia"},
+    {"speaker": "assistant", "content": "Hi Remi!"},
+]
+
+
+class TestAppend:
+    """append() writes segments and manifest."""
+
+    def test_append_writes_segment_and_manifest(self, tmp_path):
+        archive = TranscriptArchive(tmp_path)
+        entry = archive.append("CA1", TRANSCRIPT, recorded_at=datetime(2026, 3, 25, 10, 0))
+        assert entry.segment == "2026-03.jsonl"
+        assert (tmp_path / SEGMENTS_DIR / "2026-03.jsonl").exists()
+        lines = (tmp_path / MANIFEST_NAME).read_text().splitlines()
+        assert json.loads(lines[0])["call_sid"] == "CA1"
+
+    def test_excerpts_in_manifest(self, tmp_path):
+        archive = TranscriptArchive(tmp_path)
+        entry = archive.append("CA1", TRANSCRIPT)
+        assert entry.user_excerpt == "Hello Nia"
+        assert entry.assistant_excerpt == "Hi Remi!"
+        assert entry.turns == 2
+
+    def test_get_reads_record_by_offset(self, tmp_path):
+        archive = TranscriptArchive(tmp_path)
+        archive.append("CA1", TRANSCRIPT)
+        archive.append("CA2", [{"speaker": "user", "content": "second"}])
+        assert archive.get("CA2")["transcript"][0]["content"] == "second"
+        assert archive.get("CA1")["turns"] == 2
+        assert archive.get("missing") is None
+
+
+class TestRecent:
+    """recent() ordering, bounds and compaction."""
+
+    def test_newest_first_and_limited(self, tmp_path):
+        archive = TranscriptArchive(tmp_path)
+        for i in range(5):
+            archive.append(f"CA{i}", TRANSCRIPT)
+        assert [e.call_sid for e in archive.recent(3)] == ["CA4", "CA3", "CA2"]
+
+    def test_manifest_compacted(self, tmp_path):
+        archive = TranscriptArchive(tmp_path, manifest_size=3)
+        for i in range(10):
+            archive.append(f"CA{i}", TRANSCRIPT)
+        lines = (tmp_path / MANIFEST_NAME).read_text().splitlines()
+        assert len(lines) <= 6
+        assert [e.call_sid for e in archive.recent(10)] == ["CA9", "CA8", "CA7"]
+
+    def test_aged_out_call_found_in_segments(self, tmp_path):
+        archive = TranscriptArchive(tmp_path, manifest_size=2)
+        for i in range(4):
+            archive.append(f"CA{i}", TRANSCRIPT)
+        assert archive.get("CA0")["call_sid"] == "CA0"
+
+    def test_reload_from_disk(self, tmp_path):
+        TranscriptArchive(tmp_path).append("CA1", TRANSCRIPT)
+        fresh = TranscriptArchive(tmp_path)
+        assert [e.call_sid for e in fresh.recent(5)] == ["CA1"]
+
+    def test_sees_writes_from_another_instance(self, tmp_path):
+        reader = TranscriptArchive(tmp_path)
+        writer = TranscriptArchive(tmp_path)
+        writer.append("CA1", TRANSCRIPT)
+        assert reader.recent(5)[0].call_sid == "CA1"
+        writer.append("CA2", TRANSCRIPT)
+        assert reader.recent(5)[0].call_sid == "CA2"
+
+    def test_torn_manifest_line_skipped(self, tmp_path):
+        archive = TranscriptArchive(tmp_path)
+        archive.append("CA1", TRANSCRIPT)
+        with open(tmp_path / MANIFEST_NAME, "a") as f:
+            f.write('{"call_sid": "CA2", "recor')
+        assert [e.call_sid for e in TranscriptArchive(tmp_path).recent(5)] == ["CA1"]
+
+
+class TestLegacyFiles:
+    """Per-call JSON files from before the archive."""
+
+    def test_legacy_files_indexed(self, tmp_path):
+        for i in range(3):
+            (tmp_path / f"2026-03-2{i}_CA{i}.json").write_text(json.dumps({
+                "call_sid": f"CA{i}", "recorded_at": f"2026-03-2{i}T10:00:00",
+                "turns": 2, "transcript": TRANSCRIPT,
+            }))
+        (tmp_path / "broken.json").write_text("nope")
+        archive = TranscriptArchive(tmp_path)
+        assert [e.call_sid for e in archive.recent(2)] == ["CA2", "CA1"]
+        assert archive.get("CA0")["turns"] == 2
+
+    def test_new_calls_join_legacy_index(self, tmp_path):
+        (tmp_path / "2026-03-20_CA0.json").write_text(json.dumps({
+            "call_sid": "CA0", "recorded_at": "2026-03-20T10:00:00",
+            "turns": 2, "transcript": TRANSCRIPT,
+        }))
+        archive = TranscriptArchive(tmp_path)
+        archive.append("CA1", TRANSCRIPT)
+        assert [e.call_sid for e in TranscriptArchive(tmp_path).recent(5)] == ["CA1", "CA0"]
+
+
+class TestGetArchive:
+    """get_archive() returns one instance per directory."""
+
+    def test_shared_per_directory(self, tmp_path):
+        assert get_archive(tmp_path) is get_archive(tmp_path)
+        assert get_archive(tmp_path / "a") is not get_archive(tmp_path)
+
+
+class TestCompressSegments:
+    """compress_segments() gzips finished months; reads go through."""
+
+    def test_old_months_compressed_and_readable(self, tmp_path):
+        archive = TranscriptArchive(tmp_path)
+        archive.append("CA1", TRANSCRIPT, recorded_at=datetime(2026, 1, 10))
+        archive.append("CA2", TRANSCRIPT, recorded_at=datetime(2026, 1, 11))
+        archive.append("CA3", TRANSCRIPT, recorded_at=datetime(2026, 3, 1))
+
+        assert archive.compress_segments(datetime(2026, 3, 5)) == 1
+        segments = tmp_path / SEGMENTS_DIR
+        assert not (segments / "2026-01.jsonl").exists()
+        assert (segments / "2026-01.jsonl.gz").exists()
+        assert (segments / "2026-03.jsonl").exists()
+
+        # Manifest offsets still point into the decompressed stream
+        assert archive.get("CA2")["call_sid"] == "CA2"
+        assert archive.get("CA3")["call_sid"] == "CA3"
+
+    def test_scan_reads_compressed_segments(self, tmp_path):
+        archive = TranscriptArchive(tmp_path, manifest_size=1)
+        archive.append("CA1", TRANSCRIPT, recorded_at=datetime(2026, 1, 10))
+        archive.append("CA2", TRANSCRIPT, recorded_at=datetime(2026, 3, 1))
+        archive.compress_segments(datetime(2026, 3, 5))
+        assert archive.get("CA1")["call_sid"] == "CA1"  # Aged out of the manifest
+
+    def test_current_month_left_alone(self, tmp_path):
+        archive = TranscriptArchive(tmp_path)
+        archive.append("CA1", TRANSCRIPT, recorded_at=datetime(2026, 3, 1))
+        assert archive.compress_segments(datetime(2026, 3, 31)) == 0
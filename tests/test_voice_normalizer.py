@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for scripts/voice_normalizer.py
+
+Covers:
+- Markdown stripping (headers, emphasis, links, inline code, bullets)
+- State across lines and feeds: code fences, emphasis, lists
+- Whole-stream character budget
+
+Run with:
+    python3 -m pytest tests/test_voice_normalizer.py -v
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+from voice_normalizer import CODE_PLACEHOLDER, TRUNCATION_SUFFIX, VoiceNormalizer
+
+
+def _stream(text, step):
+    """Feed text in fixed-size pieces and join everything emitted."""
+    normalizer = VoiceNormalizer()
+    parts = [normalizer.feed(text[i:i + step]) for i in range(0, len(text), step)]
+    parts.append(normalizer.finish())
+    return '\n'.join(p for p in parts if p).strip()
+
+
+class TestMarkdown:
+    """Single-line formatting."""
+
+    @pytest.mark.parametrize("raw, spoken", [
+        ("## Weather today", "Weather today"),
+        ("It is **very** hot", "It is very hot"),
+        ("It is __very__ hot", "It is very hot"),
+        ("An *important* note", "An important note"),
+        ("Use `ls -la` here", "Use ls -la here"),
+        ("See [the docs](https://example.com) now", "See the docs now"),
+        ("Run ```rm -rf``` carefully", f"Run {CODE_PLACEHOLDER} carefully"),
+        ("my_var_name stays", "my_var_name stays"),
+        ("2 * 3 = 6", "2 * 3 = 6"),
+    ])
+    def test_line(self, raw, spoken):
+        assert VoiceNormalizer().normalize(raw) == spoken
+
+    def test_bullets_become_sentences(self):
+        text = "Options:\n- Flight one\n* Flight two!\n1. Flight three\nThat's all"
+        assert VoiceNormalizer().normalize(text) == (
+            "Options:\nFlight one.\nFlight two!\nFlight three.\nThat's all")
+
+    def test_blank_runs_collapse(self):
+        assert VoiceNormalizer().normalize("One\n\n\n\nTwo") == "One\n\nTwo"
+
+
+class TestStreamingState:
+    """State that spans lines and feeds."""
+
+    TEXT = ("Here is the script:\n"
+            "```python\n"
+            "def main():\n"
+            "    print('**hello**')\n"
+            "\n"
+            "```\n"
+            "It prints **a\n"
+            "greeting** and exits.\n")
+
+    def test_fence_spanning_lines(self):
+        assert VoiceNormalizer().normalize(self.TEXT) == (
+            f"Here is the script:\n{CODE_PLACEHOLDER}\nIt prints a\ngreeting and exits.")
+
+    @pytest.mark.parametrize("step", [1, 3, 7, 40])
+    def test_any_feed_size_matches_whole(self, step):
+        assert _stream(self.TEXT, step) == VoiceNormalizer().normalize(self.TEXT)
+
+    def test_line_by_line_fence(self):
+        normalizer = VoiceNormalizer()
+        out = [normalizer.feed(line) for line in self.TEXT.splitlines(keepends=True)]
+        assert out[1] == CODE_PLACEHOLDER
+        assert out[2:6] == ["", "", "", ""]
+
+    def test_partial_line_held_until_newline(self):
+        normalizer = VoiceNormalizer()
+        assert normalizer.feed("The **answer") == ""
+        assert normalizer.feed("** is 42\n") == "The answer is 42"
+
+    def test_unclosed_fence_drops_rest(self):
+        assert VoiceNormalizer().normalize("Look:\n~~~\nsecret\nmore") == f"Look:\n{CODE_PLACEHOLDER}"
+
+    def test_emphasis_closes_before_punctuation(self):
+        assert VoiceNormalizer().normalize("Thanks _a lot\nfor waiting_!") == "Thanks a lot\nfor waiting!"
+
+
+class TestBudget:
+    """Character budget across the whole stream."""
+
+    def test_truncates_across_feeds(self):
+        normalizer = VoiceNormalizer(max_chars=50)
+        first = normalizer.feed("word word word word word\n")
+        second = normalizer.feed("more words here and there and everywhere\n")
+        assert first == "word word word word word"
+        assert second == "more words here and there" + TRUNCATION_SUFFIX
+        assert normalizer.truncated
+        assert normalizer.feed("ignored\n") == ""
+        assert normalizer.finish() == ""
+
+    def test_default_budget(self):
+        text = VoiceNormalizer().normalize("word " * 1000)
+        assert text.endswith(TRUNCATION_SUFFIX)
+        assert len(text) <= 2000 + len(TRUNCATION_SUFFIX)
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+Tests for the Twilio ↔ OpenAI Realtime bridge helpers in scripts/webhook-server.py
+
+Covers:
+- build_session_config: session.update payload shape
+- open_realtime_session: connect + session.update
+- build_replay_items: transcript compaction for reconnect replay
+- reconnect_delay: backoff growth, cap, jitter
+- summarize_conversation: rolling compaction summary + fallback
+- record_latency_event: optional call_metrics integration
+- dispatch_tool_call (deferred mode): interim output, late injection, cancellation
+- summarize_and_remember: resumable steps, retry vs final-attempt fallback
+
+Run with:
+    python3 -m pytest tests/test_webhook_server_bridge.py -v
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import unittest.mock
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+# ─── Import webhook-server with mocked heavy dependencies ────────────────────
+
+_SCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "..", "scripts")
+_SERVER_PATH = os.path.join(_SCRIPTS_DIR, "webhook-server.py")
+
+_pydantic_mock = MagicMock()
+
+
+class _FakeBaseModel:
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+_pydantic_mock.BaseModel = _FakeBaseModel
+
+_MOCKED_MODULES = {
+    "fastapi": MagicMock(),
+    "fastapi.responses": MagicMock(),
+    "uvicorn": MagicMock(),
+    "twilio": MagicMock(),
+    "twilio.rest": MagicMock(),
+    "twilio.base": MagicMock(),
+    "twilio.base.exceptions": MagicMock(),
+    "twilio.twiml": MagicMock(),
+    "twilio.twiml.voice_response": MagicMock(),
+    "websockets": MagicMock(),
+    "websockets.exceptions": MagicMock(),
+    "httpx": MagicMock(),
+    "pydantic": _pydantic_mock,
+}
+
+_twilio_exc = type("TwilioException", (Exception,), {})
+_MOCKED_MODULES["twilio.base.exceptions"].TwilioException = _twilio_exc
+
+with unittest.mock.patch.dict("sys.modules", _MOCKED_MODULES):
+    spec = importlib.util.spec_from_file_location("webhook_server_bridge", _SERVER_PATH)
+    _ws = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(_ws)
+
+
+# ─── build_session_config / open_realtime_session ────────────────────────────
+
+class TestSessionConfig:
+    """Tests for build_session_config() and open_realtime_session()"""
+
+    def test_session_config_carries_prompt_and_tools(self):
+        config = _ws.build_session_config("be nice")
+        assert config["type"] == "session.update"
+        assert config["session"]["instructions"] == "be nice"
+        assert config["session"]["tools"] is _ws.VOICE_TOOLS
+        assert config["session"]["voice"] == _ws.OPENAI_VOICE
+
+    def test_open_session_sends_session_update(self):
+        fake_ws = AsyncMock()
+        with patch.object(_ws.websockets, "connect", AsyncMock(return_value=fake_ws)) as connect:
+            result = asyncio.run(_ws.open_realtime_session("prompt"))
+
+        assert result is fake_ws
+        assert connect.call_args[0][0] == _ws.OPENAI_REALTIME_URL
+        sent = json.loads(fake_ws.send.call_args[0][0])
+        assert sent["type"] == "session.update"
+        assert sent["session"]["instructions"] == "prompt"
+
+    def test_open_session_propagates_connect_failure(self):
+        with patch.object(_ws.websockets, "connect", AsyncMock(side_effect=OSError("down"))):
+            with pytest.raises(OSError):
+                asyncio.run(_ws.open_realtime_session("prompt"))
+
+
+# ─── build_replay_items ──────────────────────────────────────────────────────
+
+class TestBuildReplayItems:
+    """Tests for build_replay_items()"""
+
+    def test_roles_and_content_types(self):
+        events = _ws.build_replay_items([
+            {"speaker": "user", "content": "Hi Nia"},
+            {"speaker": "assistant", "content": "Hey Remi"},
+        ])
+        assert [e["type"] for e in events] == ["conversation.item.create"] * 2
+        assert events[0]["item"]["role"] == "user"
+        assert events[0]["item"]["content"][0] == {"type": "input_text", "text": "Hi Nia"}
+        assert events[1]["item"]["role"] == "assistant"
+        assert events[1]["item"]["content"][0] == {"type": "text", "text": "Hey Remi"}
+
+    def test_keeps_only_recent_turns(self):
+        transcript = [{"speaker": "user", "content": f"turn {i}"} for i in range(30)]
+        events = _ws.build_replay_items(transcript, max_turns=5)
+        texts = [e["item"]["content"][0]["text"] for e in events]
+        assert texts == [f"turn {i}" for i in range(25, 30)]
+
+    def test_truncates_long_turns(self):
+        events = _ws.build_replay_items([{"speaker": "user", "content": "x" * 1000}], max_chars=50)
+        text = events[0]["item"]["content"][0]["text"]
+        assert len(text) == 51
+        assert text.endswith("…")
+
+    def test_skips_empty_turns(self):
+        events = _ws.build_replay_items([
+            {"speaker": "user", "content": "  "},
+            {"speaker": "assistant"},
+            {"speaker": "user", "content": "real"},
+        ])
+        assert len(events) == 1
+
+    def test_zero_turns_replays_nothing(self):
+        assert _ws.build_replay_items([{"speaker": "user", "content": "hi"}], max_turns=0) == []
+
+    def test_rolling_summary_replayed_first(self):
+        events = _ws.build_replay_items(
+            [{"speaker": "user", "content": "and then?"}], summary="Remi asked about Q3."
+        )
+        assert len(events) == 2
+        assert events[0]["item"]["role"] == "system"
+        assert "Remi asked about Q3." in events[0]["item"]["content"][0]["text"]
+
+
+# ─── summarize_conversation ──────────────────────────────────────────────────
+
+class TestSummarizeConversation:
+    """Tests for summarize_conversation()"""
+
+    def test_uses_llm_summary(self):
+        resp = MagicMock()
+        resp.json.return_value = {"choices": [{"message": {"content": " Short summary. "}}]}
+        client = AsyncMock()
+        client.post = AsyncMock(return_value=resp)
+        client_cm = MagicMock()
+        client_cm.__aenter__ = AsyncMock(return_value=client)
+        client_cm.__aexit__ = AsyncMock(return_value=False)
+
+        with patch.object(_ws, "OPENAI_API_KEY", "sk-test"), \
+             patch.object(_ws.httpx, "AsyncClient", return_value=client_cm):
+            result = asyncio.run(_ws.summarize_conversation("before", "User: hi"))
+
+        assert result == "Short summary."
+        body = client.post.call_args.kwargs["json"]
+        assert "before" in body["messages"][1]["content"]
+        assert "User: hi" in body["messages"][1]["content"]
+
+    def test_falls_back_without_api_key(self):
+        with patch.object(_ws, "OPENAI_API_KEY", None):
+            result = asyncio.run(_ws.summarize_conversation("", "User: hello"))
+        assert "User: hello" in result
+
+    def test_falls_back_on_http_error(self):
+        with patch.object(_ws, "OPENAI_API_KEY", "sk-test"), \
+             patch.object(_ws.httpx, "AsyncClient", side_effect=RuntimeError("no network")):
+            result = asyncio.run(_ws.summarize_conversation("Earlier.", "User: hello"))
+        assert result.startswith("Earlier.")
+
+
+# ─── reconnect_delay ─────────────────────────────────────────────────────────
+
+class TestReconnectDelay:
+    """Tests for reconnect_delay()"""
+
+    def test_first_attempt_is_immediate(self):
+        assert _ws.reconnect_delay(0) == 0.0
+
+    def test_delay_grows_exponentially(self):
+        with patch.object(_ws.random, "random", return_value=0.0):
+            delays = [_ws.reconnect_delay(n) for n in range(1, 4)]
+        base = _ws.OPENAI_RECONNECT_INITIAL_DELAY
+        assert delays == [base, base * 2, base * 4]
+
+    def test_delay_capped_with_jitter(self):
+        with patch.object(_ws.random, "random", return_value=1.0):
+            delay = _ws.reconnect_delay(50)
+        assert delay == pytest.approx(_ws.OPENAI_RECONNECT_MAX_DELAY * 1.1)
+
+
+# ─── record_latency_event ────────────────────────────────────────────────────
+
+class TestRecordLatencyEvent:
+    """Tests for record_latency_event()"""
+
+    def test_records_via_metrics_manager(self):
+        fake_metrics = MagicMock()
+        with patch.dict(sys.modules, {"call_metrics": fake_metrics}):
+            _ws.record_latency_event("CA1", "session_recovery", 420.0, {"attempts": 1})
+
+        fake_metrics.metrics_manager.record_latency_event.assert_called_once_with(
+            "CA1", "session_recovery", 420.0, {"attempts": 1}
+        )
+
+    def test_metrics_failure_is_swallowed(self):
+        fake_metrics = MagicMock()
+        fake_metrics.metrics_manager.record_latency_event.side_effect = RuntimeError("db locked")
+        with patch.dict(sys.modules, {"call_metrics": fake_metrics}):
+            _ws.record_latency_event("CA1", "session_recovery", 1.0)
+
+    def test_missing_call_metrics_is_noop(self):
+        with patch.dict(sys.modules, {"call_metrics": None}):
+            _ws.record_latency_event("CA1", "session_recovery", 1.0)
+
+
+# ─── dispatch_tool_call — deferred mode ───────────────────────────────────────
+
+def _sent(ws):
+    return [json.loads(c[0][0]) for c in ws.send.call_args_list]
+
+
+class TestDeferredToolDispatch:
+    """Tests for dispatch_tool_call(..., call_state=ctx)"""
+
+    def _ctx(self):
+        ws = AsyncMock()
+        return {"openai_ws": ws, "nia_speaking": False, "reconnecting": False,
+                "closing": False, "deferred_tools": set()}, ws
+
+    def test_fast_tool_answers_directly(self):
+        ctx, ws = self._ctx()
+
+        async def quick(**kwargs):
+            return "done"
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"quick": quick}):
+            asyncio.run(_ws.dispatch_tool_call(AsyncMock(), "quick", {}, "c1", call_state=ctx))
+
+        sent = _sent(ws)
+        assert sent[0]["item"]["output"] == "done"
+        assert sent[1]["type"] == "response.create"
+        assert not ctx["deferred_tools"]
+
+    def test_sends_to_current_session_ws(self):
+        ctx, ws = self._ctx()
+        stale_ws = AsyncMock()
+
+        async def quick(**kwargs):
+            return "ok"
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"quick": quick}):
+            asyncio.run(_ws.dispatch_tool_call(stale_ws, "quick", {}, "c1", call_state=ctx))
+
+        assert stale_ws.send.call_count == 0
+        assert ws.send.call_count == 2
+
+    def test_slow_tool_gets_interim_then_real_result(self):
+        ctx, ws = self._ctx()
+
+        async def slow(**kwargs):
+            await asyncio.sleep(0.1)
+            return "reminder set for 3pm"
+
+        async def run():
+            await _ws.dispatch_tool_call(ws, "slow", {}, "c2", call_state=ctx)
+            interim = _sent(ws)
+            assert "Still working" in interim[0]["item"]["output"]
+            assert interim[1]["type"] == "response.create"
+            assert len(ctx["deferred_tools"]) == 1
+            await asyncio.gather(*ctx["deferred_tools"])
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"slow": slow}), \
+             patch.object(_ws, "TOOL_INTERIM_DEADLINE", 0.01):
+            asyncio.run(run())
+
+        late = _sent(ws)[2:]
+        assert late[0]["item"]["type"] == "message"
+        assert "reminder set for 3pm" in late[0]["item"]["content"][0]["text"]
+        assert late[1]["type"] == "response.create"
+        assert not ctx["deferred_tools"]
+
+    def test_deferred_result_waits_for_nia_to_finish(self):
+        ctx, ws = self._ctx()
+        ctx["nia_speaking"] = True
+
+        async def slow(**kwargs):
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def run():
+            await _ws.dispatch_tool_call(ws, "slow", {}, "c3", call_state=ctx)
+            await asyncio.sleep(0.3)
+            assert ws.send.call_count == 2  # interim only
+            ctx["nia_speaking"] = False
+            await asyncio.gather(*ctx["deferred_tools"])
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"slow": slow}), \
+             patch.object(_ws, "TOOL_INTERIM_DEADLINE", 0.01):
+            asyncio.run(run())
+
+        assert ws.send.call_count == 4
+
+    def test_deferred_tool_cancelled_with_call(self):
+        ctx, ws = self._ctx()
+        finished = []
+
+        async def forever(**kwargs):
+            await asyncio.sleep(999)
+            finished.append(True)
+
+        async def run():
+            await _ws.dispatch_tool_call(ws, "forever", {}, "c4", call_state=ctx)
+            tasks = list(ctx["deferred_tools"])
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"forever": forever}), \
+             patch.object(_ws, "TOOL_INTERIM_DEADLINE", 0.01):
+            asyncio.run(run())
+
+        assert finished == []
+        assert ws.send.call_count == 2  # interim only, no late result
+
+    def test_call_ended_before_interim_deadline_cancels_tool(self):
+        ctx, ws = self._ctx()
+        cancelled = []
+
+        async def slow(**kwargs):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def run():
+            _ws.tool_scheduler.spawn(
+                "CA1", _ws.dispatch_tool_call(ws, "slow", {}, "c7", call_state=ctx)
+            )
+            await asyncio.sleep(0.05)
+            await _ws.tool_scheduler.cancel_call("CA1")
+            await asyncio.sleep(0.05)  # Let the inner tool task unwind
+            assert cancelled == [True]  # Before asyncio.run tears the loop down
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"slow": slow}), \
+             patch.object(_ws, "TOOL_INTERIM_DEADLINE", 5.0):
+            asyncio.run(run())
+
+        assert ws.send.call_count == 0
+
+    def test_deferred_tool_hard_timeout(self):
+        ctx, ws = self._ctx()
+
+        async def forever(**kwargs):
+            await asyncio.sleep(999)
+
+        async def run():
+            await _ws.dispatch_tool_call(ws, "forever", {}, "c5", call_state=ctx)
+            await asyncio.gather(*ctx["deferred_tools"])
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"forever": forever}), \
+             patch.object(_ws, "TOOL_INTERIM_DEADLINE", 0.01), \
+             patch.object(_ws, "TOOL_DEFERRED_TIMEOUT", 0.05):
+            asyncio.run(run())
+
+        late = _sent(ws)[2]
+        assert "did not finish in time" in late["item"]["content"][0]["text"]
+
+    def test_tool_error_reported_in_deferred_mode(self):
+        ctx, ws = self._ctx()
+
+        async def broken(**kwargs):
+            raise ValueError("bad input")
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"broken": broken}):
+            asyncio.run(_ws.dispatch_tool_call(ws, "broken", {}, "c6", call_state=ctx))
+
+        assert "Tool error: bad input" in _sent(ws)[0]["item"]["output"]
+
+    def test_overloaded_scheduler_degrades_gracefully(self):
+        ctx, ws = self._ctx()
+
+        async def quick(**kwargs):
+            return "never"
+
+        with patch.dict(_ws.TOOL_REGISTRY, {"quick": quick}), \
+             patch.object(_ws, "_run_scheduled_tool",
+                          AsyncMock(side_effect=_ws.SchedulerOverloaded("full"))):
+            asyncio.run(_ws.dispatch_tool_call(ws, "quick", {}, "c8", call_state=ctx))
+
+        assert _sent(ws)[0]["item"]["output"] == _ws.TOOL_OVERLOADED_MESSAGE
+
+    def test_every_tool_has_a_scheduler_class(self):
+        assert set(_ws.TOOL_REGISTRY) <= set(_ws.TOOL_CLASSES)
+
+    def test_unknown_tool_in_deferred_mode(self):
+        ctx, ws = self._ctx()
+        asyncio.run(_ws.dispatch_tool_call(ws, "nope", {}, "c7", call_state=ctx))
+        assert "Unknown tool" in _sent(ws)[0]["item"]["output"]
+
+
+# ─── summarize_and_remember ──────────────────────────────────────────────────
+
+def _http_client(status_code=200, content="Remi asked about the launch."):
+    resp = MagicMock()
+    resp.status_code = status_code
+    resp.text = ""
+    resp.json.return_value = {"choices": [{"message": {"content": content}}]}
+    client = AsyncMock()
+    client.post = AsyncMock(return_value=resp)
+    client_cm = MagicMock()
+    client_cm.__aenter__ = AsyncMock(return_value=client)
+    client_cm.__aexit__ = AsyncMock(return_value=False)
+    return client, client_cm
+
+
+class TestSummarizeAndRemember:
+    """Resumable post-call steps run by the post-call queue."""
+
+    TRANSCRIPT = [{"speaker": "user", "content": "how is the launch going"}]
+
+    def _run(self, tmp_path, client_cm, **kwargs):
+        batcher = _ws.MemoryAppendBatcher(flush_interval=0.0)
+        with patch.object(_ws, "OPENAI_API_KEY", "sk-test"), \
+             patch.object(_ws, "OPENCLAW_TOKEN", "tok"), \
+             patch.object(_ws, "WORKSPACE_ROOT", tmp_path), \
+             patch.object(_ws, "memory_batcher", batcher), \
+             patch.object(_ws.httpx, "AsyncClient", return_value=client_cm):
+            asyncio.run(_ws.summarize_and_remember("CA1", self.TRANSCRIPT, "", 42.0, **kwargs))
+
+    def test_all_steps_recorded(self, tmp_path):
+        client, client_cm = _http_client()
+        state, checkpoints = {}, []
+        self._run(tmp_path, client_cm, state=state,
+                  checkpoint=lambda s: checkpoints.append(dict(s)),
+                  ended_at=1767261600.0)
+        assert state == {"summary": "Remi asked about the launch.",
+                         "memory_written": True, "woken": True}
+        assert len(checkpoints) == 3
+        [daily] = (tmp_path / "memory").glob("*.md")
+        assert "Remi asked about the launch." in daily.read_text()
+
+    def test_finished_steps_skipped_on_retry(self, tmp_path):
+        client, client_cm = _http_client()
+        state = {"summary": "Earlier summary.", "memory_written": True}
+        self._run(tmp_path, client_cm, state=state)
+        # Only the wake call is made; no second memory entry
+        assert client.post.call_count == 1
+        assert "/internal/events/wake" in client.post.call_args.args[0]
+        assert not (tmp_path / "memory").exists()
+        assert state["woken"] is True
+
+    def test_wake_failure_raises_unless_final(self, tmp_path):
+        client, client_cm = _http_client(status_code=503)
+        state = {"summary": "s", "memory_written": True}
+        with pytest.raises(RuntimeError):
+            self._run(tmp_path, client_cm, state=state, final_attempt=False)
+        assert "woken" not in state
+        self._run(tmp_path, client_cm, state=state, final_attempt=True)
+        assert "woken" not in state
+
+    def test_summary_failure_falls_back_on_final_attempt(self, tmp_path):
+        state = {}
+        with patch.object(_ws, "OPENAI_API_KEY", "sk-test"), \
+             patch.object(_ws.httpx, "AsyncClient", side_effect=RuntimeError("down")):
+            with pytest.raises(RuntimeError):
+                asyncio.run(_ws.summarize_and_remember(
+                    "CA1", self.TRANSCRIPT, state=state, final_attempt=False))
+        assert state == {}
+
+        client, client_cm = _http_client()
+        with patch.object(_ws, "OPENAI_API_KEY", "sk-test"), \
+             patch.object(_ws, "OPENCLAW_TOKEN", None), \
+             patch.object(_ws, "WORKSPACE_ROOT", tmp_path), \
+             patch.object(_ws, "memory_batcher", _ws.MemoryAppendBatcher(flush_interval=0.0)), \
+             patch.object(_ws.httpx, "AsyncClient", side_effect=RuntimeError("down")):
+            asyncio.run(_ws.summarize_and_remember("CA1", self.TRANSCRIPT, state=state))
+        assert state["summary"].startswith("[Auto-summary unavailable]")
+
+    def test_job_handler_passes_payload(self):
+        job = _ws.PostCallJob(
+            call_sid="CA9", payload={"transcript": self.TRANSCRIPT, "duration_s": 5.0,
+                                     "caller_number": "+15550001111", "ended_at": 100.0},
+            status="running", attempts=5, max_attempts=5, created_at=0.0,
+        )
+        with patch.object(_ws, "summarize_and_remember", new=AsyncMock()) as mock:
+            asyncio.run(_ws._run_post_call_job(job))
+        args, kwargs = mock.call_args
+        assert args == ("CA9", self.TRANSCRIPT, "+15550001111", 5.0)
+        assert kwargs["final_attempt"] is True
+        assert kwargs["ended_at"] == 100.0
+        assert kwargs["state"] is job.state
+
+
+# ─── Source-level checks ─────────────────────────────────────────────────────
+
+class TestReconnectSource:
+    """The media bridge must reconnect instead of exiting on ConnectionClosed."""
+
+    @pytest.fixture(scope="class")
+    def src(self):
+        with open(_SERVER_PATH) as f:
+            return f.read()
+
+    def test_receiver_reconnects(self, src):
+        assert "await reconnect_openai()" in src
+
+    def test_audio_backlog_bounded(self, src):
+        assert "deque(maxlen=AUDIO_BACKLOG_MAX_FRAMES)" in src
+
+    def test_recovery_recorded_as_latency_event(self, src):
+        assert '"session_recovery"' in src
+
+    def test_compaction_runs_between_turns(self, src):
+        assert "maybe_compact()" in src
+        assert "conversation.item.deleted" in src
+
+    def test_post_call_work_is_queued(self, src):
+        assert "await post_call_queue.enqueue(call_sid, payload)" in src
+        assert "await post_call_queue.start()" in src
+
+    def test_both_legs_fed_to_recorder(self, src):
+        assert 'ctx["recorder"].feed_caller(' in src
+        assert 'ctx["recorder"].feed_agent(payload)' in src
+        assert "await finish_audio_recording(" in src
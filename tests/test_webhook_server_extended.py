@@ -413,6 +413,41 @@ class TestBuildCallPromptExtended:
             prompt = build_call_prompt()
         assert "Previous call question" in prompt or "Recent Call History" in prompt
 
+    def test_prompt_cached_until_source_changes(self, tmp_path):
+        memory_file = tmp_path / "MEMORY.md"
+        memory_file.write_text("first version")
+        with patch.object(_ws_mod, 'WORKSPACE_ROOT', tmp_path):
+            hits = _ws_mod.prompt_planner.stats["cache_hits"]
+            first = build_call_prompt("+250794002033")
+            again = build_call_prompt("+250794002033")
+            assert again == first
+            assert _ws_mod.prompt_planner.stats["cache_hits"] == hits + 1
+
+            memory_file.write_text("second version, longer")
+            updated = build_call_prompt("+250794002033")
+        assert "second version" in updated
+
+    def test_unknown_caller_gets_no_personal_context(self, tmp_path):
+        (tmp_path / "USER.md").write_text("Remi's private notes")
+        (tmp_path / "SOUL.md").write_text("I am Nia.")
+        with patch.object(_ws_mod, 'WORKSPACE_ROOT', tmp_path):
+            known = build_call_prompt("+250794002033")
+            stranger = build_call_prompt("+19995550100")
+        assert "Remi's private notes" in known
+        assert "Remi's private notes" not in stranger
+        assert "I am Nia." in stranger
+
+    def test_prompt_respects_token_budget(self, tmp_path):
+        (tmp_path / "SOUL.md").write_text("soul " * 400)
+        (tmp_path / "MEMORY.md").write_text("memory line\n" * 400)
+        (tmp_path / "USER.md").write_text("user " * 300)
+        with patch.object(_ws_mod, 'WORKSPACE_ROOT', tmp_path), \
+             patch.object(_ws_mod.prompt_planner, 'budget_tokens', 900):
+            prompt = build_call_prompt("+250794002033")
+        assert len(prompt) <= 900 * 4
+        assert "ABSOLUTE RULE" in prompt[:200]
+        assert "# This Call" in prompt
+
 
 # ─── generate_thinking_tone ────────────────────────────────────────────────────
 
@@ -429,10 +429,10 @@ class TestSaveTranscript:
 
         transcripts_dir = tmp_path / "memory" / "call-transcripts"
         assert transcripts_dir.exists()
-        files = list(transcripts_dir.glob("*CA123*.json"))
-        assert len(files) == 1
+        segments = list((transcripts_dir / "segments").glob("*.jsonl"))
+        assert len(segments) == 1
 
-        data = json.loads(files[0].read_text())
+        data = _ws.get_archive(transcripts_dir).get("CA123")
         assert data["call_sid"] == "CA123"
         assert data["turns"] == 2
         assert data["transcript"][0]["content"] == "Hello Nia"
@@ -441,15 +441,15 @@ class TestSaveTranscript:
         with patch.object(_ws, "WORKSPACE_ROOT", tmp_path):
             _save_transcript("CA000", [])
 
-        files = list((tmp_path / "memory" / "call-transcripts").glob("*.json"))
-        assert len(files) == 1
-        data = json.loads(files[0].read_text())
-        assert data["turns"] == 0
+        archive = _ws.get_archive(tmp_path / "memory" / "call-transcripts")
+        [entry] = archive.recent(5)
+        assert entry.call_sid == "CA000"
+        assert entry.turns == 0
 
     def test_handles_write_exception_gracefully(self, tmp_path):
         """Should log but not raise even if write fails."""
         with patch.object(_ws, "WORKSPACE_ROOT", tmp_path):
-            with patch.object(Path, "write_text", side_effect=PermissionError("no write")):
+            with patch("builtins.open", side_effect=PermissionError("no write")):
                 # Should NOT raise
                 _save_transcript("CA_BROKEN", [{"speaker": "user", "content": "test"}])
 